@@ -0,0 +1,220 @@
+# artifacts.py
+"""
+Precompiled artifact bundle: τα παράγωγα indexes χτίζονται μία φορά στο build και το app
+τα διαβάζει από ένα read-only mmap αντί να τα ξαναχτίζει σε κάθε boot.
+
+    register(name, build, sources=...)   δήλωση section (στο import του module που το χρειάζεται)
+    load(name)                           από το bundle αν το section είναι φρέσκο, αλλιώς build()
+    python -m artifacts build            γράφει όλα τα sections στο ARTIFACTS_FILE
+    python -m artifacts info             sections, μέγεθος και αν είναι φρέσκα
+
+Μορφή (little-endian):
+
+    header   b"BOOKYART" | u32 FORMAT_VERSION | u32 πλήθος sections
+    toc      ανά section: name[32] | digest[16] | u64 offset | u64 length
+    data     marshal blobs
+
+Το digest κάθε section είναι blake2b των αρχείων πηγής του (περιεχόμενο + basename). Στο boot
+αν δεν ταιριάζει (άλλαξε το constants.json, το intents.json, …) το section αγνοείται και χτίζεται
+από την πηγή — ποτέ stale δεδομένα. Το αρχείο γίνεται mmap μία φορά· τα pages του μοιράζονται
+μεταξύ workers μέσω του page cache και κάθε section αποκωδικοποιείται (marshal) μόνο όταν ζητηθεί.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import importlib
+import logging
+import marshal
+import mmap
+import os
+import struct
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ARTIFACTS_FILE = os.getenv("ARTIFACTS_FILE", "data/artifacts.bin")
+ARTIFACTS_ENABLED = os.getenv("ARTIFACTS_ENABLED", "1").lower() in {"1", "true", "yes", "on"}
+
+MAGIC = b"BOOKYART"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sII")
+_ENTRY = struct.Struct("<32s16sQQ")
+
+# modules που δηλώνουν sections στο import τους (για το build)
+PRODUCERS = ("livedata", "tools", "intents", "phrases")
+
+
+@dataclass
+class Section:
+    name: str
+    build: Callable[[], Any]
+    sources: Tuple[str, ...]
+    encode: Optional[Callable[[Any], Any]] = None  # value → marshal-able
+    decode: Optional[Callable[[Any], Any]] = None  # marshal-able → value
+
+
+_SECTIONS: Dict[str, Section] = {}
+
+
+def digest(sources: Iterable[str]) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(FORMAT_VERSION.to_bytes(4, "little"))
+    for path in sources:
+        h.update(os.path.basename(path).encode())
+        try:
+            with open(path, "rb") as f:
+                h.update(f.read())
+        except OSError:
+            h.update(b"\0missing")
+    return h.digest()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Bundle (read-only mmap)
+
+class Bundle:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: δεν είναι artifact bundle")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path}: format v{version}, αναμένεται v{FORMAT_VERSION}")
+        self.toc: Dict[str, Tuple[bytes, int, int]] = {}
+        pos = _HEADER.size
+        for _ in range(count):
+            name, dig, off, length = _ENTRY.unpack_from(self._mm, pos)
+            self.toc[name.rstrip(b"\0").decode()] = (dig, off, length)
+            pos += _ENTRY.size
+
+    def raw(self, name: str, expected_digest: Optional[bytes] = None) -> Any:
+        """Το marshal payload του section, ή KeyError αν λείπει/είναι stale."""
+        dig, off, length = self.toc[name]
+        if expected_digest is not None and dig != expected_digest:
+            raise KeyError(name)
+        with memoryview(self._mm) as mv, mv[off:off + length] as view:
+            return marshal.loads(view)
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+def write(path: str, payloads: Dict[str, Tuple[bytes, Any]]) -> int:
+    """payloads: name → (digest, marshal-able value). Atomic (tmp + rename). Επιστρέφει bytes."""
+    blobs = [(name, dig, marshal.dumps(value)) for name, (dig, value) in sorted(payloads.items())]
+    off = _HEADER.size + _ENTRY.size * len(blobs)
+    toc = bytearray(_HEADER.pack(MAGIC, FORMAT_VERSION, len(blobs)))
+    for name, dig, blob in blobs:
+        key = name.encode()
+        if len(key) > 32:
+            raise ValueError(f"section name too long: {name}")
+        toc += _ENTRY.pack(key, dig, off, len(blob))
+        off += len(blob)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(toc)
+        for _name, _dig, blob in blobs:
+            f.write(blob)
+    os.replace(tmp, path)  # οι workers που έχουν ήδη mmap κρατούν το παλιό inode
+    return off
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Registry
+
+_BUNDLE: Optional[Bundle] = None
+_OPENED = False
+_LOCK = threading.Lock()
+_BUILDING = False  # στο `python -m artifacts build`: πάντα από την πηγή
+STATS = {"hit": 0, "miss": 0}
+
+
+def _bundle() -> Optional[Bundle]:
+    global _BUNDLE, _OPENED
+    if not _OPENED:
+        with _LOCK:
+            if not _OPENED:
+                if ARTIFACTS_ENABLED and not _BUILDING and os.path.exists(ARTIFACTS_FILE):
+                    try:
+                        _BUNDLE = Bundle(ARTIFACTS_FILE)
+                    except Exception:
+                        logger.warning("artifacts: αγνοώ το %s", ARTIFACTS_FILE, exc_info=True)
+                _OPENED = True
+    return _BUNDLE
+
+
+def register(name: str, build: Callable[[], Any], *, sources: Iterable[str],
+             encode: Optional[Callable[[Any], Any]] = None,
+             decode: Optional[Callable[[Any], Any]] = None) -> None:
+    _SECTIONS[name] = Section(name, build, tuple(sources), encode, decode)
+
+
+def load(name: str) -> Any:
+    sec = _SECTIONS[name]
+    b = _bundle()
+    if b is not None and name in b.toc:
+        try:
+            raw = b.raw(name, digest(sec.sources))
+            STATS["hit"] += 1
+            return sec.decode(raw) if sec.decode else raw
+        except KeyError:
+            logger.info("artifacts: το section %s είναι stale — build από την πηγή", name)
+        except Exception:
+            logger.warning("artifacts: αποτυχία ανάγνωσης %s", name, exc_info=True)
+    STATS["miss"] += 1
+    return sec.build()
+
+
+def build(path: str = ARTIFACTS_FILE) -> Dict[str, int]:
+    """Χτίζει όλα τα δηλωμένα sections από την πηγή και γράφει το bundle."""
+    global _BUILDING
+    _BUILDING = True
+    try:
+        for mod in PRODUCERS:
+            importlib.import_module(mod)
+        payloads: Dict[str, Tuple[bytes, Any]] = {}
+        for name, sec in _SECTIONS.items():
+            value = sec.build()
+            payloads[name] = (digest(sec.sources), sec.encode(value) if sec.encode else value)
+    finally:
+        _BUILDING = False
+    write(path, payloads)
+    return {name: len(marshal.dumps(v)) for name, (_d, v) in payloads.items()}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m artifacts", description="Mr Booky artifact bundle")
+    ap.add_argument("cmd", choices=("build", "info"))
+    ap.add_argument("--out", default=ARTIFACTS_FILE)
+    args = ap.parse_args(argv)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    if args.cmd == "build":
+        sizes = build(args.out)
+        for name, n in sorted(sizes.items()):
+            print(f"{name:<32} {n:>9} B")
+        print(f"✔ {args.out} ({os.path.getsize(args.out)} B, format v{FORMAT_VERSION})")
+        return 0
+
+    for mod in PRODUCERS:
+        importlib.import_module(mod)
+    b = Bundle(args.out)
+    for name, (dig, _off, length) in sorted(b.toc.items()):
+        sec = _SECTIONS.get(name)
+        state = "unknown" if sec is None else ("fresh" if digest(sec.sources) == dig else "stale")
+        print(f"{name:<32} {length:>9} B  {state}")
+    return 0
+
+
+if __name__ == "__main__":
+    # ίδιο module object με αυτό που κάνουν import οι producers (όχι το __main__)
+    from artifacts import main as _main
+
+    sys.exit(_main())
@@ -0,0 +1,13 @@
+# benchmarks/__init__.py
+"""
+Micro-benchmarks για τα hot paths κειμένου του Mr Booky.
+
+Τρέχει standalone (χωρίς pytest-benchmark):
+
+    python -m benchmarks.run                      # μέτρηση & εκτύπωση
+    python -m benchmarks.run --save               # ενημέρωση baseline.json
+    python -m benchmarks.run --check              # regression check (exit 1)
+    python -m benchmarks.run --check --threshold 1.5 -k route
+
+Τα baselines αποθηκεύονται στο ``benchmarks/baseline.json`` (ns/op ανά case).
+"""
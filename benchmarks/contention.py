@@ -0,0 +1,75 @@
+# benchmarks/contention.py
+"""
+Contention του in-memory rate limiter: N threads × M keys, sharded vs ένα lock.
+
+    python -m benchmarks.contention
+    python -m benchmarks.contention --threads 32 --keys 200000 --ops 20000 --shards 1 16 64
+
+Για κάθε αριθμό shards τυπώνει throughput, πόσα acquire βρήκαν το lock πιασμένο
+(`contended`) και το μέγεθος της μνήμης (keys) μετά το cap/eviction.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+from security import Bucket, MemoryRateLimiter
+
+
+def run(shards: int, *, threads: int, ops: int, keys: int, max_keys: int, seed: int = 7) -> Dict[str, float]:
+    rl = MemoryRateLimiter(shards=shards, max_keys=max_keys, prune_sec=0.5)
+    start = threading.Barrier(threads + 1)
+
+    def worker(n: int) -> None:
+        rng = random.Random(seed + n)
+        # IP churn: τα περισσότερα keys εμφανίζονται μία φορά, λίγα "hot" (API keys)
+        batch = [
+            [Bucket(f"key:{rng.randrange(16)}", 1.0, 60), Bucket(f"ip:{rng.randrange(keys)}", 1.0, 60)]
+            if rng.random() < 0.3 else [Bucket(f"ip:{rng.randrange(keys)}", 1.0, 60)]
+            for _ in range(ops)
+        ]
+        start.wait()
+        for b in batch:
+            rl.take(b)
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    start.wait()
+    t0 = time.perf_counter()
+    for t in pool:
+        t.join()
+    dt = time.perf_counter() - t0
+    st = rl.stats()
+    total = threads * ops
+    return {
+        "shards": shards,
+        "ops_per_sec": total / dt,
+        "contended_pct": 100.0 * st["contended"] / max(total, 1),
+        "keys": st["keys"],
+        "evicted": st["evicted"],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.contention", description="rate limiter lock contention")
+    ap.add_argument("--threads", type=int, default=16)
+    ap.add_argument("--ops", type=int, default=10_000, help="requests ανά thread")
+    ap.add_argument("--keys", type=int, default=500_000, help="πλήθος διαφορετικών IPs")
+    ap.add_argument("--max-keys", type=int, default=50_000)
+    ap.add_argument("--shards", type=int, nargs="+", default=[1, 16, 64])
+    args = ap.parse_args(argv)
+
+    print(f"{'shards':>7}  {'ops/s':>12}  {'contended':>10}  {'keys':>8}  {'evicted':>8}")
+    for n in args.shards:
+        r = run(n, threads=args.threads, ops=args.ops, keys=args.keys, max_keys=args.max_keys)
+        print(f"{n:>7}  {r['ops_per_sec']:>12,.0f}  {r['contended_pct']:>9.1f}%  {r['keys']:>8}  {r['evicted']:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
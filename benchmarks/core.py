@@ -0,0 +1,106 @@
+# benchmarks/core.py
+"""Μικρός harness: registry από cases, μέτρηση ns/op, baselines & σύγκριση."""
+from __future__ import annotations
+
+import json
+import os
+import platform
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+BASELINE_FILE = Path(__file__).with_name("baseline.json")
+DEFAULT_THRESHOLD = float(os.getenv("BENCH_THRESHOLD", "1.30"))  # +30% = regression
+
+
+@dataclass
+class Case:
+    name: str
+    fn: Callable[[Any], Any]
+    inputs: Sequence[Any]
+    setup: Optional[Callable[[], None]] = None
+
+
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str, inputs: Sequence[Any], *, setup: Optional[Callable[[], None]] = None):
+    """Decorator: δηλώνει μια συνάρτηση ενός ορίσματος ως benchmark case."""
+    def _wrap(fn: Callable[[Any], Any]):
+        CASES[name] = Case(name=name, fn=fn, inputs=list(inputs), setup=setup)
+        return fn
+    return _wrap
+
+
+def measure(c: Case, *, repeat: int = 5, target_sec: float = 0.05) -> float:
+    """Επιστρέφει ns ανά κλήση (min από `repeat` γύρους πάνω σε όλο το corpus)."""
+    if c.setup:
+        c.setup()
+    fn, inputs = c.fn, c.inputs
+    n_inputs = max(len(inputs), 1)
+
+    # warm-up + calibration: πόσα περάσματα χωράνε στο target_sec
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            for x in inputs:
+                fn(x)
+        dt = time.perf_counter() - t0
+        if dt >= target_sec or loops >= 1 << 16:
+            break
+        loops *= 2
+
+    best = float("inf")
+    for _ in range(max(repeat, 1)):
+        t0 = time.perf_counter_ns()
+        for _ in range(loops):
+            for x in inputs:
+                fn(x)
+        best = min(best, (time.perf_counter_ns() - t0) / (loops * n_inputs))
+    return float(best)
+
+
+def load_baseline(path: Path = BASELINE_FILE) -> Dict[str, float]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return {k: float(v) for k, v in (data.get("results") or {}).items()}
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(results: Dict[str, float], path: Path = BASELINE_FILE) -> None:
+    old: Dict[str, float] = load_baseline(path)
+    old.update({k: round(v, 1) for k, v in results.items()})
+    payload = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "updated": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "unit": "ns/op",
+        },
+        "results": dict(sorted(old.items())),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def compare(
+    results: Dict[str, float], baseline: Dict[str, float], *, threshold: float = DEFAULT_THRESHOLD
+) -> List[Dict[str, Any]]:
+    """Γραμμές σύγκρισης· `regression=True` όταν current/baseline > threshold."""
+    rows: List[Dict[str, Any]] = []
+    for name, cur in sorted(results.items()):
+        base = baseline.get(name)
+        ratio = (cur / base) if base else None
+        rows.append({
+            "name": name,
+            "ns_per_op": cur,
+            "baseline": base,
+            "ratio": ratio,
+            "regression": bool(ratio is not None and ratio > threshold),
+        })
+    return rows
@@ -0,0 +1,136 @@
+# benchmarks/corpus.py
+"""Ρεαλιστικά inputs (ελληνικά / greeklish / αγγλικά) για τα benchmarks."""
+from __future__ import annotations
+
+# Μηνύματα χρηστών όπως έρχονται στο /chat
+USER_MESSAGES = [
+    "πόσο κοστίζει από Πάτρα μέχρι Αθήνα;",
+    "ποσο κανει απο πατρα μεχρι καλαβρυτα",
+    "apo patra mexri athina poso kostizei?",
+    "apo rio mehri to aerodromio araxou",
+    "πόσα χιλιόμετρα είναι μέχρι την Σπάρτη;",
+    "τιμή για Ναύπακτο",
+    "μέχρι Αίγιο",
+    "Πάτρα Πρέβεζα",
+    "ποιο φαρμακειο εφημερευει ;",
+    "φαρμακείο στα Βραχναίικα",
+    "farmakeio sta vraxnaika",
+    "παραλια",
+    "ποιο νοσοκομείο εφημερεύει αύριο;",
+    "τηλέφωνο ραδιοταξί",
+    "κάνετε εκδρομές στους Δελφούς;",
+    "θέλω να κλείσω ταξί για αύριο στις 18:30 από Κορίνθου 25",
+    "02:00 - 08:30 ΑΓΓΕΛΟΠΟΥΛΟΥ ΕΦΗ — ΑΓ. ΙΩΑΝΝΗ ΠΡΑΤΣΙΚΑ 58",
+    "how much is a taxi from the new port to the university hospital?",
+    "ναι",
+    "άκυρο",
+]
+
+# Κείμενα διαδρομών για route parsing
+ROUTE_TEXTS = [
+    "πόσο κοστίζει από Πάτρα μέχρι Αθήνα;",
+    "από Ρίο προς Καλάβρυτα",
+    "apo patra mexri athina poso kostizei?",
+    "apo rio mehri to aerodromio araxou",
+    "from patras to athens airport",
+    "Κόρινθο από Πάτρα",
+    "μέχρι τη Θήβα",
+    "για Ναύπακτο τιμή",
+    "ταξί από Αγίου Ανδρέου 45 έως ΚΤΕΛ Αχαΐας",
+    "ews to limani tis kyllinis",
+]
+
+# Διάρκειες σε ό,τι μορφή επιστρέφουν τα upstream APIs
+DURATIONS = [
+    140,
+    8400,
+    "2:24",
+    "113:03",
+    "PT2H24M",
+    "PT45M30S",
+    "8640s",
+    "2 ώρες και 20 λεπτά",
+    "45 λεπτά",
+    "95",
+    None,
+]
+
+# Dialogflow-like απαντήσεις του Timologio /webhook
+TIMOLOGIO_REPLIES = [
+    {
+        "fulfillment_response": {
+            "messages": [
+                {
+                    "text": {
+                        "text": [
+                            "Η διαδρομή από Πάτρα προς Αθήνα είναι 211,4 χλμ. "
+                            "Κόστος: 268,50 € Διάρκεια: ~2 ώρες και 24 λεπτά. "
+                            "<a href='https://www.google.com/maps/dir/?api=1&origin=Patra&destination=Athens'>Χάρτης</a>"
+                        ]
+                    }
+                }
+            ]
+        }
+    },
+    {
+        "fulfillment_response": {
+            "messages": [{"text": {"text": ["Απόσταση 35,2 χλμ — 48,00 € — 0:42"]}}]
+        },
+        "map_url": "https://www.google.com/maps/dir/?api=1&origin=Rio&destination=Kalavryta",
+    },
+    {
+        "fulfillment_response": {
+            "messages": [{"text": {"text": ["Κόστος περίπου 1.120,00 € για 812 χλμ, ~540 λεπτά"]}}]
+        }
+    },
+]
+
+# Απαντήσεις εργαλείων πριν το post-processing
+TOOL_REPLIES = [
+    (
+        "💶 Εκτίμηση: 270€\n🛣️ Απόσταση: ~211.4 km\n⏱️ Χρόνος: ~2 ώρες και 33 λεπτά\n"
+        "[📌 Δες τη διαδρομή στον χάρτη](https://www.google.com/maps/dir/?api=1&origin=Patra"
+        "&destination=Athens&travelmode=driving)\n⚠️ Η τιμή δεν περιλαμβάνει διόδια."
+    ),
+    (
+        "**Περιοχή: Παραλία Πατρών**\n🕘 08:00 - 21:00\n• Φαρμακείο Α — Παραλία - Οδός 1\n"
+        "• Φαρμακείο Β — Παραλία - Οδός 2\n🕘 21:00 - 08:00\n• Φαρμακείο Γ — Ακτή Δυμαίων 12"
+    ),
+    "🏥 ΠΓΝΠ Ρίο εφημερεύει σήμερα.",
+    "📞 Τηλέφωνο: 2610 450000\n🌐 Ιστότοπος: https://taxipatras.com",
+    "Η Πάτρα έχει υπέροχα καφέ στην Ρήγα Φεραίου 😊 ☕ 🌊 🎉 🙌 ✨",
+    (
+        "Δες τη διαδρομή https://www.google.com/maps/dir/?api=1&origin=Rio&destination=Patra "
+        "και πες μου αν θες κράτηση."
+    ),
+]
+
+# (reply, intent) για enrich_reply
+ENRICH_CASES = [
+    (TOOL_REPLIES[0], "TripCostIntent"),
+    (TOOL_REPLIES[1], "OnDutyPharmacyIntent"),
+    (TOOL_REPLIES[2], "HospitalIntent"),
+    (TOOL_REPLIES[3], "ContactInfoIntent"),
+    (TOOL_REPLIES[4], None),
+]
+
+# Ημερομηνίες όπως τις γράφουν οι χρήστες στο booking
+DATE_HINTS = [
+    "αύριο στις 10:00",
+    "σημερα το απογευμα",
+    "μεθαύριο πρωί",
+    "την Παρασκευή",
+    "κυριακη βραδυ",
+    "2025-09-14 18:30",
+    "tomorrow morning",
+    "όποτε μπορείτε",
+]
+
+# (reply, γλώσσα στόχος) για το template catalog / translation cache
+TRANSLATE_CASES = [
+    (TOOL_REPLIES[0], "en"),
+    (TOOL_REPLIES[1], "de"),
+    (TOOL_REPLIES[3], "fr"),
+    ("Πότε θες παραλαβή; (γράψε ‘άμεσα’ ή ώρα π.χ. 18:30)", "it"),
+    (TOOL_REPLIES[4], "en"),  # δυναμικό → miss (πάει σε LLM)
+]
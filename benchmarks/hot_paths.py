@@ -0,0 +1,141 @@
+# benchmarks/hot_paths.py
+"""Cases για τους helpers που τρέχουν σε κάθε μήνυμα."""
+from __future__ import annotations
+
+import os
+import random
+
+os.environ.setdefault("OPENAI_AGENTS_DISABLE_TRACING", "1")
+
+import main
+import tools
+import greeklish
+import intents
+import router_and_booking
+import translations
+import language_id
+import security
+import phrases
+from api_clients import TimologioClient
+
+from benchmarks import corpus
+from benchmarks.core import case
+
+_SID = "bench:decide"
+
+
+def _seed() -> None:
+    random.seed(1234)
+
+
+case("tools._norm_txt", corpus.USER_MESSAGES)(tools._norm_txt)
+case("tools._preclean_route_text", corpus.ROUTE_TEXTS)(tools._preclean_route_text)
+case("greeklish.skeleton", corpus.USER_MESSAGES)(greeklish.skeleton)
+case("tools._area_from_text", corpus.USER_MESSAGES)(tools._area_from_text)
+case("tools._extract_route_free_text", corpus.ROUTE_TEXTS)(tools._extract_route_free_text)
+case("tools._normalize_minutes", corpus.DURATIONS)(tools._normalize_minutes)
+case("TimologioClient._parse_timologio", corpus.TIMOLOGIO_REPLIES)(TimologioClient._parse_timologio)
+case("main.strip_map_link", corpus.TOOL_REPLIES)(main.strip_map_link)
+case("intents.extract_entities", corpus.USER_MESSAGES)(intents.extract_entities)
+case("router_and_booking.parse_date_hint", corpus.DATE_HINTS)(router_and_booking.parse_date_hint)
+
+
+@case("main.enrich_reply", corpus.ENRICH_CASES, setup=_seed)
+def _enrich(args):
+    text, intent = args
+    return main.enrich_reply(text, intent=intent)
+
+
+# μακριά λίστα εφημερευόντων: το παλιό emoji cap ήταν O(n²)
+_PHARMACY_LIST = "\n".join(f"💊 Φαρμακείο {i} — Κορίνθου {i} 📍 ☎️ 2610{i:06d}" for i in range(60))
+
+
+@case("main.enrich_reply[pharmacy_list]", [(_PHARMACY_LIST, "OnDutyPharmacyIntent")], setup=_seed)
+def _enrich_long(args):
+    text, intent = args
+    return main.enrich_reply(text, intent=intent)
+
+
+@case("main._decide_intent", corpus.USER_MESSAGES)
+def _decide(text):
+    # κάθε μήνυμα ξεκινά από καθαρό session για να μετράμε ίδια δουλειά κάθε φορά
+    main._clear_state(_SID)
+    return main._decide_intent(_SID, text, None, 0.0)
+
+
+@case("translations.localize", corpus.TRANSLATE_CASES)
+def _localize(args):
+    text, lang = args
+    return translations.localize(text, lang)
+
+
+# χωρίς το lru_cache — μετράμε το πραγματικό κόστος ανίχνευσης ανά νέο μήνυμα
+@case("phrases.pick_trendy_phrase", [("joy", "success"), ("surprise", "fallback"), ("neutral", "")], setup=_seed)
+def _pick(args):
+    emotion, context = args
+    return phrases.pick_trendy_phrase(emotion=emotion, context=context, lang="el", season="all")
+
+
+case("language_id.detect", corpus.USER_MESSAGES)(language_id.detect.__wrapped__)
+
+
+_LIMITER = security.MemoryRateLimiter()
+_RL_BUCKETS = [[security.Bucket(f"ip:10.0.{i % 7}.{i}", 1.0, 60)] for i in range(64)]
+
+
+@case("security.MemoryRateLimiter.take", _RL_BUCKETS)
+def _rate_limit(buckets):
+    return _LIMITER.take(buckets)
+
+
+# ── ASGI security layer: παλιά αλυσίδα middlewares vs SecurityMiddleware (ίδιος έλεγχος) ──
+
+async def _asgi_ok(scope, receive, send):
+    return None
+
+
+async def _asgi_receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _asgi_send(message):
+    return None
+
+
+def _drive(coro):
+    # όλα τα awaits ολοκληρώνονται σύγχρονα (memory limiter, no-op app) → χωρίς event loop
+    try:
+        coro.send(None)
+    except StopIteration:
+        pass
+
+
+_SEC_SETTINGS = main.settings.__class__(RATE_LIMIT_MAX_REQ=10**9, RATE_LIMIT_WINDOW_SEC=1)
+_SEC_KEYS = ["bench-key"]
+_LEGACY_STACK = security.RateLimitMiddleware(
+    security.APIKeyAuthMiddleware(security.BodySizeLimitMiddleware(_asgi_ok), keys=_SEC_KEYS),
+    settings=_SEC_SETTINGS,
+)
+_FUSED = security.SecurityMiddleware(_asgi_ok, settings=_SEC_SETTINGS, keys=_SEC_KEYS)
+_SCOPES = [
+    {
+        "type": "http", "method": "POST", "path": "/chat", "client": (f"10.1.0.{i}", 5000),
+        "headers": [
+            (b"host", b"api.example.gr"), (b"user-agent", b"Mozilla/5.0 (Linux; Android 14)"),
+            (b"content-type", b"application/json"), (b"content-length", b"96"),
+            (b"origin", b"https://www.taxipatras.gr"), (b"accept", b"*/*"),
+            (b"accept-language", b"el-GR,el;q=0.9"), (b"x-api-key", b"bench-key"),
+        ],
+    }
+    for i in range(32)
+]
+
+
+@case("security.middleware_stack", _SCOPES)
+def _legacy_security(scope):
+    _drive(_LEGACY_STACK(scope, _asgi_receive, _asgi_send))
+
+
+@case("security.SecurityMiddleware", _SCOPES)
+def _fused_security(scope):
+    _drive(_FUSED(scope, _asgi_receive, _asgi_send))
@@ -0,0 +1,87 @@
+# benchmarks/importtime.py
+"""
+Startup profile: `python -X importtime` του app σε καθαρό subprocess, με budget.
+
+    python -m benchmarks.importtime
+    python -m benchmarks.importtime --top 30 --budget-ms 900 --check
+    python -m benchmarks.importtime --module tools
+
+Τυπώνει το συνολικό import time, τα πιο ακριβά imports (cumulative, πρώτο επίπεδο κάτω από
+το module) και όσα από τα lazy dependencies (LAZY) φορτώθηκαν ήδη στο import. Με --check:
+exit 1 αν ξεπεραστεί το budget ή αν φορτώθηκε κάποιο lazy dependency.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, NamedTuple, Optional
+
+# φορτώνουν στην πρώτη χρήση (startup.LazyModule)· δεν πρέπει να εμφανίζονται στο import του main
+LAZY = ("agents", "openai", "redis", "spacy")
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "900"))
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+class Entry(NamedTuple):
+    name: str
+    self_us: int
+    cum_us: int
+    depth: int
+
+
+def parse(stderr: str) -> List[Entry]:
+    out: List[Entry] = []
+    for line in stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if m:
+            out.append(Entry(m.group(4), int(m.group(1)), int(m.group(2)), (len(m.group(3)) - 1) // 2))
+    return out
+
+
+def profile(module: str) -> List[Entry]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} απέτυχε:\n{proc.stderr[-2000:]}")
+    return parse(proc.stderr)
+
+
+def summary(entries: List[Entry], module: str, *, top: int = 20) -> Dict[str, object]:
+    root = next((e for e in entries if e.name == module and e.depth == 0), None)
+    children = [e for e in entries if e.depth == 1]
+    loaded = sorted({e.name.partition(".")[0] for e in entries} & set(LAZY))
+    return {
+        "total_ms": (root.cum_us if root else sum(e.self_us for e in entries)) / 1000.0,
+        "top": sorted(children, key=lambda e: e.cum_us, reverse=True)[:top],
+        "lazy_loaded": loaded,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.importtime", description="Mr Booky startup import profile")
+    ap.add_argument("--module", default="main")
+    ap.add_argument("--top", type=int, default=20)
+    ap.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    ap.add_argument("--check", action="store_true", help="exit 1 αν ξεπεραστεί το budget ή φορτώθηκε lazy dependency")
+    args = ap.parse_args(argv)
+
+    s = summary(profile(args.module), args.module, top=args.top)
+    width = max([len(e.name) for e in s["top"]] + [6])
+    print(f"{'import'.ljust(width)}  {'cumulative':>11}  {'self':>9}")
+    for e in s["top"]:
+        print(f"{e.name.ljust(width)}  {e.cum_us / 1000:>8.1f} ms  {e.self_us / 1000:>6.1f} ms")
+    over = s["total_ms"] > args.budget_ms
+    print(f"\nimport {args.module}: {s['total_ms']:.0f} ms (budget {args.budget_ms:.0f} ms){'  ⚠️ OVER BUDGET' if over else ''}")
+    if s["lazy_loaded"]:
+        print(f"⚠️ lazy dependencies φορτώθηκαν στο import: {', '.join(s['lazy_loaded'])}")
+    return 1 if args.check and (over or s["lazy_loaded"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
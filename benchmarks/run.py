@@ -0,0 +1,77 @@
+# benchmarks/run.py
+"""CLI: python -m benchmarks.run [--save] [--check] [--threshold X] [-k substr]"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import logging
+import sys
+from typing import Dict, List, Optional
+
+from benchmarks.core import CASES, DEFAULT_THRESHOLD, compare, load_baseline, measure, save_baseline
+
+# Modules που δηλώνουν cases (με το import τους)
+CASE_MODULES = [
+    "benchmarks.hot_paths",
+]
+
+
+def _load_cases() -> None:
+    for mod in CASE_MODULES:
+        importlib.import_module(mod)
+    # τα modules του app κάνουν basicConfig(INFO) — δεν θέλουμε θόρυβο στις μετρήσεις
+    logging.getLogger().setLevel(logging.WARNING)
+
+
+def _fmt_ns(ns: Optional[float]) -> str:
+    if ns is None:
+        return "—"
+    if ns >= 1_000_000:
+        return f"{ns / 1_000_000:.2f} ms"
+    if ns >= 1_000:
+        return f"{ns / 1_000:.2f} µs"
+    return f"{ns:.0f} ns"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.run", description="Mr Booky hot-path benchmarks")
+    ap.add_argument("-k", dest="pattern", default="", help="τρέξε μόνο cases που περιέχουν το substring")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--save", action="store_true", help="γράψε τα αποτελέσματα ως νέο baseline")
+    ap.add_argument("--check", action="store_true", help="exit 1 αν κάποιο case ξεπερνά το threshold")
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="όριο current/baseline")
+    args = ap.parse_args(argv)
+
+    _load_cases()
+    selected = [c for name, c in sorted(CASES.items()) if args.pattern in name]
+    if not selected:
+        print(f"Κανένα case δεν ταιριάζει με '{args.pattern}'", file=sys.stderr)
+        return 2
+
+    results: Dict[str, float] = {}
+    for c in selected:
+        results[c.name] = measure(c, repeat=args.repeat)
+
+    rows = compare(results, load_baseline(), threshold=args.threshold)
+    width = max(len(r["name"]) for r in rows)
+    print(f"{'case'.ljust(width)}  {'current':>11}  {'baseline':>11}  ratio")
+    for r in rows:
+        ratio = f"{r['ratio']:.2f}x" if r["ratio"] is not None else "new"
+        flag = "  ⚠️ REGRESSION" if r["regression"] else ""
+        print(f"{r['name'].ljust(width)}  {_fmt_ns(r['ns_per_op']):>11}  {_fmt_ns(r['baseline']):>11}  {ratio}{flag}")
+
+    if args.save:
+        save_baseline(results)
+        print("✔ baseline.json ενημερώθηκε")
+
+    if args.check:
+        bad = [r["name"] for r in rows if r["regression"]]
+        if bad:
+            print(f"✖ {len(bad)} regression(s) πάνω από {args.threshold:.2f}x: {', '.join(bad)}", file=sys.stderr)
+            return 1
+        print(f"✔ Κανένα regression (threshold {args.threshold:.2f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+# benchmarks/workers.py
+"""
+1 vs N gunicorn workers πάνω στο loadtest harness (stubs + loadgen), με κοινό SQLite state.
+
+    python -m benchmarks.workers
+    python -m benchmarks.workers --workers 1 2 4 --users 40 --duration 20
+    python -m benchmarks.workers --backend memory   # για σύγκριση: state ανά process
+
+Για κάθε αριθμό workers σηκώνει `gunicorn -k uvicorn.workers.UvicornWorker -w N main:app`
+με PERSIST_BACKEND=sqlite (νέο LOCAL_DB σε temp dir), περιμένει το /ready και τρέχει τα
+σενάρια του loadtest.loadgen. Τα upstream APIs και το LLM είναι τα stubs (με latency), άρα
+μετράει ό,τι κάνει το app γύρω τους: routing, sessions, rate limit, idempotency.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from loadtest.loadgen import run_load
+from loadtest.stubs import StubServer
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(url: str, proc: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn τερμάτισε (exit {proc.returncode})")
+        try:
+            if httpx.get(f"{url}/ready", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url}/ready δεν έγινε 200 σε {timeout:.0f}s")
+
+
+def run(workers: int, *, stub_env: Dict[str, str], backend: str, users: int, duration: float,
+        seed: int, boot_timeout: float = 60.0) -> Dict[str, Any]:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory(prefix="bench-workers-") as tmp:
+        env = {
+            **os.environ, **stub_env,
+            "PERSIST_BACKEND": backend,
+            "LOCAL_DB": os.path.join(tmp, "local.sqlite3"),
+            "JOBS_DB": os.path.join(tmp, "jobs.sqlite3"),
+            "WEB_CONCURRENCY": str(workers),
+            # το benchmark μετράει throughput, όχι το όριο του rate limiter
+            "RATE_LIMIT_MAX_REQ": "1000000",
+        }
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-k", "uvicorn.workers.UvicornWorker", "-w", str(workers),
+             "-b", f"127.0.0.1:{port}", "--log-level", "warning", "main:app"],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        )
+        try:
+            t0 = time.monotonic()
+            _wait_ready(url, proc, boot_timeout)
+            boot = time.monotonic() - t0
+            report = asyncio.run(run_load(url, users=users, duration=duration, seed=seed))
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+    s = report.summary()
+    s["workers"] = workers
+    s["boot_sec"] = round(boot, 2)
+    return s
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.workers", description="1 vs N gunicorn workers")
+    ap.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    ap.add_argument("--backend", default="sqlite", choices=("sqlite", "memory", "redis"))
+    ap.add_argument("--users", type=int, default=20)
+    ap.add_argument("--duration", type=float, default=15.0)
+    ap.add_argument("--latency-ms", type=float, default=30.0, help="latency των stubs")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args(argv)
+
+    rows = []
+    with StubServer(latency_ms=args.latency_ms) as stub:
+        for n in args.workers:
+            rows.append(run(n, stub_env=stub.env(), backend=args.backend, users=args.users,
+                            duration=args.duration, seed=args.seed))
+
+    print(f"backend={args.backend} users={args.users} duration={args.duration:.0f}s stubs={args.latency_ms:.0f}ms")
+    print(f"{'workers':>7}  {'rps':>8}  {'p50 ms':>8}  {'p90 ms':>8}  {'p99 ms':>8}  {'errors':>7}  {'boot s':>6}")
+    base = rows[0]["rps"] or 1.0
+    for r in rows:
+        print(f"{r['workers']:>7}  {r['rps']:>8}  {r['p50_ms']:>8}  {r['p90_ms']:>8}  {r['p99_ms']:>8}  "
+              f"{r['errors']:>7}  {r['boot_sec']:>6}   ×{r['rps'] / base:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
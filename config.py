@@ -14,7 +14,7 @@ try:
         ALLOWED_ORIGINS: Union[str, List[str], None] = None
         ALLOWED_ORIGIN_REGEX: Optional[str] = None
 
-        PERSIST_BACKEND: str = "memory"  # memory|redis
+        PERSIST_BACKEND: str = "memory"  # memory|redis|sqlite
         REDIS_URL: Optional[str] = None
 
         TOOL_TIMEOUT_SEC: int = 25
@@ -23,6 +23,9 @@ try:
 
         RATE_LIMIT_WINDOW_SEC: int = 60
         RATE_LIMIT_MAX_REQ: int = 60
+        RATE_LIMIT_BURST: int = 0          # 0 → = RATE_LIMIT_MAX_REQ
+        RATE_LIMIT_IP_MAX_REQ: int = 0     # επιπλέον όριο ανά IP για requests με API key (0 = off)
+        RATE_LIMIT_COSTS: str = ""         # π.χ. "/chat=1,/chat/stream=2"
 
         # Important: ignore extra env vars (TRENDY_PROB, OPENAI_API_KEY, etc.)
         model_config = SettingsConfigDict(
@@ -70,6 +73,9 @@ except Exception:
 
         RATE_LIMIT_WINDOW_SEC: int = 60
         RATE_LIMIT_MAX_REQ: int = 60
+        RATE_LIMIT_BURST: int = 0          # 0 → = RATE_LIMIT_MAX_REQ
+        RATE_LIMIT_IP_MAX_REQ: int = 0     # επιπλέον όριο ανά IP για requests με API key (0 = off)
+        RATE_LIMIT_COSTS: str = ""         # π.χ. "/chat=1,/chat/stream=2"
 
         @validator("ALLOWED_ORIGINS", pre=True)
         def _parse_origins(cls, v):
@@ -71,31 +71,6 @@ BRAND_INFO = {
 DEFAULTS = {
     "default_area": "Πάτρα",
 }
-# Χαρτογράφηση περιοχών -> alias/γραφές (όλα σε πεζά/χωρίς τόνους εσωτερικά)
-AREA_ALIASES = {
-    "Πάτρα": [
-        "πατρα", "πάτρα", "patra", "patras", "κεντρο πατρας", "πλατεια γεωργιου",
-    ],
-    "Ρίο": [
-        "ριο", "ριον", "αντιριο", "γεφυρα ριου", "γεφυρα αντιρριου", "πανεπιστημιο πατρων",
-        "νοσοκομειο ριου", "πανεπιστημιακο νοσοκομειο", "uprio", "university hospital rio",
-    ],
-    "Βραχνέικα": [
-        "βραχναιικα", "βραχνεϊκα", "βραχνεϊκων", "βραχνεικα", "βραχναϊκα",
-        "vraxnaika", "braxnaika", "vrahneika", "brahneika",
-        "τζουκαλαιικα", "τσουκαλαιικα", "tsouka", "tsoukal",
-    ],
-    "Παραλία Πατρών": [
-        "παραλια", "παραλια πατρας", "παραλια πατρων", "paralia patras", "paralia patron",
-    ],
-    "Μεσσάτιδα": [
-        "μεσατιδα", "μεσσατιδα", "οβρυα", "οβρια", "ovria", "δεμενικα", "demenika",
-    ],
-    "Κέντρο Πάτρας": [
-        "κεντρο", "πλατεια γεωργιου", "αγυια", "αγια σοφια",
-    ],
-}
-
 # (προαιρετικά) Πακέτα εκδρομών/υπηρεσίες σε “λίστα από dicts” για μελλοντική χρήση
 SERVICES = [
     {"category": "Μεταφορές", "items": [
@@ -109,131 +84,12 @@ SERVICES = [
 ]
 
 # ==============================
-# 3) Τιμοκατάλογος / Χρεώσεις
+# 3)–5), 7) Τιμοκατάλογος, Φαρμακεία, Εκδρομές, UI Strings → data/constants.json
 # ==============================
 
-TAXI_TARIFF = {
-    "currency": "EUR",
-    "minimum_fare": 4.00,                 # ελάχιστη αποζημίωση
-    "km_rate_zone1": 0.90,                # εντός Πάτρας
-    "km_rate_zone2_or_night": 1.25,       # εκτός πόλης ή βράδυ (διπλή ταρίφα)
-    "radio_taxi_call": 1.92,              # απλή κλήση
-    "radio_taxi_appointment_min": 3.39,   # ραντεβού (κατώτατο)
-    "radio_taxi_appointment_max": 5.65,   # ραντεβού (ανώτατο)
-    "baggage_over_10kg_per_piece": 0.39,
-    "airport_pickup_fee": 4.00,
-    "station_pickup_fee": 1.07,
-    "waiting_per_hour": 15.00,
-    "notes": [
-        "Διόδια & ferry πληρώνονται έξτρα από τον πελάτη.",
-        "Οι τιμές ενδέχεται να διαφέρουν σε ειδικές περιπτώσεις/ώρες."
-    ],
-}
-
-
-# ==============================
-# 4) Φαρμακεία – Περιοχές & Συνώνυμα
-# ==============================
-# Χρησιμοποιείται τόσο από NLP (κανονικοποίηση) όσο και από τον scraper.
-
-PHARMACY_AREAS = [
-    {
-        "canonical": "Πάτρα",
-        "synonyms": ["πατρα", "patra", "patras", "κεντρο", "κέντρο", "πλατεια γεωργιου", "πλατεία γεωργίου"],
-        "pharmacy_url": "https://www.efimeria.gr/Patra",
-        "panel_id": "Patra",
-    },
-    {
-        "canonical": "Ρίο",
-        "synonyms": ["ριο", "αντιρριο", "αντίρριο", "γεφυρα ριου", "γέφυρα ρίο", "πανεπιστημιο", "πανεπιστήμιο", "νοσοκομειο ριου"],
-        "pharmacy_url": "https://www.efimeria.gr/Rio",
-        "panel_id": "Rio",
-    },
-    {
-        "canonical": "Βραχνέικα",
-        "synonyms": ["βραχνεϊκα", "βραχναιικα", "βραχνεικα", "βραχναίικα", "vrahneika", "braxnaika"],
-        "pharmacy_url": "https://www.efimeria.gr/Vrahneika",
-        "panel_id": "Vrahneika",
-    },
-    {
-        "canonical": "Παραλία Πατρών",
-        "synonyms": ["παραλια πατρων", "παραλια πατρας", "παραλία πατρών", "παραλία"],
-        "pharmacy_url": "https://www.efimeria.gr/Paralia_Patrwn",
-        "panel_id": "Paralia_Patrwn",
-    },
-    {
-        "canonical": "Μεσσάτιδα",
-        "synonyms": ["μεσατιδα", "μεσσατιδα", "messatida", "οβρυα", "οβρυά", "ovria", "ovrya", "δεμενικα", "δεμένικα"],
-        "pharmacy_url": "https://www.efimeria.gr/Messatida",
-        "panel_id": "Messatida",
-    },
-]
-
-# π.χ. "Μεσσάτιδα" -> ("https://…/Messatida", "Messatida")
-PHARMACY_AREA_URL_MAP = {
-    area["canonical"]: (area["pharmacy_url"], area["panel_id"])
-    for area in PHARMACY_AREAS
-}
-# ==============================
-# 5) Εκδρομές / Πακέτα
-# ==============================
-
-TOUR_PACKAGES = [
-    {
-        "code": "NAF-GAL-DEL",
-        "title": "Ναύπακτος – Γαλαξίδι – Δελφοί",
-        "price_from": 330,
-        "currency": "EUR",
-        "duration_hours": 7,
-        "languages": ["Ελληνικά", "Αγγλικά"],
-        "includes": ["Μεταφορά", "Διόδια", "Τέλη", "Παιδικά καθίσματα (εφόσον ζητηθεί)"],
-        "excludes": ["Εισιτήρια μουσείων/χώρων", "Ξεναγήσεις", "Γεύματα/ποτά"],
-        "stops": [
-            "Γέφυρα Ρίου-Αντιρρίου",
-            "Κάστρο Ναυπάκτου",
-            "Γαλαξίδι & Ναυτικό Μουσείο",
-            "Αρχαιολογικός Χώρος & Μουσείο Δελφών",
-        ],
-        "pickup": "Πάτρα (08:00–10:00 από το ξενοδοχείο σας)",
-        "passengers_included": "έως 4 άτομα (ίδια τιμή)",
-        "book_url": BRAND_INFO.get("booking_url",""),
-        "tags": ["βουνό", "πολιτισμός", "ημερήσια"],
-        "notes": [
-            "Σταθερή τιμή για 1–4 άτομα",
-            "Ώρα εκκίνησης: 08:00–10:00 από το κατάλυμά σας",
-            "Τα παιδιά προσμετρούνται στον αριθμό επιβατών",]
-    },
-    {
-        "code": "OLYMPIA",
-        "title": "Αρχαία Ολυμπία",
-        "price_from": 290,
-        "currency": "EUR",
-        "duration_hours": 7,
-        "languages": ["Ελληνικά", "Αγγλικά"],
-        "includes": ["Μεταφορά", "Τέλη", "Παιδικά καθίσματα (εφόσον ζητηθεί)"],
-        "excludes": ["Εισιτήρια", "Ξεναγήσεις", "Γεύματα/ποτά"],
-        "stops": [
-            "Ναός Δία",
-            "Ναός Ήρας",
-            "Στάδιο",
-            "Πρυτανείο",
-            "Γυμνάσιο",
-            "Εργαστήριο Φειδία",
-            "Στοά Ηχούς",
-            "Νυμφαίο",
-            "Αρχαιολογικό Μουσείο (Ερμής Πραξιτέλους, Νίκη Παιωνίου)",
-        ],
-        "pickup": "Πάτρα (08:00–10:00 από το ξενοδοχείο)",
-        "passengers_included": "έως 4 άτομα (ίδια τιμή)",
-        "book_url": BRAND_INFO.get("booking_url",""),
-        "tags": ["πολιτισμός", "ημερήσια"],
-         "notes": [
-            "Σταθερή τιμή για 1–4 άτομα",
-            "Ώρα εκκίνησης: 08:00–10:00 από το κατάλυμά σας",
-            "Τα παιδιά προσμετρούνται στον αριθμό επιβατών",]
-    },
-    # ➕ Πρόσθεσε κι άλλα εδώ με την ίδια μορφή
-]
+# TAXI_TARIFF, AREA_ALIASES, PHARMACY_AREAS (+ PHARMACY_AREA_URL_MAP), TOUR_PACKAGES και
+# UI_TEXT ζουν στο data/constants.json με hot reload (βλ. livedata.py). Τα ονόματα μένουν
+# διαθέσιμα εδώ (βλ. __getattr__ στο τέλος) και δίνουν το τρέχον snapshot.
 
 
 # ==============================
@@ -268,21 +124,6 @@ HOSPITALS_META = [
 # 7) UI Strings / Prompts / Disclaimers
 # ==============================
 
-UI_TEXT = {
-    "ask_pharmacy_area": "Για ποια περιοχή να ψάξω εφημερεύον φαρμακείο; π.χ. Πάτρα, Ρίο, Βραχναίικα, Μεσσάτιδα/Οβρυά, Παραλία Πατρών. 😊",
-    "pharmacy_none_for_area": "❌ Δεν βρέθηκαν εφημερεύοντα για {area}. Θες να δοκιμάσουμε άλλη περιοχή;",
-    "generic_error": "❌ Κάτι πήγε στραβά. Θες να δοκιμάσουμε ξανά;",
-    "ask_trip_route": "❓ Πες μου από πού ξεκινάς και πού πας (π.χ. 'από Πάτρα μέχρι Λουτράκι').",
-    "fare_disclaimer": "⚠️ Η τιμή δεν περιλαμβάνει διόδια.",
-    "contact_signature": (
-        "📞 {phone}\n🌐 {site}\n🧾 Κράτηση: {booking}\n📱 Εφαρμογή: {app}"
-    ).format(
-        phone=BRAND_INFO["phone"],
-        site=BRAND_INFO["site_url"],
-        booking=BRAND_INFO["booking_url"],
-        app=BRAND_INFO["app_url"],
-    ),
-}
 # ==============================
 # 8) Sticky Intents (προαιρετικό config)
 # ==============================
@@ -305,3 +146,27 @@ INTENT_SWITCH_KEYWORDS = {
         "activate_any": ["τηλέφων", "τηλ", "επικοιν", "booking", "site", "σελίδ", "app", "εφαρμογ"],
     },
 }
+
+
+# ==============================
+# 9) Δεδομένα με hot reload (data/constants.json)
+# ==============================
+
+_LIVE = {
+    "TAXI_TARIFF": "tariff",
+    "AREA_ALIASES": "area_aliases",
+    "PHARMACY_AREAS": "pharmacy_areas",
+    "PHARMACY_AREA_URL_MAP": "pharmacy_url_map",
+    "TOUR_PACKAGES": "tours",
+    "UI_TEXT": "ui_text",
+}
+
+
+def __getattr__(name):
+    # constants.TAXI_TARIFF κ.λπ. → το τρέχον livedata snapshot (ένα `from constants import X`
+    # κρατά την τιμή της στιγμής του import· ο κώδικας του request path διαβάζει livedata.current())
+    if name in _LIVE:
+        import livedata
+
+        return getattr(livedata.current(), _LIVE[name])
+    raise AttributeError(f"module 'constants' has no attribute {name!r}")
@@ -1,52 +1,275 @@
-import spacy
-from typing import Dict
-from nlp_utils import normalize_city, strip_article, extract_entities as rule_based_extract
+# entity_parser.py
+"""
+NER (spaCy, trained_ner_el) ως service: warm start, micro-batching και LRU αποτελεσμάτων.
 
-# Αν έχεις ήδη φορτωμένο το μοντέλο, βάλε try/catch ή κάνε το load στο startup.
-try:
-    nlp = spacy.load("trained_ner_el")
-except Exception:
-    nlp = spacy.blank("el")  # fallback, δε θα δουλέψει NER, αλλά δεν θα σπάει ο agent
+- το μοντέλο φορτώνεται σε background thread (start() στο lifespan) — όχι στο import
+- μένουν ενεργά μόνο τα pipes που χρειάζεται το NER (tok2vec/transformer + ner)
+- ταυτόχρονα αιτήματα μαζεύονται σε batch (ως NER_BATCH_SIZE ή NER_BATCH_WAIT_MS) και
+  περνούν από ένα nlp.pipe σε worker thread
+- LRU των πρόσφατων αποτελεσμάτων ανά κείμενο
+- όσο το μοντέλο ζεσταίνεται (ή αν λείπει το spaCy/μοντέλο, ή αν αργήσει): fallback στο
+  rule-based intents.extract_entities
+"""
+from __future__ import annotations
 
-def extract_entities(text: str, fallback_rule_based: bool = True) -> Dict[str, str]:
-    """
-    Extract entities from Greek text using spaCy trained model.
-    Tries to map NER labels to business logic (FROM, TO, destination).
-    If spaCy fails, uses rule-based as fallback (if enabled).
-    """
-    doc = nlp(text)
-    entities = {}
-
-    # Mapping, adjust as per your NER labels (π.χ. GPE, LOC → TO, FROM, κλπ)
-    label_map = {
-        "FROM": "FROM",
-        "TO": "TO",
-        "LOC": "TO",
-        "GPE": "TO",
-        "DEST": "TO",
-        "ORG": "organization",
-        "CITY": "TO",
-    }
+import asyncio
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+import startup
+from intents import extract_entities as rule_based_extract
+
+# optional· lazy: το import του spaCy γίνεται μέσα στο background load
+spacy = startup.LazyModule("spacy") if startup.available("spacy") else None
+
+logger = logging.getLogger(__name__)
+
+NER_MODEL = os.getenv("NER_MODEL", "trained_ner_el")
+NER_ENABLED = os.getenv("NER_ENABLED", "1").lower() in {"1", "true", "yes", "on"}
+NER_BATCH_SIZE = int(os.getenv("NER_BATCH_SIZE", "16"))
+NER_BATCH_WAIT_MS = float(os.getenv("NER_BATCH_WAIT_MS", "5"))
+NER_TIMEOUT_SEC = float(os.getenv("NER_TIMEOUT_SEC", "1.0"))
+NER_CACHE_SIZE = int(os.getenv("NER_CACHE_SIZE", "2048"))
+
+# pipes που χρειάζεται το NER· τα υπόλοιπα (parser, tagger, lemmatizer…) απενεργοποιούνται
+NER_PIPES = ("tok2vec", "transformer", "ner")
+
+# Mapping, adjust as per your NER labels (π.χ. GPE, LOC → TO, FROM, κλπ)
+LABEL_MAP = {
+    "FROM": "FROM",
+    "TO": "TO",
+    "LOC": "TO",
+    "GPE": "TO",
+    "DEST": "TO",
+    "ORG": "organization",
+    "CITY": "TO",
+}
+
+_ARTICLE_RE = re.compile(r"^(?:ο|η|το|τη|την|τον|τα|οι|στη|στην|στο|στον|στα|της|του)\s+", re.IGNORECASE)
 
+
+def strip_article(s: str) -> str:
+    return _ARTICLE_RE.sub("", (s or "").strip())
+
+
+def normalize_city(s: str) -> str:
+    # ίδια μορφή με το rule-based extract_entities ("Πάτρα", "Ρίο")
+    return re.sub(r"\s+", " ", (s or "").strip(" ,.;·")).title()
+
+
+def entities_from_doc(doc: Any) -> Dict[str, Any]:
+    entities: Dict[str, Any] = {}
     for ent in doc.ents:
-        label = label_map.get(ent.label_, ent.label_)
+        label = LABEL_MAP.get(ent.label_, ent.label_)
         val = normalize_city(strip_article(ent.text))
         if label not in entities:
             entities[label] = val
-        else:
+        elif isinstance(entities[label], list):
             # Αν υπάρχει ήδη, βάλε ως λίστα (πχ αν βρίσκει πολλά TO)
-            if isinstance(entities[label], list):
-                entities[label].append(val)
-            else:
-                entities[label] = [entities[label], val]
+            entities[label].append(val)
+        else:
+            entities[label] = [entities[label], val]
+    return entities
 
-    print(f"[EntityParser] Text: {text} → Entities: {entities}")
 
+def _merge_rule_based(text: str, entities: Dict[str, Any]) -> Dict[str, Any]:
     # Fallback σε rule-based extraction αν δεν βρήκε βασικά entities (π.χ. TO)
-    if fallback_rule_based and ("TO" not in entities or not entities["TO"]):
-        rb = rule_based_extract(text)
-        for k, v in rb.items():
+    if "TO" not in entities or not entities["TO"]:
+        for k, v in rule_based_extract(text).items():
             if k not in entities or not entities[k]:
                 entities[k] = v
+    return entities
+
+
+class NerService:
+    """spaCy NER με background load, micro-batching σε worker thread και LRU."""
+
+    def __init__(self, model: str = NER_MODEL, *, batch_size: int = NER_BATCH_SIZE,
+                 batch_wait_ms: float = NER_BATCH_WAIT_MS, timeout: float = NER_TIMEOUT_SEC,
+                 cache_size: int = NER_CACHE_SIZE, loader=None):
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = max(0.0, batch_wait_ms) / 1000.0
+        self.timeout = timeout
+        self.cache_size = max(0, cache_size)
+        self._loader = loader or self._load_spacy
+        self.nlp = None
+        self.state = "cold"  # cold | warming | ready | failed | unavailable
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[Tuple[str, Future]]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self.stats = {"ner": 0, "cache": 0, "fallback": 0, "batches": 0}
 
+    # ── lifecycle ────────────────────────────────────────────────────────────
+    def _load_spacy(self, model: str):
+        if spacy is None:
+            raise RuntimeError("spaCy is not installed")
+        nlp = spacy.load(model)
+        keep = [p for p in nlp.pipe_names if p in NER_PIPES]
+        if "ner" not in keep:
+            raise RuntimeError(f"{model}: δεν υπάρχει ner pipe")
+        nlp.select_pipes(enable=keep)
+        return nlp
+
+    def start(self) -> bool:
+        """Ξεκινά το φόρτωμα στο background (idempotent). False αν δεν υπάρχει spaCy."""
+        with self._lock:
+            if self.state != "cold":
+                return self.state in ("warming", "ready")
+            if self._loader == self._load_spacy and spacy is None:
+                self.state = "unavailable"
+                logger.info("NER: spaCy δεν είναι εγκατεστημένο — μόνο rule-based entities")
+                return False
+            self.state = "warming"
+        t = threading.Thread(target=self._warm, name="ner-load", daemon=True)
+        self._threads.append(t)
+        t.start()
+        return True
+
+    def _warm(self) -> None:
+        t0 = time.perf_counter()
+        try:
+            nlp = self._loader(self.model)
+            nlp("ζέσταμα")  # πρώτο inference εκτός request path
+        except Exception:
+            self.state = "failed"
+            logger.warning("NER: φόρτωση %s απέτυχε — μόνο rule-based entities", self.model, exc_info=True)
+            return
+        self.nlp = nlp
+        worker = threading.Thread(target=self._worker, name="ner-batch", daemon=True)
+        self._threads.append(worker)
+        worker.start()
+        self.state = "ready"
+        logger.info("NER: %s έτοιμο σε %.1fs", self.model, time.perf_counter() - t0)
+
+    def stop(self) -> None:
+        if self.state == "ready":
+            self._queue.put(None)
+        for t in self._threads:
+            t.join(timeout=2)
+        self._threads.clear()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    # ── batching ─────────────────────────────────────────────────────────────
+    def _worker(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.batch_size:
+                left = deadline - time.monotonic()
+                try:
+                    nxt = self._queue.get(timeout=left) if left > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    self._queue.put(None)  # τελείωσε αυτό το batch και μετά σταμάτα
+                    break
+                batch.append(nxt)
+            batch = [(text, fut) for text, fut in batch if fut.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            self.stats["batches"] += 1
+            try:
+                docs = list(self.nlp.pipe([text for text, _ in batch], batch_size=self.batch_size))
+            except Exception as e:
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+            for (_, fut), doc in zip(batch, docs):
+                fut.set_result(entities_from_doc(doc))
+
+    def submit(self, text: str) -> Future:
+        fut: Future = Future()
+        self._queue.put((text, fut))
+        return fut
+
+    # ── cache ────────────────────────────────────────────────────────────────
+    def _cached(self, text: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            hit = self._cache.get(text)
+            if hit is not None:
+                self._cache.move_to_end(text)
+        return dict(hit) if hit is not None else None
+
+    def _remember(self, text: str, ents: Dict[str, Any]) -> None:
+        if not self.cache_size:
+            return
+        with self._lock:
+            self._cache[text] = dict(ents)
+            self._cache.move_to_end(text)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    # ── API ──────────────────────────────────────────────────────────────────
+    def _fallback(self, text: str) -> Dict[str, Any]:
+        self.stats["fallback"] += 1
+        return rule_based_extract(text)
+
+    def _finish(self, text: str, ents: Dict[str, Any], fallback_rule_based: bool) -> Dict[str, Any]:
+        self.stats["ner"] += 1
+        self._remember(text, ents)
+        out = dict(ents)
+        return _merge_rule_based(text, out) if fallback_rule_based else out
+
+    def extract(self, text: str, fallback_rule_based: bool = True) -> Dict[str, Any]:
+        text = (text or "").strip()
+        if not self.ready:
+            return self._fallback(text)
+        hit = self._cached(text)
+        if hit is not None:
+            self.stats["cache"] += 1
+            return _merge_rule_based(text, hit) if fallback_rule_based else hit
+        try:
+            ents = self.submit(text).result(timeout=self.timeout)
+        except Exception:
+            logger.warning("NER: timeout/σφάλμα — rule-based για αυτό το μήνυμα", exc_info=True)
+            return self._fallback(text)
+        return self._finish(text, ents, fallback_rule_based)
+
+    async def aextract(self, text: str, fallback_rule_based: bool = True) -> Dict[str, Any]:
+        """Όπως το extract, χωρίς να μπλοκάρει το event loop όσο τρέχει το batch."""
+        text = (text or "").strip()
+        if not self.ready:
+            return self._fallback(text)
+        hit = self._cached(text)
+        if hit is not None:
+            self.stats["cache"] += 1
+            return _merge_rule_based(text, hit) if fallback_rule_based else hit
+        try:
+            ents = await asyncio.wait_for(asyncio.wrap_future(self.submit(text)), self.timeout)
+        except Exception:
+            logger.warning("NER: timeout/σφάλμα — rule-based για αυτό το μήνυμα", exc_info=True)
+            return self._fallback(text)
+        return self._finish(text, ents, fallback_rule_based)
+
+
+SERVICE = NerService()
+
+
+def start() -> bool:
+    return SERVICE.start() if NER_ENABLED else False
+
+
+def extract_entities(text: str, fallback_rule_based: bool = True) -> Dict[str, str]:
+    """
+    Extract entities from Greek text using spaCy trained model.
+    Tries to map NER labels to business logic (FROM, TO, destination).
+    Όσο το μοντέλο δεν είναι έτοιμο (ή αν λείπει), επιστρέφει το rule-based αποτέλεσμα.
+    """
+    entities = SERVICE.extract(text, fallback_rule_based=fallback_rule_based)
+    logger.debug("[EntityParser] Text: %s → Entities: %s", text, entities)
     return entities
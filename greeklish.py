@@ -0,0 +1,220 @@
+# greeklish.py
+"""
+Greeklish ↔ ελληνικά: ένα κοινό, table-driven transliteration για όλους τους matchers.
+
+    skeleton(s)   κανονική "σκελετική" μορφή· ίδια για ελληνικά και κάθε greeklish γραφή
+                  ("Βραχνέικα", "vrahneika", "braxnaika" → "vraxnika"/"vraxneka" όπως το αντίστοιχο ελληνικό)
+    to_greek(s)   greeklish → ελληνικά, για να πιάνουν τα ελληνικά regex triggers
+    with_greek(s) lowered κείμενο + "\\n" + to_greek, μόνο αν το μήνυμα έχει λατινικά
+
+Και τα δύο είναι ένα πέρασμα digraphs (str.replace, μόνο όσα υπάρχουν) + ένα str.translate.
+Οι λίστες (aliases, gazetteer, connectives) γίνονται index μία φορά σε skeleton μορφή με
+AliasIndex, οπότε μία αναζήτηση καλύπτει κάθε γραφή χωρίς ξεχωριστό regex ανά παραλλαγή.
+
+Το skeleton είναι σκόπιμα lossy (ι/η/υ/ει/οι → i, ω → o, χ/ξ → x, β/μπ → v, ντ → d, διπλά
+γράμματα → ένα): αρκεί για ταυτοποίηση φράσεων, όχι για εμφάνιση.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple, Union
+
+import artifacts
+import textnorm
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Skeleton
+
+_CONS = "bcdfgjklmnpqrstvxz"
+_CONS_NOT_DIGRAPH = "bdfgjlmnqrsvxz"  # t/p/c/k + h είναι θ/φ/χ
+
+# digraphs → skeleton, με αυτή τη σειρά: πρώτα τα greeklish, μετά τα ελληνικά (η έξοδός τους
+# είναι ήδη λατινική και δεν ξαναπερνά από τους κανόνες)
+_SK_MULTI: Tuple[Tuple[str, str], ...] = (
+    # greeklish
+    ("th", "8"), ("ph", "f"), ("ch", "x"), ("kh", "x"), ("ks", "x"), ("ck", "k"),
+    ("ou", "u"), ("ay", "av"), ("au", "av"), ("ey", "ev"), ("eu", "ev"),
+    ("ai", "e"), ("ei", "i"), ("oi", "i"), ("yi", "i"), ("ui", "i"),
+    ("mp", "v"), ("mb", "v"), ("nt", "d"), ("nd", "d"), ("gk", "g"), ("gg", "g"),
+    # ελληνικά
+    ("ου", "u"), ("αυ", "av"), ("ευ", "ev"), ("αι", "e"), ("ει", "i"), ("οι", "i"), ("υι", "i"),
+    ("μπ", "v"), ("ντ", "d"), ("γκ", "g"), ("γγ", "g"),
+)
+# αυ/ευ: "af"/"ef" πριν από άηχο σύμφωνο, αλλιώς "av"/"ev"
+_SK_AY_RE = re.compile(r"([αε])υ(?=[θκξπστφχψ])")
+# h ανάμεσα σε σύμφωνα είναι "η" (efhmeria), αλλιώς "χ" (mehri, vrahneika)
+_SK_H_RE = re.compile(rf"(?<=[{_CONS_NOT_DIGRAPH}])h(?=[{_CONS}])")
+_SK_TABLE = str.maketrans({
+    "α": "a", "β": "v", "γ": "g", "δ": "d", "ε": "e", "ζ": "z", "η": "i", "θ": "8", "ι": "i",
+    "κ": "k", "λ": "l", "μ": "m", "ν": "n", "ξ": "x", "ο": "o", "π": "p", "ρ": "r", "σ": "s",
+    "ς": "s", "τ": "t", "υ": "i", "φ": "f", "χ": "x", "ψ": "ps", "ω": "o",
+    "h": "x", "y": "i", "w": "o", "b": "v", "c": "k", "q": "k",
+})
+_SK_JUNK_RE = re.compile(r"[^a-z0-9]+")
+_SK_DOUBLE_RE = re.compile(r"([a-z])\1+")
+
+
+def _skeleton(folded_text: str) -> str:
+    s = folded_text
+    if "υ" in s:
+        s = _SK_AY_RE.sub(lambda m: "af" if m.group(1) == "α" else "ef", s)
+    if "h" in s:
+        s = _SK_H_RE.sub("i", s)
+    for gr, sk in _SK_MULTI:
+        if gr in s:
+            s = s.replace(gr, sk)
+    s = _SK_DOUBLE_RE.sub(r"\1", s.translate(_SK_TABLE))
+    return _SK_JUNK_RE.sub(" ", s).strip()
+
+
+def skeleton(s) -> str:
+    """Κανονική μορφή για matching (cached σε NormText)."""
+    if isinstance(s, textnorm.NormText):
+        return s.skeleton
+    return _skeleton(textnorm.folded(s))
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Greeklish → ελληνικά
+
+_LATIN_RE = re.compile(r"[a-z]")
+_GR_MULTI: Tuple[Tuple[str, str], ...] = (
+    ("th", "θ"), ("ph", "φ"), ("ch", "χ"), ("kh", "χ"), ("ks", "ξ"), ("ps", "ψ"), ("ou", "ου"),
+    ("mp", "μπ"), ("nt", "ντ"), ("gk", "γκ"), ("gg", "γγ"),
+)
+_GR_TABLE = str.maketrans({
+    "a": "α", "b": "β", "c": "κ", "d": "δ", "e": "ε", "f": "φ", "g": "γ", "h": "χ", "i": "ι",
+    "j": "τζ", "k": "κ", "l": "λ", "m": "μ", "n": "ν", "o": "ο", "p": "π", "q": "κ", "r": "ρ",
+    "s": "σ", "t": "τ", "u": "ου", "v": "β", "w": "ω", "x": "χ", "y": "υ", "z": "ζ",
+})
+_GR_FINAL_SIGMA_RE = re.compile(r"σ\b")
+
+
+def _to_greek(lowered_text: str) -> str:
+    s = lowered_text
+    if "h" in s:
+        s = _SK_H_RE.sub("η", s)
+    for lat, gr in _GR_MULTI:
+        if lat in s:
+            s = s.replace(lat, gr)
+    return _GR_FINAL_SIGMA_RE.sub("ς", s.translate(_GR_TABLE))
+
+
+def to_greek(s) -> str:
+    """Greeklish → ελληνικά ("poso kostizei" → "ποσο κοστιζει")· τα ελληνικά μένουν ως έχουν."""
+    if isinstance(s, textnorm.NormText):
+        return s.greek
+    return _to_greek(textnorm.lowered(s))
+
+
+def has_latin(s) -> bool:
+    return bool(_LATIN_RE.search(textnorm.lowered(s)))
+
+
+def with_greek(s) -> str:
+    """
+    Κείμενο για τα ελληνικά regex triggers: το lowered μήνυμα και, αν έχει λατινικά, μια
+    δεύτερη γραμμή με το to_greek. Τα patterns δεν περνούν αλλαγή γραμμής (χωρίς DOTALL),
+    άρα κάθε μορφή ελέγχεται χωριστά σε ένα re.search.
+    """
+    low = textnorm.lowered(s)
+    return f"{low}\n{to_greek(s)}" if has_latin(s) else low
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Alias index
+
+class AliasIndex:
+    """
+    value → aliases, με index σε skeleton μορφή (μία φορά στο build).
+
+    lookup(phrase)  όλη η φράση είναι alias
+    search(text)    κάποιο alias εμφανίζεται ως λέξη/φράση μέσα στο κείμενο· με prefix=True
+                    αρκεί να ξεκινά λέξη ("πατρας" → "Πάτρα")
+
+    Αν ταιριάζουν περισσότερα, νικά το value που προστέθηκε πρώτο (όπως η σειρά των rules).
+    """
+
+    def __init__(self, mapping: Union[Mapping[str, Iterable[str]], Iterable[Tuple[str, Iterable[str]]], None] = None):
+        # mapping ή (value, aliases) pairs· το ίδιο value μπορεί να ξαναέρθει (βλ. livedata.area_mapping)
+        self._keys: Dict[str, str] = {}
+        self._rank: Dict[str, int] = {}
+        self._res: Dict[bool, "re.Pattern[str]"] = {}
+        pairs = mapping.items() if isinstance(mapping, Mapping) else (mapping or ())
+        for value, aliases in pairs:
+            self.add(value, aliases)
+
+    def add(self, value: str, aliases: Iterable[str]) -> None:
+        self._rank.setdefault(value, len(self._rank))
+        for a in aliases or ():
+            k = skeleton(a)
+            if k:
+                self._keys.setdefault(k, value)
+        self._res.clear()
+
+    def tables(self) -> Dict[str, Any]:
+        """Τα skeleton tables (για το artifact bundle)."""
+        return {"keys": dict(self._keys), "rank": dict(self._rank)}
+
+    @classmethod
+    def from_tables(cls, tables: Mapping[str, Any]) -> "AliasIndex":
+        idx = cls()
+        idx._keys = dict(tables["keys"])
+        idx._rank = dict(tables["rank"])
+        return idx
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, phrase) -> bool:
+        return self.lookup(phrase) is not None
+
+    def lookup(self, phrase) -> Optional[str]:
+        return self._keys.get(skeleton(phrase))
+
+    def _regex(self, prefix: bool) -> "re.Pattern[str]":
+        rx = self._res.get(prefix)
+        if rx is None:
+            alts = "|".join(sorted(map(re.escape, self._keys), key=len, reverse=True)) or r"(?!)"
+            rx = self._res[prefix] = re.compile(rf"\b({alts})" + ("" if prefix else r"\b"))
+        return rx
+
+    def search(self, text, *, prefix: bool = False) -> Optional[str]:
+        best: Optional[str] = None
+        for m in self._regex(prefix).finditer(skeleton(text)):
+            v = self._keys[m.group(1)]
+            if best is None or self._rank[v] < self._rank[best]:
+                best = v
+                if self._rank[v] == 0:
+                    break
+        return best
+
+
+class PlaceIndex(AliasIndex):
+    """
+    AliasIndex όπου νικά το μακρύτερο alias που ταιριάζει (το πιο συγκεκριμένο: "παραλια πατρας"
+    πριν από "πατρα") και σε ισοπαλία το value που προστέθηκε πρώτο. Για τοπωνύμια, όπου ένα
+    alias είναι συχνά κομμάτι ενός άλλου και η σειρά των values δεν αρκεί.
+    """
+
+    def search(self, text, *, prefix: bool = False) -> Optional[str]:
+        best: Optional[str] = None
+        best_len = 0
+        for m in self._regex(prefix).finditer(skeleton(text)):
+            k = m.group(1)
+            v = self._keys[k]
+            if len(k) > best_len or (len(k) == best_len and self._rank[v] < self._rank[best]):
+                best, best_len = v, len(k)
+        return best
+
+
+def bundled_index(name: str, mapping: Callable[[], Any], *sources: str,
+                  cls: type = AliasIndex) -> AliasIndex:
+    """
+    AliasIndex (ή υποκλάση, π.χ. PlaceIndex) από το artifact bundle (section `name`) ή,
+    αν λείπει/είναι stale, από το mapping(). Τα sources είναι τα αρχεία του mapping· οι κανόνες
+    του skeleton (greeklish, textnorm) μπαίνουν πάντα στο digest.
+    """
+    artifacts.register(name, lambda: cls(mapping()), sources=(*sources, __file__, textnorm.__file__),
+                       encode=cls.tables, decode=cls.from_tables)
+    return artifacts.load(name)
@@ -0,0 +1,67 @@
+# hashring.py
+"""
+Consistent hashing με virtual nodes.
+
+    ring = HashRing(["redis://a", "redis://b"], vnodes=160)
+    ring.node_for("mrbooky:session:abc")            → "redis://b"
+    ring.node_for(key, skip={"redis://b"})          → επόμενος κόμβος στο ring (failover)
+
+Κάθε κόμβος μπαίνει `vnodes` φορές στο ring (hash του "node#i"), οπότε τα keys μοιράζονται
+ομοιόμορφα και η προσθήκη ενός κόμβου μετακινεί μόνο ~1/N των keys. Το ring είναι immutable:
+with_node/without_node επιστρέφουν νέο ring (atomic swap από τον caller).
+"""
+from __future__ import annotations
+
+import bisect
+import hashlib
+from typing import Collection, Dict, Iterable, List, Optional, Tuple
+
+
+def _hash(s: str) -> int:
+    return int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    def __init__(self, nodes: Iterable[str], *, vnodes: int = 160):
+        self.vnodes = max(1, vnodes)
+        self.nodes: Tuple[str, ...] = tuple(dict.fromkeys(nodes))  # σειρά εισαγωγής, χωρίς διπλά
+        points: List[Tuple[int, str]] = sorted(
+            (_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(self.vnodes)
+        )
+        self._hashes = [h for h, _ in points]
+        self._owners = [n for _, n in points]
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, node: str) -> bool:
+        return node in self.nodes
+
+    def node_for(self, key: str, *, skip: Collection[str] = ()) -> Optional[str]:
+        """Ο κόμβος του key· με skip, ο επόμενος διαθέσιμος κατά τη φορά του ring."""
+        if not self._hashes:
+            return None
+        i = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        if not skip:
+            return self._owners[i]
+        n = len(self._owners)
+        for step in range(n):
+            owner = self._owners[(i + step) % n]
+            if owner not in skip:
+                return owner
+        return None
+
+    def with_node(self, node: str) -> "HashRing":
+        return HashRing((*self.nodes, node), vnodes=self.vnodes)
+
+    def without_node(self, node: str) -> "HashRing":
+        return HashRing((n for n in self.nodes if n != node), vnodes=self.vnodes)
+
+    def spread(self, keys: Iterable[str]) -> Dict[str, int]:
+        """Πόσα από τα keys πάνε σε κάθε κόμβο (για έλεγχο ισορροπίας)."""
+        out = {n: 0 for n in self.nodes}
+        for k in keys:
+            node = self.node_for(k)
+            if node is not None:
+                out[node] += 1
+        return out
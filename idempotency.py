@@ -0,0 +1,300 @@
+# idempotency.py
+"""
+Idempotent /chat: οι retries του ίδιου μηνύματος παίρνουν την ίδια απάντηση χωρίς να
+ξανατρέξουν side effects (booking_finalize, create_booking, Slack, LLM).
+
+Message id ανά μήνυμα:
+- από τον client: `message_id` στο body ή header `Idempotency-Key` / `X-Message-Id`
+- αλλιώς παράγεται από (session, turn, κείμενο) και ισχύει μόνο για IDEMPOTENCY_DERIVED_SEC.
+  Το turn είναι μετρητής ανά session που προχωρά όταν ολοκληρωθεί ένα μήνυμα: ένα retry όσο
+  τρέχει το πρώτο αίτημα παίρνει την ίδια απάντηση, ενώ το ίδιο κείμενο στην επόμενη σειρά
+  ("ναι" → διεύθυνση → "ναι") τρέχει κανονικά
+
+Η απάντηση κρατιέται ανά (session, message id) για IDEMPOTENCY_TTL_SEC. Αν ο retry
+φτάσει ενώ το πρώτο αίτημα τρέχει ακόμα, περιμένει το ίδιο αποτέλεσμα (in-flight dedupe·
+τοπικά με asyncio.Future, μεταξύ workers με Redis SET NX lease).
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import localdb
+import startup
+
+# optional· lazy: το redis φορτώνει μόνο με PERSIST_BACKEND=redis
+redis = startup.LazyModule("redis") if startup.available("redis") else None
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_ENABLED = os.getenv("IDEMPOTENCY_ENABLED", "1").lower() in {"1", "true", "yes", "on"}
+IDEMPOTENCY_TTL_SEC = int(os.getenv("IDEMPOTENCY_TTL_SEC", "300"))
+IDEMPOTENCY_DERIVED_SEC = int(os.getenv("IDEMPOTENCY_DERIVED_SEC", "10"))  # χωρίς client id: μόνο άμεσοι retries
+IDEMPOTENCY_LEASE_SEC = float(os.getenv("IDEMPOTENCY_LEASE_SEC", "60"))  # > από το CHAT_TIMEOUT
+
+HEADERS = ("idempotency-key", "x-message-id")
+MAX_ID_CHARS = 128
+
+_PENDING = "__pending__"
+
+
+def message_key(sid: str, message_id: Optional[str], text: str, turn: int = 0) -> Tuple[str, int]:
+    """(cache key, ttl) για ένα μήνυμα· το turn μετράει μόνο χωρίς message id."""
+    if message_id:
+        return f"{sid}|id:{str(message_id)[:MAX_ID_CHARS]}", IDEMPOTENCY_TTL_SEC
+    digest = hashlib.sha1(f"{turn}\n{(text or '').strip()}".encode("utf-8")).hexdigest()[:16]
+    return f"{sid}|h:{digest}", IDEMPOTENCY_DERIVED_SEC
+
+
+def message_id_from_headers(headers: Any) -> Optional[str]:
+    for h in HEADERS:
+        v = headers.get(h)
+        if v:
+            return v.strip()
+    return None
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Backends
+
+class MemoryReplyStore:
+    def __init__(self, maxsize: int = 10_000):
+        self.maxsize = maxsize
+        self._data: Dict[str, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.time():
+                del self._data[key]
+                return None
+            return item[1]
+
+    def claim(self, key: str, lease_sec: float) -> bool:
+        # στη μνήμη το in-flight dedupe γίνεται από το ReplyCache (ένα process)
+        return True
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            if len(self._data) >= self.maxsize:
+                for k in [k for k, (exp, _) in self._data.items() if exp <= now]:
+                    del self._data[k]
+                while len(self._data) >= self.maxsize:
+                    del self._data[next(iter(self._data))]
+            self._data[key] = (now + ttl, value)
+
+    def release(self, key: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class RedisReplyStore:
+    BLOCKING = True  # sync client: το ReplyCache το καλεί σε thread
+
+    def __init__(self, url: str, prefix: str = "mrbooky:reply:"):
+        if redis is None:
+            raise RuntimeError("redis library is not installed")
+        self.r = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[str]:
+        v = self.r.get(self.prefix + key)
+        return None if v in (None, _PENDING) else v
+
+    def pending(self, key: str) -> bool:
+        return self.r.get(self.prefix + key) == _PENDING
+
+    def claim(self, key: str, lease_sec: float) -> bool:
+        return bool(self.r.set(self.prefix + key, _PENDING, nx=True, px=int(lease_sec * 1000)))
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self.r.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+    def release(self, key: str) -> None:
+        # μόνο αν είναι ακόμα δικό μας pending (όχι αν γράφτηκε ήδη απάντηση)
+        self.r.eval(
+            "if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end return 0",
+            1, self.prefix + key, _PENDING,
+        )
+
+
+class SQLiteReplyStore:
+    """Όπως το RedisReplyStore, στο κοινό SQLite του host (localdb): dedupe μεταξύ workers χωρίς Redis."""
+
+    NS = "reply"
+    BLOCKING = True
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or localdb.LOCAL_DB
+        localdb.get_db(self.path)
+
+    def get(self, key: str) -> Optional[str]:
+        v = localdb.get_db(self.path).get(self.NS, key)
+        return None if v in (None, _PENDING) else v
+
+    def pending(self, key: str) -> bool:
+        return localdb.get_db(self.path).get(self.NS, key) == _PENDING
+
+    def claim(self, key: str, lease_sec: float) -> bool:
+        return localdb.get_db(self.path).add(self.NS, key, _PENDING, lease_sec)
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        localdb.get_db(self.path).set(self.NS, key, value, ttl)
+
+    def release(self, key: str) -> None:
+        localdb.get_db(self.path).delete(self.NS, key, _PENDING)
+
+    def clear(self) -> None:
+        localdb.get_db(self.path).clear(self.NS)
+
+
+def make_reply_store():
+    if os.getenv("PERSIST_BACKEND", "memory").lower() == "sqlite":
+        return SQLiteReplyStore()
+    if os.getenv("PERSIST_BACKEND", "memory").lower() == "redis":
+        url = os.getenv("REDIS_URL", "")
+        if url and redis is not None:
+            try:
+                return RedisReplyStore(url)
+            except Exception:
+                logger.warning("idempotency: Redis μη διαθέσιμο – επιστρέφω MemoryReplyStore", exc_info=True)
+        else:
+            logger.warning("PERSIST_BACKEND=redis αλλά λείπει REDIS_URL/redis – επιστρέφω MemoryReplyStore")
+    return MemoryReplyStore()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Reply cache
+
+class ReplyCache:
+    def __init__(self, store=None, *, lease_sec: float = IDEMPOTENCY_LEASE_SEC, poll_sec: float = 0.1):
+        self.store = store if store is not None else make_reply_store()
+        self.lease_sec = lease_sec
+        self.poll_sec = poll_sec
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._blocking = bool(getattr(self.store, "BLOCKING", False))
+
+    async def _io(self, fn: Callable[..., Any], *args: Any) -> Any:
+        # Redis/SQLite backends: εκτός event loop (δίκτυο, busy timeout)· η μνήμη απευθείας
+        return await asyncio.to_thread(fn, *args) if self._blocking else fn(*args)
+
+    async def _cached(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            raw = await self._io(self.store.get, key)
+            return json.loads(raw) if raw else None
+        except Exception:
+            logger.warning("idempotency: ανάγνωση cache απέτυχε", exc_info=True)
+            return None
+
+    async def _await_remote(self, key: str) -> Optional[Dict[str, Any]]:
+        # Άλλος worker τρέχει το ίδιο μήνυμα· περίμενε την απάντησή του (ως το lease)
+        deadline = time.monotonic() + self.lease_sec
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_sec)
+            hit = await self._cached(key)
+            if hit is not None:
+                return hit
+            if not await self._io(getattr(self.store, "pending", lambda _k: False), key):
+                return None
+        return None
+
+    async def turn(self, sid: str) -> int:
+        try:
+            return int(await self._io(self.store.get, f"{sid}|turn") or 0)
+        except Exception:
+            return 0
+
+    async def _advance(self, sid: str, turn: int) -> None:
+        # set (όχι increment): ένα retry που πήρε την ίδια απάντηση δεν προχωρά τον μετρητή δεύτερη φορά
+        try:
+            await self._io(self.store.set, f"{sid}|turn", str(turn + 1), IDEMPOTENCY_TTL_SEC)
+        except Exception:
+            logger.warning("idempotency: εγγραφή turn απέτυχε", exc_info=True)
+
+    async def run_message(self, sid: str, message_id: Optional[str], text: str,
+                          work: Callable[[], Awaitable[Any]]) -> Any:
+        """run() για ένα μήνυμα /chat: με το message id του client, αλλιώς με (turn, κείμενο)."""
+        if message_id:
+            key, ttl = message_key(sid, message_id, text)
+            return await self.run(key, ttl, work)
+        turn = await self.turn(sid)
+        key, ttl = message_key(sid, None, text, turn)
+        res = await self.run(key, ttl, work)
+        if isinstance(res, dict):
+            await self._advance(sid, turn)
+        return res
+
+    async def run(self, key: str, ttl: float, work: Callable[[], Awaitable[Any]]) -> Any:
+        """Cached απάντηση, αλλιώς η απάντηση του ίδιου αιτήματος σε εξέλιξη, αλλιώς work()."""
+        hit = await self._cached(key)
+        if hit is not None:
+            return dict(hit)
+
+        fut = self._inflight.get(key)
+        if fut is not None:
+            res = await asyncio.shield(fut)
+            return dict(res) if isinstance(res, dict) else res
+
+        # δηλώνεται πριν από κάθε await: ένας τοπικός retry βρίσκει αυτό το future, όχι το store
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        res: Any = None
+        try:
+            try:
+                claimed = await self._io(self.store.claim, key, self.lease_sec)
+            except Exception:
+                logger.warning("idempotency: claim απέτυχε — χωρίς dedupe", exc_info=True)
+                claimed = True
+            if not claimed:
+                hit = await self._await_remote(key)
+                if hit is not None:
+                    fut.set_result(dict(hit))
+                    return dict(hit)
+            res = await work()
+            return res
+        except BaseException as e:
+            if not fut.done():
+                fut.set_exception(e)
+                fut.exception()  # δεν αφήνουμε "exception never retrieved"
+            raise
+        finally:
+            if not fut.done():
+                fut.set_result(dict(res) if isinstance(res, dict) else res)
+            try:
+                if isinstance(res, dict):
+                    # μόνο επιτυχημένες απαντήσεις· τα 413/500/504 ξαναδοκιμάζονται κανονικά
+                    await self._io(self.store.set, key, json.dumps(res, ensure_ascii=False), ttl)
+                else:
+                    await self._io(self.store.release, key)  # μόνο αν είναι ακόμα pending
+            except Exception:
+                logger.warning("idempotency: εγγραφή cache απέτυχε", exc_info=True)
+            finally:
+                self._inflight.pop(key, None)  # μετά την εγγραφή: κανένα κενό για τους τοπικούς retries
+
+
+_CACHE: Optional[ReplyCache] = None
+
+
+def get_cache() -> ReplyCache:
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = ReplyCache()
+    return _CACHE
+
+
+def set_cache(cache: Optional[ReplyCache]) -> None:
+    global _CACHE
+    _CACHE = cache
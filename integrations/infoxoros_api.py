@@ -9,6 +9,7 @@ import requests
 BASE = os.getenv("INFOXOROS_BASE_URL", "https://apps.taxifast.gr/call-api/info/")
 CREATE_URL = os.getenv("INFOXOROS_CREATE_URL", BASE)              # αν διαφέρει στο submit
 CREATE_ACTION = os.getenv("INFOXOROS_CREATE_ACTION", "create")    # π.χ. "create" ή κάτι άλλο
+COST_URL = os.getenv("INFOXOROS_COST_URL", "https://booking.infoxoros.com/api/cost_calculator.php")
 
 REQUIRE_ORIGIN = os.getenv("INFOXOROS_REQUIRE_ORIGIN", "0") == "1"
 ORIGIN = os.getenv("INFOXOROS_ORIGIN", "https://booking.infoxoros.com")
@@ -39,8 +40,8 @@ def _headers() -> Dict[str, str]:
     return h
 
 
-def _post(url: str, data: dict, timeout: float = TIMEOUT) -> dict:
-    r = requests.post(url, data=data, headers=_headers(), timeout=timeout)
+def _post(url: str, data: dict, timeout: float = TIMEOUT, headers: Optional[Dict[str, str]] = None) -> dict:
+    r = requests.post(url, data=data, headers={**_headers(), **(headers or {})}, timeout=timeout)
     r.raise_for_status()
     try:
         return r.json()
@@ -73,7 +74,7 @@ def cost_calculator(
         params["randevou"] = 1
         params["time"] = time_hhmm
 
-    r = requests.get("https://booking.infoxoros.com/api/cost_calculator.php", params=params, timeout=8)
+    r = requests.get(COST_URL, params=params, timeout=8)
     r.raise_for_status()
     j = r.json()
 
@@ -155,10 +156,14 @@ def create_booking(
     extra_email_text: str = "",
     agent: Optional[str] = None,
     agent_email: Optional[str] = None,
+    estimate: Optional[dict] = None,
+    idempotency_key: Optional[str] = None,
 ) -> dict:
     """
     Υποβολή με action παραμετρικό από .env (CREATE_ACTION) στο CREATE_URL.
     Αν ο server δεν δέχεται create χωρίς captcha, θα επιστρέψει σφάλμα — ο caller πρέπει να κάνει fallback.
+    estimate: έτοιμο αποτέλεσμα cost_calculator (π.χ. από Quote) ώστε να μη γίνει ξανά η κλήση.
+    idempotency_key: σταθερό ανά κράτηση (header Idempotency-Key) — τα retries δεν διπλοκαταχωρούν.
     """
     if not API_KEY:
         return {"status": 0, "errors": ["missing api key"]}
@@ -167,9 +172,11 @@ def create_booking(
     distance_s = duration_s = cost_s = all_cost_s = ""
     if use_estimate:
         try:
-            lat1, lon1 = map(float, point1.split(","))
-            lat2, lon2 = map(float, point2.split(","))
-            est = cost_calculator(lat_start=lat1, lon_start=lon1, lat_end=lat2, lon_end=lon2)
+            est = estimate
+            if not est:
+                lat1, lon1 = map(float, point1.split(","))
+                lat2, lon2 = map(float, point2.split(","))
+                est = cost_calculator(lat_start=lat1, lon_start=lon1, lat_end=lat2, lon_end=lon2)
             distance_s = _fmt_distance_km(est.get("distance_km"))
             duration_s = _fmt_duration_mmhh(est.get("duration_min"))
             if est.get("cost_float") is not None:
@@ -215,7 +222,7 @@ def create_booking(
     }
     if CREATE_ACTION:
         data["action"] = CREATE_ACTION
-    return _post(CREATE_URL, data)
+    return _post(CREATE_URL, data, headers={"Idempotency-Key": idempotency_key} if idempotency_key else None)
 
 # ──────────────────────────────────────────────────────────────────────────────
 __all__ = [
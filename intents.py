@@ -5,32 +5,26 @@ from difflib import SequenceMatcher
 from pathlib import Path
 from typing import Dict, Optional, List
 
+import artifacts
+import livedata
+import textnorm
+
 logger = logging.getLogger(__name__)
 
 INTENTS_FILE = Path("intents.json")
 
-# ---- Περιοχές για φαρμακείο, προσάρμοσέ το αν θες ----
-AREAS = [
-    "Πάτρα", "Παραλία Πατρών", "Βραχνέικα", "Ρίο", "Μεσσάτιδα"
-]
 
+def _read_intents(path: Path) -> Dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+artifacts.register("intents.examples", lambda: _read_intents(INTENTS_FILE), sources=(str(INTENTS_FILE),))
+
+# ---- Περιοχές: το κοινό area index (data/constants.json: area_aliases + pharmacy_areas) ----
 def extract_area(text: str) -> Optional[str]:
-    text_lower = text.lower()
-    for area in AREAS:
-        area_variants = [area.lower()]
-        # Προσθήκη παραλλαγών για αποφυγή τόνων ή συντομεύσεων
-        if area == "Βραχνέικα":
-            area_variants += ["βραχνεϊκα", "βραχνεικα"]
-        elif area == "Παραλία Πατρών":
-            area_variants += ["παραλία", "παραλια"]
-        elif area == "Μεσσάτιδα":
-            area_variants += ["μεσάτιδα", "μεσσατιδα"]
-        elif area == "Ρίο":
-            area_variants += ["ριο"]
-        for variant in area_variants:
-            if variant in text_lower:
-                 return area
-    return None
+    # prefix: "πάτρας", "βραχνεικων" πιάνουν όπως πριν με το substring
+    return livedata.current().area(text, prefix=True)
 
 # ---- ΒΑΣΙΚΗ & ΕΥΦΥΗΣ ΑΝΑΓΝΩΡΙΣΗ entities ----
 def extract_entities(text: str, context_slot=None):
@@ -114,9 +108,9 @@ class IntentClassifier:
             logger.error(f"❌ Το αρχείο {path} δεν βρέθηκε.")
             raise FileNotFoundError(f"{path} not found")
 
-        with open(path, "r", encoding="utf-8") as f:
-            intent_data = json.load(f)
-            self.intents = {name: IntentConfig(cfg) for name, cfg in intent_data.items()}
+        # το default αρχείο έρχεται έτοιμο από το artifact bundle (αν είναι φρέσκο)
+        intent_data = artifacts.load("intents.examples") if path == INTENTS_FILE else _read_intents(path)
+        self.intents = {name: IntentConfig(cfg) for name, cfg in intent_data.items()}
 
         logger.info(f"✅ Loaded {len(self.intents)} intents")
 
@@ -126,7 +120,7 @@ class IntentClassifier:
         active_intent: Optional[str] = None,
         missing_slots: Optional[List[str]] = None,
     ) -> Optional[str]:
-        nm = message.lower()
+        nm = textnorm.lowered(message)
 
         # TripCostIntent πρέπει να προηγείται!
         if any(
@@ -216,7 +210,7 @@ class IntentClassifier:
         return None
 
     def fuzzy_intent(self, message: str) -> str:
-        nm = message.lower()
+        nm = textnorm.lowered(message)
         best_score, best_intent = 0.0, "default"
 
         for intent_name, cfg in self.intents.items():
@@ -0,0 +1,577 @@
+# jobs.py
+"""
+Persistent job queue για δουλειές που δεν πρέπει να κρατάνε τον χρήστη σε αναμονή
+(υποβολή κράτησης στο Infoxoros, ειδοποίηση back-office).
+
+- backend: SQLite (default, JOBS_DB) ή Redis (JOBS_BACKEND=redis)
+- workers: asyncio coroutines μέσα στο app· οι handlers είναι sync και τρέχουν σε thread
+- retries με exponential backoff + jitter, dead-letter (status "dead") μετά από max_attempts
+- lease: αν πέσει ο worker στη μέση, το job ξαναπαίρνεται μετά από JOBS_LEASE_SEC
+
+Handlers δηλώνονται με @handler("kind") (βλ. router_and_booking):
+
+    @jobs.handler("booking.create", on_dead=...)
+    def _create(payload: dict) -> dict: ...
+
+    jobs.get_queue().enqueue("booking.create", {...}, key=code)
+
+CLI:
+    python -m jobs stats
+    python -m jobs dead
+    python -m jobs requeue <job_id>
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import startup
+
+# optional· lazy: το redis φορτώνει μόνο με JOBS_BACKEND=redis
+redis = startup.LazyModule("redis") if startup.available("redis") else None
+
+logger = logging.getLogger(__name__)
+
+JOBS_BACKEND = os.getenv("JOBS_BACKEND", "redis" if os.getenv("PERSIST_BACKEND", "memory").lower() == "redis" else "sqlite")
+JOBS_DB = os.getenv("JOBS_DB", "data/jobs.sqlite3")
+JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", "2"))
+JOBS_MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", "5"))
+JOBS_LEASE_SEC = float(os.getenv("JOBS_LEASE_SEC", "60"))
+JOBS_POLL_SEC = float(os.getenv("JOBS_POLL_SEC", "1.0"))
+JOBS_BACKOFF_BASE_SEC = float(os.getenv("JOBS_BACKOFF_BASE_SEC", "2"))
+JOBS_BACKOFF_MAX_SEC = float(os.getenv("JOBS_BACKOFF_MAX_SEC", "300"))
+JOBS_RETENTION_SEC = int(os.getenv("JOBS_RETENTION_SEC", str(7 * 24 * 3600)))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+DEAD = "dead"
+
+LEASE_EXPIRED = "LeaseExpired: the worker did not finish within the lease"
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    payload: Dict[str, Any] = field(default_factory=dict)
+    key: Optional[str] = None
+    status: str = QUEUED
+    attempts: int = 0
+    max_attempts: int = JOBS_MAX_ATTEMPTS
+    run_at: float = 0.0  # queued: πότε είναι due · running: λήξη του lease
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = 0.0
+    updated_at: float = 0.0
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Backends
+
+class BaseJobStore:
+    def put(self, job: Job) -> None:
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> Optional[Job]:
+        raise NotImplementedError
+
+    def by_key(self, key: str) -> List[Job]:
+        raise NotImplementedError
+
+    def put_unique(self, job: Job) -> Job:
+        """Idempotent enqueue: αν υπάρχει ήδη ζωντανό (όχι dead) job ίδιου kind+key, επιστρέφει εκείνο."""
+        existing = next(
+            (j for j in self.by_key(job.key) if j.kind == job.kind and j.status != DEAD), None
+        ) if job.key else None
+        if existing is not None:
+            return existing
+        self.put(job)
+        return job
+
+    def claim(self, now: float, lease_sec: float) -> Optional[Job]:
+        """
+        Ατομικά: το πρώτο due job (ή job με ληγμένο lease) → running, attempts+1. Ληγμένο lease
+        στην τελευταία προσπάθεια → dead στην ίδια συναλλαγή (επιστρέφεται με status DEAD).
+        """
+        raise NotImplementedError
+
+    def dead_letters(self, limit: int = 50) -> List[Job]:
+        raise NotImplementedError
+
+    def counts(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+    def purge(self, older_than: float) -> int:
+        return 0
+
+
+class SQLiteJobStore(BaseJobStore):
+    _COLS = ("id", "kind", "key", "payload", "status", "attempts", "max_attempts",
+             "run_at", "result", "error", "created_at", "updated_at")
+
+    def __init__(self, path: str = JOBS_DB):
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                key TEXT,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                run_at REAL NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_due ON jobs(status, run_at);
+            CREATE INDEX IF NOT EXISTS jobs_key ON jobs(key);
+            """
+        )
+
+    def _row(self, job: Job) -> tuple:
+        d = asdict(job)
+        d["payload"] = json.dumps(job.payload, ensure_ascii=False)
+        d["result"] = json.dumps(job.result, ensure_ascii=False) if job.result is not None else None
+        return tuple(d[c] for c in self._COLS)
+
+    def _job(self, row) -> Job:
+        d = dict(zip(self._COLS, row))
+        d["payload"] = json.loads(d["payload"] or "{}")
+        d["result"] = json.loads(d["result"]) if d["result"] else None
+        return Job(**d)
+
+    def put(self, job: Job) -> None:
+        with self._lock:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO jobs ({','.join(self._COLS)}) VALUES ({','.join('?' * len(self._COLS))})",
+                self._row(job),
+            )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._db.execute(f"SELECT {','.join(self._COLS)} FROM jobs WHERE id=?", (job_id,)).fetchone()
+        return self._job(row) if row else None
+
+    def by_key(self, key: str) -> List[Job]:
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {','.join(self._COLS)} FROM jobs WHERE key=? ORDER BY created_at", (key,)
+            ).fetchall()
+        return [self._job(r) for r in rows]
+
+    def put_unique(self, job: Job) -> Job:
+        if not job.key:
+            self.put(job)
+            return job
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")  # check + insert ατομικά και μεταξύ processes
+            try:
+                row = self._db.execute(
+                    f"SELECT {','.join(self._COLS)} FROM jobs WHERE key=? AND kind=? AND status!=? ORDER BY created_at LIMIT 1",
+                    (job.key, job.kind, DEAD),
+                ).fetchone()
+                if row is None:
+                    self._db.execute(
+                        f"INSERT INTO jobs ({','.join(self._COLS)}) VALUES ({','.join('?' * len(self._COLS))})",
+                        self._row(job),
+                    )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return self._job(row) if row is not None else job
+
+    def claim(self, now: float, lease_sec: float) -> Optional[Job]:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT id, status, attempts, max_attempts FROM jobs "
+                    "WHERE status IN (?, ?) AND run_at<=? ORDER BY run_at LIMIT 1",
+                    (QUEUED, RUNNING, now),
+                ).fetchone()
+                if not row:
+                    self._db.execute("COMMIT")
+                    return None
+                if row[1] == RUNNING and row[2] >= row[3]:
+                    # ο worker της τελευταίας προσπάθειας χάθηκε: dead, όχι attempts+1
+                    self._db.execute(
+                        "UPDATE jobs SET status=?, error=?, updated_at=? WHERE id=?",
+                        (DEAD, LEASE_EXPIRED, now, row[0]),
+                    )
+                else:
+                    self._db.execute(
+                        "UPDATE jobs SET status=?, attempts=attempts+1, run_at=?, updated_at=? WHERE id=?",
+                        (RUNNING, now + lease_sec, now, row[0]),
+                    )
+                out = self._db.execute(f"SELECT {','.join(self._COLS)} FROM jobs WHERE id=?", (row[0],)).fetchone()
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return self._job(out)
+
+    def dead_letters(self, limit: int = 50) -> List[Job]:
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {','.join(self._COLS)} FROM jobs WHERE status=? ORDER BY updated_at DESC LIMIT ?",
+                (DEAD, limit),
+            ).fetchall()
+        return [self._job(r) for r in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {s: n for s, n in rows}
+
+    def purge(self, older_than: float) -> int:
+        with self._lock:
+            cur = self._db.execute("DELETE FROM jobs WHERE status=? AND updated_at<?", (DONE, older_than))
+        return cur.rowcount
+
+
+class RedisJobStore(BaseJobStore):
+    """job JSON σε string key, due/lease σε sorted set, index ανά key, λίστα για το DLQ."""
+
+    # KEYS[1]=due zset, KEYS[2]=dead list · ARGV: now, lease_until, job key prefix, error, retention
+    _CLAIM = """
+    local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, 1)
+    if #ids == 0 then return false end
+    local id = ids[1]
+    local raw = redis.call('GET', ARGV[3] .. id)
+    if not raw then
+        redis.call('ZREM', KEYS[1], id)
+        return false
+    end
+    local job = cjson.decode(raw)
+    if job['status'] == 'running' and job['attempts'] >= job['max_attempts'] then
+        job['status'] = 'dead'
+        job['error'] = ARGV[4]
+        job['updated_at'] = tonumber(ARGV[1])
+        raw = cjson.encode(job)
+        redis.call('SET', ARGV[3] .. id, raw, 'EX', ARGV[5])
+        redis.call('ZREM', KEYS[1], id)
+        redis.call('LREM', KEYS[2], 0, id)
+        redis.call('LPUSH', KEYS[2], id)
+        return raw
+    end
+    job['status'] = 'running'
+    job['attempts'] = job['attempts'] + 1
+    job['run_at'] = tonumber(ARGV[2])
+    job['updated_at'] = tonumber(ARGV[1])
+    raw = cjson.encode(job)
+    redis.call('SET', ARGV[3] .. id, raw)
+    redis.call('ZADD', KEYS[1], ARGV[2], id)
+    return raw
+    """
+
+    def __init__(self, url: str, prefix: str = "mrbooky:jobs:"):
+        if redis is None:
+            raise RuntimeError("redis library is not installed")
+        self.r = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self._due = f"{prefix}due"
+        self._dead = f"{prefix}dead"
+        self._claim = self.r.register_script(self._CLAIM)
+
+    def _jk(self, job_id: str) -> str:
+        return f"{self.prefix}job:{job_id}"
+
+    def put(self, job: Job) -> None:
+        with self.r.pipeline() as p:
+            p.set(self._jk(job.id), json.dumps(asdict(job), ensure_ascii=False))
+            if job.status in (QUEUED, RUNNING):
+                p.zadd(self._due, {job.id: job.run_at})
+            else:
+                p.zrem(self._due, job.id)
+                p.expire(self._jk(job.id), JOBS_RETENTION_SEC)
+            if job.status == DEAD:
+                p.lrem(self._dead, 0, job.id)
+                p.lpush(self._dead, job.id)
+            if job.key:
+                p.sadd(f"{self.prefix}key:{job.key}", job.id)
+                p.expire(f"{self.prefix}key:{job.key}", JOBS_RETENTION_SEC)
+            p.execute()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        raw = self.r.get(self._jk(job_id))
+        return Job(**json.loads(raw)) if raw else None
+
+    def by_key(self, key: str) -> List[Job]:
+        jobs = [self.get(i) for i in self.r.smembers(f"{self.prefix}key:{key}")]
+        return sorted((j for j in jobs if j), key=lambda j: j.created_at)
+
+    def put_unique(self, job: Job) -> Job:
+        if not job.key:
+            self.put(job)
+            return job
+        # Ένα SET NX ανά key κλειδώνει το enqueue· ο χαμένος επιστρέφει το job του νικητή
+        lock = f"{self.prefix}uniq:{job.kind}:{job.key}"
+        if self.r.set(lock, job.id, nx=True, ex=JOBS_RETENTION_SEC):
+            self.put(job)
+            return job
+        owner = self.get(self.r.get(lock) or "")
+        if owner is None or owner.status == DEAD:
+            self.r.set(lock, job.id, ex=JOBS_RETENTION_SEC)
+            self.put(job)
+            return job
+        return owner
+
+    def claim(self, now: float, lease_sec: float) -> Optional[Job]:
+        raw = self._claim(keys=[self._due, self._dead],
+                          args=[now, now + lease_sec, f"{self.prefix}job:", LEASE_EXPIRED, JOBS_RETENTION_SEC])
+        return Job(**json.loads(raw)) if raw else None
+
+    def dead_letters(self, limit: int = 50) -> List[Job]:
+        jobs = [self.get(i) for i in self.r.lrange(self._dead, 0, limit - 1)]
+        return [j for j in jobs if j and j.status == DEAD]
+
+    def counts(self) -> Dict[str, int]:
+        return {"pending": int(self.r.zcard(self._due)), DEAD: int(self.r.llen(self._dead))}
+
+
+def make_job_store() -> BaseJobStore:
+    if JOBS_BACKEND.lower() == "redis":
+        url = os.getenv("REDIS_URL", "")
+        if url and redis is not None:
+            return RedisJobStore(url)
+        logger.warning("JOBS_BACKEND=redis αλλά λείπει REDIS_URL/redis – επιστρέφω SQLite")
+    return SQLiteJobStore(JOBS_DB)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Handlers
+
+@dataclass(frozen=True)
+class _Handler:
+    fn: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+    on_dead: Optional[Callable[[Job], None]] = None
+
+
+HANDLERS: Dict[str, _Handler] = {}
+
+
+def handler(kind: str, *, on_dead: Optional[Callable[[Job], None]] = None):
+    """Δηλώνει sync handler για ένα kind. Exception → retry· επιστρεφόμενο dict → job.result."""
+    def _decorator(fn):
+        HANDLERS[kind] = _Handler(fn, on_dead)
+        return fn
+    return _decorator
+
+
+def backoff(attempts: int, *, base: float = JOBS_BACKOFF_BASE_SEC, cap: float = JOBS_BACKOFF_MAX_SEC) -> float:
+    delay = min(cap, base * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.8, 1.2)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Queue + workers
+
+class JobQueue:
+    def __init__(self, store: BaseJobStore, *, lease_sec: float = JOBS_LEASE_SEC, poll_sec: float = JOBS_POLL_SEC):
+        self.store = store
+        self.lease_sec = lease_sec
+        self.poll_sec = poll_sec
+        self._tasks: List[asyncio.Task] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._last_purge = 0.0
+
+    # --- producer -------------------------------------------------------------
+    def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        *,
+        key: Optional[str] = None,
+        max_attempts: int = JOBS_MAX_ATTEMPTS,
+        delay: float = 0.0,
+        unique: bool = False,
+    ) -> Job:
+        """unique=True: ένα ζωντανό job ανά (kind, key) — ένα διπλό enqueue επιστρέφει το υπάρχον."""
+        now = time.time()
+        job = Job(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            payload=payload,
+            key=key,
+            max_attempts=max_attempts,
+            run_at=now + delay,
+            created_at=now,
+            updated_at=now,
+        )
+        if unique and key:
+            existing = self.store.put_unique(job)
+            if existing.id != job.id:
+                logger.info("jobs: duplicate enqueue %s key=%s → %s", kind, key, existing.id)
+                return existing
+        else:
+            self.store.put(job)
+        self._notify()
+        return job
+
+    def requeue(self, job_id: str) -> Optional[Job]:
+        """Επανεκτέλεση ενός dead job (π.χ. αφού διορθώθηκε το upstream)."""
+        job = self.store.get(job_id)
+        if not job or job.status != DEAD:
+            return None
+        job.status, job.attempts, job.error = QUEUED, 0, None
+        job.run_at = job.updated_at = time.time()
+        self.store.put(job)
+        self._notify()
+        return job
+
+    def _notify(self) -> None:
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    # --- consumer -------------------------------------------------------------
+    async def run_once(self) -> bool:
+        """Εκτελεί ένα due job, αν υπάρχει. True αν έτρεξε κάτι."""
+        # store I/O (SQLite BEGIN IMMEDIATE / Redis) σε thread, όπως οι handlers
+        job = await asyncio.to_thread(self.store.claim, time.time(), self.lease_sec)
+        if job is None:
+            return False
+        h = HANDLERS.get(job.kind)
+        if job.status == DEAD:  # ληγμένο lease στην τελευταία προσπάθεια
+            logger.warning("job %s (%s) dead after %d attempts: %s", job.id, job.kind, job.attempts, job.error)
+            await self._on_dead(h, job)
+            return True
+        try:
+            if h is None:
+                raise LookupError(f"no handler for {job.kind}")
+            result = await asyncio.to_thread(h.fn, job.payload)
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"[:500]
+            job.updated_at = time.time()
+            if h is None or job.attempts >= job.max_attempts:
+                job.status = DEAD
+                logger.warning("job %s (%s) dead after %d attempts: %s", job.id, job.kind, job.attempts, job.error)
+                await asyncio.to_thread(self.store.put, job)
+                await self._on_dead(h, job)
+            else:
+                job.status = QUEUED
+                job.run_at = job.updated_at + backoff(job.attempts)
+                logger.info("job %s (%s) retry %d in %.1fs: %s",
+                            job.id, job.kind, job.attempts, job.run_at - job.updated_at, job.error)
+                await asyncio.to_thread(self.store.put, job)
+            return True
+        job.status, job.result, job.error = DONE, result or {}, None
+        job.updated_at = time.time()
+        await asyncio.to_thread(self.store.put, job)
+        return True
+
+    @staticmethod
+    async def _on_dead(h: Optional[_Handler], job: Job) -> None:
+        if h is None or h.on_dead is None:
+            return
+        try:
+            await asyncio.to_thread(h.on_dead, job)
+        except Exception:
+            logger.exception("on_dead hook failed for %s", job.kind)
+
+    async def _worker(self, n: int) -> None:
+        assert self._wake is not None
+        while True:
+            try:
+                if await self.run_once():
+                    continue
+                self._maybe_purge()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("job worker %d: store error", n)
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_sec)
+            except asyncio.TimeoutError:
+                pass
+
+    def _maybe_purge(self) -> None:
+        now = time.time()
+        if now - self._last_purge > 3600:
+            self._last_purge = now
+            self.store.purge(now - JOBS_RETENTION_SEC)
+
+    async def start(self, workers: int = JOBS_WORKERS) -> None:
+        if self._tasks or workers <= 0:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(workers)]
+        logger.info("🧵 job workers started: %d (%s)", workers, type(self.store).__name__)
+
+    async def stop(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = self._wake = None
+
+
+_QUEUE: Optional[JobQueue] = None
+_QUEUE_LOCK = threading.Lock()
+
+
+def get_queue() -> JobQueue:
+    global _QUEUE
+    if _QUEUE is None:
+        with _QUEUE_LOCK:
+            if _QUEUE is None:
+                _QUEUE = JobQueue(make_job_store())
+    return _QUEUE
+
+
+def set_queue(queue: Optional[JobQueue]) -> None:
+    global _QUEUE
+    _QUEUE = queue
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# CLI
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m jobs", description="Mr Booky job queue")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("stats", help="πλήθος jobs ανά status")
+    sub.add_parser("dead", help="λίστα dead-letter jobs")
+    rq = sub.add_parser("requeue", help="ξανά στην ουρά ένα dead job")
+    rq.add_argument("job_id")
+    args = ap.parse_args(list(argv) if argv is not None else None)
+
+    q = get_queue()
+    if args.cmd == "stats":
+        print(json.dumps(q.store.counts(), ensure_ascii=False))
+    elif args.cmd == "dead":
+        for j in q.store.dead_letters():
+            print(f"{j.id}  {j.kind:<16} key={j.key or '-'}  attempts={j.attempts}  {j.error or ''}")
+    elif args.cmd == "requeue":
+        job = q.requeue(args.job_id)
+        print("✔ requeued" if job else "✗ δεν βρέθηκε dead job με αυτό το id")
+        return 0 if job else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
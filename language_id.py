@@ -0,0 +1,303 @@
+# language_id.py
+"""
+Τοπικό language identification — χωρίς LLM.
+
+- ελληνικό script  → "el" (fast path, χωρίς μοντέλο)
+- λατινικό script  → char n-gram Naive Bayes: "el-latn" (greeklish), en, de, fr, it, es
+- άλλο script      → "xx" (ξένη γλώσσα που δεν μοντελοποιούμε — την ανιχνεύει το LLM)
+
+Το μοντέλο εκπαιδεύεται offline από το data/langid_corpus.json και
+αποθηκεύεται στο data/langid.json:
+
+    python -m language_id train
+    python -m language_id eval
+    python -m language_id detect "poso kanei mexri patra"
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import re
+import sys
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import repeat
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILE = os.getenv("LANGID_MODEL_FILE", "data/langid.json")
+CORPUS_FILE = os.getenv("LANGID_CORPUS_FILE", "data/langid_corpus.json")
+MIN_LETTERS = int(os.getenv("LANGID_MIN_LETTERS", "4"))
+MIN_MARGIN = float(os.getenv("LANGID_MIN_MARGIN", "0.3"))  # μέση διαφορά log-prob ανά n-gram
+MAX_CHARS = 160  # αρκεί για απόφαση· κρατά σταθερό το κόστος
+
+GREEK = "el"
+GREEKLISH = "el-latn"
+OTHER = "xx"
+GREEK_LANGS = frozenset({GREEK, GREEKLISH})
+
+_NON_LETTER_RE = re.compile(r"[^\w']+|[\d_]+")
+
+
+@dataclass(frozen=True)
+class LangGuess:
+    lang: Optional[str]
+    confidence: float  # margin best vs 2ος (0 για fast paths)
+    script: str        # "greek" | "latin" | "other" | "none"
+
+
+def _script(text: str) -> Tuple[str, int]:
+    greek = latin = other = 0
+    for ch in text:
+        if not ch.isalpha():
+            continue
+        o = ord(ch)
+        if 0x0370 <= o <= 0x03FF or 0x1F00 <= o <= 0x1FFF:
+            greek += 1
+        elif o < 0x0250:  # Basic Latin … Latin Extended-B
+            latin += 1
+        else:
+            other += 1
+    if greek and greek >= latin:
+        return "greek", greek
+    if other > latin:
+        return "other", other
+    if latin:
+        return "latin", latin
+    return "none", 0
+
+
+def _prep(text: str) -> str:
+    s = _NON_LETTER_RE.sub(" ", text.lower()[:MAX_CHARS]).strip()
+    return f" {s} " if s else ""
+
+
+def _ngrams(s: str, nmax: int) -> List[str]:
+    out: List[str] = []
+    L = len(s)
+    for n in range(1, nmax + 1):
+        out.extend(s[i:i + n] for i in range(L - n + 1))
+    return out
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Μοντέλο
+
+class NgramModel:
+    def __init__(self, langs: Dict[str, Dict], nmax: int = 3, version: int = 1):
+        self.nmax = nmax
+        self.version = version
+        self.langs = list(langs)
+        self._tables = [(lang, langs[lang]["grams"], float(langs[lang]["unseen"])) for lang in self.langs]
+
+    @classmethod
+    def load(cls, path: str = MODEL_FILE) -> Optional["NgramModel"]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return cls(data["langs"], nmax=int(data.get("nmax", 3)), version=int(data.get("version", 1)))
+        except Exception:
+            logger.warning("language_id: δεν φορτώθηκε το μοντέλο %s", path, exc_info=True)
+            return None
+
+    @classmethod
+    def train(cls, corpus: Dict[str, List[str]], *, nmax: int = 3, top: int = 700, alpha: float = 0.5) -> "NgramModel":
+        langs: Dict[str, Dict] = {}
+        for lang, sentences in corpus.items():
+            counts: Counter = Counter()
+            for s in sentences:
+                counts.update(_ngrams(_prep(s), nmax))
+            kept = counts.most_common(top)
+            total = sum(counts.values())
+            denom = total + alpha * (len(counts) + 1)
+            langs[lang] = {
+                "unseen": round(math.log(alpha / denom), 3),
+                "grams": {g: round(math.log((c + alpha) / denom), 3) for g, c in kept},
+            }
+        return cls(langs, nmax=nmax)
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": self.version,
+            "nmax": self.nmax,
+            "langs": {lang: {"unseen": unseen, "grams": grams} for lang, grams, unseen in self._tables},
+        }
+
+    def scores(self, text: str) -> Tuple[Dict[str, float], int]:
+        grams = _ngrams(_prep(text), self.nmax)
+        n = len(grams)
+        return {lang: sum(map(table.get, grams, repeat(unseen, n))) for lang, table, unseen in self._tables}, n
+
+    def predict(self, text: str) -> Tuple[Optional[str], float]:
+        sc, n = self.scores(text)
+        if not n:
+            return None, 0.0
+        ranked = sorted(sc.items(), key=lambda kv: kv[1], reverse=True)
+        best, second = ranked[0], ranked[1] if len(ranked) > 1 else (None, float("-inf"))
+        return best[0], (best[1] - second[1]) / n
+
+
+_MODEL: Optional[NgramModel] = None
+_MODEL_LOCK = threading.Lock()
+
+
+def get_model() -> Optional[NgramModel]:
+    global _MODEL
+    if _MODEL is None:
+        with _MODEL_LOCK:
+            if _MODEL is None:
+                _MODEL = NgramModel.load()
+    return _MODEL
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Public API
+
+@lru_cache(maxsize=4096)
+def detect(text: str) -> LangGuess:
+    """Πλήρες αποτέλεσμα (γλώσσα, confidence, script)."""
+    script, letters = _script(text or "")
+    if script == "greek":
+        return LangGuess(GREEK, 0.0, script)
+    if script == "other":
+        return LangGuess(OTHER, 0.0, script)
+    if script == "none" or letters < MIN_LETTERS:
+        return LangGuess(None, 0.0, script)
+    model = get_model()
+    if model is None:
+        return LangGuess(None, 0.0, script)
+    lang, margin = model.predict(text)
+    return LangGuess(lang, round(margin, 4), script)
+
+
+def identify(text: str, *, min_margin: float = MIN_MARGIN) -> Optional[str]:
+    """Γλώσσα του μηνύματος ή None όταν είναι αβέβαιο (π.χ. "ok", "18:30", τηλέφωνο)."""
+    g = detect(text or "")
+    if g.lang is None:
+        return None
+    if g.script == "latin" and g.confidence < min_margin:
+        return None
+    return g.lang
+
+
+def is_greek(lang: Optional[str]) -> bool:
+    return lang in GREEK_LANGS
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Training (offline)
+
+_GREEKLISH_MAP = [
+    # digraphs πρώτα
+    ("ου", ["ou", "u"]), ("αι", ["ai", "e"]), ("ει", ["ei", "i"]), ("οι", ["oi", "i"]),
+    ("μπ", ["mp", "b"]), ("ντ", ["nt", "d"]), ("γκ", ["gk", "g"]), ("γγ", ["gg", "ng"]),
+    ("αυ", ["av", "af"]), ("ευ", ["ev", "eu", "ef"]),
+    ("α", ["a"]), ("β", ["v", "b"]), ("γ", ["g"]), ("δ", ["d"]), ("ε", ["e"]), ("ζ", ["z"]),
+    ("η", ["i", "h"]), ("θ", ["th", "8"]), ("ι", ["i"]), ("κ", ["k"]), ("λ", ["l"]), ("μ", ["m"]),
+    ("ν", ["n"]), ("ξ", ["ks", "x"]), ("ο", ["o"]), ("π", ["p"]), ("ρ", ["r"]), ("σ", ["s"]),
+    ("ς", ["s"]), ("τ", ["t"]), ("υ", ["y", "i", "u"]), ("φ", ["f"]), ("χ", ["x", "h", "ch"]),
+    ("ψ", ["ps"]), ("ω", ["o", "w"]),
+]
+
+
+def to_greeklish(text: str, rng: random.Random) -> str:
+    """Ελληνικά → greeklish με τυχαίες (αλλά ρεαλιστικές) παραλλαγές, για data augmentation."""
+    s = "".join(c for c in unicodedata.normalize("NFD", text.lower()) if unicodedata.category(c) != "Mn")
+    out: List[str] = []
+    i = 0
+    while i < len(s):
+        for gr, lat in _GREEKLISH_MAP:
+            if s.startswith(gr, i):
+                out.append(rng.choice(lat))
+                i += len(gr)
+                break
+        else:
+            out.append(s[i])
+            i += 1
+    return "".join(out)
+
+
+def build_corpus(raw: Dict[str, List[str]], *, variants: int = 3, seed: int = 7) -> Dict[str, List[str]]:
+    rng = random.Random(seed)
+    corpus = {k: list(v) for k, v in raw.items() if not k.startswith("_") and k != GREEK}
+    gl = corpus.setdefault(GREEKLISH, [])
+    for s in raw.get(GREEK, []):
+        gl.extend(to_greeklish(s, rng) for _ in range(variants))
+    return corpus
+
+
+def _load_corpus(path: str = CORPUS_FILE) -> Dict[str, List[str]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _eval(model: NgramModel, corpus: Dict[str, List[str]]) -> Tuple[int, int, List[Tuple[str, str, Optional[str]]]]:
+    ok = total = 0
+    misses: List[Tuple[str, str, Optional[str]]] = []
+    for lang, sentences in corpus.items():
+        for s in sentences:
+            pred, _ = model.predict(s)
+            total += 1
+            if pred == lang:
+                ok += 1
+            else:
+                misses.append((lang, s, pred))
+    return ok, total, misses
+
+
+def _split(corpus: Dict[str, List[str]], every: int = 5) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    train, held = {}, {}
+    for lang, sentences in corpus.items():
+        train[lang] = [s for i, s in enumerate(sentences) if i % every]
+        held[lang] = [s for i, s in enumerate(sentences) if not i % every]
+    return train, held
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m language_id", description="Mr Booky language identification")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    t = sub.add_parser("train", help="εκπαίδευση από το corpus → data/langid.json")
+    t.add_argument("--corpus", default=CORPUS_FILE)
+    t.add_argument("--out", default=MODEL_FILE)
+    t.add_argument("--top", type=int, default=700, help="n-grams ανά γλώσσα")
+    e = sub.add_parser("eval", help="held-out ακρίβεια (κάθε 5η πρόταση εκτός training)")
+    e.add_argument("--corpus", default=CORPUS_FILE)
+    e.add_argument("--top", type=int, default=700)
+    d = sub.add_parser("detect", help="ανίχνευση για ένα κείμενο")
+    d.add_argument("text")
+    args = ap.parse_args(list(argv) if argv is not None else None)
+
+    if args.cmd == "detect":
+        g = detect(args.text)
+        print(f"{g.lang or '-'}  confidence={g.confidence:.3f}  script={g.script}  → identify={identify(args.text)}")
+        return 0
+
+    corpus = build_corpus(_load_corpus(args.corpus))
+    if args.cmd == "eval":
+        train, held = _split(corpus)
+        ok, total, misses = _eval(NgramModel.train(train, top=args.top), held)
+        print(f"held-out accuracy: {ok}/{total} = {ok / max(total, 1):.1%}")
+        for lang, s, pred in misses:
+            print(f"  ✗ {lang} → {pred}: {s}")
+        return 0
+
+    model = NgramModel.train(corpus, top=args.top)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(model.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        f.write("\n")
+    ok, total, _ = _eval(model, corpus)
+    size_kb = os.path.getsize(args.out) / 1024
+    print(f"✔ {args.out}: {len(model.langs)} γλώσσες, {size_kb:.0f} KB, training accuracy {ok}/{total}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
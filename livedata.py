@@ -0,0 +1,228 @@
+# livedata.py
+"""
+Δεδομένα που αλλάζουν χωρίς redeploy: τιμοκατάλογος, περιοχές, φαρμακεία, εκδρομές, UI strings.
+
+    CONSTANTS_FILE=data/constants.json
+    snap = livedata.current()                 # immutable Snapshot· ένα ανά request
+    snap.day_km, snap.area(text), snap.get("tour_cards")
+    livedata.derive("tour_cards", build)      # παράγωγο που ξαναχτίζεται σε κάθε reload
+
+- το αρχείο παρακολουθείται από background thread (watchfiles, αλλιώς stat ανά
+  CONSTANTS_RELOAD_SEC)· parse, indexes και παράγωγα χτίζονται εκεί, όχι στο request path
+- το νέο Snapshot (version + 1) αλλάζει με μία ανάθεση (atomic swap)· αν αποτύχει η φόρτωση
+  ή κάποιο παράγωγο, μένει το προηγούμενο
+- tariff_version αλλάζει μόνο όταν αλλάζει ο τιμοκατάλογος (τα quotes με παλιό version λήγουν)
+- ένα area index για όλα: AREA_ALIASES + PHARMACY_AREAS (canonical και synonyms) σε skeleton
+  μορφή, ένα regex scan ανά κείμενο· η πρώτη φόρτωση το παίρνει από το artifact bundle
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import constants
+import greeklish
+
+try:
+    import watchfiles  # type: ignore
+except Exception:  # optional
+    watchfiles = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+CONSTANTS_FILE = os.getenv("CONSTANTS_FILE", "data/constants.json")
+CONSTANTS_RELOAD_SEC = float(os.getenv("CONSTANTS_RELOAD_SEC", "30"))  # χωρίς watchfiles
+CONSTANTS_WATCH = os.getenv("CONSTANTS_WATCH", "1").lower() in {"1", "true", "yes", "on"}
+
+_KEYS = {"taxi_tariff": dict, "area_aliases": dict, "pharmacy_areas": list, "tour_packages": list, "ui_text": dict}
+
+
+def _read(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    for key, typ in _KEYS.items():
+        if not isinstance(data.get(key), typ):
+            raise ValueError(f"{path}: το '{key}' λείπει ή δεν είναι {typ.__name__}")
+    return data
+
+
+def area_mapping(data: Dict[str, Any]) -> List[Tuple[str, List[str]]]:
+    """
+    (canonical, aliases) για το area index, σε σειρά προτεραιότητας: ένα alias που εμφανίζεται
+    σε δύο περιοχές ανήκει στην πρώτη που το δηλώνει.
+
+    1. area_aliases (canonical + aliases), με τη σειρά του αρχείου: "κεντρο" → Κέντρο Πάτρας,
+       "κεντρο πατρας" / "πλατεια γεωργιου" → Πάτρα
+    2. pharmacy_areas (canonical + synonyms): μόνο όσα δεν δήλωσε ήδη το 1 (ovrya, πανεπιστημιο…)
+    """
+    pairs = [(canonical, [canonical, *aliases]) for canonical, aliases in data["area_aliases"].items()]
+    pairs += [(a["canonical"], [a["canonical"], *(a.get("synonyms") or ())]) for a in data["pharmacy_areas"]]
+    return pairs
+
+
+def _rate(tariff: Dict[str, Any], keys: List[str], default: float) -> float:
+    for k in keys:
+        try:
+            v = tariff.get(k)
+            if v is not None:
+                return float(v)
+        except Exception:
+            pass
+    return float(default)
+
+
+class Snapshot:
+    """Ένα φορτωμένο data/constants.json με τα indexes και τα παράγωγά του (read-only)."""
+
+    def __init__(self, data: Dict[str, Any], *, version: int, mtime: float = 0.0,
+                 tariff_version: Optional[int] = None, area_index: Optional[greeklish.PlaceIndex] = None):
+        self.version = version
+        self.mtime = mtime
+        self.tariff: Dict[str, Any] = data["taxi_tariff"]
+        self.area_aliases: Dict[str, List[str]] = data["area_aliases"]
+        self.pharmacy_areas: List[Dict[str, Any]] = data["pharmacy_areas"]
+        self.tours: List[Dict[str, Any]] = data["tour_packages"]
+        self.ui_text: Dict[str, str] = dict(data["ui_text"])
+        if "contact_signature" in self.ui_text:
+            b = constants.BRAND_INFO
+            self.ui_text["contact_signature"] = self.ui_text["contact_signature"].format(
+                phone=b["phone"], site=b["site_url"], booking=b["booking_url"], app=b["app_url"])
+        # π.χ. "Μεσσάτιδα" -> ("https://…/Messatida", "Messatida")
+        self.pharmacy_url_map: Dict[str, Tuple[str, str]] = {
+            a["canonical"]: (a["pharmacy_url"], a["panel_id"]) for a in self.pharmacy_areas
+        }
+
+        t = self.tariff
+        self.day_km = _rate(t, ["km_rate_city_or_day", "km_rate_zone1"], 0.90)
+        self.night_km = _rate(t, ["km_rate_zone2_or_night"], max(self.day_km, 1.25))
+        self.start_fee = _rate(t, ["minimum_fare"], 4.0)
+        self.night_pct = int(round((self.night_km / max(self.day_km, 0.01) - 1.0) * 100)) if self.night_km > self.day_km else 0
+        self.wait_rate = int(_rate(t, ["wait_rate_per_hour", "waiting_per_hour"], 15.0))
+        self.tariff_version = version if tariff_version is None else tariff_version
+
+        # aliases σε skeleton μορφή: οι greeklish γραφές δεν χρειάζεται να γράφονται χωριστά
+        self.area_index = area_index if area_index is not None else greeklish.PlaceIndex(area_mapping(data))
+        self.derived: Dict[str, Any] = {}
+
+    def area(self, text, *, prefix: bool = False) -> Optional[str]:
+        """Η περιοχή (canonical) που αναφέρει το κείμενο· με prefix πιάνει και πτώσεις ("πάτρας")."""
+        return self.area_index.search(text, prefix=prefix) if text else None
+
+    def get(self, name: str) -> Any:
+        return self.derived[name]
+
+
+_DERIVED: Dict[str, Callable[[Snapshot], Any]] = {}
+_LOCK = threading.RLock()
+_WATCHER: Optional[threading.Thread] = None
+_STOP = threading.Event()
+
+
+def _initial() -> Snapshot:
+    data = _read(CONSTANTS_FILE)
+    index = greeklish.bundled_index("livedata.areas", lambda: area_mapping(_read(CONSTANTS_FILE)), CONSTANTS_FILE,
+                                    cls=greeklish.PlaceIndex)
+    return Snapshot(data, version=1, mtime=os.path.getmtime(CONSTANTS_FILE), area_index=index)
+
+
+_CURRENT = _initial()
+
+
+def current() -> Snapshot:
+    return _CURRENT
+
+
+def version() -> int:
+    return _CURRENT.version
+
+
+def derive(name: str, build: Callable[[Snapshot], Any]) -> None:
+    """Δηλώνει παράγωγο του snapshot (cache, rendered κείμενα)· χτίζεται τώρα και σε κάθε reload."""
+    with _LOCK:
+        _DERIVED[name] = build
+        _CURRENT.derived[name] = build(_CURRENT)
+
+
+def reload() -> bool:
+    """Νέο snapshot από το αρχείο με όλα τα παράγωγα, και swap. False αν κράτησε το προηγούμενο."""
+    global _CURRENT
+    with _LOCK:
+        cur = _CURRENT
+        try:
+            mtime = os.path.getmtime(CONSTANTS_FILE)
+            data = _read(CONSTANTS_FILE)
+            same_tariff = data["taxi_tariff"] == cur.tariff
+            same_areas = data["area_aliases"] == cur.area_aliases and data["pharmacy_areas"] == cur.pharmacy_areas
+            snap = Snapshot(data, version=cur.version + 1, mtime=mtime,
+                            tariff_version=cur.tariff_version if same_tariff else None,
+                            area_index=cur.area_index if same_areas else None)
+            for name, build in _DERIVED.items():
+                snap.derived[name] = build(snap)
+        except Exception:
+            logger.warning("livedata: αποτυχία φόρτωσης %s — κρατάω το v%d", CONSTANTS_FILE, cur.version, exc_info=True)
+            return False
+        _CURRENT = snap
+    logger.info("livedata: v%d από %s (tariff v%d)", snap.version, CONSTANTS_FILE, snap.tariff_version)
+    return True
+
+
+def _changed() -> bool:
+    try:
+        return os.path.getmtime(CONSTANTS_FILE) != _CURRENT.mtime
+    except OSError:
+        return False
+
+
+def _watch_loop(path: str) -> None:
+    global _WATCHER
+    target = os.path.abspath(path)
+    try:
+        if watchfiles is not None:
+            for changes in watchfiles.watch(os.path.dirname(target) or ".", stop_event=_STOP,
+                                            watch_filter=lambda _c, p: os.path.abspath(p) == target,
+                                            raise_interrupt=False):
+                if changes and _changed():
+                    reload()
+        else:
+            while not _STOP.wait(CONSTANTS_RELOAD_SEC):
+                if _changed():
+                    reload()
+    except Exception:
+        logger.warning("livedata: ο watcher σταμάτησε — χωρίς hot reload ως το επόμενο start_watcher()", exc_info=True)
+    finally:
+        if _WATCHER is threading.current_thread():
+            _WATCHER = None
+
+
+def start_watcher() -> bool:
+    """Background watcher του CONSTANTS_FILE (idempotent)."""
+    global _WATCHER
+    if not CONSTANTS_WATCH or not os.path.exists(CONSTANTS_FILE):
+        return False
+    with _LOCK:
+        if _WATCHER is not None and _WATCHER.is_alive():
+            return True
+        _STOP.clear()
+        _WATCHER = threading.Thread(target=_watch_loop, args=(CONSTANTS_FILE,), name="constants-watch", daemon=True)
+        _WATCHER.start()
+    return True
+
+
+def stop_watcher() -> None:
+    _STOP.set()
+    w = _WATCHER
+    if w is not None:
+        w.join(timeout=2)
+
+
+atexit.register(stop_watcher)
+
+
+def stats() -> Dict[str, Any]:
+    snap = _CURRENT
+    return {"version": snap.version, "tariff_version": snap.tariff_version, "file": CONSTANTS_FILE,
+            "watching": _WATCHER is not None, "derived": sorted(snap.derived)}
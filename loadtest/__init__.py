@@ -0,0 +1,21 @@
+# loadtest/__init__.py
+"""
+Τοπικά stand-ins για όλα τα upstream APIs + asyncio load generator για το /chat.
+
+    # 1) stubs σε ξεχωριστό process (και τύπωσε τα env για το app)
+    python -m loadtest.stubs --port 8099 --latency-ms 80 --error-rate 0.02 --print-env
+
+    # 2) app με τα env του stub
+    eval "$(python -m loadtest.stubs --port 8099 --print-env --no-serve)"
+    uvicorn main:app --port 8000
+
+    # 3) load
+    python -m loadtest.loadgen --url http://127.0.0.1:8000 --users 50 --duration 30
+
+Ή όλα in-process από python:
+
+    from loadtest.stubs import StubServer
+    with StubServer(latency_ms=50) as stub:
+        os.environ.update(stub.env())
+        ...
+"""
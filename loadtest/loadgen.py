@@ -0,0 +1,216 @@
+# loadtest/loadgen.py
+"""
+asyncio load generator: N ταυτόχρονοι "χρήστες" που τρέχουν ρεαλιστικές
+συνομιλίες πάνω στο /chat και μετράνε latency / throughput / errors.
+
+    python -m loadtest.loadgen --url http://127.0.0.1:8000 --users 50 --duration 30
+    python -m loadtest.loadgen --users 20 --iterations 5 --api-key $CHAT_API_KEY --json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+
+# Κάθε σενάριο = μια συνομιλία (τα μηνύματα στέλνονται με σειρά, ίδιο session)
+SCENARIOS: Dict[str, List[str]] = {
+    "quote": [
+        "πόσο κοστίζει από Πάτρα μέχρι Αθήνα;",
+        "και μέχρι το αεροδρόμιο;",
+    ],
+    "quote_greeklish": [
+        "apo patra mexri kalavryta poso kanei?",
+    ],
+    "pharmacy": [
+        "ποιο φαρμακείο εφημερεύει;",
+        "Παραλία",
+    ],
+    "hospital": [
+        "ποιο νοσοκομείο εφημερεύει αύριο;",
+    ],
+    "contact": [
+        "τηλέφωνο ραδιοταξί",
+    ],
+    "booking": [
+        "πόσο κάνει από Ρίο μέχρι Πάτρα;",
+        "θέλω να κλείσω",
+        "Γιώργος Παπαδόπουλος",
+        "6900000000",
+        "αύριο στις 10:00",
+        "Αγίου Ανδρέου 45",
+        "1",
+        "ναι",
+    ],
+    "smalltalk_en": [
+        "hi, do you speak english?",
+        "how much is a taxi from the port to the university hospital?",
+    ],
+}
+
+
+@dataclass
+class Sample:
+    scenario: str
+    latency_ms: float
+    status: int
+    ok: bool
+
+
+@dataclass
+class Report:
+    samples: List[Sample] = field(default_factory=list)
+    wall_sec: float = 0.0
+
+    def percentile(self, p: float, values: Optional[Sequence[float]] = None) -> float:
+        vals = sorted(values if values is not None else (s.latency_ms for s in self.samples))
+        if not vals:
+            return 0.0
+        k = (len(vals) - 1) * p / 100.0
+        lo, hi = int(k), min(int(k) + 1, len(vals) - 1)
+        return vals[lo] + (vals[hi] - vals[lo]) * (k - lo)
+
+    def summary(self) -> Dict[str, Any]:
+        n = len(self.samples)
+        errors = sum(1 for s in self.samples if not s.ok)
+        per_scenario: Dict[str, Dict[str, Any]] = {}
+        for name in sorted({s.scenario for s in self.samples}):
+            lat = [s.latency_ms for s in self.samples if s.scenario == name]
+            per_scenario[name] = {
+                "requests": len(lat),
+                "p50_ms": round(self.percentile(50, lat), 1),
+                "p99_ms": round(self.percentile(99, lat), 1),
+            }
+        status: Dict[str, int] = {}
+        for s in self.samples:
+            status[str(s.status)] = status.get(str(s.status), 0) + 1
+        return {
+            "requests": n,
+            "errors": errors,
+            "error_rate": round(errors / n, 4) if n else 0.0,
+            "rps": round(n / self.wall_sec, 1) if self.wall_sec else 0.0,
+            "p50_ms": round(self.percentile(50), 1),
+            "p90_ms": round(self.percentile(90), 1),
+            "p99_ms": round(self.percentile(99), 1),
+            "max_ms": round(max((s.latency_ms for s in self.samples), default=0.0), 1),
+            "status": status,
+            "scenarios": per_scenario,
+        }
+
+
+async def _user(
+    client: httpx.AsyncClient,
+    uid: int,
+    report: Report,
+    *,
+    scenarios: Sequence[str],
+    deadline: Optional[float],
+    iterations: int,
+    think_ms: float,
+    rng: random.Random,
+) -> None:
+    done = 0
+    while True:
+        if deadline is not None and time.monotonic() >= deadline:
+            return
+        if deadline is None and done >= iterations:
+            return
+        name = rng.choice(list(scenarios))
+        sid = f"load:{uid}:{uuid.uuid4().hex[:8]}"
+        for msg in SCENARIOS[name]:
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            t0 = time.perf_counter()
+            status = 0
+            try:
+                r = await client.post("/chat", json={"message": msg, "session_id": sid, "user_id": sid})
+                status = r.status_code
+            except httpx.HTTPError:
+                status = 0
+            report.samples.append(Sample(name, (time.perf_counter() - t0) * 1000.0, status, 200 <= status < 300))
+            if think_ms:
+                await asyncio.sleep(rng.uniform(0, think_ms) / 1000.0)
+        done += 1
+
+
+async def run_load(
+    url: str,
+    *,
+    users: int = 10,
+    duration: Optional[float] = None,
+    iterations: int = 1,
+    scenarios: Optional[Sequence[str]] = None,
+    api_key: Optional[str] = None,
+    think_ms: float = 0.0,
+    timeout: float = 60.0,
+    seed: Optional[int] = None,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> Report:
+    """Τρέχει `users` ταυτόχρονους χρήστες· είτε για `duration` sec είτε `iterations` συνομιλίες ο καθένας."""
+    names = list(scenarios or SCENARIOS)
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        raise ValueError(f"Άγνωστα σενάρια: {', '.join(unknown)}")
+
+    headers = {"X-API-Key": api_key} if api_key else {}
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    report = Report()
+    rng = random.Random(seed)
+    async with httpx.AsyncClient(
+        base_url=url, headers=headers, timeout=timeout, limits=limits, transport=transport
+    ) as client:
+        t0 = time.monotonic()
+        deadline = (t0 + duration) if duration else None
+        await asyncio.gather(*(
+            _user(client, i, report, scenarios=names, deadline=deadline, iterations=iterations,
+                  think_ms=think_ms, rng=random.Random(rng.random()))
+            for i in range(users)
+        ))
+        report.wall_sec = time.monotonic() - t0
+    return report
+
+
+def _print_human(s: Dict[str, Any]) -> None:
+    print(f"requests: {s['requests']}  errors: {s['errors']} ({s['error_rate']:.2%})  rps: {s['rps']}")
+    print(f"latency ms  p50={s['p50_ms']}  p90={s['p90_ms']}  p99={s['p99_ms']}  max={s['max_ms']}")
+    print(f"status: {s['status']}")
+    for name, row in s["scenarios"].items():
+        print(f"  {name:<16} n={row['requests']:<6} p50={row['p50_ms']:<8} p99={row['p99_ms']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m loadtest.loadgen", description="Load generator για το /chat")
+    ap.add_argument("--url", default="http://127.0.0.1:8000")
+    ap.add_argument("--users", type=int, default=10)
+    ap.add_argument("--duration", type=float, default=None, help="sec· αλλιώς --iterations ανά χρήστη")
+    ap.add_argument("--iterations", type=int, default=3)
+    ap.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="επαναλαμβανόμενο")
+    ap.add_argument("--api-key", default=None)
+    ap.add_argument("--think-ms", type=float, default=0.0, help="τυχαία παύση έως Χ ms μεταξύ μηνυμάτων")
+    ap.add_argument("--timeout", type=float, default=60.0)
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--json", action="store_true", help="έξοδος σε JSON")
+    args = ap.parse_args(argv)
+
+    report = asyncio.run(run_load(
+        args.url, users=args.users, duration=args.duration, iterations=args.iterations,
+        scenarios=args.scenario, api_key=args.api_key, think_ms=args.think_ms,
+        timeout=args.timeout, seed=args.seed,
+    ))
+    s = report.summary()
+    if args.json:
+        print(json.dumps(s, ensure_ascii=False, indent=2))
+    else:
+        _print_human(s)
+    return 1 if s["requests"] == 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,505 @@
+# loadtest/stubs.py
+"""
+Stand-in ASGI app για όλα τα upstream που καλεί το Mr Booky, με ρυθμιζόμενο
+latency / error rate / timeouts / payload variants ανά υπηρεσία.
+
+Υπηρεσίες (prefix → env var του app):
+    /timologio      TIMOLOGIO_API_URL           GET /fare, POST /webhook (Dialogflow-like)
+    /pharmacy-api   PHARMACY_API_URL            GET|POST /pharmacy
+    /hospitals      HOSPITAL_API_URL            POST /webhook
+    /patras         PATRAS_LLM_ANSWERS_API_URL  POST /
+    /nominatim      NOMINATIM_URL               GET /search
+    /infoxoros      INFOXOROS_*                 GET /api/cost_calculator.php, POST /call-api/info/
+    /slack          SLACK_BOOKING_WEBHOOK_URL   POST /webhook
+    /openai         OPENAI_BASE_URL             POST /v1/chat/completions, POST /v1/responses (+stream)
+
+Runtime ρύθμιση: POST /__stub/config  (ίδια κλειδιά με το StubConfig),
+στατιστικά: GET /__stub/stats, reset: POST /__stub/reset.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shlex
+import threading
+import time
+import uuid
+import zlib
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+SERVICES = ("timologio", "pharmacy", "hospitals", "patras", "nominatim", "infoxoros", "slack", "openai")
+
+# Payload variants του Timologio:
+#   fare        → JSON με price_eur/distance_km/duration_min από το GET /fare
+#   dialogflow  → το GET /fare δεν έχει τιμή, άρα το client πάει στο POST /webhook (fulfillment_response)
+#   error       → το GET /fare σκάει 500, fallback κατευθείαν στο webhook
+TIMOLOGIO_VARIANTS = ("fare", "dialogflow", "error")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 0.0       # σταθερή καθυστέρηση ανά κλήση
+    jitter_ms: float = 0.0        # + uniform(0, jitter_ms)
+    error_rate: float = 0.0       # πιθανότητα HTTP 503
+    timeout_rate: float = 0.0     # πιθανότητα να "κρεμάσει" για hang_sec
+    hang_sec: float = 30.0
+    timologio_variant: str = "fare"
+    stream_chunk_ms: float = 0.0  # καθυστέρηση ανά token στα streamed LLM replies
+    seed: Optional[int] = None
+    # per-service overrides, π.χ. {"openai": {"latency_ms": 900}, "slack": {"error_rate": 0.5}}
+    services: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    @classmethod
+    def from_env(cls) -> "StubConfig":
+        cfg = cls(
+            latency_ms=_env_float("STUB_LATENCY_MS", 0.0),
+            jitter_ms=_env_float("STUB_JITTER_MS", 0.0),
+            error_rate=_env_float("STUB_ERROR_RATE", 0.0),
+            timeout_rate=_env_float("STUB_TIMEOUT_RATE", 0.0),
+            hang_sec=_env_float("STUB_HANG_SEC", 30.0),
+            timologio_variant=os.getenv("STUB_TIMOLOGIO_VARIANT", "fare"),
+            stream_chunk_ms=_env_float("STUB_STREAM_CHUNK_MS", 0.0),
+        )
+        raw = os.getenv("STUB_SERVICES_JSON")
+        if raw:
+            try:
+                cfg.services = json.loads(raw)
+            except ValueError:
+                pass
+        return cfg
+
+    def update(self, data: Dict[str, Any]) -> None:
+        for k, v in (data or {}).items():
+            if k == "services" and isinstance(v, dict):
+                for svc, overrides in v.items():
+                    self.services.setdefault(svc, {}).update(overrides or {})
+            elif hasattr(self, k):
+                setattr(self, k, v)
+
+    def for_service(self, name: str) -> Dict[str, float]:
+        """Τα ενεργά fault settings για μια υπηρεσία (global + overrides)."""
+        base = {
+            "latency_ms": self.latency_ms,
+            "jitter_ms": self.jitter_ms,
+            "error_rate": self.error_rate,
+            "timeout_rate": self.timeout_rate,
+            "hang_sec": self.hang_sec,
+        }
+        base.update(self.services.get(name) or {})
+        return base
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Canned payloads
+
+def _timologio_numbers(origin: str, destination: str) -> Dict[str, Any]:
+    # ντετερμινιστικά νούμερα ανά ζεύγος, ώστε ίδια ερώτηση → ίδια τιμή
+    key = f"{origin.strip().lower()}|{destination.strip().lower()}"
+    h = zlib.crc32(key.encode("utf-8")) % 2000
+    km = 5.0 + h / 10.0
+    minutes = int(km * 0.9) + 5
+    price = round(3.5 + km * 1.25, 2)
+    return {"price_eur": price, "distance_km": round(km, 1), "duration_min": minutes}
+
+
+def _dialogflow_reply(text: str, **extra: Any) -> Dict[str, Any]:
+    out: Dict[str, Any] = {"fulfillment_response": {"messages": [{"text": {"text": [text]}}]}}
+    out.update(extra)
+    return out
+
+
+def _map_url(origin: str, destination: str) -> str:
+    from urllib.parse import quote_plus
+    return (
+        "https://www.google.com/maps/dir/?api=1"
+        f"&origin={quote_plus(origin)}&destination={quote_plus(destination)}&travelmode=driving"
+    )
+
+
+_PHARMACIES = [
+    {"name": "Φαρμακείο Stub Α", "address": "Κορίνθου 100", "time_range": "08:00 - 21:00"},
+    {"name": "Φαρμακείο Stub Β", "address": "Μαιζώνος 55", "time_range": "08:00 - 21:00"},
+    {"name": "Φαρμακείο Stub Γ", "address": "Ακτή Δυμαίων 12", "time_range": "21:00 - 08:00"},
+]
+
+_LLM_REPLY = (
+    "Γεια σου! Είμαι το stub του LLM 🙂 Μπορώ να σου δώσω τιμή διαδρομής, "
+    "εφημερεύοντα φαρμακεία ή νοσοκομεία και να κλείσω ταξί."
+)
+
+
+def _last_user_text(messages: Any) -> str:
+    if isinstance(messages, str):
+        return messages
+    for m in reversed(messages or []):
+        if isinstance(m, dict) and m.get("role") == "user":
+            c = m.get("content")
+            if isinstance(c, str):
+                return c
+            if isinstance(c, list):
+                return " ".join(str(p.get("text", "")) for p in c if isinstance(p, dict))
+    return ""
+
+
+def _llm_text(prompt: str) -> str:
+    # Για prompts μετάφρασης / rewrite επιστρέφουμε το ίδιο κείμενο (ισχύει ως "μετάφραση")
+    return prompt.strip()[:400] if prompt and len(prompt) > 40 else _LLM_REPLY
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# App factory
+
+def create_app(config: Optional[StubConfig] = None) -> FastAPI:
+    cfg = config or StubConfig.from_env()
+    rng = random.Random(cfg.seed)
+    stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"calls": 0, "errors": 0, "timeouts": 0})
+    app = FastAPI(title="Mr Booky upstream stubs")
+    app.state.config = cfg
+    app.state.stats = stats
+
+    async def inject(service: str) -> Optional[JSONResponse]:
+        """Latency + fault injection. Επιστρέφει response αν πρέπει να κοπεί η κλήση."""
+        s = cfg.for_service(service)
+        stats[service]["calls"] += 1
+        delay = float(s["latency_ms"]) + rng.uniform(0.0, float(s["jitter_ms"]))
+        if delay > 0:
+            await asyncio.sleep(delay / 1000.0)
+        roll = rng.random()
+        if roll < float(s["timeout_rate"]):
+            stats[service]["timeouts"] += 1
+            await asyncio.sleep(float(s["hang_sec"]))
+            return JSONResponse(status_code=504, content={"error": "stub timeout"})
+        if roll < float(s["timeout_rate"]) + float(s["error_rate"]):
+            stats[service]["errors"] += 1
+            return JSONResponse(status_code=503, content={"error": "stub injected failure"})
+        return None
+
+    # ── control plane ──
+    @app.get("/__stub/stats")
+    async def _stats():
+        return {"config": asdict(cfg), "stats": dict(stats)}
+
+    @app.post("/__stub/config")
+    async def _config(req: Request):
+        cfg.update(await req.json())
+        if cfg.seed is not None:
+            rng.seed(cfg.seed)
+        return asdict(cfg)
+
+    @app.post("/__stub/reset")
+    async def _reset():
+        stats.clear()
+        return {"ok": True}
+
+    # ── Timologio ──
+    @app.get("/timologio/fare")
+    async def timologio_fare(request: Request):
+        if (r := await inject("timologio")) is not None:
+            return r
+        q = request.query_params
+        origin = q.get("origin") or q.get("from") or ""
+        dest = q.get("destination") or q.get("to") or ""
+        variant = cfg.timologio_variant
+        if variant == "error":
+            return JSONResponse(status_code=500, content={"error": "fare backend down"})
+        if variant == "dialogflow":
+            # χωρίς τιμή → ο client κάνει enrichment μέσω POST /webhook
+            return {"origin": origin, "destination": dest, "status": "pending"}
+        out = _timologio_numbers(origin, dest)
+        out["map_url"] = _map_url(origin, dest)
+        return out
+
+    @app.post("/timologio/webhook")
+    async def timologio_webhook(req: Request):
+        if (r := await inject("timologio")) is not None:
+            return r
+        body = await req.json()
+        origin = body.get("origin") or body.get("from") or ""
+        dest = body.get("destination") or body.get("to") or ""
+        n = _timologio_numbers(origin, dest)
+        h, m = divmod(n["duration_min"], 60)
+        price = f"{n['price_eur']:.2f}".replace(".", ",")
+        km = f"{n['distance_km']:.1f}".replace(".", ",")
+        text = (
+            f"Η διαδρομή από {origin} προς {dest} είναι {km} χλμ. "
+            f"Κόστος: {price} € Διάρκεια: ~{h} ώρες και {m} λεπτά. "
+            f"<a href='{_map_url(origin, dest)}'>Χάρτης</a>"
+        )
+        return _dialogflow_reply(text)
+
+    # ── Pharmacy ──
+    @app.api_route("/pharmacy-api/pharmacy", methods=["GET", "POST"])
+    async def pharmacy(req: Request):
+        if (r := await inject("pharmacy")) is not None:
+            return r
+        area = req.query_params.get("area")
+        if req.method == "POST":
+            area = (await req.json()).get("area")
+        return {"area": area or "Πάτρα", "pharmacies": _PHARMACIES}
+
+    # ── Hospitals ──
+    @app.post("/hospitals/webhook")
+    async def hospitals(req: Request):
+        if (r := await inject("hospitals")) is not None:
+            return r
+        body = await req.json()
+        params = (body.get("queryResult") or {}).get("parameters") or {}
+        day = params.get("which_day") or params.get("day") or "σήμερα"
+        return _dialogflow_reply(f"🏥 Εφημερεύει ({day}): Π.Γ.Ν. Πατρών (Ρίο) — stub")
+
+    # ── Patras answers ──
+    @app.post("/patras")
+    @app.post("/patras/")
+    async def patras(req: Request):
+        if (r := await inject("patras")) is not None:
+            return r
+        body = await req.json()
+        return {"answer": f"ℹ️ (stub) Πληροφορίες για: {body.get('question', '')}"}
+
+    # ── Nominatim ──
+    @app.get("/nominatim/search")
+    async def nominatim(q: str = ""):
+        if (r := await inject("nominatim")) is not None:
+            return r
+        h = zlib.crc32(q.strip().lower().encode("utf-8")) % 10_000
+        return [{
+            "lat": f"{38.20 + h / 100_000:.6f}",
+            "lon": f"{21.70 + h / 100_000:.6f}",
+            "display_name": q or "Πάτρα",
+        }]
+
+    # ── Infoxoros ──
+    @app.get("/infoxoros/api/cost_calculator.php")
+    async def infoxoros_cost(request: Request):
+        if (r := await inject("infoxoros")) is not None:
+            return r
+        q = request.query_params
+        n = _timologio_numbers(q.get("lat_start", ""), q.get("lat_end", ""))
+        return {
+            "cost": f"{n['price_eur']:.2f}",
+            "distance": int(n["distance_km"] * 1000),
+            "duration": n["duration_min"] * 60,
+        }
+
+    @app.post("/infoxoros/call-api/info/")
+    async def infoxoros_info(req: Request):
+        if (r := await inject("infoxoros")) is not None:
+            return r
+        form = await req.form()
+        action = form.get("action") or ""
+        if action == "getoffer":
+            return {"status": 1, "cost": "25.00", "distance": 9500, "duration": 1200}
+        return {"status": 1, "booking_id": f"STUB-{uuid.uuid4().hex[:8].upper()}", "action": action}
+
+    # ── Slack ──
+    @app.post("/slack/webhook")
+    async def slack(req: Request):
+        if (r := await inject("slack")) is not None:
+            return r
+        await req.body()
+        return PlainTextResponse("ok")
+
+    # ── OpenAI ──
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(req: Request):
+        if (r := await inject("openai")) is not None:
+            return r
+        body = await req.json()
+        model = body.get("model") or "gpt-4o-mini"
+        text = _llm_text(_last_user_text(body.get("messages")))
+        cid = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        if not body.get("stream"):
+            return {
+                "id": cid, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": text}}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            }
+
+        async def _gen():
+            for tok in _tokens(text):
+                chunk = {"id": cid, "object": "chat.completion.chunk", "created": created, "model": model,
+                         "choices": [{"index": 0, "delta": {"content": tok}, "finish_reason": None}]}
+                yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                if cfg.stream_chunk_ms:
+                    await asyncio.sleep(cfg.stream_chunk_ms / 1000.0)
+            end = {"id": cid, "object": "chat.completion.chunk", "created": created, "model": model,
+                   "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+            yield f"data: {json.dumps(end)}\n\ndata: [DONE]\n\n"
+
+        return StreamingResponse(_gen(), media_type="text/event-stream")
+
+    @app.post("/openai/v1/responses")
+    async def responses(req: Request):
+        # Το Agents SDK (Runner.run / run_streamed) μιλάει Responses API
+        if (r := await inject("openai")) is not None:
+            return r
+        body = await req.json()
+        inp = body.get("input")
+        text = _llm_text(_last_user_text(inp) if not isinstance(inp, str) else inp)
+        rid, mid = f"resp_{uuid.uuid4().hex[:12]}", f"msg_{uuid.uuid4().hex[:12]}"
+
+        def _resp(status: str, final_text: Optional[str]) -> Dict[str, Any]:
+            output = []
+            if final_text is not None:
+                output = [{
+                    "id": mid, "type": "message", "role": "assistant", "status": "completed",
+                    "content": [{"type": "output_text", "text": final_text, "annotations": []}],
+                }]
+            return {
+                "id": rid, "object": "response", "created_at": time.time(), "status": status,
+                "model": body.get("model") or "gpt-4o-mini", "output": output,
+                "parallel_tool_calls": False, "tool_choice": "auto", "tools": [],
+                "usage": {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0,
+                          "input_tokens_details": {"cached_tokens": 0},
+                          "output_tokens_details": {"reasoning_tokens": 0}},
+            }
+
+        if not body.get("stream"):
+            return _resp("completed", text)
+
+        async def _gen():
+            seq = 0
+
+            def ev(payload: Dict[str, Any]) -> str:
+                nonlocal seq
+                payload["sequence_number"] = seq
+                seq += 1
+                return f"event: {payload['type']}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+            yield ev({"type": "response.created", "response": _resp("in_progress", None)})
+            for tok in _tokens(text):
+                yield ev({"type": "response.output_text.delta", "item_id": mid, "output_index": 0,
+                          "content_index": 0, "delta": tok, "logprobs": []})
+                if cfg.stream_chunk_ms:
+                    await asyncio.sleep(cfg.stream_chunk_ms / 1000.0)
+            yield ev({"type": "response.completed", "response": _resp("completed", text)})
+
+        return StreamingResponse(_gen(), media_type="text/event-stream")
+
+    return app
+
+
+def _tokens(text: str):
+    # "tokens" ≈ λέξεις με το κενό τους, αρκετό για ρεαλιστικό streaming
+    parts = text.split(" ")
+    for i, p in enumerate(parts):
+        yield p if i == len(parts) - 1 else p + " "
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Env για να "δείξει" το app στα stubs
+
+def stub_env(base_url: str) -> Dict[str, str]:
+    b = base_url.rstrip("/")
+    return {
+        "TIMOLOGIO_API_URL": f"{b}/timologio",
+        "PHARMACY_API_URL": f"{b}/pharmacy-api",
+        "HOSPITAL_API_URL": f"{b}/hospitals",
+        "PATRAS_LLM_ANSWERS_API_URL": f"{b}/patras",
+        "NOMINATIM_URL": f"{b}/nominatim/search",
+        "INFOXOROS_BASE_URL": f"{b}/infoxoros/call-api/info/",
+        "INFOXOROS_COST_URL": f"{b}/infoxoros/api/cost_calculator.php",
+        "INFOXOROS_API_KEY": "stub-key",
+        "SLACK_BOOKING_WEBHOOK_URL": f"{b}/slack/webhook",
+        "OPENAI_BASE_URL": f"{b}/openai/v1",
+        "OPENAI_API_KEY": "sk-stub",
+        "OPENAI_AGENTS_DISABLE_TRACING": "1",
+    }
+
+
+class StubServer:
+    """uvicorn σε background thread — για in-process χρήση (tests / loadgen --with-stubs)."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, config: Optional[StubConfig] = None, **overrides: Any):
+        import uvicorn
+
+        cfg = config or StubConfig.from_env()
+        cfg.update(overrides)
+        self.app = create_app(cfg)
+        self.config = cfg
+        self._server = uvicorn.Server(uvicorn.Config(self.app, host=host, port=port, log_level="warning", lifespan="off"))
+        self._thread: Optional[threading.Thread] = None
+        self.host = host
+        self.port = port
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def env(self) -> Dict[str, str]:
+        return stub_env(self.base_url)
+
+    def start(self, timeout: float = 10.0) -> "StubServer":
+        self._thread = threading.Thread(target=self._server.run, name="loadtest-stubs", daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("stub server did not start")
+            time.sleep(0.02)
+        if self.port == 0:
+            # port=0 → το OS διάλεξε ελεύθερη θύρα
+            self.port = self._server.servers[0].sockets[0].getsockname()[1]
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def main(argv: Optional[list] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m loadtest.stubs", description="Mr Booky upstream stubs")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8099)
+    ap.add_argument("--latency-ms", type=float)
+    ap.add_argument("--jitter-ms", type=float)
+    ap.add_argument("--error-rate", type=float)
+    ap.add_argument("--timeout-rate", type=float)
+    ap.add_argument("--hang-sec", type=float)
+    ap.add_argument("--timologio-variant", choices=TIMOLOGIO_VARIANTS)
+    ap.add_argument("--stream-chunk-ms", type=float)
+    ap.add_argument("--seed", type=int)
+    ap.add_argument("--print-env", action="store_true", help="τύπωσε export γραμμές για το app")
+    ap.add_argument("--no-serve", action="store_true", help="μόνο --print-env, χωρίς server")
+    args = ap.parse_args(argv)
+
+    if args.print_env:
+        for k, v in stub_env(f"http://{args.host}:{args.port}").items():
+            print(f"export {k}={shlex.quote(v)}")
+    if args.no_serve:
+        return 0
+
+    cfg = StubConfig.from_env()
+    cfg.update({k: v for k, v in vars(args).items() if v is not None and hasattr(cfg, k)})
+
+    import uvicorn
+    uvicorn.run(create_app(cfg), host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,129 @@
+# localdb.py
+"""
+Κοινό SQLite (WAL) για όλους τους workers ενός host, χωρίς Redis.
+
+    PERSIST_BACKEND=sqlite   sessions, rate limits, idempotent replies, translation cache (L2)
+    LOCAL_DB=data/local.sqlite3
+
+Με WAL οι readers δεν μπλοκάρουν τον writer και τα writes μεταξύ processes σειριοποιούνται από
+το SQLite (BEGIN IMMEDIATE + busy_timeout), οπότε το `gunicorn -w N` βλέπει ένα κοινό state.
+synchronous=NORMAL: ένα crash του host μπορεί να χάσει τα τελευταία commits — αποδεκτό για
+sessions/caches, όχι για το jobs queue (εκείνο έχει δικό του αρχείο, βλ. jobs.py).
+
+Οι χρόνοι είναι wall clock (time.time()), κοινός για όλα τα processes.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+LOCAL_DB = os.getenv("LOCAL_DB", "data/local.sqlite3")
+LOCAL_DB_PURGE_SEC = float(os.getenv("LOCAL_DB_PURGE_SEC", "60"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    ns TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    exp REAL NOT NULL,
+    PRIMARY KEY (ns, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS kv_exp ON kv(exp);
+"""
+
+
+class LocalDB:
+    """Μία σύνδεση ανά process με lock (όπως το SQLiteJobStore)· το SQLite κάνει τον συντονισμό μεταξύ processes."""
+
+    def __init__(self, path: str = LOCAL_DB):
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.lock = threading.RLock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        if path != ":memory:":
+            self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SCHEMA)
+        self._next_purge = 0.0
+
+    def execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self.lock:
+            return self.db.execute(sql, params)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """BEGIN IMMEDIATE: read-modify-write ατομικά και μεταξύ processes."""
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.db
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+
+    # ── TTL key/value ────────────────────────────────────────────────────────
+    def get(self, ns: str, key: str, now: Optional[float] = None) -> Optional[str]:
+        now = time.time() if now is None else now
+        row = self.execute("SELECT value FROM kv WHERE ns=? AND key=? AND exp>?", (ns, key, now)).fetchone()
+        return row[0] if row else None
+
+    def set(self, ns: str, key: str, value: str, ttl: float) -> None:
+        now = time.time()
+        self.execute("INSERT OR REPLACE INTO kv (ns, key, value, exp) VALUES (?, ?, ?, ?)", (ns, key, value, now + ttl))
+        self._maybe_purge(now)
+
+    def add(self, ns: str, key: str, value: str, ttl: float) -> bool:
+        """Γράφει μόνο αν δεν υπάρχει (ή έχει λήξει)· True αν έγραψε (SET NX)."""
+        now = time.time()
+        cur = self.execute(
+            "INSERT INTO kv (ns, key, value, exp) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(ns, key) DO UPDATE SET value=excluded.value, exp=excluded.exp WHERE kv.exp<=?",
+            (ns, key, value, now + ttl, now),
+        )
+        return cur.rowcount > 0
+
+    def delete(self, ns: str, key: str, value: Optional[str] = None) -> None:
+        """Σβήνει το key· με value μόνο αν έχει ακόμα αυτή την τιμή (compare-and-delete)."""
+        if value is None:
+            self.execute("DELETE FROM kv WHERE ns=? AND key=?", (ns, key))
+        else:
+            self.execute("DELETE FROM kv WHERE ns=? AND key=? AND value=?", (ns, key, value))
+
+    def clear(self, ns: str) -> None:
+        self.execute("DELETE FROM kv WHERE ns=?", (ns,))
+
+    def _maybe_purge(self, now: float) -> None:
+        if now >= self._next_purge:
+            self._next_purge = now + LOCAL_DB_PURGE_SEC
+            self.execute("DELETE FROM kv WHERE exp<=?", (now,))
+
+
+_DBS: Dict[str, LocalDB] = {}
+_LOCK = threading.Lock()
+
+
+def get_db(path: Optional[str] = None) -> LocalDB:
+    """Μία LocalDB ανά αρχείο ανά process (μετά από fork ανοίγει νέα σύνδεση, βλ. _reset_after_fork)."""
+    path = path or LOCAL_DB
+    with _LOCK:
+        db = _DBS.get(path)
+        if db is None:
+            db = _DBS[path] = LocalDB(path)
+        return db
+
+
+def _reset_after_fork() -> None:
+    # μια sqlite σύνδεση δεν πρέπει να περνά σε child process (gunicorn --preload)
+    global _LOCK
+    _DBS.clear()
+    _LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
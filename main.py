@@ -4,52 +4,27 @@ import os
 import logging
 import re
 import random
+import math
 import asyncio
 import threading
 import uuid
-from typing import Any, Dict, List, Optional
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import JSONResponse
+from sse_starlette.sse import EventSourceResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
-try:
-    from agents import Agent, Runner, function_tool  # type: ignore
-    HAS_AGENTS_SDK = True
-except Exception:  # graceful fallback when Agents SDK is missing
-    HAS_AGENTS_SDK = False
-    def function_tool(fn=None, **kwargs):
-        # Minimal no-op decorator to let tools load without Agents SDK
-        def _decorator(f):
-            # attach a .name attribute similar to agents SDK for consistency
-            setattr(f, "name", kwargs.get("name_override", getattr(f, "__name__", "tool")))
-            return f
-        if fn is None:
-            return _decorator
-        return _decorator(fn)
-
-    class Agent:  # minimal placeholder
-        def __init__(self, *args, **kwargs): 
-            self.name = kwargs.get("name", "agent")
-            self.tools = kwargs.get("tools", [])
-            self.instructions = kwargs.get("instructions", "")
-
-    class Runner:  # minimal placeholder runner: we won't actually use it
-        @staticmethod
-        async def run(agent, input: str, context: dict):
-            raise RuntimeError("Agents SDK not installed; using direct tool dispatch fallback.")
 from config import Settings
 from dataclasses import dataclass, field, asdict
 import constants
 from api_clients import PharmacyClient
 
-from unicodedata import normalize as _u_norm
 import time
-from constants import TOUR_PACKAGES
-from security import APIKeyAuthMiddleware, RateLimitMiddleware, BodySizeLimitMiddleware
-from constants import TAXI_TARIFF as _TT
+from security import APIKeys, RateLimitPolicy, SecurityMiddleware, api_key_from_headers, scope_client_ip
 
 # εργαλεία
 from tools import (
@@ -65,11 +40,38 @@ from tools import (
     detect_area_for_pharmacy,
 )
 from tools import RunContextWrapper as _RunCtx
+from tools import HAS_AGENTS_SDK, sdk_tool
+from tools import _extract_route_free_text, _is_round_trip
 # 🔹 ΝΕΟ: LLM Router & Booking helpers
 from router_and_booking import (
     init_session_state,
     maybe_handle_followup_or_booking,
+    booking_status,
+    booking_status_update,
 )
+# 🔹 ΝΕΟ: template catalog + translation cache για _maybe_adapt_language
+import translations
+import language_id
+# 🔹 ΝΕΟ: SSE events για το /chat/stream
+import streaming
+# 🔹 ΝΕΟ: background ουρά (υποβολή κράτησης, ειδοποιήσεις)
+import jobs
+import entity_parser
+import livedata
+import localdb
+from hashring import HashRing
+import startup
+import phrases
+import reply_pipeline
+from reply_pipeline import Reply, Stage
+# 🔹 ΝΕΟ: Quote records (reuse εκτίμησης σε confirm/booking)
+import greeklish
+import quotes
+import textnorm
+from textnorm import NormText
+# 🔹 ΝΕΟ: idempotent /chat (retries χωρίς διπλά side effects)
+import idempotency
+from contextlib import asynccontextmanager
 
 # ──────────────────────────────────────────────────────────────────────────────
 # .env + settings
@@ -79,10 +81,25 @@ settings = Settings()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Taxi Agent")
 
-# Size guard (413)
-app.add_middleware(BodySizeLimitMiddleware, max_body_bytes=getattr(settings, "MAX_BODY_BYTES", 1_000_000))
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    queue = jobs.get_queue()
+    await queue.start(workers=jobs.JOBS_WORKERS)
+    entity_parser.start()  # το NER μοντέλο φορτώνει στο background· ως τότε rule-based entities
+    livedata.start_watcher()  # hot reload του data/constants.json (τιμοκατάλογος, περιοχές, εκδρομές)
+    startup.WARMUP.start()  # agent/SDK, classifier, caches — το /ready γυρίζει 200 όταν τελειώσουν
+    try:
+        yield
+    finally:
+        await queue.stop()
+        entity_parser.SERVICE.stop()
+        quotes.SPECULATOR.shutdown()
+        phrases.stop_watcher()
+        livedata.stop_watcher()
+
+
+app = FastAPI(title="Taxi Agent", lifespan=_lifespan)
 
 # --- CORS από env (fallback στο default) ---
 
@@ -96,48 +113,6 @@ ALLOWED_ORIGINS = _parse_origins()
 ALLOWED_ORIGIN_REGEX = os.getenv("ALLOWED_ORIGIN_REGEX", getattr(settings, "ALLOWED_ORIGIN_REGEX", None) or None)
 _ORIGIN_RE = re.compile(ALLOWED_ORIGIN_REGEX) if ALLOWED_ORIGIN_REGEX else None
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=list(ALLOWED_ORIGINS),
-    allow_origin_regex=ALLOWED_ORIGIN_REGEX,
-    allow_credentials=False,
-    allow_methods=["*"],
-    allow_headers=["*"],
-    max_age=600,
-)
-
-# 🔐 API key + rate limit as middlewares (ΟΧΙ Depends σε routes)
-_KEYS = [k.strip() for k in os.getenv("CHAT_API_KEYS", "").split(",") if k.strip()]
-app.add_middleware(APIKeyAuthMiddleware, keys=_KEYS)
-app.add_middleware(RateLimitMiddleware, settings=settings)
-
-
-class _PreflightMiddleware:
-    """Unconditionally handle CORS preflight before auth/ratelimit.
-    Must be added *after* auth/rl so it runs first (FastAPI wraps last-added first).
-    """
-
-    def __init__(self, app):
-        self.app = app
-
-    async def __call__(self, scope, receive, send):
-        if scope.get("type") == "http" and scope.get("method") == "OPTIONS":
-            req = Request(scope, receive)
-            origin = req.headers.get("origin", "")
-            req_headers = req.headers.get("access-control-request-headers", "Content-Type, Authorization")
-            headers = _cors_headers(origin)
-            if headers:
-                headers.setdefault("Access-Control-Allow-Headers", req_headers)
-                headers.setdefault("Access-Control-Allow-Methods", "POST, GET, OPTIONS")
-                # no body for 204
-                res = Response(status_code=204, headers=headers)
-                return await res(scope, receive, send)
-        return await self.app(scope, receive, send)
-
-
-# Add preflight bypass LAST so it executes FIRST
-app.add_middleware(_PreflightMiddleware)
-
 
 def _cors_headers(origin: str) -> dict:
     if not origin:
@@ -153,6 +128,31 @@ def _cors_headers(origin: str) -> dict:
         }
     return {}
 
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=list(ALLOWED_ORIGINS),
+    allow_origin_regex=ALLOWED_ORIGIN_REGEX,
+    allow_credentials=False,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    max_age=600,
+)
+
+# 🔐 Preflight + rate limit + API key + size guard (413) σε ένα middleware, πριν το CORS
+# (FastAPI wraps last-added first → αυτό τρέχει πρώτο)
+_API_KEYS = [k.strip() for k in os.getenv("CHAT_API_KEYS", "").split(",") if k.strip()]
+_KEYS = APIKeys(_API_KEYS)
+RATE_POLICY = RateLimitPolicy(settings)  # κοινό για HTTP και /chat/ws
+app.add_middleware(
+    SecurityMiddleware,
+    settings=settings,
+    policy=RATE_POLICY,
+    keys=_API_KEYS,
+    cors_headers=_cors_headers,
+    max_body_bytes=getattr(settings, "MAX_BODY_BYTES", 1_000_000),
+)
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Cancel/Confirm regex (αποφεύγουμε false positives)
 CANCEL_RE = re.compile(r"^(?:άκυρο|ακυρο|cancel|τέλος|τελος|σταμάτα|σταματα|stop)\.?$", re.IGNORECASE | re.UNICODE)
@@ -166,23 +166,30 @@ def is_cancel_message(text: str) -> bool:
 # Επιβεβαιώσεις τύπου "ναι/σωστά/ok" για να ΜΗΝ κάνουμε reset intent
 CONFIRM_RE = re.compile(r"\b(ναι|ναι\.?|σωστά|σωστα|ok|okay|οκ|οκει|έτσι|ακριβώς)\b", re.IGNORECASE | re.UNICODE)
 
-# Intents (προαιρετικά classifier)
-try:
-    from intents import IntentClassifier
+# Intents (προαιρετικά classifier)· χτίζεται στο warm-up ή στο πρώτο μήνυμα
+INTENT_CLF = None  # None: όχι ακόμα, False: μη διαθέσιμος
 
-    INTENT_CLF = IntentClassifier()
 
-    def predict_intent(text: str):
-        if hasattr(INTENT_CLF, "classify"):
-            return INTENT_CLF.classify(text)
-        if hasattr(INTENT_CLF, "predict"):
-            return INTENT_CLF.predict(text)
-        return (None, 0.0)
-except Exception:
-    INTENT_CLF = None
+def _intent_clf():
+    global INTENT_CLF
+    if INTENT_CLF is None:
+        try:
+            from intents import IntentClassifier
+
+            INTENT_CLF = IntentClassifier()
+        except Exception:
+            logger.warning("IntentClassifier μη διαθέσιμος", exc_info=True)
+            INTENT_CLF = False
+    return INTENT_CLF
+
 
-    def predict_intent(_):
-        return (None, 0.0)
+def predict_intent(text: str):
+    clf = _intent_clf()
+    if hasattr(clf, "classify"):
+        return clf.classify(text)
+    if hasattr(clf, "predict"):
+        return clf.predict(text)
+    return (None, 0.0)
 
 SYSTEM_PROMPT = constants.SYSTEM_PROMPT
 
@@ -194,14 +201,11 @@ class ChatRequest(BaseModel):
     session_id: Optional[str] = None
     context: Optional[str] = None
     history: Optional[List[Dict[str, str]]] = None
+    message_id: Optional[str] = None  # idempotency: ίδιο id στα retries → ίδια απάντηση
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Tools για Agent
 
-def ensure_tool(t):
-    return t if hasattr(t, "name") else function_tool(t)
-
-
 tool_candidates = [
     ask_llm,
     trip_quote_nlp,
@@ -213,35 +217,55 @@ tool_candidates = [
     taxi_contact,
     trendy_phrase,
 ]
-TOOLS = [ensure_tool(t) for t in tool_candidates]
-for t in TOOLS:
-    logger.info("🔧 tool loaded: %s (%s)", getattr(t, "name", t), type(t))
-
-chat_agent = Agent(
-    name="customer_support_agent",
-    instructions=(
-        # Persona
-        "You are Mr Booky, a warm and witty customer-support agent for Taxi Express Patras. "
-        # Language policy
-        "Detect the user's language and ALWAYS respond in that same language. "
-        "If tools return Greek text while the user's language is different, translate/adapt the content to the user's language, "
-        "preserving numbers, prices, addresses, URLs and phone numbers exactly as given. "
-        # Voice / style for TTS friendliness
-        "Keep sentences natural and speakable (text-to-speech ready). Avoid spelling out words letter-by-letter or using overly technical descriptions. "
-        "Be concise, friendly, and conversational. "
-        # Tool routing policy (your original logic, kept as-is)
-        "If `desired_tool` exists in context, first try calling ONLY that tool. "
-        "For routes/price/time-of-trip use: trip_quote_nlp. "
-        "For pharmacies: pharmacy_lookup / pharmacy_lookup_nlp. "
-        "For hospitals: hospital_duty (today/tomorrow). "
-        "For local info/tours: patras_info. "
-        "For taxi contact info: taxi_contact. "
-        "Use ask_llm only when free-form reasoning with a system prompt is explicitly intended. "
-        "If `desired_tool` exists, DO NOT call any other tool unless the specified tool fails clearly."
-    ),
-    tools=TOOLS,
+
+CHAT_AGENT_INSTRUCTIONS = (
+    # Persona
+    "You are Mr Booky, a warm and witty customer-support agent for Taxi Express Patras. "
+    # Language policy
+    "Detect the user's language and ALWAYS respond in that same language. "
+    "If tools return Greek text while the user's language is different, translate/adapt the content to the user's language, "
+    "preserving numbers, prices, addresses, URLs and phone numbers exactly as given. "
+    # Voice / style for TTS friendliness
+    "Keep sentences natural and speakable (text-to-speech ready). Avoid spelling out words letter-by-letter or using overly technical descriptions. "
+    "Be concise, friendly, and conversational. "
+    # Tool routing policy (your original logic, kept as-is)
+    "If `desired_tool` exists in context, first try calling ONLY that tool. "
+    "For routes/price/time-of-trip use: trip_quote_nlp. "
+    "For pharmacies: pharmacy_lookup / pharmacy_lookup_nlp. "
+    "For hospitals: hospital_duty (today/tomorrow). "
+    "For local info/tours: patras_info. "
+    "For taxi contact info: taxi_contact. "
+    "Use ask_llm only when free-form reasoning with a system prompt is explicitly intended. "
+    "If `desired_tool` exists, DO NOT call any other tool unless the specified tool fails clearly."
 )
 
+_agents = startup.LazyModule("agents")
+_CHAT_AGENT = None
+_AGENT_LOCK = threading.Lock()
+
+
+def get_chat_agent():
+    """Ο Agent (και το import του SDK) χτίζεται στο warm-up, όχι στο import του main."""
+    global _CHAT_AGENT
+    if _CHAT_AGENT is None:
+        with _AGENT_LOCK:
+            if _CHAT_AGENT is None:
+                tools = [sdk_tool(t) for t in tool_candidates]
+                for t in tools:
+                    logger.info("🔧 tool loaded: %s (%s)", getattr(t, "name", t), type(t))
+                _CHAT_AGENT = _agents.Agent(
+                    name="customer_support_agent",
+                    instructions=CHAT_AGENT_INSTRUCTIONS,
+                    tools=tools,
+                )
+    return _CHAT_AGENT
+
+# Warm-up μετά το startup (βλ. startup.py)· η σειρά είναι η σειρά εκτέλεσης
+startup.WARMUP.add("intent_classifier", _intent_clf)
+if HAS_AGENTS_SDK:
+    startup.WARMUP.add("chat_agent", get_chat_agent)
+startup.WARMUP.add("trendy_phrases", phrases._load_trendy)
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Heuristics / Patterns
 INTENT_TOOL_MAP = {
@@ -277,7 +301,7 @@ KM_QUERY_RE = re.compile(r"πόσα\s+χιλιόμετρα", re.IGNORECASE)
 
 
 def is_trip_quote(text: str) -> bool:
-    t = (text or "").lower()
+    t = textnorm.lowered(text)
     if TIME_RANGE_RE.search(t):
         return False
     movement_kw = any(w in t for w in ["πάω", "πάμε", "μετάβαση", "διαδρομή", "route", "ταξ", "κοστίζει", "τιμή"])
@@ -340,7 +364,7 @@ def is_hospital_message(text: str) -> bool:
 # --- helpers για slots / km-queries ---
 
 def _missing_slots(intent: str, text: str, st: "SessionState") -> list[str]:
-    t = (text or "").lower()
+    t = textnorm.lowered(text)
     if intent == INTENT_PHARMACY:
         area = detect_area_for_pharmacy(text) or st.slots.get("area")
         return ["area"] if not area else []
@@ -425,36 +449,14 @@ def _partial_to_full_trip(text: str, st: "SessionState") -> Optional[str]:
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Map link stripper -> UI βγάζει κουμπί
-MAP_RE_MD = re.compile(r"\[[^\]]*\]\((https?://www\.google\.com/maps/dir/\?[^)]+)\)")
-MAP_RE_RAW = re.compile(r"(https?://www\.google\.com/maps/dir/\?[^ \t\n\r<>]+)")
+MAP_RE_MD = reply_pipeline.MAP_RE_MD
+MAP_RE_RAW = reply_pipeline.MAP_RE_RAW
 
 
 def strip_map_link(text: str):
     """Extract Google Maps URL and strip only the link token.
     If stripping would empty the message, keep original text."""
-    if not text:
-        return text, None
-    # Markdown link first: [..](https://www.google.com/maps/dir/?..)
-    m = MAP_RE_MD.search(text)
-    if m:
-        url = m.group(1)
-        token = m.group(0)  # full markdown token
-        cleaned = text.replace(token, "").strip()
-        cleaned = re.sub(r"\n{3,}", "\n\n", cleaned).strip()
-        if not cleaned:
-            cleaned = text  # don't drop content entirely
-        return cleaned, url
-    # Raw URL fallback
-    m = MAP_RE_RAW.search(text)
-    if m:
-        url = m.group(1)
-        token = m.group(0)
-        cleaned = text.replace(token, "").strip()
-        cleaned = re.sub(r"\n{3,}", "\n\n", cleaned).strip()
-        if not cleaned:
-            cleaned = text
-        return cleaned, url
-    return text, None
+    return reply_pipeline.split_map_link(text)
 
 # ── Location aliases για δύσκολες ονομασίες (βοηθάει το geocoding)
 LOCATION_ALIASES = [
@@ -513,9 +515,10 @@ def _session_can_phrase(st) -> bool:
     return random.random() < PHRASE_PROB
 
 
-def inject_trendy_phrase(text: str, *, st, intent: str, success: bool = True) -> str:
-    if not text or not _session_can_phrase(st):
-        return text
+def _trendy_for(st, intent: str, success: bool = True) -> Optional[str]:
+    """Η φράση που μπαίνει πάνω από την απάντηση (None αν δεν ταιριάζει/cooldown)."""
+    if not _session_can_phrase(st):
+        return None
     context = "success" if success else "fallback"
     emap = {
         "TripCostIntent": "joy" if success else "neutral",
@@ -530,11 +533,9 @@ def inject_trendy_phrase(text: str, *, st, intent: str, success: bool = True) ->
     except Exception:
         phrase = None
     if not phrase:
-        return text
+        return None
     st.slots["last_trendy_ts"] = time.time()
-    if intent not in ("HospitalIntent",):
-        return f"{phrase}\n{text}"
-    return text
+    return phrase if intent not in ("HospitalIntent",) else None
 
 
 EMOJI_PACK = {
@@ -546,10 +547,12 @@ EMOJI_PACK = {
 }
 
 
-def enrich_reply(text: str, intent: Optional[str] = None) -> str:
-    t = (text or "").strip()
-    if not t:
-        return t
+REPLY_MAX_EMOJIS = int(os.getenv("REPLY_MAX_EMOJIS", "4"))
+
+
+def _enrich_decor(t: str, intent: Optional[str] = None):
+    """(prefix, suffix) που προσθέτει το enrich_reply γύρω από το (stripped) κείμενο."""
+    prefix = suffix = ""
     kind = "generic"
     low = t.lower()
     if intent in ("TripCostIntent",) or ("€" in t and "απόσταση" in low):
@@ -563,20 +566,24 @@ def enrich_reply(text: str, intent: Optional[str] = None) -> str:
     pack = EMOJI_PACK.get(kind, EMOJI_PACK["generic"])
     if not re.match(r"^[\W_]{1,3}", t):
         if kind == "trip":
-            t = f"{random.choice(['Πάμε!', 'Έτοιμοι;', 'ΟΚ!'])} {pack[0]} " + t
+            prefix = f"{random.choice(['Πάμε!', 'Έτοιμοι;', 'ΟΚ!'])} {pack[0]} "
         elif kind == "pharmacy":
-            t = f"{random.choice(['Βρήκα!', 'Έχουμε νέα!'])} {pack[0]} " + t
+            prefix = f"{random.choice(['Βρήκα!', 'Έχουμε νέα!'])} {pack[0]} "
         elif kind in ("hospital", "contact"):
-            t = f"{pack[0]} " + t
+            prefix = f"{pack[0]} "
         else:
-            t = f"{EMOJI_PACK['generic'][0]} " + t
+            prefix = f"{EMOJI_PACK['generic'][0]} "
     if kind == "trip" and ("διόδι" in low or "εκτίμηση" in low):
-        t += "\n" + random.choice(["Θες να το κανονίσουμε; 🚖", "Να σου κάνω και επιστροφή; 🔁"])
-    emoji_count = len(re.findall(r"[\U0001F300-\U0001FAFF]", t))
-    while emoji_count > 4:
-        t = re.sub(r"[\U0001F300-\U0001FAFF](?!.*[\U0001F300-\U0001FAFF])", "", t)
-        emoji_count -= 1
-    return t
+        suffix = "\n" + random.choice(["Θες να το κανονίσουμε; 🚖", "Να σου κάνω και επιστροφή; 🔁"])
+    return prefix, suffix
+
+
+def enrich_reply(text: str, intent: Optional[str] = None) -> str:
+    t = (text or "").strip()
+    if not t:
+        return t
+    prefix, suffix = _enrich_decor(t, intent)
+    return reply_pipeline.cap_emojis(prefix + t + suffix, REPLY_MAX_EMOJIS)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -723,29 +730,35 @@ def render_all_tours(packages: List[dict]) -> str:
     return "\n\n".join(cards) + footer
 
 
+def _tour_key(pkg: dict) -> str:
+    return str(pkg.get("code") or pkg.get("title") or "")
+
+
+# rendered κάρτες εκδρομών: ξαναχτίζονται σε κάθε reload του data/constants.json, όχι ανά request
+livedata.derive("tour_cards", lambda snap: {_tour_key(p): render_tour_card(p) for p in snap.tours})
+livedata.derive("all_tours", lambda snap: render_all_tours(snap.tours))
+
+
+def tour_card(pkg: dict) -> str:
+    return livedata.current().get("tour_cards").get(_tour_key(pkg)) or render_tour_card(pkg)
+
+
 def _nrm(s: str) -> str:
-    s = _u_norm("NFKD", (s or "").lower())
-    s = "".join(ch for ch in s if ord(ch) < 0x0300)
-    return re.sub(r"\s+", " ", s).strip()
+    # lower + χωρίς τόνους (το παλιό `ord(ch) < 0x0300` έσβηνε και τα ελληνικά γράμματα)
+    return textnorm.folded(s)
 
 
 def _tok(s: str) -> list[str]:
-    s = _u_norm("NFKD", s or "")
-    s = "".join(ch for ch in s if ch.isalnum() or ch.isspace())
-    s = s.lower()
-    s = re.sub(r"\s+", " ", s).strip()
-    return [w for w in s.split(" ") if len(w) >= 3]
+    return textnorm.tokens(s)
 
 
 def _find_tour_by_query(q: str) -> Optional[dict]:
-    from constants import TOUR_PACKAGES
-
     q_tokens = set(_tok(q))
     if not q_tokens:
         return None
     best = None
     best_overlap = 0
-    for p in (TOUR_PACKAGES or []):
+    for p in livedata.current().tours:
         title_tokens = set(_tok(p.get("title", "")))
         code_tokens = set(_tok(p.get("code", "")))
         stop_tokens = set(_tok(" ".join(p.get("stops", [])[:6])))
@@ -757,21 +770,15 @@ def _find_tour_by_query(q: str) -> Optional[dict]:
 
 
 def services_reply(query: str, st) -> str:
-    from constants import SERVICES, TOUR_PACKAGES, BRAND_INFO
+    from constants import SERVICES, BRAND_INFO
 
+    snap = livedata.current()
     phone = os.getenv("TAXI_EXPRESS_PHONE", BRAND_INFO.get("phone", "2610 450000"))
     booking = os.getenv("TAXI_BOOKING_URL", BRAND_INFO.get("booking_url", ""))
     qn = _nrm(query or "")
     
     if re.search(r"night\s*taxi|νυχτεριν(ο|η)\s*ταξι|νυχτα\s*ταξι", qn):
-        from constants import TAXI_TARIFF as _TT
-        def _tf(k, d):
-            try:
-                return float(_TT.get(k, d))
-            except Exception:
-                return d
-        night_pct = int(_tf("night_multiplier", 1.0) * 100 - 100) if _tf("night_multiplier", 1.0) > 1 else 0
-        wait_rate = int(_tf("wait_rate_per_hour", 18.0))
+        night_pct, wait_rate = snap.night_pct, snap.wait_rate
         lines = [
             "**Night Taxi**: νυχτερινές διαδρομές (00:00–05:00).",
             f"Επιβάρυνση: +{night_pct}% στα νυχτερινά (όπου ισχύει)." if night_pct else "",
@@ -799,7 +806,7 @@ def services_reply(query: str, st) -> str:
                 pick = next(
                     (
                         p
-                        for p in (TOUR_PACKAGES or [])
+                        for p in livedata.current().tours
                         if re.search(key, _nrm(p.get("title", "") + " " + " ".join(p.get("stops") or [])))
                     ),
                     None,
@@ -808,18 +815,18 @@ def services_reply(query: str, st) -> str:
                     break
         if pick:
             st.slots["last_tour"] = pick.get("code") or pick.get("title")
-            return render_tour_card(pick)
-        return render_all_tours(TOUR_PACKAGES)
+            return tour_card(pick)
+        return snap.get("all_tours")
 
     tour = _find_tour_by_query(qn)
     if tour:
         st.slots["last_tour"] = tour.get("code") or tour.get("title")
-        return render_tour_card(tour)
+        return tour_card(tour)
 
     if ("τι περιλαμ" in qn or "δεν περιλαμ" in qn) and st.slots.get("last_tour"):
         key = _nrm(str(st.slots["last_tour"]))
         pick = None
-        for p in (TOUR_PACKAGES or []):
+        for p in snap.tours:
             if _nrm(p.get("code", "")) == key or _nrm(p.get("title", "")) == key:
                 pick = p
                 break
@@ -832,7 +839,7 @@ def services_reply(query: str, st) -> str:
                 return f"❌ Δεν περιλαμβάνει: {exc}"
 
     if re.search(r"(εκδρομ|tours?)", qn):
-        return render_all_tours(TOUR_PACKAGES)
+        return snap.get("all_tours")
 
     lines = ["🧰 Υπηρεσίες:"]
     if isinstance(constants.SERVICES, list):
@@ -841,10 +848,10 @@ def services_reply(query: str, st) -> str:
                 lines.append(f"• {cat['category']}:")
                 for it in cat["items"][:5]:
                     lines.append(f"  – {it}")
-    if TOUR_PACKAGES:
+    if snap.tours:
         lines.append("")
         lines.append("🎒 Εκδρομές (σταθερή τιμή για 1–4 άτομα):")
-        for p in TOUR_PACKAGES[:2]:
+        for p in snap.tours[:2]:
             lines.append(f"• {p.get('title','—')} — {p.get('price_from','—')}€ / ~{p.get('duration_hours','—')}h")
     lines.append("")
     c = f"Κλείσιμο/Πληροφορίες: ☎️ {phone}"
@@ -859,29 +866,18 @@ def _match_triggers(text: str, intent: str) -> bool:
             return True
     return False
 
-def _tf2(keys, d):
-    for k in keys:
-        try:
-            if k in _TT:
-                return float(_TT[k])
-        except Exception:
-            pass
-    return d
-
-_day_km = _tf2(["km_rate_city_or_day", "km_rate_zone1"], 0.90)
-_night_km = _tf2(["km_rate_zone2_or_night"], max(_day_km, 1.25))
-night_pct = int(round((_night_km / max(_day_km, 0.01) - 1.0) * 100)) if _night_km > _day_km else 0
-wait_rate = int(_tf2(["wait_rate_per_hour", "waiting_per_hour"], 15.0))
 
 # ──────────────────────────────────────────────────────────────────────────────
-# Persisted memory store (Redis/Memory)
+# Persisted memory store (Redis/SQLite/Memory)
 
 import json as _json
-PERSIST_BACKEND = os.getenv("PERSIST_BACKEND", "memory")  # "redis" | "memory"
+PERSIST_BACKEND = os.getenv("PERSIST_BACKEND", "memory")  # "redis" | "sqlite" | "memory"
 SESS_TTL_SECONDS = int(os.getenv("SESS_TTL_SECONDS", "2592000"))  # 30 μέρες
 
 
 class BaseStore:
+    BLOCKING = False  # True: I/O (δίκτυο/SQLite) — το /chat το καλεί εκτός event loop (βλ. _chat_reply)
+
     def get(self, sid: str) -> Optional["SessionState"]:
         raise NotImplementedError
 
@@ -920,6 +916,8 @@ class MemoryStore(BaseStore):
 
 
 class RedisStore(BaseStore):
+    BLOCKING = True
+
     def __init__(self, url: str):
         import redis
 
@@ -947,13 +945,214 @@ class RedisStore(BaseStore):
         self.r.delete(self._key(sid))
 
 
+class SQLiteStore(BaseStore):
+    """Sessions στο κοινό SQLite του host (localdb): όλοι οι gunicorn workers βλέπουν το ίδιο session."""
+
+    NS = "session"
+    BLOCKING = True
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or localdb.LOCAL_DB
+        localdb.get_db(self.path)
+
+    def get(self, sid: str):
+        s = localdb.get_db(self.path).get(self.NS, sid)
+        if not s:
+            return None
+        try:
+            return SessionState(**_json.loads(s))
+        except Exception:
+            return None
+
+    def set(self, sid: str, st: "SessionState"):
+        payload = _json.dumps(asdict(st), ensure_ascii=False)
+        localdb.get_db(self.path).set(self.NS, sid, payload, SESS_TTL_SECONDS)
+
+    def delete(self, sid: str):
+        localdb.get_db(self.path).delete(self.NS, sid)
+
+
+REDIS_URLS = [u.strip() for u in os.getenv("REDIS_URLS", "").split(",") if u.strip()]
+SESSION_RING_VNODES = int(os.getenv("SESSION_RING_VNODES", "160"))
+REDIS_NODE_TIMEOUT_SEC = float(os.getenv("REDIS_NODE_TIMEOUT_SEC", "0.2"))
+REDIS_NODE_RETRY_SEC = float(os.getenv("REDIS_NODE_RETRY_SEC", "30"))
+
+
+class ShardedRedisStore(BaseStore):
+    """
+    Sessions σε πολλούς Redis κόμβους (REDIS_URLS) με consistent hashing και virtual nodes.
+
+    - add_node/remove_node: νέο ring αμέσως. Τα keys που άλλαξαν κόμβο διαβάζονται από τον
+      προηγούμενο κόμβο και μεταφέρονται στο πρώτο get (read-through), ενώ το rebalance()
+      τα μεταφέρει όλα σε background thread
+    - κόμβος που αποτυγχάνει σημαδεύεται down για REDIS_NODE_RETRY_SEC· τα sessions του πάνε
+      στον επόμενο κόμβο του ring και ξεκινούν από fresh state αντί να αποτύχει το request
+    """
+
+    prefix = "mrbooky:session:"
+    BLOCKING = True
+
+    def __init__(self, urls: List[str], *, vnodes: int = SESSION_RING_VNODES, timeout: float = REDIS_NODE_TIMEOUT_SEC,
+                 retry_sec: float = REDIS_NODE_RETRY_SEC, client_factory=None):
+        self.timeout = timeout
+        self.retry_sec = retry_sec
+        self._factory = client_factory or self._connect
+        self._clients: Dict[str, Any] = {}
+        self.ring = HashRing(urls, vnodes=vnodes)
+        self._prev: Optional[HashRing] = None  # ring πριν από την τελευταία αλλαγή, ώσπου να τελειώσει το rebalance
+        self._down: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._rebalancer: Optional[threading.Thread] = None
+
+    def _connect(self, url: str):
+        import redis
+
+        return redis.Redis.from_url(url, decode_responses=True, socket_timeout=self.timeout,
+                                    socket_connect_timeout=self.timeout)
+
+    def _key(self, sid: str) -> str:
+        return f"{self.prefix}{sid}"
+
+    def _client(self, url: str):
+        c = self._clients.get(url)
+        if c is None:
+            c = self._clients.setdefault(url, self._factory(url))
+        return c
+
+    def _skip(self) -> set:
+        now = time.monotonic()
+        return {u for u, until in self._down.items() if until > now}
+
+    def _op(self, url: str, fn, default=None):
+        try:
+            return fn(self._client(url))
+        except Exception:
+            self._down[url] = time.monotonic() + self.retry_sec
+            logger.warning("sessions: Redis κόμβος %s μη διαθέσιμος για %.0fs — fresh state για τα sessions του",
+                           url, self.retry_sec, exc_info=True)
+            return default
+
+    _FAILED = object()  # default του _op: ο κόμβος δεν απάντησε (≠ None του Redis)
+
+    def _move(self, key: str, src: str, dst: str) -> Tuple[Optional[str], bool]:
+        """
+        src → dst χωρίς να πατήσει νεότερη τιμή στο dst (SET NX). Το src σβήνεται μόνο αφού το
+        dst έχει το key (SET ok ή NX conflict)· αν κάποιος κόμβος δεν απαντά, μένει στο src.
+        Επιστρέφει (τιμή στο dst, ok)· ok=False: η μεταφορά πρέπει να ξαναγίνει.
+        """
+        raw = self._op(src, lambda r: r.get(key), self._FAILED)
+        if raw is self._FAILED:
+            return None, False
+        if raw is None:
+            return None, True  # έληξε/σβήστηκε στο μεταξύ
+        ttl = self._op(src, lambda r: r.ttl(key), -1)
+        res = self._op(dst, lambda r: r.set(key, raw, ex=ttl if ttl and ttl > 0 else SESS_TTL_SECONDS, nx=True),
+                       self._FAILED)
+        if res is self._FAILED:
+            return raw, False
+        if not res:  # NX conflict: το dst έχει ήδη νεότερη τιμή
+            raw = self._op(dst, lambda r: r.get(key)) or raw
+        self._op(src, lambda r: r.delete(key))
+        return raw, True
+
+    def get(self, sid: str):
+        key = self._key(sid)
+        skip = self._skip()
+        node = self.ring.node_for(key, skip=skip)
+        if node is None:
+            return None
+        raw = self._op(node, lambda r: r.get(key))
+        prev = self._prev
+        if raw is None and prev is not None:
+            old = prev.node_for(key, skip=skip)
+            if old is not None and old != node:
+                raw, _ = self._move(key, old, node)
+        if not raw:
+            return None
+        try:
+            return SessionState(**_json.loads(raw))
+        except Exception:
+            return None
+
+    def set(self, sid: str, st: "SessionState"):
+        key = self._key(sid)
+        payload = _json.dumps(asdict(st), ensure_ascii=False)
+        for _ in range(2):  # αν πέσει ο κόμβος, μία ακόμη προσπάθεια στον επόμενο του ring
+            node = self.ring.node_for(key, skip=self._skip())
+            if node is None or self._op(node, lambda r: r.set(key, payload, ex=SESS_TTL_SECONDS), False) is not False:
+                return
+
+    def delete(self, sid: str):
+        key = self._key(sid)
+        prev = self._prev
+        nodes = {self.ring.node_for(key), prev.node_for(key) if prev is not None else None} - {None}
+        for node in nodes - self._skip():
+            self._op(node, lambda r: r.delete(key))
+
+    # ── rebalancing ──────────────────────────────────────────────────────────
+    def add_node(self, url: str, *, rebalance: bool = True) -> None:
+        with self._lock:
+            if url in self.ring:
+                return
+            self._prev, self.ring = self.ring, self.ring.with_node(url)
+        if rebalance:
+            self.start_rebalance()
+
+    def remove_node(self, url: str, *, rebalance: bool = True) -> None:
+        """Προγραμματισμένη αφαίρεση: τα keys του κόμβου μεταφέρονται πριν τον κλείσετε."""
+        with self._lock:
+            if url not in self.ring or len(self.ring) == 1:
+                return
+            self._prev, self.ring = self.ring, self.ring.without_node(url)
+        if rebalance:
+            self.start_rebalance()
+
+    def rebalance(self, batch: int = 500) -> int:
+        """Μεταφέρει όσα keys δεν είναι στον κόμβο που ορίζει το τρέχον ring. Επιστρέφει πόσα."""
+        ring, prev = self.ring, self._prev
+        nodes = dict.fromkeys((*ring.nodes, *(prev.nodes if prev is not None else ())))
+        moved, clean = 0, True
+        for node in nodes:
+            keys = self._op(node, lambda r: list(r.scan_iter(match=f"{self.prefix}*", count=batch)))
+            if keys is None:
+                clean = False
+                continue
+            for key in keys:
+                dst = ring.node_for(key)
+                if dst is None or dst == node:
+                    continue
+                raw, ok = self._move(key, node, dst)
+                if not ok:
+                    clean = False  # μένει στο src· το read-through και το επόμενο rebalance το ξαναπιάνουν
+                elif raw is not None:
+                    moved += 1
+        with self._lock:
+            if clean and self.ring is ring and self._prev is prev:
+                self._prev = None  # όλα στη θέση τους: τέλος το read-through
+        logger.info("sessions: rebalance μετέφερε %d keys", moved)
+        return moved
+
+    def start_rebalance(self) -> None:
+        t = self._rebalancer
+        if t is not None and t.is_alive():
+            return  # το τρέχον πέρασμα βλέπει ήδη το νέο ring για τα keys που δεν έχει σαρώσει
+        self._rebalancer = threading.Thread(target=self.rebalance, name="session-rebalance", daemon=True)
+        self._rebalancer.start()
+
+
 def make_store() -> BaseStore:
+    if PERSIST_BACKEND.lower() == "sqlite":
+        return SQLiteStore()
     if PERSIST_BACKEND.lower() == "redis":
-        url = os.getenv("REDIS_URL", "")
+        if len(REDIS_URLS) > 1:
+            return ShardedRedisStore(REDIS_URLS)
+        url = os.getenv("REDIS_URL", "") or (REDIS_URLS[0] if REDIS_URLS else "")
         if not url:
             logger.warning("PERSIST_BACKEND=redis αλλά λείπει REDIS_URL – επιστρέφω MemoryStore")
             return MemoryStore()
         return RedisStore(url)
+    if int(os.getenv("WEB_CONCURRENCY", "1") or 1) > 1:
+        logger.warning("WEB_CONCURRENCY>1 με MemoryStore: κάθε worker έχει δικά του sessions — βάλε PERSIST_BACKEND=sqlite ή redis")
     return MemoryStore()
 
 
@@ -970,21 +1169,72 @@ class SessionState:
     pending_trip: Dict[str, Any] = field(default_factory=dict)
     context_turns: List[str] = field(default_factory=list)
     booking_slots: Dict[str, Any] = field(default_factory=dict)
+    lang: Optional[str] = None  # γλώσσα χρήστη (language_id), sticky ανά session
+
+
+class _SessionOverlay:
+    """Write-back cache ενός session για όσο ζει ένα WebSocket (βλ. /chat/ws).
+
+    Οι _get_state/_save_state/_clear_state δουλεύουν πάνω σε αντίγραφα όπως με το STORE,
+    αλλά χωρίς round-trip· το flush() γράφει στο STORE μόνο αν άλλαξε κάτι.
+    """
+
+    __slots__ = ("sid", "state", "dirty")
+
+    def __init__(self, sid: str):
+        self.sid = sid
+        self.state: Optional[SessionState] = STORE.get(sid)
+        self.dirty = False
+
+    def flush(self) -> None:
+        if not self.dirty:
+            return
+        if self.state is None:
+            STORE.delete(self.sid)
+        else:
+            STORE.set(self.sid, self.state)
+        self.dirty = False
+
+
+_OVERLAY: ContextVar[Optional[_SessionOverlay]] = ContextVar("session_overlay", default=None)
+
+
+def _overlay_for(sid: str) -> Optional[_SessionOverlay]:
+    ov = _OVERLAY.get()
+    return ov if ov is not None and ov.sid == sid else None
+
+
+def _peek_state(sid: str) -> Optional["SessionState"]:
+    """Το state του session χωρίς να δημιουργηθεί αν λείπει."""
+    ov = _overlay_for(sid)
+    if ov is not None:
+        return SessionState(**asdict(ov.state)) if ov.state else None
+    return STORE.get(sid)
 
 
 def _get_state(sid: str) -> "SessionState":
-    st = STORE.get(sid)
+    st = _peek_state(sid)
     if not st:
         st = SessionState()
-        STORE.set(sid, st)
+        _save_state(sid, st)
     return st
 
 
 def _save_state(sid: str, st: "SessionState"):
+    ov = _overlay_for(sid)
+    if ov is not None:
+        ov.state = SessionState(**asdict(st))
+        ov.dirty = True
+        return
     STORE.set(sid, st)
 
 
 def _clear_state(sid: str):
+    ov = _overlay_for(sid)
+    if ov is not None:
+        ov.state = None
+        ov.dirty = True
+        return
     STORE.delete(sid)
 
 
@@ -1029,7 +1279,8 @@ def _best_intent_from_triggers(text: str, exclude: str | None = None):
 
 
 def _decide_intent(sid: str, text: str, predicted_intent: Optional[str], score: float) -> str:
-    t = (text or "").lower()
+    t = textnorm.lowered(text)
+    tt = greeklish.with_greek(text)  # triggers: + greeklish → ελληνικά
     st = _get_state(sid)
 
     if is_cancel_message(t):
@@ -1038,8 +1289,8 @@ def _decide_intent(sid: str, text: str, predicted_intent: Optional[str], score:
 
     # Αν υπάρχει ήδη intent, κάνε sticky/ελεγχόμενα switch μόνο με triggers
     if st.intent:
-        cur_hits = _intent_trigger_hits(st.intent, t)
-        cand_intent, cand_hits = _best_intent_from_triggers(t, exclude=None)      
+        cur_hits = _intent_trigger_hits(st.intent, tt)
+        cand_intent, cand_hits = _best_intent_from_triggers(tt, exclude=None)      
         missing = _missing_slots(st.intent, text, st)
         if missing:
             return st.intent
@@ -1060,7 +1311,7 @@ def _decide_intent(sid: str, text: str, predicted_intent: Optional[str], score:
             return st.intent
 
         for intent in (INTENT_TRIP, INTENT_HOSPITAL, INTENT_PHARMACY, INTENT_SERVICES, INTENT_INFO):
-            if intent != st.intent and _match_triggers(t, intent):
+            if intent != st.intent and _match_triggers(tt, intent):
                 new_st = SessionState(intent=intent)
                 _save_state(sid, new_st)
                 return intent
@@ -1068,7 +1319,7 @@ def _decide_intent(sid: str, text: str, predicted_intent: Optional[str], score:
 
     # ΔΕΝ έχουμε intent: δεν κάνουμε auto-PHARMACY σε σκέτη περιοχή.
     for intent in (INTENT_TRIP, INTENT_HOSPITAL, INTENT_PHARMACY, INTENT_SERVICES, INTENT_INFO):
-        if _match_triggers(t, intent):
+        if _match_triggers(tt, intent):
             st_new = SessionState(intent=intent)
             _save_state(sid, st_new)
             return intent
@@ -1098,9 +1349,14 @@ def _two_word_cities_to_trip(text: str) -> Optional[str]:
 # Helper: run tool with timeout
 async def _run_tool_with_timeout(*, tool_input: str, ctx: dict):
     """Run a tool either via Agents SDK (if available) or directly by dispatching to our local functions."""
+    if HAS_AGENTS_SDK and streaming.active():
+        return await asyncio.wait_for(
+            _run_agent_streamed(tool_input=tool_input, ctx=ctx),
+            timeout=getattr(settings, "TOOL_TIMEOUT_SEC", 25),
+        )
     if HAS_AGENTS_SDK:
         return await asyncio.wait_for(
-            Runner.run(chat_agent, input=tool_input, context=ctx),
+            _agents.Runner.run(get_chat_agent(), input=tool_input, context=ctx),
             timeout=getattr(settings, "TOOL_TIMEOUT_SEC", 25),
         )
     # Fallback: direct dispatch
@@ -1125,7 +1381,39 @@ async def _run_tool_with_timeout(*, tool_input: str, ctx: dict):
             return fn(tool_input)
     except Exception:
         logger.exception("Direct tool dispatch failed (fallback)")
-        return UI_TEXT.get("generic_error", "❌ Κάτι πήγε στραβά με το εργαλείο.")
+        return livedata.current().ui_text.get("generic_error", "❌ Κάτι πήγε στραβά με το εργαλείο.")
+
+
+async def _run_agent_streamed(*, tool_input: str, ctx: dict):
+    """Όπως το Runner.run, αλλά στέλνει tool outputs (partial) και LLM deltas (token) στο /chat/stream."""
+    source = ctx.get("stream_source") or ctx.get("desired_tool") or "agent"
+    result = _agents.Runner.run_streamed(get_chat_agent(), input=tool_input, context=ctx)
+    async for ev in result.stream_events():
+        if ev.type == "raw_response_event":
+            if getattr(ev.data, "type", "") == "response.output_text.delta" and ev.data.delta:
+                streaming.emit("token", {"delta": ev.data.delta, "source": source})
+        elif ev.type == "run_item_stream_event" and getattr(ev.item, "type", "") == "tool_call_output_item":
+            out = ev.item.output
+            if isinstance(out, str) and out.strip() and out != "⏭️":
+                text, map_url = strip_map_link(out)
+                data = {"text": text, "source": source}
+                if map_url:
+                    data["map_url"] = map_url
+                streaming.emit("partial", data)
+    return result
+
+
+def _attach_quote(sid: str, tool_input: str) -> None:
+    """Το Quote που έβγαλε το trip_quote_nlp → στο session, για reuse από confirm/booking."""
+    try:
+        o, d = _extract_route_free_text(tool_input)
+        q = quotes.BOOK.for_route(o, d, _is_round_trip(tool_input)) if o and d else None
+        if q is not None:
+            st = _get_state(sid)
+            quotes.attach(st, q)
+            _save_state(sid, st)
+    except Exception:
+        logger.exception("quote attach failed")
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Multilingual post-processing helper
@@ -1135,6 +1423,24 @@ GREEK_CHARS_RE = re.compile(r"[Α-ΩΆΈΉΊΌΎΏα-ωάέήίϊΐόύϋΰώ]")
 def _looks_greek(s: str) -> bool:
     return bool(GREEK_CHARS_RE.search(s or ""))
 
+def _update_session_lang(sid: str, st: "SessionState", text: str) -> Optional[str]:
+    """Ανίχνευση γλώσσας (τοπικά, μs) και αποθήκευση στο session όταν είναι σίγουρη."""
+    lang = language_id.identify(text)
+    if lang and lang != st.lang:
+        st.lang = lang
+        _save_state(sid, st)
+    return st.lang
+
+
+def _user_lang(sid: str, user_text: str) -> Optional[str]:
+    # Το μήνυμα πρώτα· αν είναι αβέβαιο ("ok", ώρα, τηλέφωνο) → η γλώσσα του session
+    lang = language_id.identify(user_text)
+    if lang is None:
+        st = _peek_state(sid)
+        lang = st.lang if st else None
+    return lang
+
+
 async def _maybe_adapt_language(*, sid: str, user_text: str, reply_text: str) -> str:
     """
     Αν ο χρήστης δεν γράφει ελληνικά αλλά η απάντηση είναι ελληνικά,
@@ -1144,16 +1450,22 @@ async def _maybe_adapt_language(*, sid: str, user_text: str, reply_text: str) ->
     if not reply_text:
         return reply_text
 
-    user_is_greek = _looks_greek(user_text)
-    reply_is_greek = _looks_greek(reply_text)
-
-    # Αν ο χρήστης έγραψε ελληνικά ή ήδη η απάντηση δεν είναι ελληνικά → καμία ενέργεια
-    if user_is_greek or not reply_is_greek:
+    # Ελληνικά ή greeklish ή άγνωστη γλώσσα → η απάντηση μένει ως έχει
+    lang = _user_lang(sid, user_text)
+    if lang is None or language_id.is_greek(lang) or not _looks_greek(reply_text):
         return reply_text
 
-    # Διαφορετικά, προσαρμογή στη γλώσσα του χρήστη.
+    # Templated replies / ήδη μεταφρασμένα → χωρίς LLM ("xx" = άγνωστη γλώσσα, μόνο LLM)
+    known = lang if lang != language_id.OTHER else None
+    local = await translations.alocalize(reply_text, known)
+    if local is not None:
+        return local
+
+    # Διαφορετικά, προσαρμογή στη γλώσσα του χρήστη (στο stream: πρώτα το ελληνικό κείμενο)
+    streaming.emit("partial", {"text": reply_text, "source": "original"})
     ctx = {
         "user_id": "system",
+        "stream_source": "adapt",
         "system_prompt": (
             "You are a multilingual assistant. Detect the user's language from the given user_text "
             "and rewrite the assistant_text in that language. Keep numbers, prices, addresses, URLs "
@@ -1168,26 +1480,132 @@ async def _maybe_adapt_language(*, sid: str, user_text: str, reply_text: str) ->
         "ASSISTANT_TEXT_TO_ADAPT:\n"
         f"{reply_text}\n\n"
         "TASK:\n"
-        "1) Detect the user's language from USER_TEXT.\n"
-        "2) Rewrite ASSISTANT_TEXT_TO_ADAPT into that language.\n"
+        + (f"1) The user's language is '{known}'.\n" if known else "1) Detect the user's language from USER_TEXT.\n")
+        + "2) Rewrite ASSISTANT_TEXT_TO_ADAPT into that language.\n"
         "3) Preserve numbers, prices, addresses, URLs and phone numbers exactly.\n"
         "4) Keep emojis and friendly tone."
     )
 
     try:
         adapted = await _run_tool_with_timeout(tool_input=tool_input, ctx=ctx)
+        translations.record_llm()
         out = getattr(adapted, "final_output", None)
+        if out:
+            await translations.aremember(reply_text, known, out)
         return out or reply_text
     except Exception:
         logger.exception("Language adaptation failed; returning original reply.")
         return reply_text
 
+
 # ──────────────────────────────────────────────────────────────────────────────
+# Reply pipeline: map link → trendy phrase → enrich → emoji cap → γλώσσα
+
+def _stage_trendy(reply: Reply, ctx: Dict[str, Any]) -> None:
+    if not reply.text or not ctx.get("trendy", True):
+        return
+    phrase = _trendy_for(_get_state(ctx["sid"]), ctx.get("trendy_intent") or "", True)
+    if phrase:
+        reply.prepend(f"{phrase}\n")
+
+
+def _stage_enrich(reply: Reply, ctx: Dict[str, Any]) -> None:
+    t = reply.text.strip()
+    if not t:
+        return
+    if t != reply.text:
+        reply.set_text(t)
+    prefix, suffix = _enrich_decor(t, reply.intent)
+    if prefix:
+        reply.prepend(prefix)
+    if suffix:
+        reply.append(suffix)
+
+
+async def _stage_adapt(reply: Reply, ctx: Dict[str, Any]) -> None:
+    text = reply.text
+    out = await _maybe_adapt_language(sid=ctx["sid"], user_text=ctx["user_text"], reply_text=text)
+    if out != text:
+        reply.set_text(out)
+
+
+REPLY_PIPELINE = reply_pipeline.Pipeline([
+    Stage("strip_map", reply_pipeline.strip_map),
+    Stage("trendy", _stage_trendy),
+    Stage("enrich", _stage_enrich),
+    Stage("emoji_cap", reply_pipeline.emoji_cap(REPLY_MAX_EMOJIS)),
+    Stage("adapt", _stage_adapt),
+])
+
+
+def _reply_channel(request: Any) -> str:
+    if getattr(request, "scope", {}).get("type") == "websocket":
+        return "ws"
+    return "sse" if streaming.active() else "chat"
+
+
+async def _finish_reply(raw: str, *, sid: str, user_text: str, request: Any,
+                        intent: Optional[str] = None, trendy_intent: Optional[str] = None,
+                        trendy: bool = True) -> Dict[str, Any]:
+    """Tool output → τελικό {"reply", "map_url"?} μέσα από το REPLY_PIPELINE (trendy=False: ερωτήσεις/σφάλματα)."""
+    reply = Reply.scan(raw, intent=intent)
+    await REPLY_PIPELINE.run(
+        reply, channel=_reply_channel(request), sid=sid, user_text=user_text,
+        trendy_intent=intent if trendy_intent is None else trendy_intent, trendy=trendy,
+    )
+    return reply.response()
+
+# ──────────────────────────────────────────────────────────────────────────────
+async def _booking_update_note(sid: str, user_text: str) -> Optional[str]:
+    """Αποτέλεσμα κράτησης που ολοκληρώθηκε στο background (μία φορά)."""
+    st = _peek_state(sid)
+    if not st or not st.slots.get("booking_job"):
+        return None
+    note = await asyncio.to_thread(booking_status_update, st)  # job store lookup (SQLite/Redis)
+    if not note:
+        return None
+    _save_state(sid, st)
+    return await _maybe_adapt_language(sid=sid, user_text=user_text, reply_text=note)
+
+
 @app.post("/chat")
 async def chat_endpoint(
     body: ChatRequest,
     request: Request,
 ):
+    if not idempotency.IDEMPOTENCY_ENABLED or not body.message:
+        return await _chat_reply(body, request)
+    sid = body.session_id or body.user_id or "default"
+    mid = body.message_id
+    if not mid and request.scope.get("type") == "http":
+        mid = idempotency.message_id_from_headers(request.headers)
+    return await idempotency.get_cache().run_message(sid, mid, body.message, lambda: _chat_reply(body, request))
+
+
+async def _chat_reply(body: ChatRequest, request: Request):
+    sid = body.session_id or body.user_id or "default"
+    if STORE.BLOCKING and _overlay_for(sid) is None:
+        # ένα load και ένα flush σε thread ανά μήνυμα· ο γύρος δουλεύει στο overlay, όχι στο STORE
+        overlay = await asyncio.to_thread(_SessionOverlay, sid)
+        token = _OVERLAY.set(overlay)
+        try:
+            return await _chat_reply(body, request)
+        finally:
+            _OVERLAY.reset(token)
+            await asyncio.to_thread(overlay.flush)
+    resp = await _chat_turn(body, request)
+    if isinstance(resp, dict) and resp.get("reply") and body.message:
+        try:
+            note = await _booking_update_note(sid, body.message.strip())
+        except Exception:
+            logger.exception("booking status check failed")
+            note = None
+        if note:
+            resp["reply"] = f"{note}\n\n{resp['reply']}"
+    return resp
+
+
+async def _chat_turn(body: ChatRequest, request: Request):
     try:
         if not body.message:
             return {"reply": "Στείλε μου ένα μήνυμα 🙂"}
@@ -1195,29 +1613,32 @@ async def chat_endpoint(
             return JSONResponse(status_code=413, content={"error": "Μήνυμα πολύ μεγάλο"})
 
         sid = body.session_id or body.user_id or "default"
-        text = (body.message or "").strip()
-        t_norm = text.lower()
+        # μία NormText ανά μήνυμα: κάθε κανονικοποίηση (lower/fold/tokens…) γίνεται μία φορά
+        text = NormText((body.message or "").strip())
+        t_norm = text.lowered
         st = _get_state(sid)
+        _update_session_lang(sid, st, text)
 
         # 🔹 init νέα πεδία router/booking/context
         init_session_state(st)
 
         # Hard override για επικοινωνία/app
         if is_contact_intent(t_norm):
-            reply = enrich_reply(_contact_reply(), intent="ContactInfoIntent")
-            reply = await _maybe_adapt_language(sid=sid, user_text=text, reply_text=reply)
-            _push_context(sid, text, reply)
-            return {"reply": reply}
+            resp = await _finish_reply(_contact_reply(), sid=sid, user_text=text, request=request,
+                                       intent="ContactInfoIntent", trendy=False)
+            _push_context(sid, text, resp["reply"])
+            return resp
 
         # 🔹 Router/Booking πρώτος έλεγχος ΠΡΙΝ από τα παλιά quick-confirm/regex
-        handled = maybe_handle_followup_or_booking(st, text)
+        # σε thread: το finalize κάνει enqueue στο job store (SQLite lock/BEGIN IMMEDIATE, Redis round-trips)
+        # και το confirm μπορεί να περιμένει το pre-quote — τίποτα από αυτά στο event loop
+        handled = await asyncio.to_thread(maybe_handle_followup_or_booking, st, text)
         if handled is not None:
-            reply = handled["reply"]
-            reply = enrich_reply(reply)  # απαλό styling
-            reply = await _maybe_adapt_language(sid=sid, user_text=text, reply_text=reply)
             _save_state(sid, st)        # ⭐ ΝΕΟ: αποθήκευσε τις αλλαγές του router (BookingIntent, slots κ.λπ.)
-            _push_context(sid, text, reply)
-            return {"reply": reply}
+            # ο router βάζει ήδη τη δική του trendy φράση (σύνοψη/finalize)
+            resp = await _finish_reply(handled["reply"], sid=sid, user_text=text, request=request, trendy=False)
+            _push_context(sid, text, resp["reply"])
+            return resp
 
 
         # ✅ ΠΑΛΙΟ Quick path: επιβεβαίωση «ναι/σωστά/ok» επανατρέχει την τελευταία εκτίμηση ταξιδιού
@@ -1237,21 +1658,16 @@ async def chat_endpoint(
                 "desired_tool": "trip_quote_nlp",
             }
             result = await _run_tool_with_timeout(tool_input=tool_input, ctx=run_context)
+            _attach_quote(sid, tool_input)
             reply_raw = result.final_output or "❌ Κάτι πήγε στραβά, να το ξαναπροσπαθήσω;"
-            reply, map_url = strip_map_link(reply_raw)
             _dec_budget(sid)
-            reply = inject_trendy_phrase(reply, st=_get_state(sid), intent=INTENT_TRIP, success=True)
-            reply = enrich_reply(reply, intent=INTENT_TRIP)
-            reply = await _maybe_adapt_language(sid=sid, user_text=text, reply_text=reply)
-            _push_context(sid, text, reply)
-            resp = {"reply": reply}
-            if map_url:
-                resp["map_url"] = map_url
+            resp = await _finish_reply(reply_raw, sid=sid, user_text=text, request=request, intent=INTENT_TRIP)
+            _push_context(sid, text, resp["reply"])
             return resp
 
         # 1) Intent detect (sticky)
         predicted_intent, score = (None, 0.0)
-        if INTENT_CLF:
+        if INTENT_CLF is not False:
             try:
                 out = predict_intent(text)
                 if isinstance(out, tuple) and len(out) == 2:
@@ -1263,12 +1679,13 @@ async def chat_endpoint(
 
         intent = _decide_intent(sid, text, predicted_intent, score)
 
-        ui = getattr(constants, "UI_TEXT", {}) or {}
+        ui = livedata.current().ui_text
 
         if intent == "" and is_cancel_message(t_norm):
-            reply = enrich_reply("ΟΚ, το αφήνουμε εδώ 🙂 Πες μου τι άλλο θες να κανονίσουμε!")
-            _push_context(sid, text, reply)
-            return {"reply": reply}
+            resp = await _finish_reply("ΟΚ, το αφήνουμε εδώ 🙂 Πες μου τι άλλο θες να κανονίσουμε!",
+                                       sid=sid, user_text=text, request=request, trendy=False)
+            _push_context(sid, text, resp["reply"])
+            return resp
 
         # Αν δεν αποφασίστηκε intent: πιάσε το μοτίβο “Πάτρα Ιωάννινα” ως TRIP
         if not intent:
@@ -1286,7 +1703,7 @@ async def chat_endpoint(
         if intent == INTENT_PHARMACY:
             st = _get_state(sid)
             area = detect_area_for_pharmacy(text) or st.slots.get("area")
-            ui = getattr(constants, "UI_TEXT", {}) or {}
+            ui = livedata.current().ui_text
 
             if not area:
                 st.slots["area"] = None
@@ -1295,9 +1712,9 @@ async def chat_endpoint(
                     "ask_pharmacy_area",
                     "Για ποια περιοχή να ψάξω εφημερεύον φαρμακείο; π.χ. Πάτρα, Ρίο, Βραχναίικα, Μεσσάτιδα/Οβρυά, Παραλία Πατρών. 😊",
                 )
-                reply = enrich_reply(ask, intent=intent)
-                _push_context(sid, text, reply)
-                return {"reply": reply}
+                resp = await _finish_reply(ask, sid=sid, user_text=text, request=request, intent=intent, trendy=False)
+                _push_context(sid, text, resp["reply"])
+                return resp
 
             try:
                 client = PharmacyClient()
@@ -1309,10 +1726,9 @@ async def chat_endpoint(
                         "pharmacy_none_for_area",
                         "❌ Δεν βρέθηκαν εφημερεύοντα για {area}. Θες να δοκιμάσουμε άλλη περιοχή?"
                     ).format(area=area)
-                    reply = enrich_reply(none_msg, intent=intent)
-                    reply = await _maybe_adapt_language(sid=sid, user_text=text, reply_text=reply)
-                    _push_context(sid, text, reply)
-                    return {"reply": reply}
+                    resp = await _finish_reply(none_msg, sid=sid, user_text=text, request=request, intent=intent, trendy=False)
+                    _push_context(sid, text, resp["reply"])
+                    return resp
 
                 # --- ΑΠΛΟ SESSION CACHE ΣΕ ΕΠΙΠΕΔΟ TEXT ---
                 cached: dict = st.slots.get("cached_pharmacy", {})
@@ -1332,12 +1748,9 @@ async def chat_endpoint(
                 _dec_budget(sid)
 
                 # --- ΤΕΛΙΚΟ ΜΗΝΥΜΑ (χωρίς Runner.run/LLM) ---
-                reply = f"**Περιοχή: {area}**\n{pharm_text}"
-                reply = inject_trendy_phrase(reply, st=st, intent=intent, success=True)
-                reply = enrich_reply(reply, intent=intent)
-                reply = await _maybe_adapt_language(sid=sid, user_text=text, reply_text=reply) 
-                _push_context(sid, text, reply)
-                return {"reply": reply}
+                resp = await _finish_reply(f"**Περιοχή: {area}**\n{pharm_text}", sid=sid, user_text=text, request=request, intent=intent)
+                _push_context(sid, text, resp["reply"])
+                return resp
 
 
             except Exception:
@@ -1346,10 +1759,9 @@ async def chat_endpoint(
                     "generic_error",
                     "❌ Κάτι πήγε στραβά με την αναζήτηση. Θες να δοκιμάσουμε άλλη περιοχή;"
                 )
-                reply = enrich_reply(generic, intent=intent)
-                reply = await _maybe_adapt_language(sid=sid, user_text=text, reply_text=reply)
-                _push_context(sid, text, reply)
-                return {"reply": reply}
+                resp = await _finish_reply(generic, sid=sid, user_text=text, request=request, intent=intent, trendy=False)
+                _push_context(sid, text, resp["reply"])
+                return resp
 
 
         # --- HOSPITAL ---
@@ -1372,16 +1784,14 @@ async def chat_endpoint(
                 result = await _run_tool_with_timeout(tool_input=f"νοσοκομεία {which_day}", ctx=run_context)
                 _dec_budget(sid)
                 out = result.final_output or "❌ Δεν μπόρεσα να φέρω την εφημερία."
-                out = inject_trendy_phrase(out, st=_get_state(sid), intent=intent, success=True)
-                reply = enrich_reply(out, intent=intent)
-                reply = await _maybe_adapt_language(sid=sid, user_text=text, reply_text=reply)
-                _push_context(sid, text, reply)
-                return {"reply": reply}
+                resp = await _finish_reply(out, sid=sid, user_text=text, request=request, intent=intent)
+                _push_context(sid, text, resp["reply"])
+                return resp
             except Exception:
                 logger.exception("Hospital intent failed")
-                reply = enrich_reply("❌ Δεν κατάφερα να φέρω εφημερεύοντα νοσοκομεία.", intent=intent)
-                _push_context(sid, text, reply)
-                return {"reply": reply}
+                resp = await _finish_reply("❌ Δεν κατάφερα να φέρω εφημερεύοντα νοσοκομεία.", sid=sid, user_text=text, request=request, intent=intent, trendy=False)
+                _push_context(sid, text, resp["reply"])
+                return resp
 
         # --- TRIP COST ---
         if intent == INTENT_TRIP:
@@ -1431,17 +1841,12 @@ async def chat_endpoint(
                 "desired_tool": "trip_quote_nlp",
             }
             result = await _run_tool_with_timeout(tool_input=tool_input, ctx=run_context)
+            _attach_quote(sid, tool_input)
             reply_raw = result.final_output or "❌ Κάτι πήγε στραβά, να το ξαναπροσπαθήσω;"
 
-            reply, map_url = strip_map_link(reply_raw)
             _dec_budget(sid)
-            reply = inject_trendy_phrase(reply, st=_get_state(sid), intent=intent, success=True)
-            reply = enrich_reply(reply, intent=intent)
-            reply = await _maybe_adapt_language(sid=sid, user_text=text, reply_text=reply)
-            _push_context(sid, text, reply)
-            resp = {"reply": reply}
-            if map_url:
-                resp["map_url"] = map_url
+            resp = await _finish_reply(reply_raw, sid=sid, user_text=text, request=request, intent=intent)
+            _push_context(sid, text, resp["reply"])
             return resp
 
         # --- SERVICES / TOURS ---
@@ -1455,7 +1860,7 @@ async def chat_endpoint(
                 pick = next(
                     (
                         p
-                        for p in (TOUR_PACKAGES or [])
+                        for p in livedata.current().tours
                         if _nrm(p.get("code", "")) == key or _nrm(p.get("title", "")) == key
                     ),
                     None,
@@ -1463,36 +1868,28 @@ async def chat_endpoint(
                 if pick:
                     if re.search(r"τι\s+περιλαμ", t_norm):
                         inc = ", ".join((pick.get("includes") or [])[:6]) or "Μεταφορά"
-                        msg = enrich_reply(f"✅ Περιλαμβάνει: {inc}", intent=intent)
                         _save_state(sid, st)
-                        msg = await _maybe_adapt_language(sid=sid, user_text=text, reply_text=msg)
-                        _push_context(sid, text, msg)
-                        return {"reply": msg}
+                        resp = await _finish_reply(f"✅ Περιλαμβάνει: {inc}", sid=sid, user_text=text, request=request, intent=intent, trendy=False)
+                        _push_context(sid, text, resp["reply"])
+                        return resp
                     else:
                         exc = ", ".join((pick.get("excludes") or [])[:6]) or "—"
-                        msg = enrich_reply(f"❌ Δεν περιλαμβάνει: {exc}", intent=intent)
                         _save_state(sid, st)
-                        msg = await _maybe_adapt_language(sid=sid, user_text=text, reply_text=msg)
-                        _push_context(sid, text, msg)
-                        return {"reply": msg}
+                        resp = await _finish_reply(f"❌ Δεν περιλαμβάνει: {exc}", sid=sid, user_text=text, request=request, intent=intent, trendy=False)
+                        _push_context(sid, text, resp["reply"])
+                        return resp
 
             if re.search(r"(εκδρομ|tours?)", t_norm):
-                msg = render_all_tours(TOUR_PACKAGES)
-                msg = enrich_reply(msg, intent=intent)
-                try:
-                    msg = inject_trendy_phrase(msg, st=st, intent=intent, success=True)
-                except Exception:
-                    pass
-                msg = await _maybe_adapt_language(sid=sid, user_text=text, reply_text=msg)    
                 _save_state(sid, st)
-                _push_context(sid, text, msg)
-                return {"reply": msg}
+                resp = await _finish_reply(livedata.current().get("all_tours"), sid=sid, user_text=text, request=request, intent=intent)
+                _push_context(sid, text, resp["reply"])
+                return resp
 
             if re.search(r"(δελφ|ολυμπ|ναυπακ|γαλαξ)", _nrm(text)):
                 pick = _find_tour_by_query(_nrm(text)) or next(
                     (
                         p
-                        for p in (TOUR_PACKAGES or [])
+                        for p in livedata.current().tours
                         if re.search(r"(δελφ|ολυμπ|ναυπακ|γαλαξ)", _nrm(p.get('title','') + ' ' + ' '.join(p.get('stops') or [])))
                     ),
                     None,
@@ -1500,26 +1897,15 @@ async def chat_endpoint(
                 if pick:
                     st.slots["last_tour"] = pick.get("code") or pick.get("title")
                     _save_state(sid, st)
-                    msg = render_tour_card(pick)
-                    msg = enrich_reply(msg, intent=intent)
-                    try:
-                        msg = inject_trendy_phrase(msg, st=st, intent=intent, success=True)
-                    except Exception:
-                        pass
-                    msg = await _maybe_adapt_language(sid=sid, user_text=text, reply_text=msg)    
-                    _push_context(sid, text, msg)
-                    return {"reply": msg}
+                    resp = await _finish_reply(tour_card(pick), sid=sid, user_text=text, request=request, intent=intent)
+                    _push_context(sid, text, resp["reply"])
+                    return resp
 
             msg = services_reply(text, st)
             _save_state(sid, st)
-            msg = enrich_reply(msg, intent=intent)
-            try:
-                msg = inject_trendy_phrase(msg, st=st, intent=intent, success=True)
-            except Exception:
-                pass
-            msg = await _maybe_adapt_language(sid=sid, user_text=text, reply_text=msg)    
-            _push_context(sid, text, msg)
-            return {"reply": msg}
+            resp = await _finish_reply(msg, sid=sid, user_text=text, request=request, intent=intent)
+            _push_context(sid, text, resp["reply"])
+            return resp
 
         # --- INFO / LLM Πάτρας ---
         if intent == INTENT_INFO:
@@ -1533,11 +1919,9 @@ async def chat_endpoint(
             result = await _run_tool_with_timeout(tool_input=text, ctx=run_context)
             _dec_budget(sid)
             out = result.final_output or "Δεν βρήκα κάτι σχετικό, θες να το ψάξω αλλιώς?"
-            out = inject_trendy_phrase(out, st=_get_state(sid), intent=intent, success=True)
-            reply = enrich_reply(out, intent=intent)
-            reply = await _maybe_adapt_language(sid=sid, user_text=text, reply_text=reply)
-            _push_context(sid, text, reply)
-            return {"reply": reply}
+            resp = await _finish_reply(out, sid=sid, user_text=text, request=request, intent=intent)
+            _push_context(sid, text, resp["reply"])
+            return resp
 
         # 3) Γενικό fallback
         desired_tool = None
@@ -1554,13 +1938,9 @@ async def chat_endpoint(
                 st.slots["last_tour"] = matched
                 _save_state(sid, st)
                 msg = services_reply(matched, st)
-                msg = enrich_reply(msg, intent=INTENT_SERVICES)
-                try:
-                    msg = inject_trendy_phrase(msg, st=st, intent=INTENT_SERVICES, success=True)
-                except Exception:
-                    pass
-                _push_context(sid, text, msg)
-                return {"reply": msg}
+                resp = await _finish_reply(msg, sid=sid, user_text=text, request=request, intent=INTENT_SERVICES)
+                _push_context(sid, text, resp["reply"])
+                return resp
             desired_tool = "__internal_services__"
 
         
@@ -1572,22 +1952,18 @@ async def chat_endpoint(
                 text = tw  # normalize
 
         if desired_tool == "taxi_contact":
-            reply = enrich_reply(_contact_reply(), intent="ContactInfoIntent")
-            _push_context(sid, text, reply)
-            return {"reply": reply}
+            resp = await _finish_reply(_contact_reply(), sid=sid, user_text=text, request=request,
+                                       intent="ContactInfoIntent", trendy=False)
+            _push_context(sid, text, resp["reply"])
+            return resp
         if desired_tool == "__internal_services__":
             _dec_budget(sid)
             st = _get_state(sid)
             msg = services_reply(text, st)
             _save_state(sid, st)
-            msg = enrich_reply(msg, intent=INTENT_SERVICES)
-            try:
-                msg = inject_trendy_phrase(msg, st=st, intent=INTENT_SERVICES, success=True)
-            except Exception:
-                pass
-        if desired_tool == "__internal_services__":   
-            _push_context(sid, text, msg)
-            return {"reply": msg}
+            resp = await _finish_reply(msg, sid=sid, user_text=text, request=request, intent=INTENT_SERVICES)
+            _push_context(sid, text, resp["reply"])
+            return resp
 
         if desired_tool == "trip_quote_nlp":
             try:
@@ -1618,16 +1994,11 @@ async def chat_endpoint(
                 "desired_tool": "trip_quote_nlp",
             }
             result = await _run_tool_with_timeout(tool_input=tool_input, ctx=run_context)
+            _attach_quote(sid, tool_input)
             reply_raw = result.final_output or ""
 
-            reply, map_url = strip_map_link(reply_raw)
-            reply = inject_trendy_phrase(reply, st=_get_state(sid), intent=INTENT_TRIP, success=True)
-            reply = enrich_reply(reply, intent=INTENT_TRIP)
-            reply = await _maybe_adapt_language(sid=sid, user_text=text, reply_text=reply)
-            _push_context(sid, text, reply)
-            resp = {"reply": reply}
-            if map_url:
-                resp["map_url"] = map_url
+            resp = await _finish_reply(reply_raw, sid=sid, user_text=text, request=request, intent=INTENT_TRIP)
+            _push_context(sid, text, resp["reply"])
             return resp
 
         # Τελικό agent fallback
@@ -1641,14 +2012,9 @@ async def chat_endpoint(
         }
         result = await _run_tool_with_timeout(tool_input=text, ctx=run_context)
         reply_raw = result.final_output or ""
-        reply, map_url = strip_map_link(reply_raw)
-        reply = inject_trendy_phrase(reply, st=_get_state(sid), intent=intent or "", success=True)
-        reply = enrich_reply(reply)
-        reply = await _maybe_adapt_language(sid=sid, user_text=text, reply_text=reply)
-        _push_context(sid, text, reply)
-        resp = {"reply": reply}
-        if map_url:
-            resp["map_url"] = map_url
+        resp = await _finish_reply(reply_raw, sid=sid, user_text=text, request=request,
+                                   intent=None, trendy_intent=intent or "")
+        _push_context(sid, text, resp["reply"])
         return resp
 
     except asyncio.TimeoutError:
@@ -1660,7 +2026,147 @@ async def chat_endpoint(
         return JSONResponse(status_code=500, content={"error": "Agent execution error"}, headers=_cors_headers(origin))
 
 
+@app.post("/chat/stream")
+async def chat_stream_endpoint(
+    body: ChatRequest,
+    request: Request,
+):
+    """
+    Ίδια δρομολόγηση με το /chat, σε Server-Sent Events: partial (ντετερμινιστικά κομμάτια),
+    token (LLM deltas) και στο τέλος done με την πλήρη απάντηση.
+    """
+    return EventSourceResponse(streaming.run(chat_endpoint(body, request)), ping=15)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# WebSocket: auth μία φορά, session στη μνήμη της σύνδεσης, replies/tokens με push
+
+WS_MAX_MESSAGE_BYTES = int(os.getenv("WS_MAX_MESSAGE_BYTES", "16384"))
+
+
+def _ws_authorized(ws: WebSocket) -> bool:
+    origin = ws.headers.get("origin")
+    if origin and not _cors_headers(origin):
+        return False
+    if not _KEYS:
+        return True
+    # οι browsers δεν στέλνουν headers σε WebSocket → δεκτό και ?api_key=
+    key = api_key_from_headers(ws.headers) or ws.query_params.get("api_key")
+    return _KEYS.check(key)
+
+
+def _history_from_turns(turns: List[str]) -> List[Dict[str, str]]:
+    # context_turns = ["U: ...", "A: ...", ...] → [{"user", "bot"}] όπως το ChatRequest.history
+    out: List[Dict[str, str]] = []
+    for t in turns:
+        if t.startswith("U: "):
+            out.append({"user": t[3:]})
+        elif t.startswith("A: ") and out and "bot" not in out[-1]:
+            out[-1]["bot"] = t[3:]
+    return out
+
+
+@app.websocket("/chat/ws")
+async def chat_ws(ws: WebSocket):
+    """
+    Client → {"message": "...", "id"?: ...}
+    Server → {"type": "ready", "session_id"} και ανά μήνυμα partial/token/done/error
+    (ίδια events με το /chat/stream, με το "id" του μηνύματος).
+    """
+    if not _ws_authorized(ws):
+        await ws.close(code=1008)
+        return
+    await ws.accept()
+
+    sid = ws.query_params.get("session_id") or ws.query_params.get("user_id") or f"ws:{uuid.uuid4().hex}"
+    user_id = ws.query_params.get("user_id") or sid
+    overlay = await asyncio.to_thread(_SessionOverlay, sid)
+    token = _OVERLAY.set(overlay)
+    # ίδια buckets (IP/API key του handshake) με το /chat: περισσότερα sockets δεν δίνουν περισσότερο budget
+    api_key = api_key_from_headers(ws.headers) or ws.query_params.get("api_key")
+    buckets = RATE_POLICY.buckets(scope_client_ip(ws.scope), api_key)
+    cost = RATE_POLICY.message_cost("/chat/ws")
+    try:
+        await ws.send_json({"type": "ready", "session_id": sid})
+        while True:
+            raw = await ws.receive_text()
+            try:
+                if len(raw) > WS_MAX_MESSAGE_BYTES:
+                    raise ValueError("too large")
+                msg = _json.loads(raw)
+                text = msg["message"] if isinstance(msg, dict) else None
+                if not isinstance(text, str):
+                    raise ValueError("missing message")
+            except Exception:
+                await ws.send_json({"type": "error", "status": 400, "error": "Invalid message"})
+                continue
+            mid = msg.get("id")
+            decision = await RATE_POLICY.backend.acquire(buckets, cost) if cost else None
+            if decision is not None and not decision.allowed:
+                await ws.send_json({"type": "error", "status": 429, "error": "Too Many Requests", "id": mid,
+                                    "retry_after": max(1, math.ceil(decision.retry_after))})
+                continue
+
+            st = overlay.state
+            body = ChatRequest(
+                message=text,
+                user_id=user_id,
+                session_id=sid,
+                context=msg.get("context"),
+                history=msg.get("history") or (_history_from_turns(st.context_turns) if st else None),
+                message_id=str(mid) if mid not in (None, "") else None,
+            )
+            connected = True
+            async for event, data in streaming.events(chat_endpoint(body, ws)):
+                if connected:
+                    try:
+                        await ws.send_json({"type": event, **data, "id": mid})
+                    except Exception:
+                        connected = False  # ολοκλήρωσε τον γύρο ώστε το flush να έχει το τελικό state
+            await asyncio.to_thread(overlay.flush)
+            if not connected:
+                break
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await asyncio.to_thread(overlay.flush)
+        _OVERLAY.reset(token)
+
+
+@app.get("/booking/{code}/status")
+def booking_status_endpoint(code: str):
+    """Κατάσταση της υποβολής μιας κράτησης (χωρίς προσωπικά στοιχεία)."""
+    out = booking_status(code)
+    if out["state"] == "unknown":
+        return JSONResponse(status_code=404, content=out)
+    return out
+
+
+@app.get("/stats/translations")
+def translation_stats():
+    """Πόσες προσαρμογές γλώσσας σερβιρίστηκαν από catalog/cache αντί για LLM."""
+    return translations.stats()
+
+
+@app.get("/stats/constants")
+def constants_stats():
+    """Version του data/constants.json που σερβίρεται (αλλάζει σε κάθε hot reload)."""
+    return livedata.stats()
+
+
+@app.get("/stats/reply")
+def reply_pipeline_stats():
+    """Μέσος χρόνος ανά stage του reply pipeline."""
+    return REPLY_PIPELINE.stats()
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 @app.get("/")
 def root():
     return {"status": "ok"}
+
+
+@app.get("/ready")
+def ready():
+    """Readiness probe: 503 ώσπου να ολοκληρωθεί το warm-up."""
+    return JSONResponse(status_code=200 if startup.WARMUP.ready else 503, content=startup.WARMUP.status())
@@ -1,31 +1,66 @@
 # phrases.py
-import json, os, random, time
-from typing import List, Dict, Optional
+"""
+Trendy phrases: index ανά (lang, season, emotion, context) με alias tables για O(1)
+weighted επιλογή.
+
+- το αρχείο φορτώνεται μία φορά· reload από file watcher (watchfiles) σε background thread,
+  όχι stat σε κάθε κλήση. Χωρίς watchfiles: έλεγχος mtime το πολύ ανά TRENDY_RELOAD_SEC.
+- κάθε reload φτιάχνει νέο _PhraseIndex και το αλλάζει με μία ανάθεση (atomic swap)
+- το alias table κάθε key χτίζεται στην πρώτη χρήση και μένει στο index
+"""
+import atexit, json, logging, os, random, threading, time
+from typing import Dict, List, Optional, Tuple
+
+import artifacts
+
+try:
+    import watchfiles  # type: ignore
+except Exception:  # optional
+    watchfiles = None  # type: ignore
+
+logger = logging.getLogger(__name__)
 
-_TRENDY: List[Dict] = []
-_LAST_LOAD = 0.0
 _FILE = os.getenv("TRENDY_PHRASES_FILE", "data/trendy_phrases.el.json")
-_RELOAD_SEC = int(os.getenv("TRENDY_RELOAD_SEC", "300"))  # reload ανά 5'
+_RELOAD_SEC = int(os.getenv("TRENDY_RELOAD_SEC", "300"))  # fallback χωρίς watcher
+_WATCH = os.getenv("TRENDY_WATCH", "1").lower() in {"1", "true", "yes", "on"}
 
-def _load_trendy() -> List[Dict]:
-    global _TRENDY, _LAST_LOAD
-    try:
-        mtime = os.path.getmtime(_FILE)
-        if (not _TRENDY) or (mtime > _LAST_LOAD) or ((time.time() - _LAST_LOAD) > _RELOAD_SEC):
-            with open(_FILE, "r", encoding="utf-8") as f:
-                _TRENDY = json.load(f)
-            _LAST_LOAD = mtime
-    except Exception:
-        pass
-    return _TRENDY or []
+Key = Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]
 
-def pick_trendy_phrase(*, emotion: Optional[str] = None, context: Optional[str] = None,
-                       lang: str = "el", season: Optional[str] = None) -> Optional[str]:
-    items = _load_trendy()
-    if not items:
-        return None
 
-    def ok(x: Dict) -> bool:
+class _AliasTable:
+    """Vose alias method: O(n) build, O(1) draw."""
+
+    __slots__ = ("texts", "prob", "alias")
+
+    def __init__(self, texts: List[str], weights: List[float]):
+        n = len(texts)
+        total = sum(weights)
+        scaled = [w * n / total for w in weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s], alias[s] = scaled[s], l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        self.texts, self.prob, self.alias = texts, prob, alias
+
+    def draw(self, rnd=random.random) -> str:
+        u = rnd() * len(self.texts)
+        i = int(u)
+        return self.texts[i] if (u - i) < self.prob[i] else self.texts[self.alias[i]]
+
+
+class _PhraseIndex:
+    def __init__(self, items: List[Dict], mtime: float = 0.0):
+        self.items = items
+        self.mtime = mtime
+        self._tables: Dict[Key, Optional[_AliasTable]] = {}
+
+    @staticmethod
+    def _ok(x: Dict, lang, season, emotion, context) -> bool:
         if lang and x.get("lang") not in (None, lang): return False
         if season and x.get("season") not in (None, "all", season): return False
         if emotion and (x.get("emotion") not in (emotion, "neutral")): return False
@@ -36,9 +71,133 @@ def pick_trendy_phrase(*, emotion: Optional[str] = None, context: Optional[str]
         if x.get("nsfw"): return False
         return True
 
-    pool = [x for x in items if ok(x)]
-    if not pool:
+    def table(self, key: Key) -> Optional[_AliasTable]:
+        try:
+            return self._tables[key]
+        except KeyError:
+            pass
+        pool = [x for x in self.items if self._ok(x, *key) and x.get("text")]
+        weights = [float(x.get("weight", 1.0)) for x in pool]
+        t = _AliasTable([x["text"] for x in pool], weights) if pool and sum(weights) > 0 else None
+        self._tables[key] = t  # ίδιο αποτέλεσμα αν δύο threads το χτίσουν ταυτόχρονα
+        return t
+
+
+_INDEX = _PhraseIndex([])
+_LOADED = False
+_NEXT_CHECK = 0.0
+_LOCK = threading.Lock()
+_WATCHER: Optional[threading.Thread] = None
+_STOP = threading.Event()
+
+
+def _read_items(path: str) -> List[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        items = json.load(f)
+    if not isinstance(items, list):
+        raise ValueError("trendy phrases: αναμένεται JSON list")
+    return items
+
+
+def _read(path: str) -> Optional[_PhraseIndex]:
+    try:
+        mtime = os.path.getmtime(path)
+        return _PhraseIndex(_read_items(path), mtime)
+    except Exception:
+        logger.warning("trendy phrases: αποτυχία φόρτωσης %s — κρατάω την προηγούμενη λίστα", path, exc_info=True)
         return None
-    weights = [float(x.get("weight", 1.0)) for x in pool]
-    choice = random.choices(pool, weights=weights, k=1)[0]
-    return choice.get("text")
+
+
+def _register(path: str) -> None:
+    artifacts.register("phrases.trendy", lambda: _read_items(path), sources=(path,))
+
+
+_register(_FILE)
+
+
+def _initial() -> Optional[_PhraseIndex]:
+    # πρώτη φόρτωση από το artifact bundle· τα reloads του watcher διαβάζουν το αρχείο
+    _register(_FILE)  # το digest ακολουθεί το τρέχον _FILE
+    try:
+        return _PhraseIndex(artifacts.load("phrases.trendy"), os.path.getmtime(_FILE))
+    except Exception:
+        return _read(_FILE)
+
+
+def reload() -> List[Dict]:
+    """Ξαναδιαβάζει το αρχείο και αλλάζει το index (σε αποτυχία μένει το παλιό)."""
+    global _INDEX, _LOADED, _NEXT_CHECK
+    with _LOCK:
+        idx = _read(_FILE) if _LOADED else _initial()
+        if idx is not None:
+            _INDEX = idx
+        _LOADED = True
+        _NEXT_CHECK = time.monotonic() + _RELOAD_SEC
+    return _INDEX.items
+
+
+def _watch_loop(path: str) -> None:
+    global _WATCHER
+    target = os.path.abspath(path)
+    try:
+        for changes in watchfiles.watch(os.path.dirname(target) or ".", stop_event=_STOP,
+                                        watch_filter=lambda _c, p: os.path.abspath(p) == target,
+                                        raise_interrupt=False):
+            if changes:
+                reload()
+    except Exception:
+        logger.warning("trendy phrases: ο watcher σταμάτησε — fallback σε περιοδικό έλεγχο", exc_info=True)
+    finally:
+        if _WATCHER is threading.current_thread():
+            _WATCHER = None
+
+
+def start_watcher() -> bool:
+    """Background watcher του _FILE (idempotent). False αν δεν γίνεται (χωρίς watchfiles/αρχείο)."""
+    global _WATCHER
+    if watchfiles is None or not _WATCH or not os.path.exists(_FILE):
+        return False
+    with _LOCK:
+        if _WATCHER is not None and _WATCHER.is_alive():
+            return True
+        _STOP.clear()
+        _WATCHER = threading.Thread(target=_watch_loop, args=(_FILE,), name="trendy-watch", daemon=True)
+        _WATCHER.start()
+    return True
+
+
+def stop_watcher() -> None:
+    _STOP.set()
+    w = _WATCHER
+    if w is not None:
+        w.join(timeout=2)
+
+
+atexit.register(stop_watcher)  # ο watcher πρέπει να βγει πριν από το interpreter shutdown
+
+
+def _index() -> _PhraseIndex:
+    global _NEXT_CHECK
+    if not _LOADED:
+        reload()
+        start_watcher()
+    elif _WATCHER is None and time.monotonic() >= _NEXT_CHECK:
+        # χωρίς watcher: stat το πολύ ανά _RELOAD_SEC και reload μόνο αν άλλαξε το αρχείο
+        _NEXT_CHECK = time.monotonic() + _RELOAD_SEC
+        try:
+            if os.path.getmtime(_FILE) != _INDEX.mtime:
+                reload()
+        except OSError:
+            pass
+    return _INDEX
+
+
+def _load_trendy() -> List[Dict]:
+    # ίδια λίστα μέχρι το επόμενο reload (το translations τη χρησιμοποιεί ως version)
+    return _index().items
+
+
+def pick_trendy_phrase(*, emotion: Optional[str] = None, context: Optional[str] = None,
+                       lang: str = "el", season: Optional[str] = None) -> Optional[str]:
+    table = _index().table((lang or None, season or None, emotion or None, context or None))
+    return table.draw() if table is not None else None
@@ -0,0 +1,237 @@
+# quotes.py
+"""
+Quote records: μία εκτίμηση διαδρομής (συντεταγμένες, τιμή, απόσταση, χρόνος) που
+ξαναχρησιμοποιείται στα επόμενα βήματα της ίδιας συζήτησης αντί για νέο geocoding/estimate.
+
+- ο producer είναι το tools.trip_quote() (και άρα το trip_quote_nlp)
+- αποθηκεύεται στο session (st.slots["quote"]) ως dict· επιβιώνει Redis/multi-worker
+- process-local BOOK (LRU + TTL) για τα paths που δεν έχουν session (π.χ. tool μέσω Agent)
+- οι consumers συμπληρώνουν ό,τι λείπει (coords, Infoxoros estimate) πάνω στο ίδιο quote
+- SPECULATOR: speculative pre-quote στο background όσο το booking ζητά ώρα/όνομα/κινητό
+- ένα quote λήγει και όταν αλλάξει ο τιμοκατάλογος (livedata tariff_version)
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import livedata
+
+QUOTE_TTL_SEC = int(os.getenv("QUOTE_TTL_SEC", "900"))  # 15' — μετά ξαναϋπολογίζουμε
+QUOTE_BOOK_SIZE = int(os.getenv("QUOTE_BOOK_SIZE", "1024"))
+PREQUOTE_WORKERS = int(os.getenv("PREQUOTE_WORKERS", "2"))
+
+LatLon = Tuple[float, float]
+
+
+def route_key(origin: str, destination: str, round_trip: bool = False) -> str:
+    from tools import _norm_txt  # lazy: το tools κάνει import το quotes
+    return f"{_norm_txt(origin or '')}|{_norm_txt(destination or '')}|{int(bool(round_trip))}"
+
+
+@dataclass
+class Quote:
+    id: str
+    origin: str
+    destination: str
+    price_eur: Optional[float] = None
+    distance_km: Optional[float] = None
+    duration_min: Optional[int] = None
+    night: bool = False
+    round_trip: bool = False
+    origin_coords: Optional[LatLon] = None
+    dest_coords: Optional[LatLon] = None
+    map_url: Optional[str] = None
+    source: str = ""  # strict | timologio | fallback
+    reply: str = ""   # το κείμενο του trip_quote_nlp, για reuse χωρίς re-render
+    estimates: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # Infoxoros cost_calculator ανά ώρα
+    created_at: float = 0.0
+    expires_at: float = 0.0
+    tariff_version: int = 0  # η τιμή βγήκε με αυτόν τον τιμοκατάλογο
+
+    @classmethod
+    def new(cls, origin: str, destination: str, **kw: Any) -> "Quote":
+        now = time.time()
+        return cls(id=f"q-{uuid.uuid4().hex[:12]}", origin=origin, destination=destination,
+                   created_at=now, expires_at=now + QUOTE_TTL_SEC,
+                   tariff_version=livedata.current().tariff_version, **kw)
+
+    @classmethod
+    def from_dict(cls, d: Optional[Dict[str, Any]]) -> Optional["Quote"]:
+        if not isinstance(d, dict) or not d.get("id"):
+            return None
+        d = dict(d)
+        for k in ("origin_coords", "dest_coords"):
+            if d.get(k) is not None:
+                d[k] = tuple(d[k])  # JSON → list
+        try:
+            return cls(**d)
+        except TypeError:
+            return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @property
+    def expired(self) -> bool:
+        return time.time() >= self.expires_at or self.tariff_version != livedata.current().tariff_version
+
+    @property
+    def coords(self) -> Optional[Tuple[LatLon, LatLon]]:
+        if self.origin_coords and self.dest_coords:
+            return self.origin_coords, self.dest_coords
+        return None
+
+    @property
+    def key(self) -> str:
+        return route_key(self.origin, self.destination, self.round_trip)
+
+    def matches(self, origin: str, destination: str, round_trip: bool = False) -> bool:
+        return self.key == route_key(origin, destination, round_trip)
+
+
+class QuoteBook:
+    """LRU + TTL ανά id και ανά διαδρομή (process-local)."""
+
+    def __init__(self, maxsize: int = QUOTE_BOOK_SIZE):
+        self.maxsize = maxsize
+        self._by_id: "OrderedDict[str, Quote]" = OrderedDict()
+        self._by_route: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def put(self, q: Quote) -> Quote:
+        with self._lock:
+            self._by_id[q.id] = q
+            self._by_id.move_to_end(q.id)
+            self._by_route[q.key] = q.id
+            while len(self._by_id) > self.maxsize:
+                old_id, old = self._by_id.popitem(last=False)
+                if self._by_route.get(old.key) == old_id:
+                    del self._by_route[old.key]
+        return q
+
+    def get(self, quote_id: str) -> Optional[Quote]:
+        with self._lock:
+            q = self._by_id.get(quote_id)
+        return q if q and not q.expired else None
+
+    def for_route(self, origin: str, destination: str, round_trip: bool = False) -> Optional[Quote]:
+        with self._lock:
+            qid = self._by_route.get(route_key(origin, destination, round_trip))
+        return self.get(qid) if qid else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._by_id.clear()
+            self._by_route.clear()
+
+
+BOOK = QuoteBook()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Speculative pre-quote
+
+class Speculator:
+    """
+    Background υπολογισμός quote ανά διαδρομή (process-local thread pool).
+
+    Το fn παίρνει ένα threading.Event που γίνεται set όταν η εικασία ακυρωθεί (ο χρήστης
+    άλλαξε διεύθυνση) ώστε να σταματήσει πριν από τα ακριβά βήματα. Το αποτέλεσμα μπαίνει
+    στο BOOK από τον producer· ο consumer το βρίσκει με for_route() ή περιμένει με wait().
+    """
+
+    def __init__(self, workers: int = PREQUOTE_WORKERS):
+        self.workers = max(1, workers)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._inflight: Dict[str, Tuple[Future, threading.Event]] = {}
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="prequote")
+        return self._pool
+
+    def submit(self, key: str, fn: Callable[[threading.Event], Optional[Quote]]) -> Future:
+        with self._lock:
+            cur = self._inflight.get(key)
+            if cur is not None and not cur[0].done():
+                return cur[0]  # ίδια διαδρομή ήδη σε εξέλιξη
+            cancelled = threading.Event()
+            fut = self._executor().submit(fn, cancelled)
+            self._inflight[key] = (fut, cancelled)
+        fut.add_done_callback(lambda f, k=key: self._forget(k, f))
+        return fut
+
+    def _forget(self, key: str, fut: Future) -> None:
+        with self._lock:
+            cur = self._inflight.get(key)
+            if cur is not None and cur[0] is fut:
+                del self._inflight[key]
+
+    def cancel(self, key: str) -> bool:
+        with self._lock:
+            cur = self._inflight.pop(key, None)
+        if cur is None:
+            return False
+        cur[1].set()
+        cur[0].cancel()  # αν δεν έχει ξεκινήσει ακόμα
+        return True
+
+    def wait(self, key: str, timeout: float) -> Optional[Quote]:
+        with self._lock:
+            cur = self._inflight.get(key)
+        if cur is None:
+            return None
+        try:
+            return cur[0].result(timeout=timeout)
+        except Exception:  # timeout / cancel / σφάλμα → ο caller υπολογίζει inline
+            return None
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._inflight)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            inflight, self._inflight = list(self._inflight.values()), {}
+            pool, self._pool = self._pool, None
+        for fut, cancelled in inflight:
+            cancelled.set()
+            fut.cancel()
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+
+SPECULATOR = Speculator()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Session helpers (st = SessionState ή οτιδήποτε με .slots)
+
+def attach(st: Any, q: Optional[Quote]) -> Optional[Quote]:
+    if q is not None:
+        st.slots["quote"] = q.to_dict()
+    return q
+
+
+def from_session(st: Any, *, quote_id: Optional[str] = None) -> Optional[Quote]:
+    q = Quote.from_dict((getattr(st, "slots", None) or {}).get("quote"))
+    if q is None or q.expired or (quote_id and q.id != quote_id):
+        return None
+    return q
+
+
+def for_route(st: Any, origin: str, destination: str, *, round_trip: bool = False) -> Optional[Quote]:
+    """Το quote του session για τη διαδρομή, αλλιώς από το BOOK (π.χ. αν το έβγαλε ο Agent)."""
+    q = from_session(st)
+    if q is not None and q.matches(origin, destination, round_trip):
+        return q
+    q = BOOK.for_route(origin, destination, round_trip)
+    return attach(st, q) if q is not None else None
@@ -0,0 +1,200 @@
+# reply_pipeline.py
+"""
+Post-processing της απάντησης ως pipeline από stages πάνω σε ένα Reply.
+
+    Reply       segments κειμένου (head… body …tail), map_url, intent, links, πλήθος emojis
+    Stage       (name, fn) — fn(reply, ctx) sync ή async
+    Pipeline    τρέχει τα stages με τη σειρά, μετρά χρόνο ανά stage και παραλείπει όσα
+                είναι απενεργοποιημένα για το channel ("chat" | "sse" | "ws")
+
+Το αρχικό κείμενο σαρώνεται μία φορά (Reply.scan): links και πλήθος emojis. Τα stages που
+προσθέτουν κείμενο (prepend/append) μετρούν μόνο το δικό τους κομμάτι, και το cap_emojis
+κρατά τα πρώτα N emojis σε ένα πέρασμα αντί για re.sub ανά emoji.
+
+Απενεργοποίηση stages ανά channel από env, π.χ. REPLY_STAGES_OFF="sse:trendy,ws:adapt,*:enrich".
+"""
+from __future__ import annotations
+
+import inspect
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+EMOJI_RE_CLASS = "\U0001F300-\U0001FAFF"
+MAP_RE_MD = re.compile(r"\[[^\]]*\]\((https?://www\.google\.com/maps/dir/\?[^)]+)\)")
+MAP_RE_RAW = re.compile(r"(https?://www\.google\.com/maps/dir/\?[^ \t\n\r<>]+)")
+_MAP_MARK = "www.google.com/maps/dir/"
+_EMOJI_RE = re.compile(f"[{EMOJI_RE_CLASS}]")
+_BLANKS_RE = re.compile(r"\n{3,}")
+
+
+def count_emojis(text: str) -> int:
+    return len(_EMOJI_RE.findall(text or ""))
+
+
+def cap_emojis(text: str, limit: int) -> str:
+    """Κρατά τα πρώτα `limit` emojis, σβήνει τα υπόλοιπα (γραμμικό)."""
+    if not text or len(_EMOJI_RE.findall(text)) <= limit:
+        return text
+    out: List[str] = []
+    pos = seen = 0
+    for m in _EMOJI_RE.finditer(text):
+        seen += 1
+        if seen > limit:
+            out.append(text[pos:m.start()])
+            pos = m.end()
+    out.append(text[pos:])
+    return "".join(out)
+
+
+@dataclass
+class Reply:
+    segments: List[str]
+    intent: Optional[str] = None
+    map_url: Optional[str] = None
+    links: List[str] = field(default_factory=list)
+    emojis: int = 0
+    timings: Dict[str, float] = field(default_factory=dict)  # ms ανά stage
+    map_token: Optional[str] = field(default=None, repr=False)  # το link όπως είναι στο κείμενο
+
+    @classmethod
+    def scan(cls, text: str, *, intent: Optional[str] = None) -> "Reply":
+        """
+        Map links (markdown πριν από raw, όπως το strip_map_link) και emojis του κειμένου του tool.
+        Το κείμενο μένει ως έχει· το link το βγάζει το strip_map stage.
+
+        (Ένα κοινό alternation regex για links+emojis είναι πιο αργό στο CPython από ένα
+        findall για emojis και search για links μόνο όταν υπάρχει το _MAP_MARK.)
+        """
+        text = text or ""
+        found: List[Tuple[str, str]] = []
+        if _MAP_MARK in text:
+            found = [(m.group(0), m.group(1)) for m in MAP_RE_MD.finditer(text)]
+            found += [(m.group(0), m.group(1)) for m in MAP_RE_RAW.finditer(MAP_RE_MD.sub(" ", text))]
+        return cls(segments=[text], intent=intent, links=[url for _tok, url in found],
+                   emojis=len(_EMOJI_RE.findall(text)), map_token=found[0][0] if found else None)
+
+    @property
+    def text(self) -> str:
+        return "".join(self.segments)
+
+    def set_text(self, text: str, *, emojis: Optional[int] = None) -> None:
+        self.segments = [text]
+        self.emojis = count_emojis(text) if emojis is None else emojis
+
+    def prepend(self, s: str) -> None:
+        self.segments.insert(0, s)
+        self.emojis += count_emojis(s)
+
+    def append(self, s: str) -> None:
+        self.segments.append(s)
+        self.emojis += count_emojis(s)
+
+    def response(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"reply": self.text}
+        if self.map_url:
+            out["map_url"] = self.map_url
+        return out
+
+
+StageFn = Callable[[Reply, Dict[str, Any]], Union[None, Awaitable[None]]]
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: StageFn
+    channels: Optional[Set[str]] = None  # None = όλα
+
+
+def _parse_off(spec: str) -> Set[Tuple[str, str]]:
+    out: Set[Tuple[str, str]] = set()
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        channel, _, stage = part.rpartition(":")
+        out.add((channel or "*", stage))
+    return out
+
+
+class Pipeline:
+    def __init__(self, stages: Iterable[Stage], *, off: Optional[str] = None):
+        self.stages: List[Stage] = list(stages)
+        self._off = _parse_off(os.getenv("REPLY_STAGES_OFF", "") if off is None else off)
+        self._stats: Dict[str, List[float]] = {}  # name → [calls, total ms]
+        self._lock = threading.Lock()
+
+    def enabled(self, stage: Stage, channel: str) -> bool:
+        if (channel, stage.name) in self._off or ("*", stage.name) in self._off:
+            return False
+        return stage.channels is None or channel in stage.channels
+
+    def disable(self, name: str, channel: str = "*") -> None:
+        self._off.add((channel, name))
+
+    def enable(self, name: str, channel: str = "*") -> None:
+        self._off.discard((channel, name))
+
+    async def run(self, reply: Reply, *, channel: str = "chat", **ctx: Any) -> Reply:
+        for stage in self.stages:
+            if not self.enabled(stage, channel):
+                continue
+            t0 = time.perf_counter()
+            res = stage.fn(reply, ctx)
+            if inspect.isawaitable(res):
+                await res
+            ms = (time.perf_counter() - t0) * 1000.0
+            reply.timings[stage.name] = ms
+            with self._lock:
+                s = self._stats.setdefault(stage.name, [0, 0.0])
+                s[0] += 1
+                s[1] += ms
+        if reply.timings:
+            logger.debug("reply pipeline (%s): %s", channel, reply.timings)
+        return reply
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {k: {"calls": int(c), "avg_ms": (t / c) if c else 0.0} for k, (c, t) in self._stats.items()}
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Κοινά stages
+
+def _without(text: str, token: str) -> str:
+    cleaned = _BLANKS_RE.sub("\n\n", text.replace(token, "").strip()).strip()
+    return cleaned or text  # δεν αφήνουμε κενό μήνυμα
+
+
+def split_map_link(text: str) -> Tuple[str, Optional[str]]:
+    """(κείμενο χωρίς το map link, url)· markdown link πρώτα, μετά raw URL."""
+    if not text or _MAP_MARK not in text:
+        return text, None
+    m = MAP_RE_MD.search(text) or MAP_RE_RAW.search(text)
+    if not m:
+        return text, None
+    return _without(text, m.group(0)), m.group(1)
+
+
+def strip_map(reply: Reply, _ctx: Dict[str, Any]) -> None:
+    """Βγάζει το (πρώτο) map link από το κείμενο στο map_url."""
+    token = reply.map_token
+    if not token:
+        return
+    reply.map_url = reply.links[0]
+    reply.set_text(_without(reply.text, token), emojis=reply.emojis)  # το link δεν έχει emojis
+    reply.map_token = None
+
+
+def emoji_cap(limit: int) -> StageFn:
+    def _cap(reply: Reply, _ctx: Dict[str, Any]) -> None:
+        if reply.emojis > limit:
+            reply.set_text(cap_emojis(reply.text, limit), emojis=limit)
+    return _cap
@@ -34,12 +34,20 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
+import logging
+import os
 import random
 import re
 import string
+import uuid
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
+
+import jobs
+
+logger = logging.getLogger(__name__)
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Infoxoros integrations (κοστολόγηση, προσφορά, booking link)
@@ -86,7 +94,14 @@ except Exception:
     geocode_osm = None  # type: ignore
 
 # Project tools
-from tools import ask_llm, trip_quote_nlp, trendy_phrase
+from tools import ask_llm, trip_quote, trendy_phrase, NOMINATIM_URL
+import greeklish
+import quotes
+import textnorm
+from quotes import Quote
+
+PREQUOTE_ENABLED = os.getenv("PREQUOTE_ENABLED", "1").lower() in {"1", "true", "yes", "on"}
+PREQUOTE_WAIT_SEC = float(os.getenv("PREQUOTE_WAIT_SEC", "3"))  # πόσο περιμένει το confirm μια εικασία σε εξέλιξη
 try:
     # Aggregator ειδοποίησης (Slack/Telegram/Email). Αν δεν υπάρχει, κάν’ το noop.
     from tools import notify_booking  # type: ignore
@@ -213,6 +228,7 @@ def _reset_booking(st: Any) -> None:
     st.intent = None
     st.booking_slots = {}
     st.last_offered = None
+    _speculate_quote(st)  # ακυρώνει τυχόν pre-quote σε εξέλιξη
 
 
 def looks_like_followup(text: str) -> bool:
@@ -295,7 +311,7 @@ def _geocode_fallback(q: str) -> Optional[tuple[float, float]]:
         return None
     try:
         r = _rq.get(
-            "https://nominatim.openstreetmap.org/search",
+            NOMINATIM_URL,
             params={"q": q, "format": "jsonv2", "limit": 1},
             headers={"User-Agent": "MrBooky/1.0 (+taxi)"},
             timeout=8,
@@ -325,6 +341,72 @@ def _resolve_coords(origin: str, destination: str) -> Optional[tuple[tuple[float
     return None
 
 
+def _quote_coords(st: Any, q: Optional[Quote], origin: str, destination: str):
+    """Συντεταγμένες από το quote· αλλιώς geocoding μία φορά και αποθήκευση πάνω στο quote."""
+    if q is not None and q.coords:
+        return q.coords
+    coords = _resolve_coords(origin, destination)
+    if q is not None and coords:
+        q.origin_coords, q.dest_coords = coords
+        quotes.attach(st, q)
+    return coords
+
+
+def _prequote(origin: str, destination: str, cancelled) -> Optional[Quote]:
+    """Speculative: quote + coords όσο ο χρήστης απαντά στα υπόλοιπα πεδία της κράτησης."""
+    if cancelled.is_set():
+        return None
+    _text, q = trip_quote(f"από {origin} μέχρι {destination}")
+    if q is None or cancelled.is_set():
+        return q
+    if not q.coords:
+        coords = _resolve_coords(origin, destination)
+        if coords:
+            q.origin_coords, q.dest_coords = coords
+    return q
+
+
+def _speculate_quote(st: Any) -> None:
+    """Ξεκινά pre-quote μόλις είναι γνωστές και οι δύο διευθύνσεις· ακυρώνει την παλιά αν άλλαξαν."""
+    if not isinstance(getattr(st, "slots", None), dict):
+        return
+    s = getattr(st, "booking_slots", None) or {}
+    origin, dest = s.get("origin"), s.get("destination")
+    key = quotes.route_key(origin, dest) if origin and dest else None
+    prev = st.slots.get("prequote")
+    if prev and prev != key:
+        quotes.SPECULATOR.cancel(prev)
+        st.slots.pop("prequote", None)
+    if not key or not PREQUOTE_ENABLED or prev == key:
+        return
+    try:
+        if quotes.for_route(st, origin, dest) is None:
+            quotes.SPECULATOR.submit(key, lambda ev: _prequote(origin, dest, ev))
+            st.slots["prequote"] = key
+    except Exception:
+        logger.exception("prequote submit failed")
+
+
+def _booking_quote(st: Any, origin: str, destination: str) -> tuple[str, Optional[Quote]]:
+    # 1) quote της συζήτησης  2) pre-quote σε εξέλιξη  3) inline υπολογισμός
+    q = quotes.for_route(st, origin, destination)
+    key = st.slots.pop("prequote", None)
+    if q is None and key:
+        q = quotes.SPECULATOR.wait(key, PREQUOTE_WAIT_SEC)
+        if q is not None and q.matches(origin, destination):
+            return q.reply, quotes.attach(st, q)
+        q = None
+    if q is not None:
+        return q.reply, q
+    text, q = trip_quote(f"από {origin} μέχρι {destination}")
+    return text, quotes.attach(st, q)
+
+
+def _pickup_hhmm(pt: Any) -> Optional[str]:
+    m = re.search(r"(\d{1,2}:\d{2})", pt) if isinstance(pt, str) else None
+    return m.group(1) if m else None
+
+
 def _append_infoxoros_estimate_if_possible(st, reply_text: str) -> str:
     """Εμπλούτισε την απάντηση με estimate από το Infoxoros cost_calculator, αν έχουμε συντεταγμένες."""
     try:
@@ -334,21 +416,22 @@ def _append_infoxoros_estimate_if_possible(st, reply_text: str) -> str:
             return reply_text
 
         # Ώρα παραλαβής (HH:MM) αν υπάρχει
-        hhmm = None
-        pt = st.pending_trip.get("pickup_time") or st.pending_trip.get("time")
-        if pt and isinstance(pt, str):
-            m = re.search(r"(\d{1,2}:\d{2})", pt)
-            if m:
-                hhmm = m.group(1)
-
-        coords = _resolve_coords(origin, dest)
-        if not coords:
-            return reply_text  # χωρίς geocoder, προχώρησε χωρίς εμπλουτισμό
-
-        (o_lat, o_lon), (d_lat, d_lon) = coords
-        est = _safe_cost_calculator(lat_start=o_lat, lon_start=o_lon, lat_end=d_lat, lon_end=d_lon, time_hhmm=hhmm)
+        hhmm = _pickup_hhmm(st.pending_trip.get("pickup_time") or st.pending_trip.get("time"))
+
+        q = quotes.for_route(st, origin, dest)
+        est = q.estimates.get(hhmm or "now") if q else None
         if not est:
-            return reply_text
+            coords = _quote_coords(st, q, origin, dest)
+            if not coords:
+                return reply_text  # χωρίς geocoder, προχώρησε χωρίς εμπλουτισμό
+
+            (o_lat, o_lon), (d_lat, d_lon) = coords
+            est = _safe_cost_calculator(lat_start=o_lat, lon_start=o_lon, lat_end=d_lat, lon_end=d_lon, time_hhmm=hhmm)
+            if not est:
+                return reply_text
+            if q is not None:
+                q.estimates[hhmm or "now"] = {k: est.get(k) for k in ("cost_float", "distance_km", "duration_min")}
+                quotes.attach(st, q)
         cost = est.get("cost_float"); dkm = est.get("distance_km"); dmin = est.get("duration_min")
         if cost:
             line = f"\n\n🧷 *Infoxoros estimate*: ~{cost:.2f}€"
@@ -370,7 +453,12 @@ def run_trip_quote_with_luggage(st: Any) -> Dict[str, Any]:
     if not origin or not destination:
         return {"reply": "Πες μου αφετηρία και προορισμό για να δώσω εκτίμηση."}
 
-    q = trip_quote_nlp(f"από {origin} μέχρι {destination}")
+    q = quotes.for_route(st, origin, destination)
+    if q is not None:
+        reply = q.reply
+    else:
+        reply, q = trip_quote(f"από {origin} μέχρι {destination}")
+        quotes.attach(st, q)
 
     extra = 0.0
     cnt = st.pending_trip.get("luggage_count")
@@ -378,7 +466,6 @@ def run_trip_quote_with_luggage(st: Any) -> Dict[str, Any]:
     if isinstance(cnt, int) and cnt > 0 and _yesish(heavy):
         extra = round(cnt * 0.39, 2)
 
-    reply = q.get("reply") if isinstance(q, dict) else str(q)
     if extra > 0:
         reply += f"\n\n🧳 Εκτίμηση επιπλέον για αποσκευές: ~{extra:.2f}€\n({BAGGAGE_NOTE})"
 
@@ -421,7 +508,7 @@ def normalize_phone(s: str) -> Optional[str]:
 
 
 def parse_pickup_time(text: str) -> str:
-    t = (text or "").strip().lower()
+    t = textnorm.lowered((text or "").strip())
     if any(x in t for x in ["άμεσα", "αμεσα", "τωρα", "τώρα", "now", "asap"]):
         return "ASAP"
     m = re.search(r"\b([01]?\d|2[0-3])[:\.](\d{2})\b", t)
@@ -443,7 +530,7 @@ _DAYS = {
 
 
 def parse_date_hint(text: str) -> Optional[str]:
-    t = (text or "").strip().lower()
+    t = textnorm.lowered((text or "").strip())
     now = datetime.now()
     if any(w in t for w in ["σήμερα", "σημερα", "today"]):
         return now.strftime("%Y-%m-%d")
@@ -514,6 +601,7 @@ def booking_start(st: Any, *, reset: bool = True, source_text: Optional[str] = N
         pt = parse_pickup_time(source_text)
         if pt:
             st.booking_slots["pickup_time"] = pt
+    _speculate_quote(st)
     # Return the next prompt and prepend a trendy phrase for a friendly tone
     prompt_dict = booking_prompt_next(st)
     reply_text = prompt_dict.get("reply", "")
@@ -562,6 +650,8 @@ def booking_collect(st: Any, user_text: str) -> Dict[str, Any]:
 
     # Δεν κάνουμε reset! Προχωράμε στο επόμενο πεδίο ή σύνοψη.
     nxt = next_missing_booking_slot(slots)
+    if nxt:
+        _speculate_quote(st)  # think-time του χρήστη για ώρα/όνομα/κινητό
     # Determine the next action (prompt for next slot or confirm booking)
     if nxt:
         result = booking_prompt_next(st)
@@ -582,11 +672,12 @@ def booking_confirm(st: Any) -> Dict[str, Any]:
     s = st.booking_slots
     quote_reply = ""
     try:
-        q = trip_quote_nlp(f"από {s['origin']} μέχρι {s['destination']}")
-        if isinstance(q, dict) and "reply" in q:
-            quote_reply = f"\n\n{q['reply']}"
-        elif isinstance(q, str):
-            quote_reply = f"\n\n{q}"
+        # Ίδια διαδρομή με προηγούμενη/speculative εκτίμηση → χωρίς νέο geocode/estimate
+        text, q = _booking_quote(st, s["origin"], s["destination"])
+        if q is not None:
+            s["quote_id"] = q.id
+        if text:
+            quote_reply = f"\n\n{text}"
     except Exception:
         pass
 
@@ -601,6 +692,8 @@ def booking_confirm(st: Any) -> Dict[str, Any]:
         f"{quote_reply}\n\nΝα προχωρήσω την κράτηση; (ναι/όχι)"
     )
     st.last_offered = "booking_confirm"
+    s["booking_key"] = uuid.uuid4().hex  # idempotency key της υποβολής (νέο σε κάθε σύνοψη)
+    s["booking_day"] = datetime.now().strftime("%Y%m%d")  # ίδιος κωδικός κι αν το finalize γίνει μετά τα μεσάνυχτα
     reply_text = summary
     # Prepend a trendy phrase for a friendly tone
     try:
@@ -612,9 +705,38 @@ def booking_confirm(st: Any) -> Dict[str, Any]:
     return {"reply": reply_text}
 
 
-def _booking_code() -> str:
-    rnd = "".join(random.choices(string.ascii_uppercase + string.digits, k=4))
-    return f"BK-{datetime.now().strftime('%Y%m%d')}-{rnd}"
+def _booking_code(idem_key: Optional[str] = None, *, day: Optional[str] = None, salt: int = 0) -> str:
+    # Με idempotency key ο κωδικός είναι ντετερμινιστικός → ένα retry του finalize δίνει τον ίδιο.
+    # salt > 0: επόμενος υποψήφιος όταν ο κωδικός ανήκει ήδη σε άλλη κράτηση (βλ. _enqueue_booking)
+    if idem_key:
+        seed = idem_key if not salt else f"{idem_key}#{salt}"
+        n = int(hashlib.sha1(seed.encode("utf-8")).hexdigest(), 16)
+        alphabet = string.ascii_uppercase + string.digits
+        rnd = "".join(alphabet[(n // len(alphabet) ** i) % len(alphabet)] for i in range(4))
+    else:
+        rnd = "".join(random.choices(string.ascii_uppercase + string.digits, k=4))
+    return f"BK-{day or datetime.now().strftime('%Y%m%d')}-{rnd}"
+
+
+BOOKING_CODE_TRIES = 8
+
+
+def _enqueue_booking(payload: Dict[str, Any], idem: str, day: str) -> Tuple["jobs.Job", str]:
+    """
+    booking.create με unique κωδικό: το job ανήκει στην κράτηση μόνο αν έχει το ίδιο booking_key.
+    Δύο κρατήσεις με ίδιο hash suffix (ίδια μέρα) δεν μοιράζονται job — η δεύτερη παίρνει άλλο κωδικό.
+    """
+    queue = jobs.get_queue()
+    for salt in range(BOOKING_CODE_TRIES):
+        code = _booking_code(idem, day=day, salt=salt)
+        # και τα dead/done jobs μετράνε: ο κωδικός τους δείχνει ακόμα άλλη κράτηση στο booking_status
+        if any(j.kind == "booking.create" and j.payload.get("idempotency_key") != idem
+               for j in queue.store.by_key(code)):
+            continue
+        job = queue.enqueue("booking.create", {**payload, "code": code}, key=code, unique=True)
+        if job.payload.get("idempotency_key") == idem:  # δικό μας (νέο ή retry)· αλλιώς το πρόλαβε άλλη κράτηση
+            return job, code
+    raise RuntimeError("no free booking code")
 
 
 def _compose_when(s: Dict[str, Any]) -> str:
@@ -642,46 +764,180 @@ def _compose_when(s: Dict[str, Any]) -> str:
     return (datetime.now() + timedelta(minutes=20)).strftime("%Y-%m-%d %H:%M:%S")
 
 
-def booking_finalize(st: Any) -> Dict[str, Any]:
+def _create_remote(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Geocoding + create_booking. Exceptions (δίκτυο/timeout) → retry από την ουρά."""
     from integrations.infoxoros_api import create_booking  # lazy import inside function
+    s = payload["slots"]
+    q = Quote.from_dict(payload.get("quote"))
+    coords = q.coords if q else None
+    if not coords:
+        coords = _resolve_coords(s.get("origin"), s.get("destination"))  # μπορεί να είναι None
+    if not coords:
+        return {"created_remote": False, "info": "ℹ️ Δεν μπόρεσα να κάνω geocoding — συνεχίζουμε με προ-κράτηση."}
+    (o_lat, o_lon), (d_lat, d_lon) = coords
+    res = create_booking(
+        origin_address=s.get("origin"),
+        destination_address=s.get("destination"),
+        point1=f"{o_lat},{o_lon}", point2=f"{d_lat},{d_lon}",
+        when_iso=payload["when"],
+        name=s.get("name", ""),
+        phone=s.get("phone", ""),
+        email=s.get("email", ""),
+        pax=int(s.get("pax", 1) or 1),
+        luggage_count=int(s.get("luggage_count", 0) or 0),
+        remarks=s.get("notes", ""),
+        estimate=_quote_estimate(q, s),
+        idempotency_key=payload.get("idempotency_key") or payload["code"],
+    )
+    created = str(res.get("status", "0")) == "1"
+    return {
+        "created_remote": created,
+        "info": "✅ Δημιουργήθηκε στο σύστημα." if created else "ℹ️ Το σύστημα δεν επιβεβαίωσε τη δημιουργία.",
+    }
+
+
+def _quote_estimate(q: Optional[Quote], s: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # Infoxoros estimate που υπολογίστηκε ήδη στη συζήτηση (μόνο όσο ισχύει το quote)
+    if q is None or q.expired:
+        return None
+    # ίδιο κλειδί με το pre-quote: HH:MM, ή "now" μόνο για άμεση/κενή ώρα· αλλιώς None → νέος υπολογισμός
+    pt = s.get("pickup_time")
+    hhmm = _pickup_hhmm(pt)
+    if hhmm:
+        return q.estimates.get(hhmm)
+    if not pt or (isinstance(pt, str) and pt.strip().upper() == "ASAP"):
+        return q.estimates.get("now")
+    return None
+
+
+def _notify_payload(payload: Dict[str, Any], created_remote: bool) -> Dict[str, Any]:
+    s = payload["slots"]
+    return {
+        "code": payload["code"],
+        "origin": s.get("origin"), "destination": s.get("destination"),
+        "pickup_time": payload["when"],
+        "pax": s.get("pax", 1),
+        "luggage_count": s.get("luggage_count", 0),
+        "luggage_heavy": _yesish(s.get("luggage_heavy", "όχι")),
+        "name": s.get("name", ""),
+        "phone": s.get("phone", ""),
+        "email": s.get("email", ""),
+        "notes": s.get("notes", ""),
+        "created_remote": created_remote,
+    }
+
+
+def _enqueue_notify(payload: Dict[str, Any], created_remote: bool) -> None:
+    # unique μόνο για την επιτυχία: ένα reclaim του create δεν ξαναστέλνει Slack, ενώ ένα
+    # requeue μετά από dead-letter ειδοποιεί ξανά ότι τελικά δημιουργήθηκε
+    jobs.get_queue().enqueue(
+        "booking.notify", _notify_payload(payload, created_remote), key=payload["code"], unique=created_remote
+    )
+
+
+def _create_dead(job: "jobs.Job") -> None:
+    # Να μη χαθεί το lead: ειδοποίηση back-office ακόμη κι αν η υποβολή απέτυχε οριστικά
+    _enqueue_notify(job.payload, False)
+
+
+@jobs.handler("booking.create", on_dead=_create_dead)
+def _job_booking_create(payload: Dict[str, Any]) -> Dict[str, Any]:
+    result = _create_remote(payload)
+    _enqueue_notify(payload, result["created_remote"])
+    return result
+
+
+@jobs.handler("booking.notify")
+def _job_booking_notify(payload: Dict[str, Any]) -> Dict[str, Any]:
+    if not os.getenv("SLACK_BOOKING_WEBHOOK_URL"):
+        return {"sent": False, "skipped": "no webhook"}
+    if not notify_booking(payload):
+        raise RuntimeError("booking notification not delivered")
+    return {"sent": True}
+
+
+def booking_status(code: str) -> Dict[str, Any]:
+    """Κατάσταση υποβολής: pending | created | not_created | failed | unknown."""
+    # το πιο πρόσφατο: μετά από dead-letter, ένα νέο finalize της ίδιας κράτησης
+    job = next((j for j in reversed(jobs.get_queue().store.by_key(code)) if j.kind == "booking.create"), None)
+    if job is None:
+        return {"code": code, "state": "unknown"}
+    if job.status == jobs.DONE:
+        state = "created" if (job.result or {}).get("created_remote") else "not_created"
+    elif job.status == jobs.DEAD:
+        state = "failed"
+    else:
+        state = "pending"
+    out = {"code": code, "state": state, "attempts": job.attempts}
+    if job.result and job.result.get("info"):
+        out["info"] = job.result["info"]
+    return out
+
+
+def booking_status_update(st: Any) -> Optional[str]:
+    """Μία φορά, στο επόμενο μήνυμα: το αποτέλεσμα της υποβολής που τρέχει στο background."""
+    pending = (getattr(st, "slots", None) or {}).get("booking_job")
+    if not pending:
+        return None
+    code = pending.get("code", "")
+    status = booking_status(code)
+    if status["state"] == "pending":
+        return None
+    st.slots.pop("booking_job", None)
+    if status["state"] == "created":
+        return f"✅ Η κράτηση δημιουργήθηκε στο σύστημα. Κωδικός: {code}"
+    link = _safe_booking_link(lang="el")
+    return (
+        f"ℹ️ Η κράτηση {code} δεν ολοκληρώθηκε αυτόματα στο σύστημα.\n"
+        f"➡️ Για ολοκλήρωση στο σύστημα, άνοιξε τον σύνδεσμο και υπέβαλε τη φόρμα (captcha).\n"
+        f"🔗 Ολοκλήρωση: {link}"
+    )
+
+
+def booking_finalize(st: Any) -> Dict[str, Any]:
     s = st.booking_slots
-    code = _booking_code()
+    idem = s.setdefault("booking_key", uuid.uuid4().hex)
+    day = s.setdefault("booking_day", datetime.now().strftime("%Y%m%d"))
+    code = _booking_code(idem, day=day)
     origin = s.get("origin")
     dest = s.get("destination")
-    when = _compose_when(s)
-
-    # γεωκωδικοποίηση για point1/point2
-    coords = _resolve_coords(origin, dest)  # μπορεί να είναι None
-    point1 = point2 = None
-    if coords:
-        (o_lat, o_lon), (d_lat, d_lon) = coords
-        point1 = f"{o_lat},{o_lon}"
-        point2 = f"{d_lat},{d_lon}"
-
-    created_remote = False
-    info_line = ""
-    # Προσπάθησε πλήρη υποβολή (action=create) μόνο αν έχουμε coords
-    if point1 and point2:
+    payload = {"code": code, "when": _compose_when(s), "slots": dict(s), "idempotency_key": idem}
+    q = quotes.from_session(st, quote_id=s.get("quote_id"))
+    if q is not None:
+        # coords/estimate από το confirm → ο worker δεν ξανακάνει geocoding/cost_calculator
+        payload["quote"] = q.to_dict()
+
+    # Υποβολή + ειδοποίηση στο background· ο χρήστης παίρνει αμέσως τον κωδικό
+    try:
+        # unique: ένα retried "ναι" δεν ξαναϋποβάλλει (ίδιο booking_key → ίδιος κωδικός → το ίδιο job)
+        job, code = _enqueue_booking(payload, idem, day)
+        payload["code"] = code
+        st.slots["booking_job"] = {"code": code, "job": job.id}
+        queued = True
+    except Exception:
+        logger.exception("booking queue unavailable — submitting inline")
+        queued = False
+
+    if queued:
+        status_line = f"📝 Προ-κράτηση καταγράφηκε (εσωτερικά). Κωδικός: {code}"
+        info_line = "⏳ Την υποβάλλω τώρα στο σύστημα — θα σε ενημερώσω για το αποτέλεσμα στο επόμενο μήνυμα."
+    else:
         try:
-            res = create_booking(
-                origin_address=origin,
-                destination_address=dest,
-                point1=point1, point2=point2,
-                when_iso=when,
-                name=s.get("name", ""),
-                phone=s.get("phone", ""),
-                email=s.get("email", ""),
-                pax=int(s.get("pax", 1) or 1),
-                luggage_count=int(s.get("luggage_count", 0) or 0),
-                remarks=s.get("notes", ""),
-            )
-            created_remote = str(res.get("status", "0")) == "1"
-            info_line = "✅ Δημιουργήθηκε στο σύστημα." if created_remote else "ℹ️ Το σύστημα δεν επιβεβαίωσε τη δημιουργία."
+            res = _create_remote(payload)
         except Exception:
-            info_line = "ℹ️ Σφάλμα υποβολής create — συνεχίζουμε με προ-κράτηση."
-            created_remote = False
-    else:
-        info_line = "ℹ️ Δεν μπόρεσα να κάνω geocoding — συνεχίζουμε με προ-κράτηση."
+            res = {"created_remote": False, "info": "ℹ️ Σφάλμα υποβολής create — συνεχίζουμε με προ-κράτηση."}
+        try:
+            notify_booking(_notify_payload(payload, res["created_remote"]))
+        except Exception:
+            pass
+        info_line = res["info"]
+        if res["created_remote"]:
+            status_line = f"✅ Η κράτηση δημιουργήθηκε στο σύστημα. Κωδικός: {code}"
+        else:
+            status_line = (
+                f"📝 Προ-κράτηση καταγράφηκε (εσωτερικά). Κωδικός: {code}\n"
+                f"➡️ Για ολοκλήρωση στο σύστημα, άνοιξε τον σύνδεσμο και υπέβαλε τη φόρμα (captcha)."
+            )
 
     link = _safe_booking_link(lang="el")
 
@@ -704,14 +960,6 @@ def booking_finalize(st: Any) -> Dict[str, Any]:
         f"Σημειώσεις: {notes}"
     ).strip()
 
-    if created_remote:
-        status_line = f"✅ Η κράτηση δημιουργήθηκε στο σύστημα. Κωδικός: {code}"
-    else:
-        status_line = (
-            f"📝 Προ-κράτηση καταγράφηκε (εσωτερικά). Κωδικός: {code}\n"
-            f"➡️ Για ολοκλήρωση στο σύστημα, άνοιξε τον σύνδεσμο και υπέβαλε τη φόρμα (captcha)."
-        )
-
     reply = (
         f"{status_line}\n"
         f"{info_line}\n"
@@ -719,24 +967,6 @@ def booking_finalize(st: Any) -> Dict[str, Any]:
         f"📋 **Copy-paste στη φόρμα**:\n{copy_block}"
     )
 
-    # Ειδοποίηση back-office να μη χαθεί το lead
-    try:
-        notify_booking({
-            "code": code,
-            "origin": origin, "destination": dest,
-            "pickup_time": when,
-            "pax": pax,
-            "luggage_count": lug,
-            "luggage_heavy": _yesish(heavy),
-            "name": s.get("name", ""),
-            "phone": s.get("phone", ""),
-            "email": s.get("email", ""),
-            "notes": notes,
-            "created_remote": created_remote,
-        })
-    except Exception:
-        pass
-
     st.last_offered = None
     # Prepend a trendy phrase for a friendly tone
     try:
@@ -760,21 +990,22 @@ def maybe_handle_followup_or_booking(st: Any, user_text: str) -> Optional[Dict[s
     """
     init_session_state(st)
     txt = (user_text or "").strip()
+    tt = greeklish.with_greek(txt)  # triggers: + greeklish → ελληνικά
 
     # A) Αν ο χρήστης ρωτά για ΚΟΣΤΟΣ → κόψε τυχόν stale booking & άφησε τον main να απαντήσει με TripCost
-    if any(re.search(p, txt, re.IGNORECASE) for p in TRIPCOST_TRIGGERS):
+    if any(re.search(p, tt, re.IGNORECASE) for p in TRIPCOST_TRIGGERS):
         _reset_booking(st)
         return None
 
     # B) Αν ο χρήστης αλλάζει θέμα σε νοσοκομείο ή φαρμακείο, τερμάτισε το booking και θέσε νέο intent
     for intent_name, patterns in INTENT_SWITCH_TRIGGERS.items():
-        if any(re.search(p, txt, re.IGNORECASE) for p in patterns):
+        if any(re.search(p, tt, re.IGNORECASE) for p in patterns):
             _reset_booking(st)
             st.intent = intent_name
             return None
 
-    is_short = txt.lower() in {"ναι", "οκ", "ok", "μάλιστα", "σωστά", "yes", "y"}
-    booking_intent = any(re.search(p, txt, re.IGNORECASE) for p in BOOKING_TRIGGERS)
+    is_short = textnorm.lowered(txt) in {"ναι", "οκ", "ok", "μάλιστα", "σωστά", "yes", "y"}
+    booking_intent = any(re.search(p, tt, re.IGNORECASE) for p in BOOKING_TRIGGERS)
 
     # C) Direct confirms (χωρίς LLM)
     if is_short:
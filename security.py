@@ -1,29 +1,32 @@
 # file: security.py
 from __future__ import annotations
 
+import asyncio
 import os
 import hashlib
+import hmac
 import ipaddress
+import logging
+import math
 import time
 import threading
-from typing import Iterable
+from collections import OrderedDict
+from typing import Callable, Iterable, NamedTuple
 
-from fastapi import Request
-from fastapi.responses import JSONResponse
-
-try:
-    import redis  # type: ignore
-except Exception:  # optional
-    redis = None  # type: ignore
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse, Response
 
+import localdb
+import startup
 from config import Settings
 
-# ──────────────────────────────────────────────────────────────────────────────
-# Helpers
+# optional· lazy: το redis φορτώνει μόνο όταν στηθεί RedisRateLimiter
+aioredis = startup.LazyModule("redis.asyncio") if startup.available("redis") else None
 
-def _now() -> int:
-    return int(time.time())
+logger = logging.getLogger(__name__)
 
+# ──────────────────────────────────────────────────────────────────────────────
+# Helpers
 
 def _client_ip(req: Request) -> str:
     xfwd = req.headers.get("x-forwarded-for")
@@ -38,6 +41,16 @@ def _client_ip(req: Request) -> str:
         return "-"
 
 
+def api_key_from_headers(headers) -> str | None:
+    """X-API-Key ή Authorization: Bearer <key> (κοινό για HTTP middlewares και WebSocket)."""
+    key = headers.get("x-api-key")
+    if not key:
+        auth = headers.get("authorization", "")
+        if auth.lower().startswith("bearer "):
+            key = auth.split(" ", 1)[1].strip()
+    return key or None
+
+
 def _origin_headers(req: Request) -> dict:
     # So that browsers can read error bodies in CORS scenarios
     return {
@@ -48,6 +61,9 @@ def _origin_headers(req: Request) -> dict:
 # ──────────────────────────────────────────────────────────────────────────────
 # API Key middleware (ASGI)
 
+# χωρίς API key και χωρίς rate limit: health/readiness probes της πλατφόρμας και docs
+PUBLIC_PATHS = ("/", "/health", "/ready", "/docs", "/openapi.json", "/redoc")
+
 class APIKeyAuthMiddleware:
     """Enforce API key on protected routes.
     Accepts X-API-Key or Authorization: Bearer <key>.
@@ -60,7 +76,7 @@ class APIKeyAuthMiddleware:
         env_keys = {k.strip() for k in (os.getenv("CHAT_API_KEYS", "").split(",")) if k.strip()}
         provided = {k.strip() for k in (keys or []) if k and k.strip()}
         self.keys = provided or env_keys
-        self.public = set(public_paths or ["/", "/health", "/docs", "/openapi.json", "/redoc"])  # keep health open
+        self.public = set(public_paths or PUBLIC_PATHS)  # keep health open
 
     async def __call__(self, scope, receive, send):
         if scope.get("type") != "http":
@@ -76,11 +92,7 @@ class APIKeyAuthMiddleware:
             return await self.app(scope, receive, send)
 
         req = Request(scope, receive)
-        key = req.headers.get("x-api-key")
-        if not key:
-            auth = req.headers.get("authorization", "")
-            if auth.lower().startswith("bearer "):
-                key = auth.split(" ", 1)[1].strip()
+        key = api_key_from_headers(req.headers)
 
         if key not in self.keys:
             res = JSONResponse({"detail": "Unauthorized"}, status_code=401, headers=_origin_headers(req))
@@ -89,67 +101,352 @@ class APIKeyAuthMiddleware:
         return await self.app(scope, receive, send)
 
 # ──────────────────────────────────────────────────────────────────────────────
-# Rate limiting (fixed window)
+# Rate limiting (token bucket)
+#
+# Κάθε bucket γεμίζει με `rate` tokens/sec ως το `capacity` (burst). Ένα request
+# κοστίζει `cost` tokens (ανά route) και περνά μόνο αν υπάρχουν σε ΟΛΑ τα buckets
+# του (π.χ. API key + IP) — αλλιώς δεν καταναλώνεται τίποτα. Σε αντίθεση με το
+# fixed window δεν επιτρέπει 2× burst στα όρια του παραθύρου.
+
+RATE_LIMIT_REDIS_TIMEOUT_SEC = float(os.getenv("RATE_LIMIT_REDIS_TIMEOUT_SEC", "0.1"))
+RATE_LIMIT_REDIS_RETRY_SEC = float(os.getenv("RATE_LIMIT_REDIS_RETRY_SEC", "30"))
+RATE_LIMIT_REDIS_POOL = int(os.getenv("RATE_LIMIT_REDIS_POOL", "20"))
+RATE_LIMIT_SHARDS = int(os.getenv("RATE_LIMIT_SHARDS", "16"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+RATE_LIMIT_PRUNE_SEC = float(os.getenv("RATE_LIMIT_PRUNE_SEC", "30"))
+
+
+class Bucket(NamedTuple):
+    key: str
+    rate: float      # tokens / sec
+    capacity: float  # burst
 
-class _MemoryBucket:
-    __slots__ = ("count", "window_start")
 
-    def __init__(self, count: int, window_start: int):
-        self.count = count
-        self.window_start = window_start
+class Decision(NamedTuple):
+    allowed: bool
+    remaining: int
+    retry_after: float  # sec ως ότου υπάρξουν αρκετά tokens (0 όταν allowed)
+
+
+def make_bucket(key: str, *, window_sec: int, max_req: int, burst: int = 0) -> Bucket:
+    window = max(1, int(window_sec))
+    max_req = max(1, int(max_req))
+    return Bucket(key, max_req / window, float(burst or max_req))
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets", "next_prune", "contended", "allowed", "denied", "expired", "evicted")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets: "OrderedDict[str, list[float]]" = OrderedDict()  # key → [tokens, ts, full_at] (LRU)
+        self.next_prune = 0.0
+        self.contended = self.allowed = self.denied = self.expired = self.evicted = 0
 
 
 class MemoryRateLimiter:
-    def __init__(self, window_sec: int, max_req: int):
-        self.window = int(max(1, window_sec))
-        self.max_req = int(max(1, max_req))
-        self._lock = threading.Lock()
-        self._buckets: dict[str, _MemoryBucket] = {}
-
-    def hit(self, key: str) -> tuple[bool, int]:
-        now = _now()
-        win = now - (now % self.window)
-        with self._lock:
-            b = self._buckets.get(key)
-            if not b or b.window_start != win:
-                b = _MemoryBucket(0, win)
-                self._buckets[key] = b
-            b.count += 1
-            allowed = b.count <= self.max_req
-            remaining = max(self.max_req - b.count, 0)
-            return allowed, remaining
+    """
+    Token buckets στη μνήμη του process (default, και fallback όταν πέφτει το Redis).
+
+    - sharded: κάθε key πάει σε ένα από `shards` κομμάτια με δικό του lock
+    - eviction: κάθε RATE_LIMIT_PRUNE_SEC πετάμε τα γεμάτα buckets (= ίδια με "δεν υπάρχει")
+    - hard cap: ως `max_keys` identifiers· πάνω από αυτό φεύγει το LRU (ξεχνιέται το χρέος του)
+    """
+
+    def __init__(self, *, shards: int = RATE_LIMIT_SHARDS, max_keys: int = RATE_LIMIT_MAX_KEYS,
+                 prune_sec: float = RATE_LIMIT_PRUNE_SEC):
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self._per_shard = max(1, max_keys // len(self._shards))
+        self.prune_sec = prune_sec
+
+    def _acquire(self, shard: _Shard) -> None:
+        if not shard.lock.acquire(blocking=False):
+            shard.contended += 1
+            shard.lock.acquire()
+
+    def take(self, buckets: Iterable[Bucket], cost: float = 1.0, now: float | None = None) -> Decision:
+        now = time.monotonic() if now is None else now
+        buckets = list(buckets)
+        n = len(self._shards)
+        idx = [hash(b.key) % n for b in buckets]
+        order = sorted(set(idx))  # πάντα με την ίδια σειρά → χωρίς deadlock για multi-bucket requests
+        for i in order:
+            self._acquire(self._shards[i])
+        try:
+            levels = []
+            for b, i in zip(buckets, idx):
+                st = self._shards[i].buckets.get(b.key)
+                tok = b.capacity if st is None else min(b.capacity, st[0] + max(0.0, now - st[1]) * b.rate)
+                levels.append(tok)
+            short = [(cost - tok) / b.rate for b, tok in zip(buckets, levels) if tok < cost]
+            allowed = not short
+            remaining = float("inf")
+            for b, i, tok in zip(buckets, idx, levels):
+                if allowed:
+                    tok -= cost
+                remaining = min(remaining, tok)
+                self._put(self._shards[i], b.key, [tok, now, now + (b.capacity - tok) / b.rate], now)
+            head = self._shards[order[0]] if order else None
+            if head is not None:
+                if allowed:
+                    head.allowed += 1
+                else:
+                    head.denied += 1
+        finally:
+            for i in reversed(order):
+                self._shards[i].lock.release()
+        rem = 0 if remaining == float("inf") else max(int(remaining), 0)
+        return Decision(allowed, rem, 0.0 if allowed else max(short))
+
+    def _put(self, shard: _Shard, key: str, state: list[float], now: float) -> None:
+        # καλείται με το lock του shard
+        buckets = shard.buckets
+        buckets[key] = state
+        buckets.move_to_end(key)
+        if now >= shard.next_prune:
+            shard.next_prune = now + self.prune_sec
+            for k in [k for k, st in buckets.items() if st[2] <= now]:
+                del buckets[k]
+                shard.expired += 1
+        while len(buckets) > self._per_shard:
+            buckets.popitem(last=False)
+            shard.evicted += 1
+
+    async def acquire(self, buckets: Iterable[Bucket], cost: float = 1.0) -> Decision:
+        return self.take(buckets, cost)
+
+    def stats(self) -> dict:
+        out = {"shards": len(self._shards), "max_keys": self._per_shard * len(self._shards), "keys": 0,
+               "largest_shard": 0, "allowed": 0, "denied": 0, "expired": 0, "evicted": 0, "contended": 0}
+        for sh in self._shards:
+            with sh.lock:
+                size = len(sh.buckets)
+                out["keys"] += size
+                out["largest_shard"] = max(out["largest_shard"], size)
+                for k in ("allowed", "denied", "expired", "evicted", "contended"):
+                    out[k] += getattr(sh, k)
+        return out
+
+
+class SQLiteRateLimiter:
+    """
+    Token buckets στο κοινό SQLite του host (localdb), για `gunicorn -w N` χωρίς Redis.
+
+    Ένα BEGIN IMMEDIATE ανά έλεγχο: read-modify-write ατομικά για όλα τα buckets του request
+    και μεταξύ processes. Fail open τοπικά όπως ο RedisRateLimiter: σε σφάλμα (π.χ. locked db
+    πέρα από το busy timeout) περνάμε στον MemoryRateLimiter.
+    """
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS rate_buckets (
+        key TEXT PRIMARY KEY,
+        tok REAL NOT NULL,
+        ts REAL NOT NULL,
+        full_at REAL NOT NULL
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS rate_buckets_full ON rate_buckets(full_at);
+    """
+
+    def __init__(self, path: str | None = None, *, prune_sec: float = RATE_LIMIT_PRUNE_SEC,
+                 fallback: MemoryRateLimiter | None = None):
+        self.path = path or localdb.LOCAL_DB
+        self.prune_sec = prune_sec
+        self.fallback = fallback or MemoryRateLimiter()
+        self._next_prune = 0.0
+        db = localdb.get_db(self.path)
+        with db.lock:
+            db.db.executescript(self._SCHEMA)
+
+    def take(self, buckets: Iterable[Bucket], cost: float = 1.0, now: float | None = None) -> Decision:
+        now = time.time() if now is None else now
+        buckets = list(buckets)
+        try:
+            with localdb.get_db(self.path).transaction() as db:
+                levels = []
+                for b in buckets:
+                    st = db.execute("SELECT tok, ts FROM rate_buckets WHERE key=?", (b.key,)).fetchone()
+                    levels.append(b.capacity if st is None else min(b.capacity, st[0] + max(0.0, now - st[1]) * b.rate))
+                short = [(cost - tok) / b.rate for b, tok in zip(buckets, levels) if tok < cost]
+                allowed = not short
+                remaining = float("inf")
+                for b, tok in zip(buckets, levels):
+                    if allowed:
+                        tok -= cost
+                    remaining = min(remaining, tok)
+                    db.execute("INSERT OR REPLACE INTO rate_buckets (key, tok, ts, full_at) VALUES (?, ?, ?, ?)",
+                               (b.key, tok, now, now + (b.capacity - tok) / b.rate))
+                if now >= self._next_prune:
+                    self._next_prune = now + self.prune_sec
+                    db.execute("DELETE FROM rate_buckets WHERE full_at<=?", (now,))  # γεμάτο = δεν υπάρχει
+        except Exception:
+            logger.warning("rate limit: SQLite σφάλμα — τοπικός limiter για αυτό το request", exc_info=True)
+            return self.fallback.take(buckets, cost)
+        rem = 0 if remaining == float("inf") else max(int(remaining), 0)
+        return Decision(allowed, rem, 0.0 if allowed else max(short))
+
+    async def acquire(self, buckets: Iterable[Bucket], cost: float = 1.0) -> Decision:
+        # BEGIN IMMEDIATE + busy timeout: σε thread, ώστε ένα locked db να μην παγώνει το event loop
+        return await asyncio.to_thread(self.take, list(buckets), cost)
 
 
 class RedisRateLimiter:
-    def __init__(self, url: str, window_sec: int, max_req: int):
-        if redis is None:
+    """
+    Token buckets στο Redis: ένα Lua script (EVALSHA) ανά έλεγχο → ένα round-trip,
+    ατομικό για όλα τα buckets του request. redis.asyncio με pool, ώστε να μη μπλοκάρει το loop.
+
+    Fail open τοπικά: σε timeout/σφάλμα του Redis περνάμε στον MemoryRateLimiter για
+    RATE_LIMIT_REDIS_RETRY_SEC (circuit breaker), αντί να προσθέτουμε latency σε κάθε request.
+    """
+
+    # KEYS: buckets · ARGV[1]=cost, ARGV[2i]=rate, ARGV[2i+1]=capacity
+    _SCRIPT = """
+    local t = redis.call('TIME')
+    local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+    local cost = tonumber(ARGV[1])
+    local levels = {}
+    local retry = 0
+    for i = 1, #KEYS do
+        local rate = tonumber(ARGV[2 * i])
+        local cap = tonumber(ARGV[2 * i + 1])
+        local b = redis.call('HMGET', KEYS[i], 't', 'ts')
+        local tok = tonumber(b[1])
+        if tok == nil then
+            tok = cap
+        else
+            tok = math.min(cap, tok + math.max(0, now - tonumber(b[2])) * rate)
+        end
+        levels[i] = tok
+        if tok < cost then retry = math.max(retry, (cost - tok) / rate) end
+    end
+    local allowed = retry == 0
+    local remaining = -1
+    for i = 1, #KEYS do
+        local rate = tonumber(ARGV[2 * i])
+        local cap = tonumber(ARGV[2 * i + 1])
+        local tok = levels[i]
+        if allowed then tok = tok - cost end
+        if remaining < 0 or tok < remaining then remaining = tok end
+        redis.call('HSET', KEYS[i], 't', tok, 'ts', now)
+        redis.call('PEXPIRE', KEYS[i], math.ceil((cap - tok) / rate * 1000) + 1000)
+    end
+    return {allowed and 1 or 0, math.floor(math.max(remaining, 0)), tostring(retry)}
+    """
+
+    def __init__(self, url: str, *, prefix: str = "rl:", timeout: float = RATE_LIMIT_REDIS_TIMEOUT_SEC,
+                 retry_sec: float = RATE_LIMIT_REDIS_RETRY_SEC, fallback: MemoryRateLimiter | None = None):
+        if aioredis is None:
             raise RuntimeError("redis library is not installed")
-        self.r = redis.Redis.from_url(url, decode_responses=True)
-        self.window = int(max(1, window_sec))
-        self.max_req = int(max(1, max_req))
-
-    def hit(self, key: str) -> tuple[bool, int]:
-        now = _now()
-        bucket = now - (now % self.window)
-        k = f"rl:{key}:{bucket}"
-        with self.r.pipeline() as p:
-            p.incr(k)
-            p.expire(k, self.window + 1)
-            count, _ = p.execute()
-        allowed = int(count) <= self.max_req
-        remaining = max(self.max_req - int(count), 0)
-        return allowed, remaining
+        self.url = url
+        self.prefix = prefix
+        self.timeout = timeout
+        self.retry_sec = retry_sec
+        self.fallback = fallback or MemoryRateLimiter()
+        self._client = None
+        self._script = None
+        self._loop = None
+        self._down_until = 0.0
+
+    def _redis(self):
+        # Οι async συνδέσεις δένονται στο event loop που τις δημιούργησε
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = aioredis.Redis.from_url(
+                self.url,
+                max_connections=RATE_LIMIT_REDIS_POOL,
+                socket_timeout=self.timeout,
+                socket_connect_timeout=self.timeout,
+            )
+            self._script = self._client.register_script(self._SCRIPT)
+            self._loop = loop
+        return self._script
+
+    async def acquire(self, buckets: Iterable[Bucket], cost: float = 1.0) -> Decision:
+        import asyncio
+
+        buckets = list(buckets)
+        if time.monotonic() < self._down_until:
+            return self.fallback.take(buckets, cost)
+        args: list = [cost]
+        for b in buckets:
+            args += [b.rate, b.capacity]
+        try:
+            script = self._redis()
+            allowed, remaining, retry = await asyncio.wait_for(
+                script(keys=[self.prefix + b.key for b in buckets], args=args), self.timeout
+            )
+        except Exception:
+            self._down_until = time.monotonic() + self.retry_sec
+            logger.warning("rate limit: Redis μη διαθέσιμο — τοπικός limiter για %.0fs", self.retry_sec, exc_info=True)
+            return self.fallback.take(buckets, cost)
+        return Decision(bool(int(allowed)), int(remaining), float(retry))
+
+
+RATE_LIMITED_PATHS = ("/chat", "/chat/stream")
+
+
+def parse_route_costs(spec: str | None, paths: Iterable[str] = RATE_LIMITED_PATHS) -> dict[str, float]:
+    """"/chat=1,/chat/stream=2" → {path: cost}· τα paths χωρίς ρητό κόστος μετράνε 1."""
+    costs = {p: 1.0 for p in paths}
+    for part in (spec or "").split(","):
+        path, sep, cost = part.partition("=")
+        if not sep or not path.strip():
+            continue
+        try:
+            costs[path.strip()] = max(0.0, float(cost))
+        except ValueError:
+            logger.warning("rate limit: άκυρο κόστος %r", part)
+    return costs
+
+
+class RateLimitPolicy:
+    """Ποια requests μετράνε, πόσο κοστίζουν και σε ποια buckets (κοινό για τα middlewares)."""
+
+    def __init__(self, settings: Settings, *, identifier: str = "auto", paths: Iterable[str] = RATE_LIMITED_PATHS):
+        self.costs = parse_route_costs(getattr(settings, "RATE_LIMIT_COSTS", ""), paths)
+        self.window = int(settings.RATE_LIMIT_WINDOW_SEC)
+        self.max_req = int(settings.RATE_LIMIT_MAX_REQ)
+        self.burst = int(getattr(settings, "RATE_LIMIT_BURST", 0) or 0)
+        self.ip_max_req = int(getattr(settings, "RATE_LIMIT_IP_MAX_REQ", 0) or 0)
+        self.identifier_mode = identifier
+        self.backend: MemoryRateLimiter | SQLiteRateLimiter | RedisRateLimiter
+        if settings.PERSIST_BACKEND.lower() == "redis" and settings.REDIS_URL and aioredis is not None:
+            self.backend = RedisRateLimiter(settings.REDIS_URL)
+        elif settings.PERSIST_BACKEND.lower() == "sqlite":
+            self.backend = SQLiteRateLimiter()
+        else:
+            self.backend = MemoryRateLimiter()
+
+    def cost(self, method: str, path: str) -> float:
+        return self.costs.get(path, 0.0) if method == "POST" else 0.0
+
+    def message_cost(self, path: str) -> float:
+        """Κόστος ενός μηνύματος WebSocket: όσο ένα POST /chat, εκτός αν το RATE_LIMIT_COSTS ορίζει το path."""
+        return self.costs.get(path, self.costs.get("/chat", 0.0))
+
+    def buckets(self, ip: str, key: str | None) -> list[Bucket]:
+        limit = dict(window_sec=self.window, max_req=self.max_req, burst=self.burst)
+        if self.identifier_mode == "ip" or not key:
+            return [make_bucket(f"ip:{ip}", **limit)]
+        out = [make_bucket(f"key:{hashlib.sha256(key.encode()).hexdigest()[:16]}", **limit)]
+        if self.ip_max_req:
+            # επιπλέον όριο ανά IP ακόμη και με έγκυρο key (π.χ. διαρροή key)
+            out.append(make_bucket(f"ip:{ip}", window_sec=self.window, max_req=self.ip_max_req))
+        return out
+
+
+def _too_many(retry_after: float, headers: dict) -> JSONResponse:
+    headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+    return JSONResponse({"detail": "Too Many Requests"}, status_code=429, headers=headers)
 
 
 class RateLimitMiddleware:
-    def __init__(self, app, *, settings: Settings, identifier: str = "auto"):
+    def __init__(self, app, *, settings: Settings, identifier: str = "auto", paths: Iterable[str] = RATE_LIMITED_PATHS):
         self.app = app
         self.settings = settings
-        if settings.PERSIST_BACKEND.lower() == "redis" and settings.REDIS_URL:
-            self.backend = RedisRateLimiter(settings.REDIS_URL, settings.RATE_LIMIT_WINDOW_SEC, settings.RATE_LIMIT_MAX_REQ)
-        else:
-            self.backend = MemoryRateLimiter(settings.RATE_LIMIT_WINDOW_SEC, settings.RATE_LIMIT_MAX_REQ)
-        self.identifier_mode = identifier
+        self.policy = RateLimitPolicy(settings, identifier=identifier, paths=paths)
+        self.backend = self.policy.backend
 
     async def __call__(self, scope, receive, send):
         if scope.get("type") != "http":
@@ -159,35 +456,67 @@ class RateLimitMiddleware:
         if scope.get("method", "GET").upper() == "OPTIONS":
             return await self.app(scope, receive, send)
 
-        req = Request(scope, receive)
-        if req.method.upper() == "POST" and req.url.path == "/chat":
-            ident = await self._identifier(req)
-            allowed, remaining = self.backend.hit(ident)
-            if not allowed:
-                headers = _origin_headers(req)
-                headers["Retry-After"] = str(self.settings.RATE_LIMIT_WINDOW_SEC)
-                res = JSONResponse({"detail": "Too Many Requests"}, status_code=429, headers=headers)
+        cost = self.policy.cost(scope.get("method", "GET").upper(), scope.get("path", "/"))
+        if cost:
+            req = Request(scope, receive)
+            buckets = self.policy.buckets(_client_ip(req), api_key_from_headers(req.headers))
+            decision = await self.backend.acquire(buckets, cost)
+            if not decision.allowed:
+                res = _too_many(decision.retry_after, _origin_headers(req))
                 return await res(scope, receive, send)
         return await self.app(scope, receive, send)
 
-    async def _identifier(self, req: Request) -> str:
-        if self.identifier_mode == "ip":
-            return _client_ip(req)
-        key = req.headers.get("x-api-key")
-        if not key:
-            auth = req.headers.get("authorization", "")
-            if auth.lower().startswith("bearer "):
-                key = auth.split(" ", 1)[1].strip()
-        if key:
-            return f"key:{hashlib.sha256(key.encode()).hexdigest()[:16]}"
-        return f"ip:{_client_ip(req)}"
-
 
 # ──────────────────────────────────────────────────────────────────────────────
-# Body size limit (Content-Length guard)
+# Body size limit (Content-Length guard + streaming count στο receive)
+
+class BodyTooLarge(HTTPException):
+    """Από το φραγμένο receive· το FastAPI ξανασηκώνει τα HTTPException κατά το parsing → 413."""
+
+    def __init__(self, headers: dict | None = None):
+        super().__init__(status_code=413, detail="Request body too large", headers=headers)
+
+
+def _too_large(headers: dict) -> JSONResponse:
+    return JSONResponse({"detail": "Request body too large"}, status_code=413, headers=headers)
+
+
+async def limit_body(app, scope, receive, send, *, max_bytes: int, headers: dict) -> None:
+    """
+    Τρέχει το app με receive που μετρά τα bytes όπως έρχονται (και για chunked bodies χωρίς
+    Content-Length): με το που ξεπεραστεί το max_bytes κόβει με 413 — ποτέ δεν κρατάμε
+    στη μνήμη περισσότερα από max_bytes + ένα chunk.
+    """
+    received = 0
+    started = False
+
+    async def limited_receive():
+        nonlocal received
+        message = await receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > max_bytes:
+                raise BodyTooLarge(headers)
+        return message
+
+    async def tracked_send(message):
+        nonlocal started
+        if message["type"] == "http.response.start":
+            started = True
+        await send(message)
+
+    try:
+        await app(scope, limited_receive, tracked_send)
+    except BodyTooLarge:
+        # διάβασμα του body έξω από FastAPI parsing (π.χ. raw ASGI/Starlette route)
+        if started:
+            raise
+        await _too_large(headers)(scope, receive, send)
+
 
 class BodySizeLimitMiddleware:
-    """Reject requests with Content-Length over max_body_bytes (413).
+    """Reject requests whose body is over max_body_bytes (413).
+    Checks Content-Length up front and counts streamed (chunked) bodies in receive.
     Skips GET/HEAD/OPTIONS to avoid breaking browser preflight.
     """
 
@@ -202,17 +531,151 @@ class BodySizeLimitMiddleware:
         if method in ("GET", "HEAD", "OPTIONS"):
             return await self.app(scope, receive, send)
         headers = {k.decode().lower(): v.decode() for k, v in scope.get("headers", [])}
+        # Echo CORS so browser can read the error
+        echo = {"Access-Control-Allow-Origin": headers.get("origin", "*"), "Vary": "Origin"}
         clen = headers.get("content-length")
         if clen and clen.isdigit() and int(clen) > self.max:
-            # Echo CORS so browser can read the error
-            origin = headers.get("origin", "*")
-            res = JSONResponse({"detail": "Request body too large"}, status_code=413, headers={
-                "Access-Control-Allow-Origin": origin,
-                "Vary": "Origin",
-            })
+            return await _too_large(echo)(scope, receive, send)
+        return await limit_body(self.app, scope, receive, send, max_bytes=self.max, headers=echo)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Fused middleware (preflight + size guard + rate limit + API key σε ένα πέρασμα)
+
+class APIKeys:
+    """Τα κλειδιά κρατιούνται μόνο ως SHA-256· ο έλεγχος είναι constant-time ως προς το περιεχόμενο."""
+
+    def __init__(self, keys: Iterable[str] | None = None):
+        env_keys = {k.strip() for k in (os.getenv("CHAT_API_KEYS", "").split(",")) if k.strip()}
+        provided = {k.strip() for k in (keys or []) if k and k.strip()}
+        self._digests = [hashlib.sha256(k.encode()).digest() for k in sorted(provided or env_keys)]
+
+    def __bool__(self) -> bool:
+        return bool(self._digests)
+
+    def check(self, key: str | None) -> bool:
+        digest = hashlib.sha256((key or "").encode()).digest()
+        ok = False
+        for d in self._digests:  # χωρίς early exit
+            ok |= hmac.compare_digest(digest, d)
+        return ok and bool(key)
+
+
+# Τα μόνα headers που χρειάζονται οι έλεγχοι· τα υπόλοιπα δεν γίνονται καν decode
+_WANTED = frozenset({
+    b"origin", b"x-api-key", b"authorization", b"content-length",
+    b"x-forwarded-for", b"access-control-request-headers",
+})
+
+
+def _scope_headers(scope) -> dict[str, str]:
+    out: dict[str, str] = {}
+    for k, v in scope.get("headers") or ():
+        k = k.lower()
+        if k in _WANTED and k not in out:
+            out[k.decode("latin-1")] = v.decode("latin-1")
+    return out
+
+
+def _ip_from(headers: dict[str, str], scope) -> str:
+    xfwd = headers.get("x-forwarded-for")
+    if xfwd:
+        ip = xfwd.split(",")[0].strip()
+    else:
+        client = scope.get("client")
+        ip = (client[0] if client else "-") or "-"
+    try:
+        ipaddress.ip_address(ip)
+        return ip
+    except Exception:
+        return "-"
+
+
+def scope_client_ip(scope) -> str:
+    """Η IP ενός ASGI scope (http ή websocket) όπως τη μετράει το rate limit."""
+    return _ip_from(_scope_headers(scope), scope)
+
+
+class SecurityMiddleware:
+    """
+    Ένα ASGI middleware στη θέση των _PreflightMiddleware → RateLimit → APIKeyAuth → BodySizeLimit
+    (ίδια σειρά, ίδια status codes και error bodies). Τα headers του scope διαβάζονται μία φορά
+    και χωρίς Starlette Request.
+
+    cors_headers(origin) → headers για επιτρεπτό origin ή {} (το preflight για άλλα origins
+    περνά στο CORSMiddleware που ακολουθεί).
+    """
+
+    def __init__(
+        self,
+        app,
+        *,
+        settings: Settings,
+        keys: Iterable[str] | None = None,
+        cors_headers: Callable[[str], dict] | None = None,
+        public_paths: Iterable[str] | None = None,
+        max_body_bytes: int | None = None,
+        identifier: str = "auto",
+        paths: Iterable[str] = RATE_LIMITED_PATHS,
+        policy: RateLimitPolicy | None = None,
+    ):
+        self.app = app
+        self.keys = APIKeys(keys)
+        self.public = frozenset(public_paths or PUBLIC_PATHS)
+        self.cors_headers = cors_headers
+        self.max = int(max_body_bytes if max_body_bytes is not None else getattr(settings, "MAX_BODY_BYTES", 1_000_000))
+        # policy: κοινό με το /chat/ws (τα WebSocket μηνύματα χρεώνονται στα ίδια buckets)
+        self.policy = policy or RateLimitPolicy(settings, identifier=identifier, paths=paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope.get("type") != "http":
+            return await self.app(scope, receive, send)
+        method = scope.get("method", "GET").upper()
+        path = scope.get("path", "/")
+        h = _scope_headers(scope)
+
+        if method == "OPTIONS":
+            if self.cors_headers is not None:
+                headers = self.cors_headers(h.get("origin", ""))
+                if headers:
+                    headers.setdefault(
+                        "Access-Control-Allow-Headers",
+                        h.get("access-control-request-headers", "Content-Type, Authorization"),
+                    )
+                    headers.setdefault("Access-Control-Allow-Methods", "POST, GET, OPTIONS")
+                    return await Response(status_code=204, headers=headers)(scope, receive, send)
+            return await self.app(scope, receive, send)
+
+        key = h.get("x-api-key")
+        if not key:
+            auth = h.get("authorization", "")
+            if auth.lower().startswith("bearer "):
+                key = auth.split(" ", 1)[1].strip()
+        key = key or None
+
+        cost = 0.0 if path in self.public else self.policy.cost(method, path)
+        if cost:
+            decision = await self.policy.backend.acquire(self.policy.buckets(_ip_from(h, scope), key), cost)
+            if not decision.allowed:
+                res = _too_many(decision.retry_after, self._echo(h))
+                return await res(scope, receive, send)
+
+        if self.keys and path not in self.public and not self.keys.check(key):
+            res = JSONResponse({"detail": "Unauthorized"}, status_code=401, headers=self._echo(h))
             return await res(scope, receive, send)
+
+        if method not in ("GET", "HEAD"):
+            clen = h.get("content-length")
+            if clen and clen.isdigit() and int(clen) > self.max:
+                return await _too_large(self._echo(h))(scope, receive, send)
+            return await limit_body(self.app, scope, receive, send, max_bytes=self.max, headers=self._echo(h))
+
         return await self.app(scope, receive, send)
 
+    @staticmethod
+    def _echo(h: dict[str, str]) -> dict:
+        return {"Access-Control-Allow-Origin": h.get("origin", "*"), "Vary": "Origin"}
+
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Backwards-compatible helpers (exported names used by main.py)
@@ -229,6 +692,12 @@ __all__ = [
     "APIKeyAuthMiddleware",
     "RateLimitMiddleware",
     "BodySizeLimitMiddleware",
+    "BodyTooLarge",
+    "SecurityMiddleware",
+    "APIKeys",
+    "MemoryRateLimiter",
+    "RedisRateLimiter",
+    "api_key_from_headers",
     "api_key_auth",
     "rate_limit",
 ]
@@ -0,0 +1,115 @@
+# startup.py
+"""
+Cold start: lazy imports για τα βαριά dependencies και readiness μετά το warm-up.
+
+    LazyModule("agents")     proxy που κάνει το import στην πρώτη πρόσβαση σε attribute
+    available("openai")      υπάρχει το package; (find_spec, χωρίς import)
+    WARMUP.add(name, fn)     εργασίες warm-up (agent, classifier, caches) που τρέχουν σε
+                             background thread μετά το startup (WARMUP.start() στο lifespan)
+    WARMUP.ready             True μόλις τελειώσουν όλες· το /ready επιστρέφει 503 ως τότε
+
+Ο worker δέχεται συνδέσεις αμέσως (το / απαντά), αλλά το Cloud Run startup/readiness probe
+στο /ready στέλνει traffic μόνο όταν τα caches είναι ζεστά. Μια warm-up εργασία που
+αποτυγχάνει καταγράφεται στο status αλλά δεν κρατά το instance εκτός: κάθε κομμάτι έχει ήδη
+fallback στην πρώτη χρήση.
+
+Αναφορά import time: python -m benchmarks.importtime
+"""
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import logging
+import threading
+import time
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def available(name: str) -> bool:
+    """Αν το top-level package υπάρχει, χωρίς να το κάνει import."""
+    try:
+        return importlib.util.find_spec(name.partition(".")[0]) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class LazyModule:
+    """Module proxy: `import` στην πρώτη πρόσβαση σε attribute (thread-safe μέσω του import lock)."""
+
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+        self.__dict__["_mod"] = None
+
+    def _load(self) -> ModuleType:
+        mod = self.__dict__["_mod"]
+        if mod is None:
+            t0 = time.perf_counter()
+            mod = importlib.import_module(self.__dict__["_name"])
+            self.__dict__["_mod"] = mod
+            logger.debug("lazy import %s: %.0fms", self.__dict__["_name"], (time.perf_counter() - t0) * 1000)
+        return mod
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__["_mod"] is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyModule {self.__dict__['_name']} ({state})>"
+
+
+class Warmup:
+    def __init__(self):
+        self._tasks: List[Tuple[str, Callable[[], Any]]] = []
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def add(self, name: str, fn: Callable[[], Any]) -> None:
+        with self._lock:
+            self._tasks.append((name, fn))
+            self._status[name] = {"state": "pending"}
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def run(self) -> None:
+        """Τρέχει όλες τις εργασίες με τη σειρά (στο τρέχον thread)."""
+        t_all = time.perf_counter()
+        for name, fn in list(self._tasks):
+            self._status[name] = {"state": "running"}
+            t0 = time.perf_counter()
+            try:
+                fn()
+                state = "ok"
+            except Exception:
+                state = "failed"
+                logger.warning("warm-up %s απέτυχε", name, exc_info=True)
+            self._status[name] = {"state": state, "ms": round((time.perf_counter() - t0) * 1000, 1)}
+        self._done.set()
+        logger.info("warm-up ολοκληρώθηκε σε %.0fms", (time.perf_counter() - t_all) * 1000)
+
+    def start(self) -> None:
+        """Background warm-up (idempotent)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def status(self) -> Dict[str, Any]:
+        return {"ready": self.ready, "tasks": {k: dict(v) for k, v in self._status.items()}}
+
+
+WARMUP = Warmup()
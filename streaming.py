@@ -0,0 +1,106 @@
+# streaming.py
+"""
+Event streaming για το /chat/stream (SSE) και το /chat/ws — χωρίς αλλαγή στη ροή του chat_endpoint.
+
+Το chat_endpoint τρέχει αυτούσιο μέσα σε task· όποιος helper θέλει να στείλει κάτι
+νωρίς καλεί emit(...), που είναι no-op όταν δεν υπάρχει ενεργό stream (π.χ. /chat).
+
+Events (SSE `event:` + JSON `data:`):
+- partial : ντετερμινιστικό κομμάτι έτοιμο πριν το LLM ({"text", "map_url"?, "source"})
+- token   : LLM delta ({"delta", "source"}) — ο client τα κολλάει ανά source
+- done    : η τελική απάντηση όπως θα την έδινε το /chat ({"reply", "map_url"?})
+- error   : {"status", "error"}
+
+Το `done` είναι πάντα η αυθεντική απάντηση (μετά από enrich/adaptation)· τα partial/token
+είναι προεπισκόπηση.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Dict, Optional, Tuple
+
+from fastapi import Response
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class _Emitter:
+    __slots__ = ("queue", "loop")
+
+    def __init__(self, queue: "asyncio.Queue", loop: asyncio.AbstractEventLoop):
+        self.queue = queue
+        self.loop = loop
+
+    def __call__(self, event: str, data: Dict[str, Any]) -> None:
+        # thread-safe: tools που τρέχουν σε worker thread μπορούν επίσης να κάνουν emit
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, (event, data))
+
+
+_EMITTER: ContextVar[Optional[_Emitter]] = ContextVar("chat_stream_emitter", default=None)
+
+
+def active() -> bool:
+    return _EMITTER.get() is not None
+
+
+def emit(event: str, data: Dict[str, Any]) -> None:
+    em = _EMITTER.get()
+    if em is not None:
+        em(event, data)
+
+
+def _sse(event: str, data: Dict[str, Any]) -> Dict[str, str]:
+    return {"event": event, "data": json.dumps(data, ensure_ascii=False)}
+
+
+def _final_event(result: Any) -> Tuple[str, Dict[str, Any]]:
+    if isinstance(result, Response):
+        # JSONResponse από το chat_endpoint (413/500/504) → error event με το ίδιο status
+        try:
+            payload = json.loads(bytes(result.body or b"{}").decode("utf-8"))
+        except Exception:
+            payload = {}
+        return "error", {"status": result.status_code, "error": payload.get("error") or payload.get("detail") or ""}
+    return "done", result if isinstance(result, dict) else {"reply": str(result or "")}
+
+
+async def events(work: Awaitable[Any]) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Τρέχει το `work` (coroutine του chat_endpoint) και δίνει (event, data) καθώς παράγονται."""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    token = _EMITTER.set(_Emitter(queue, loop))
+    try:
+        # το task κληρονομεί αντίγραφο του context → βλέπει τον emitter
+        task = asyncio.ensure_future(work)
+    finally:
+        _EMITTER.reset(token)
+    task.add_done_callback(lambda _t: queue.put_nowait((_DONE, None)))
+
+    try:
+        while True:
+            event, data = await queue.get()
+            if event is _DONE:
+                break
+            yield event, data
+        try:
+            result = task.result()
+        except Exception:
+            logger.exception("chat stream task failed")
+            yield "error", {"status": 500, "error": "Agent execution error"}
+            return
+        yield _final_event(result)
+    finally:
+        # Αποσύνδεση client: αφήνουμε το task να ολοκληρωθεί ώστε το session να μείνει συνεπές
+        if not task.done():
+            logger.info("chat stream client went away; finishing turn in background")
+
+
+async def run(work: Awaitable[Any]) -> AsyncIterator[Dict[str, str]]:
+    """Ίδια events σε μορφή EventSourceResponse (SSE)."""
+    async for event, data in events(work):
+        yield _sse(event, data)
@@ -0,0 +1,36 @@
+# tests/test_artifacts.py
+import artifacts
+import greeklish
+
+
+def _use_bundle(monkeypatch, path):
+    monkeypatch.setattr(artifacts, "_BUNDLE", artifacts.Bundle(str(path)))
+    monkeypatch.setattr(artifacts, "_OPENED", True)
+
+
+def test_bundle_roundtrip_and_stale_section_rebuilds(tmp_path, monkeypatch):
+    src = tmp_path / "src.json"
+    src.write_text("[1, 2]", encoding="utf-8")
+    calls = []
+    monkeypatch.setattr(artifacts, "_SECTIONS", dict(artifacts._SECTIONS))
+    artifacts.register("test.section", lambda: calls.append(1) or "από την πηγή", sources=(str(src),))
+    out = tmp_path / "bundle.bin"
+    artifacts.write(str(out), {"test.section": (artifacts.digest([str(src)]), "από το bundle")})
+    _use_bundle(monkeypatch, out)
+
+    assert artifacts.load("test.section") == "από το bundle" and not calls
+    src.write_text("[1, 2, 3]", encoding="utf-8")  # άλλαξε η πηγή → stale
+    assert artifacts.load("test.section") == "από την πηγή" and calls == [1]
+
+
+def test_alias_index_from_bundle_matches_source(tmp_path, monkeypatch):
+    out = tmp_path / "artifacts.bin"
+    sizes = artifacts.build(str(out))
+    assert {"livedata.areas", "tools.gazetteer", "intents.examples", "phrases.trendy"} <= set(sizes)
+    _use_bundle(monkeypatch, out)
+
+    import livedata
+    idx = artifacts.load("livedata.areas")
+    assert isinstance(idx, greeklish.PlaceIndex)
+    for text in ("farmakeio sta vrahneika", "paralia patron", "στο Ρίο"):
+        assert idx.search(text) == livedata.current().area_index.search(text)
@@ -0,0 +1,20 @@
+# tests/test_benchmarks.py
+from benchmarks.core import Case, compare, measure
+
+
+def test_compare_flags_only_slower_than_threshold():
+    rows = compare(
+        {"a": 130.0, "b": 100.0, "c": 50.0},
+        {"a": 100.0, "b": 100.0},
+        threshold=1.25,
+    )
+    by_name = {r["name"]: r for r in rows}
+    assert by_name["a"]["regression"] is True
+    assert by_name["b"]["regression"] is False
+    # νέο case χωρίς baseline δεν θεωρείται regression
+    assert by_name["c"]["ratio"] is None and by_name["c"]["regression"] is False
+
+
+def test_measure_returns_positive_ns_per_op():
+    c = Case(name="lower", fn=str.lower, inputs=["ΠΑΤΡΑ", "Αθήνα"])
+    assert measure(c, repeat=1, target_sec=0.001) > 0
@@ -0,0 +1,91 @@
+# tests/test_entity_parser.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import entity_parser
+import intents
+from entity_parser import NerService
+
+
+class _FakeNlp:
+    """Ελάχιστο nlp: κάθε λέξη με κεφαλαίο είναι GPE. Καταγράφει τα batches του pipe."""
+
+    def __init__(self, gate=None):
+        self.batches = []
+        self.gate = gate
+
+    def _doc(self, text):
+        ents = [SimpleNamespace(text=w, label_="GPE") for w in text.split() if w[:1].isupper()]
+        return SimpleNamespace(ents=ents)
+
+    def __call__(self, text):
+        return self._doc(text)
+
+    def pipe(self, texts, batch_size=1):
+        if self.gate is not None:
+            self.gate.wait(2)
+        self.batches.append(list(texts))
+        return [self._doc(t) for t in texts]
+
+
+def _ready(svc):
+    svc.start()
+    for _ in range(200):
+        if svc.ready:
+            return svc
+        time.sleep(0.01)
+    raise AssertionError(svc.state)
+
+
+def test_fallback_to_rule_based_while_cold():
+    svc = NerService(loader=lambda _m: _FakeNlp())
+    text = "θέλω ταξί για Πάτρα"
+    assert svc.extract(text) == intents.extract_entities(text)
+    assert svc.stats["fallback"] == 1
+
+
+def test_failed_load_keeps_rule_based():
+    def boom(_m):
+        raise OSError("no model")
+    svc = NerService(loader=boom)
+    svc.start()
+    for t in list(svc._threads):
+        t.join(2)
+    assert svc.state == "failed"
+    assert svc.extract("ταξί για Αθήνα") == intents.extract_entities("ταξί για Αθήνα")
+
+
+def test_module_api_without_spacy_model():
+    # εδώ το spaCy/μοντέλο δεν είναι ζεστό: ίδιο αποτέλεσμα με το rule-based
+    assert entity_parser.extract_entities("ταξί για Πάτρα")["TO"] == "Πάτρα"
+
+
+def test_ner_results_are_cached():
+    nlp = _FakeNlp()
+    svc = _ready(NerService(loader=lambda _m: nlp, batch_wait_ms=0))
+    try:
+        assert svc.extract("Ρίο Πάτρα", fallback_rule_based=False) == {"TO": ["Ρίο", "Πάτρα"]}
+        assert svc.extract("Ρίο Πάτρα", fallback_rule_based=False) == {"TO": ["Ρίο", "Πάτρα"]}
+        assert len(nlp.batches) == 1 and svc.stats["cache"] == 1
+    finally:
+        svc.stop()
+
+
+def test_concurrent_requests_share_a_pipe_batch():
+    gate = threading.Event()
+    nlp = _FakeNlp(gate=gate)
+    svc = _ready(NerService(loader=lambda _m: nlp, batch_size=8, batch_wait_ms=50, timeout=5))
+    try:
+        texts = [f"Πόλη{i}" for i in range(6)]
+        with ThreadPoolExecutor(6) as ex:
+            futs = [ex.submit(svc.extract, t, False) for t in texts]
+            time.sleep(0.02)
+            gate.set()
+            results = [f.result() for f in futs]
+        assert results == [{"TO": t} for t in texts]
+        assert sum(len(b) for b in nlp.batches) == 6
+        assert len(nlp.batches) < 6  # μαζεύτηκαν σε batch αντί για ένα pipe ανά αίτημα
+    finally:
+        svc.stop()
@@ -0,0 +1,48 @@
+# tests/test_greeklish.py
+import greeklish
+import intents
+import tools
+from textnorm import NormText
+
+
+def test_skeleton_is_shared_by_greek_and_greeklish():
+    sk = greeklish.skeleton
+    assert sk("Βραχνέικα") == sk("vrahneika") == sk("brahneika")
+    assert sk("βραχναϊκα") == sk("vraxnaika") == sk("braxnaika")
+    assert sk("μέχρι") == sk("mexri") == sk("mehri") == sk("mechri")
+    assert sk("Θήβα") == sk("thiva") == sk("8iva")
+    assert sk("εφημερία") == sk("efhmeria") == sk("efimeria")
+    assert sk("Μεσσάτιδα") == sk("mesatida")
+
+
+def test_to_greek_feeds_greek_triggers():
+    assert greeklish.to_greek("poso kostizei apo patra") == "ποσο κοστιζει απο πατρα"
+    assert greeklish.with_greek("Ρίο") == "ρίο"  # χωρίς λατινικά: ίδιο κείμενο
+    assert greeklish.with_greek("farmakeio").endswith("\nφαρμακειο")
+
+
+def test_normtext_caches_skeleton():
+    t = NormText("apo patra mexri athina")
+    assert greeklish.skeleton(t) is t.skeleton
+    assert greeklish.to_greek(t) is t.greek
+
+
+def test_alias_index_priority_and_prefix():
+    idx = greeklish.AliasIndex({"Πάτρα": ["πατρα"], "Παραλία": ["παραλια πατρων"]})
+    assert idx.lookup("PATRA") == "Πάτρα"
+    assert idx.search("φαρμακείο paralia patron και patra") == "Πάτρα"  # πρώτο value νικά
+    assert idx.search("πατρας") is None
+    assert idx.search("πατρας", prefix=True) == "Πάτρα"
+
+
+def test_area_aliases_resolve_greeklish_without_listing_it():
+    # οι λατινικές γραφές αφαιρέθηκαν από το constants.AREA_ALIASES
+    for text in ("vraxnaika", "braxnaika", "vrahneika", "brahneika"):
+        assert tools._area_from_text(f"farmakeio sta {text}") == "Βραχνέικα"
+    assert tools._area_from_text("paralia patron") == "Παραλία Πατρών"
+    assert intents.extract_area("efhmeria sto rio") == "Ρίο"
+
+
+def test_preclean_route_text_handles_greeklish_connectives():
+    assert tools._preclean_route_text("apo patra mechri athina poso kanei?") == "από patra μέχρι athina"
+    assert tools._preclean_route_text("από το Ρίο για Πάτρα") == "από το Ρίο για Πάτρα"
@@ -0,0 +1,121 @@
+# tests/test_hashring.py
+import fnmatch
+
+import main
+from hashring import HashRing
+
+NODES = ["redis://a", "redis://b", "redis://c"]
+KEYS = [f"mrbooky:session:{i}" for i in range(3000)]
+
+
+class DictRedis:
+    """Ελάχιστος Redis client σε dict (get/set/ttl/delete/scan_iter) για τα tests του store."""
+
+    def __init__(self):
+        self.data = {}
+        self.up = True
+
+    def _check(self):
+        if not self.up:
+            raise ConnectionError("down")
+
+    def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        self._check()
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def ttl(self, key):
+        self._check()
+        return 60 if key in self.data else -2
+
+    def delete(self, key):
+        self._check()
+        return int(self.data.pop(key, None) is not None)
+
+    def scan_iter(self, match="*", count=None):
+        self._check()
+        return [k for k in list(self.data) if fnmatch.fnmatch(k, match)]
+
+
+def _store(urls):
+    clients = {}
+    store = main.ShardedRedisStore(urls, client_factory=lambda u: clients.setdefault(u, DictRedis()))
+    return store, clients
+
+
+def test_ring_is_balanced_and_adding_a_node_moves_about_a_quarter():
+    ring = HashRing(NODES)
+    spread = ring.spread(KEYS)
+    assert min(spread.values()) > len(KEYS) / 3 * 0.8
+    bigger = ring.with_node("redis://d")
+    moved = [k for k in KEYS if ring.node_for(k) != bigger.node_for(k)]
+    # μετακινούνται μόνο ~1/4 των keys, και όλα προς τον νέο κόμβο
+    assert 0.15 < len(moved) / len(KEYS) < 0.35
+    assert {bigger.node_for(k) for k in moved} == {"redis://d"}
+
+
+def test_skip_routes_to_next_node():
+    ring = HashRing(NODES)
+    for k in KEYS[:200]:
+        alt = ring.node_for(k, skip={ring.node_for(k)})
+        assert alt in NODES and alt != ring.node_for(k)
+    assert ring.node_for("x", skip=set(NODES)) is None
+
+
+def test_add_node_read_through_and_rebalance():
+    store, clients = _store(NODES)
+    st = main.SessionState(intent="TripCostIntent", slots={"destination": "Αθήνα"})
+    for i in range(200):
+        store.set(f"s{i}", st)
+    store.add_node("redis://d", rebalance=False)
+    assert store.get("s0") == st and store.get("s1") == st  # read-through από τον παλιό κόμβο
+    moved = store.rebalance()
+    assert 0 < moved < 200 and store._prev is None
+    for i in range(200):
+        key = f"mrbooky:session:s{i}"
+        owner = store.ring.node_for(key)
+        assert [u for u, c in clients.items() if key in c.data] == [owner]
+        assert store.get(f"s{i}") == st
+
+
+def test_move_keeps_source_when_destination_is_down():
+    store, clients = _store(NODES)
+    st = main.SessionState(intent="TripCostIntent")
+    for i in range(100):
+        store.set(f"s{i}", st)
+    clients["redis://d"] = down = DictRedis()
+    down.up = False
+    store.add_node("redis://d", rebalance=False)
+    assert store.rebalance() == 0 and store._prev is not None  # τίποτα δεν σβήστηκε από τους παλιούς κόμβους
+    assert sum(len(c.data) for u, c in clients.items() if u != "redis://d") == 100
+    assert all(store.get(f"s{i}") == st for i in range(100))  # read-through: διαβάζει, δεν σβήνει
+    assert sum(len(c.data) for u, c in clients.items() if u != "redis://d") == 100
+    down.up = True
+    store._down.clear()
+    assert store.rebalance() > 0 and store._prev is None
+    assert all(store.get(f"s{i}") == st for i in range(100))
+
+
+def test_failed_node_degrades_to_fresh_state():
+    store, clients = _store(NODES)
+    st = main.SessionState(intent="TripCostIntent")
+    store.set("s1", st)
+    owner = store.ring.node_for("mrbooky:session:s1")
+    clients[owner].up = False
+    assert store.get("s1") is None  # fresh state, χωρίς exception
+    store.set("s1", st)  # πάει στον επόμενο κόμβο του ring όσο ο owner είναι down
+    assert store.get("s1") == st
+    assert [u for u, c in clients.items() if "mrbooky:session:s1" in c.data and u != owner]
+
+
+def test_unreachable_redis_does_not_raise():
+    store = main.ShardedRedisStore(["redis://127.0.0.1:1/0", "redis://127.0.0.1:2/0"], timeout=0.05)
+    assert store.get("s1") is None
+    store.set("s1", main.SessionState())
+    store.delete("s1")
@@ -0,0 +1,74 @@
+# tests/test_idempotency.py
+import asyncio
+
+import idempotency
+
+
+def _cache():
+    return idempotency.ReplyCache(idempotency.MemoryReplyStore())
+
+
+def test_retry_returns_cached_reply_without_rerun():
+    cache, calls = _cache(), []
+
+    async def work():
+        calls.append(1)
+        return {"reply": f"κωδικός {len(calls)}"}
+
+    async def go():
+        key, ttl = idempotency.message_key("s1", "m-1", "ναι")
+        a = await cache.run(key, ttl, work)
+        b = await cache.run(key, ttl, work)
+        return a, b
+
+    a, b = asyncio.run(go())
+    assert a == b == {"reply": "κωδικός 1"} and len(calls) == 1
+
+
+def test_concurrent_retry_waits_for_inflight():
+    cache, calls = _cache(), []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"reply": "ok"}
+
+    async def go():
+        key, ttl = idempotency.message_key("s1", None, "ναι")
+        return await asyncio.gather(cache.run(key, ttl, work), cache.run(key, ttl, work))
+
+    assert asyncio.run(go()) == [{"reply": "ok"}, {"reply": "ok"}] and len(calls) == 1
+
+
+def test_same_short_answer_on_next_turn_runs_again():
+    cache, calls = _cache(), []
+
+    async def work():
+        calls.append(1)
+        return {"reply": f"βήμα {len(calls)}"}
+
+    async def go():
+        # "ναι" → διεύθυνση → "ναι" μέσα στο IDEMPOTENCY_DERIVED_SEC, χωρίς message id
+        return [await cache.run_message("s1", None, t, work) for t in ("ναι", "Κορίνθου 10", "ναι")]
+
+    assert asyncio.run(go()) == [{"reply": "βήμα 1"}, {"reply": "βήμα 2"}, {"reply": "βήμα 3"}]
+
+
+def test_concurrent_retry_without_id_waits_for_inflight():
+    cache, calls = _cache(), []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"reply": "ok"}
+
+    async def go():
+        return await asyncio.gather(*(cache.run_message("s1", None, "ναι", work) for _ in range(2)))
+
+    assert asyncio.run(go()) == [{"reply": "ok"}, {"reply": "ok"}] and len(calls) == 1
+
+
+def test_message_key_scoped_by_session_and_id():
+    assert idempotency.message_key("a", "1", "x")[0] != idempotency.message_key("b", "1", "x")[0]
+    assert idempotency.message_key("a", None, " ναι ")[0] == idempotency.message_key("a", None, "ναι")[0]
+    assert idempotency.message_key("a", None, "ναι")[1] == idempotency.IDEMPOTENCY_DERIVED_SEC
@@ -0,0 +1,163 @@
+# tests/test_jobs.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import jobs
+import router_and_booking as rb
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    q = jobs.JobQueue(jobs.SQLiteJobStore(":memory:"), lease_sec=30)
+    monkeypatch.setattr(jobs, "backoff", lambda attempts, **kw: 0.0)  # retries αμέσως due
+    jobs.set_queue(q)
+    yield q
+    jobs.set_queue(None)
+
+
+def _drain(q):
+    async def go():
+        while await q.run_once():
+            pass
+    asyncio.run(go())
+
+
+def test_retry_then_done(queue, monkeypatch):
+    calls = []
+
+    def flaky(payload):
+        calls.append(payload["n"])
+        if len(calls) < 3:
+            raise ConnectionError("upstream down")
+        return {"ok": True}
+
+    monkeypatch.setitem(jobs.HANDLERS, "t.flaky", jobs._Handler(flaky))
+    job = queue.enqueue("t.flaky", {"n": 1}, key="k1")
+    _drain(queue)
+    done = queue.store.get(job.id)
+    assert (done.status, done.attempts, done.result) == (jobs.DONE, 3, {"ok": True})
+
+
+def test_dead_letter_and_requeue(queue, monkeypatch):
+    dead = []
+
+    def broken(payload):
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(jobs.HANDLERS, "t.broken", jobs._Handler(broken, on_dead=dead.append))
+    job = queue.enqueue("t.broken", {}, max_attempts=2)
+    _drain(queue)
+    assert queue.store.get(job.id).status == jobs.DEAD and len(dead) == 1
+    assert [j.id for j in queue.store.dead_letters()] == [job.id]
+    assert queue.requeue(job.id).status == jobs.QUEUED
+
+
+def test_expired_lease_is_reclaimed(queue):
+    job = queue.enqueue("t.none", {})
+    assert queue.store.claim(1e12, lease_sec=0).id == job.id  # "πέθανε" ο worker
+    again = queue.store.claim(1e12, lease_sec=30)
+    assert again.id == job.id and again.attempts == 2
+
+
+def test_expired_lease_on_last_attempt_is_dead(queue, monkeypatch):
+    dead = []
+    monkeypatch.setitem(jobs.HANDLERS, "t.hang", jobs._Handler(lambda p: {}, on_dead=dead.append))
+    job = queue.enqueue("t.hang", {}, max_attempts=1)
+    assert queue.store.claim(1e12, lease_sec=-1e12).attempts == 1  # ο worker χάθηκε στη μοναδική προσπάθεια
+    assert asyncio.run(queue.run_once()) is True
+    out = queue.store.get(job.id)
+    assert (out.status, out.attempts, out.error) == (jobs.DEAD, 1, jobs.LEASE_EXPIRED)
+    assert [j.id for j in dead] == [job.id] and queue.store.claim(1e12, lease_sec=30) is None
+
+
+def test_finalize_returns_immediately_and_reports_next_turn(queue, monkeypatch):
+    monkeypatch.setattr(rb, "_create_remote", lambda payload: {"created_remote": True, "info": "✅"})
+    monkeypatch.setattr(rb, "trendy_phrase", lambda **kw: "")
+    st = SimpleNamespace(
+        slots={}, last_offered="booking_confirm",
+        booking_slots={"origin": "Πάτρα", "destination": "Ρίο", "pickup_time": "18:30", "name": "Νίκος", "phone": "6900000000"},
+    )
+    reply = rb.booking_finalize(st)["reply"]
+    code = st.slots["booking_job"]["code"]
+    assert code in reply and "⏳" in reply
+    assert rb.booking_status(code)["state"] == "pending"
+    assert rb.booking_status_update(st) is None
+
+    _drain(queue)  # create + notify
+    assert rb.booking_status(code)["state"] == "created"
+    assert code in rb.booking_status_update(st)
+    assert "booking_job" not in st.slots
+    assert [j.kind for j in queue.store.by_key(code)] == ["booking.create", "booking.notify"]
+
+
+def test_finalize_retry_is_idempotent(queue, monkeypatch):
+    monkeypatch.setattr(rb, "trendy_phrase", lambda **kw: "")
+    slots = {"origin": "Πάτρα", "destination": "Ρίο", "pickup_time": "18:30", "name": "Νίκος",
+             "phone": "6900000000", "booking_key": "k-123"}
+    # δύο "ναι" (π.χ. retry του client πάνω σε παλιό state) → ίδιος κωδικός, ένα job
+    st1 = SimpleNamespace(slots={}, last_offered="booking_confirm", booking_slots=dict(slots))
+    st2 = SimpleNamespace(slots={}, last_offered="booking_confirm", booking_slots=dict(slots))
+    rb.booking_finalize(st1)
+    rb.booking_finalize(st2)
+    code = st1.slots["booking_job"]["code"]
+    assert st2.slots["booking_job"] == st1.slots["booking_job"]
+    assert len(queue.store.by_key(code)) == 1
+
+
+def test_colliding_booking_codes_get_separate_jobs(queue, monkeypatch):
+    monkeypatch.setattr(rb, "trendy_phrase", lambda **kw: "")
+    seen = {}
+    for i in range(100_000):  # δύο booking_key με το ίδιο 4-ψήφιο suffix την ίδια μέρα
+        code = rb._booking_code(f"k{i}", day="20260101")
+        if code in seen:
+            a, b = seen[code], f"k{i}"
+            break
+        seen[code] = f"k{i}"
+    slots = {"origin": "Πάτρα", "destination": "Ρίο", "pickup_time": "18:30", "booking_day": "20260101"}
+    st1 = SimpleNamespace(slots={}, last_offered="booking_confirm",
+                          booking_slots={**slots, "name": "Νίκος", "phone": "6900000000", "booking_key": a})
+    st2 = SimpleNamespace(slots={}, last_offered="booking_confirm",
+                          booking_slots={**slots, "name": "Μαρία", "phone": "6911111111", "booking_key": b})
+    rb.booking_finalize(st1)
+    rb.booking_finalize(st2)
+    j1, j2 = st1.slots["booking_job"], st2.slots["booking_job"]
+    assert j1["code"] == code and j2["code"] != code and j1["job"] != j2["job"]
+    assert queue.store.get(j2["job"]).payload["slots"]["name"] == "Μαρία"
+    assert [j.payload["slots"]["name"] for j in queue.store.by_key(j2["code"])] == ["Μαρία"]
+    # retry του δεύτερου (και μετά τα μεσάνυχτα: η μέρα είναι στα slots) → ίδιος κωδικός, κανένα νέο job
+    st3 = SimpleNamespace(slots={}, last_offered="booking_confirm", booking_slots=dict(st2.booking_slots))
+    rb.booking_finalize(st3)
+    assert st3.slots["booking_job"] == j2 and len(queue.store.by_key(j2["code"])) == 1
+
+
+def test_booking_router_runs_off_the_event_loop(monkeypatch):
+    import threading
+
+    from fastapi.testclient import TestClient
+
+    import main
+
+    seen = []
+
+    def router(st, text):
+        seen.append(threading.current_thread())
+        return {"reply": "📝 Προ-κράτηση καταγράφηκε."}
+
+    monkeypatch.setattr(main, "maybe_handle_followup_or_booking", router)
+    loop_threads = []
+
+    async def probe():
+        return threading.current_thread()
+
+    real = main._chat_turn
+
+    async def turn(body, request):
+        loop_threads.append(await probe())
+        return await real(body, request)
+
+    monkeypatch.setattr(main, "_chat_turn", turn)
+    r = TestClient(main.app).post("/chat", json={"message": "ναι", "session_id": "t_router_thread"})
+    assert r.status_code == 200 and "Προ-κράτηση" in r.json()["reply"]
+    assert seen and seen[0] is not loop_threads[0]  # enqueue/lookup όχι στο thread του event loop
@@ -0,0 +1,36 @@
+# tests/test_language_id.py
+import random
+
+import language_id
+
+
+def test_greek_script_fast_path():
+    g = language_id.detect("Πόσο κάνει μέχρι την Αθήνα;")
+    assert (g.lang, g.script) == ("el", "greek")
+
+
+def test_greeklish_vs_foreign():
+    assert language_id.identify("poso kanei mexri tin athina") == "el-latn"
+    assert language_id.identify("how much is a taxi to the airport?") == "en"
+    assert language_id.identify("wie viel kostet ein Taxi nach Athen") == "de"
+    # greeklish μετράει ως ελληνικά → καμία μετάφραση
+    assert language_id.is_greek(language_id.identify("thelo taxi gia avrio"))
+
+
+def test_uncertain_messages_return_none():
+    # σύντομα / αριθμοί / ώρες δεν αλλάζουν τη γλώσσα του session
+    for text in ("ok", "18:30", "6900000000", ""):
+        assert language_id.identify(text) is None
+
+
+def test_unmodelled_script_is_other():
+    assert language_id.identify("Сколько стоит такси до аэропорта?") == language_id.OTHER
+
+
+def test_train_smoke():
+    rng = random.Random(1)
+    assert language_id.to_greeklish("θέλω ταξί", rng).isascii()
+    corpus = language_id.build_corpus({"el": ["πόσο κάνει το ταξί"], "en": ["how much is the taxi"]})
+    model = language_id.NgramModel.train(corpus)
+    assert model.predict("poso kanei")[0] == "el-latn"
+    assert model.predict("how much")[0] == "en"
@@ -0,0 +1,75 @@
+# tests/test_livedata.py
+import json
+import shutil
+
+import constants
+import livedata
+import tools
+from quotes import Quote
+
+
+def _live_copy(tmp_path, monkeypatch):
+    path = tmp_path / "constants.json"
+    shutil.copy(livedata.CONSTANTS_FILE, path)
+    monkeypatch.setattr(livedata, "CONSTANTS_FILE", str(path))
+    monkeypatch.setattr(livedata, "_CURRENT", livedata.current())  # επαναφορά μετά το test
+    monkeypatch.setattr(livedata, "_DERIVED", dict(livedata._DERIVED))
+    return path
+
+
+def _edit(path, fn):
+    data = json.loads(path.read_text(encoding="utf-8"))
+    fn(data)
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+
+def test_reload_swaps_tariff_indexes_and_derived(tmp_path, monkeypatch):
+    path = _live_copy(tmp_path, monkeypatch)
+    livedata.derive("day_km_label", lambda snap: f"{snap.day_km:.2f}€/km")
+    before = livedata.current()
+    q = Quote.new("Πάτρα", "Αθήνα", price_eur=200.0)
+
+    def change(d):
+        d["taxi_tariff"]["km_rate_zone1"] = 1.10
+        d["area_aliases"]["Ρίο"].append("καστελλοκαμπος")
+    _edit(path, change)
+    assert livedata.reload()
+
+    snap = livedata.current()
+    assert snap.version == before.version + 1 and snap.tariff_version == snap.version
+    assert snap.get("day_km_label") == "1.10€/km" and before.get("day_km_label") == "0.90€/km"
+    assert tools._area_from_text("πάμε καστελλόκαμπος") == "Ρίο"
+    assert constants.TAXI_TARIFF["km_rate_zone1"] == 1.10
+    assert q.expired  # η τιμή βγήκε με τον παλιό τιμοκατάλογο
+
+
+def test_ui_change_keeps_tariff_version_and_bad_file_keeps_snapshot(tmp_path, monkeypatch):
+    path = _live_copy(tmp_path, monkeypatch)
+    before = livedata.current()
+    _edit(path, lambda d: d["ui_text"].update(fare_disclaimer="⚠️ Χωρίς διόδια."))
+    assert livedata.reload()
+    snap = livedata.current()
+    assert snap.tariff_version == before.tariff_version and snap.area_index is before.area_index
+    assert snap.ui_text["fare_disclaimer"] == "⚠️ Χωρίς διόδια."
+
+    path.write_text('{"taxi_tariff": ', encoding="utf-8")  # μισογραμμένο αρχείο
+    assert not livedata.reload() and livedata.current() is snap
+
+
+def test_one_area_index_for_aliases_and_pharmacy_synonyms():
+    import intents
+
+    # synonyms που υπήρχαν μόνο στο PHARMACY_AREAS
+    assert tools.detect_area_for_pharmacy("εφημερια στο πανεπιστημιο") == "Ρίο"
+    assert tools.detect_area_for_pharmacy("farmakeio ovrya") == "Μεσσάτιδα"
+    # νικά το μακρύτερο alias: "παραλια πατρας" πριν από το "πατρα" (και με prefix)
+    for text in ("φαρμακείο παραλία πάτρας", "farmakeio paralia patras"):
+        assert tools.detect_area_for_pharmacy(text) == intents.extract_area(text) == "Παραλία Πατρών"
+    assert intents.extract_area("φαρμακεία βραχνεικων") == "Βραχνέικα"
+
+
+def test_area_aliases_win_over_pharmacy_synonyms():
+    # "κεντρο" είναι synonym της Πάτρας στα pharmacy_areas, αλλά alias του Κέντρου Πάτρας στο area_aliases
+    assert tools.detect_area_for_pharmacy("φαρμακείο στο κέντρο") == "Κέντρο Πάτρας"
+    assert tools.detect_area_for_pharmacy("φαρμακείο κέντρο πάτρας") == "Πάτρα"
+    assert tools.detect_area_for_pharmacy("πλατεία γεωργίου") == "Πάτρα"
@@ -0,0 +1,34 @@
+# tests/test_loadtest_stubs.py
+from fastapi.testclient import TestClient
+
+from api_clients import TimologioClient
+from loadtest.loadgen import Report, Sample
+from loadtest.stubs import StubConfig, create_app
+
+
+def test_timologio_dialogflow_variant_is_parseable():
+    app = create_app(StubConfig(timologio_variant="dialogflow"))
+    with TestClient(app) as c:
+        fare = c.get("/timologio/fare", params={"origin": "Πάτρα", "destination": "Αθήνα"}).json()
+        assert "price_eur" not in fare  # ο client πρέπει να πάει στο webhook
+        df = c.post("/timologio/webhook", json={"origin": "Πάτρα", "destination": "Αθήνα"}).json()
+    parsed = TimologioClient._parse_timologio(df)
+    assert parsed["price_eur"] > 0 and parsed["distance_km"] > 0
+    assert parsed["map_url"].startswith("https://www.google.com/maps/dir/")
+
+
+def test_per_service_error_injection():
+    cfg = StubConfig(seed=1, services={"slack": {"error_rate": 1.0}})
+    with TestClient(create_app(cfg)) as c:
+        assert c.post("/slack/webhook", json={"text": "x"}).status_code == 503
+        # οι υπόλοιπες υπηρεσίες δεν επηρεάζονται
+        assert c.get("/pharmacy-api/pharmacy", params={"area": "Πάτρα"}).status_code == 200
+        stats = c.get("/__stub/stats").json()["stats"]
+    assert stats["slack"]["errors"] == 1 and stats["pharmacy"]["errors"] == 0
+
+
+def test_report_percentiles():
+    r = Report(samples=[Sample("quote", float(ms), 200, True) for ms in range(1, 101)], wall_sec=2.0)
+    s = r.summary()
+    assert s["requests"] == 100 and s["rps"] == 50.0
+    assert 50 <= s["p50_ms"] <= 51 and s["p99_ms"] >= 99
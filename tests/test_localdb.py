@@ -0,0 +1,87 @@
+# tests/test_localdb.py
+import asyncio
+import sqlite3
+import subprocess
+import sys
+
+import idempotency
+import localdb
+import main
+import security
+
+
+def test_sessions_are_shared_through_the_file(tmp_path):
+    path = str(tmp_path / "local.sqlite3")
+    a, b = main.SQLiteStore(path), main.SQLiteStore(path)
+    st = main.SessionState(intent="OnDutyPharmacyIntent", slots={"area": "Ρίο"})
+    a.set("s1", st)
+    assert b.get("s1") == st
+    b.delete("s1")
+    assert a.get("s1") is None
+
+
+def test_reply_store_claim_is_set_nx_with_lease(tmp_path):
+    store = idempotency.SQLiteReplyStore(str(tmp_path / "local.sqlite3"))
+    assert store.claim("k", 60) and not store.claim("k", 60)
+    assert store.pending("k") and store.get("k") is None
+    store.set("k", '{"reply": "ok"}', 60)
+    store.release("k")  # δεν σβήνει απάντηση που γράφτηκε ήδη
+    assert store.get("k") == '{"reply": "ok"}'
+    assert store.claim("expired", 0) and store.claim("expired", 60)  # ληγμένο lease → ξανά claim
+
+
+def test_rate_limit_buckets_are_shared_across_processes(tmp_path):
+    path = str(tmp_path / "local.sqlite3")
+    rl = security.SQLiteRateLimiter(path)
+    bucket = [security.make_bucket("ip:1.2.3.4", window_sec=60, max_req=3)]
+    assert rl.take(bucket).allowed
+    # δεύτερο process (όπως ένας άλλος gunicorn worker) ξοδεύει τα υπόλοιπα tokens
+    code = (
+        "import security\n"
+        f"rl = security.SQLiteRateLimiter({path!r})\n"
+        "b = [security.make_bucket('ip:1.2.3.4', window_sec=60, max_req=3)]\n"
+        "assert rl.take(b).allowed and rl.take(b).allowed\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+    d = rl.take(bucket)
+    assert not d.allowed and d.retry_after > 0
+
+
+def test_locked_db_does_not_block_the_event_loop(tmp_path):
+    path = str(tmp_path / "local.sqlite3")
+    rl = security.SQLiteRateLimiter(path)
+    cache = idempotency.ReplyCache(idempotency.SQLiteReplyStore(path))
+    bucket = [security.make_bucket("ip:1.2.3.4", window_sec=60, max_req=3)]
+    blocker = sqlite3.connect(path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")  # άλλος worker κρατά το lock
+
+    async def scenario():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        async def work():
+            return {"reply": "ok"}
+
+        ticker = asyncio.create_task(tick())
+        pending = asyncio.gather(rl.acquire(bucket), cache.run("k", 60, work))
+        await asyncio.sleep(0.2)
+        blocker.execute("COMMIT")
+        out = await pending
+        ticker.cancel()
+        return out, ticks
+
+    (decision, reply), ticks = asyncio.run(scenario())
+    assert decision.allowed and reply == {"reply": "ok"}
+    assert ticks >= 10  # το loop συνέχισε να τρέχει όσο περίμεναν το lock
+
+
+def test_kv_ttl(tmp_path):
+    db = localdb.LocalDB(str(tmp_path / "kv.sqlite3"))
+    db.set("ns", "a", "1", ttl=60)
+    db.set("ns", "b", "2", ttl=-1)
+    assert db.get("ns", "a") == "1" and db.get("ns", "b") is None
@@ -0,0 +1,69 @@
+# tests/test_phrases.py
+import json
+import random
+import time
+from collections import Counter
+
+import pytest
+
+import phrases
+
+
+def _write(path, items):
+    path.write_text(json.dumps(items, ensure_ascii=False), encoding="utf-8")
+
+
+@pytest.fixture
+def phrase_file(tmp_path, monkeypatch):
+    f = tmp_path / "trendy.json"
+    _write(f, [
+        {"text": "A", "emotion": "joy", "context_tags": ["success"], "lang": "el", "weight": 3.0},
+        {"text": "B", "emotion": "neutral", "context_tags": ["generic"], "lang": "el", "weight": 1.0},
+        {"text": "C", "emotion": "joy", "context_tags": ["success"], "lang": "el", "nsfw": True},
+    ])
+    monkeypatch.setattr(phrases, "_FILE", str(f))
+    monkeypatch.setattr(phrases, "_LOADED", False)
+    monkeypatch.setattr(phrases, "_INDEX", phrases._PhraseIndex([]))
+    yield f
+    phrases.stop_watcher()
+
+
+def test_weighted_draws_follow_weights(phrase_file):
+    random.seed(7)
+    c = Counter(phrases.pick_trendy_phrase(emotion="joy", context="success") for _ in range(20000))
+    assert set(c) == {"A", "B"}  # nsfw εκτός
+    assert 0.72 < c["A"] / 20000 < 0.78
+    assert phrases.pick_trendy_phrase(emotion="joy", context="success", lang="en") is None
+
+
+def test_table_is_built_once_per_key(phrase_file):
+    phrases.pick_trendy_phrase(emotion="joy", context="success")
+    idx = phrases._INDEX
+    t = idx.table(("el", None, "joy", "success"))
+    phrases.pick_trendy_phrase(emotion="joy", context="success")
+    assert idx.table(("el", None, "joy", "success")) is t
+
+
+def test_reload_swaps_index_and_keeps_old_on_bad_file(phrase_file):
+    items = phrases._load_trendy()
+    _write(phrase_file, [{"text": "D", "emotion": "joy", "context_tags": ["success"]}])
+    phrases.reload()
+    assert phrases._load_trendy() is not items
+    assert phrases.pick_trendy_phrase(emotion="joy", context="success") == "D"
+
+    phrase_file.write_text("{oops", encoding="utf-8")
+    phrases.reload()
+    assert phrases.pick_trendy_phrase(emotion="joy", context="success") == "D"
+
+
+def test_watcher_reloads_on_change(phrase_file):
+    if phrases.watchfiles is None:
+        pytest.skip("watchfiles not installed")
+    phrases.pick_trendy_phrase()  # πρώτη φόρτωση + watcher
+    assert phrases._WATCHER is not None
+    time.sleep(0.3)
+    _write(phrase_file, [{"text": "E", "emotion": "joy", "context_tags": ["success"]}])
+    deadline = time.time() + 5
+    while time.time() < deadline and phrases.pick_trendy_phrase(emotion="joy", context="success") != "E":
+        time.sleep(0.05)
+    assert phrases.pick_trendy_phrase(emotion="joy", context="success") == "E"
@@ -0,0 +1,104 @@
+# tests/test_quotes.py
+from types import SimpleNamespace
+
+import pytest
+
+import quotes
+import router_and_booking as rb
+from quotes import Quote
+
+
+@pytest.fixture(autouse=True)
+def clean_book():
+    quotes.BOOK.clear()
+    yield
+    quotes.BOOK.clear()
+
+
+def _state(**booking):
+    st = SimpleNamespace(intent=None, slots={}, booking_slots=dict(booking))
+    rb.init_session_state(st)
+    return st
+
+
+def test_round_trip_is_part_of_the_key():
+    q = quotes.BOOK.put(Quote.new("Πάτρα", "Αθήνα", price_eur=200.0))
+    assert quotes.BOOK.for_route("πατρα", "ΑΘΗΝΑ").id == q.id  # normalized
+    assert quotes.BOOK.for_route("Πάτρα", "Αθήνα", round_trip=True) is None
+
+
+def test_confirm_reuses_session_quote(monkeypatch):
+    st = _state(origin="Πάτρα", destination="Αθήνα", pickup_time="18:30", name="Νίκος", phone="6900000000")
+    q = quotes.attach(st, Quote.new("Πάτρα", "Αθήνα", reply="💶 Εκτίμηση: 200€"))
+
+    def no_requote(*a, **kw):
+        raise AssertionError("δεν πρέπει να ξαναβγεί εκτίμηση")
+
+    monkeypatch.setattr(rb, "trip_quote", no_requote)
+    out = rb.booking_confirm(st)
+    assert "200€" in out["reply"]
+    assert st.booking_slots["quote_id"] == q.id
+
+
+def test_create_remote_uses_quote_coords_and_estimate(monkeypatch):
+    import integrations.infoxoros_api as ix
+
+    q = Quote.new("Πάτρα", "Αθήνα", origin_coords=(38.24, 21.73), dest_coords=(37.98, 23.72))
+    q.estimates["now"] = {"cost_float": 201.5, "distance_km": 211.0, "duration_min": 150}
+    seen = {}
+
+    def fake_create(**kw):
+        seen.update(kw)
+        return {"status": "1"}
+
+    monkeypatch.setattr(rb, "_resolve_coords", lambda *a: pytest.fail("geocoding παρά το quote"))
+    monkeypatch.setattr(ix, "create_booking", fake_create)
+    slots = {"origin": "Πάτρα", "destination": "Αθήνα", "name": "Νίκος", "phone": "6900000000"}
+    res = rb._create_remote({"code": "ABC123", "when": "τώρα", "slots": slots, "quote": q.to_dict()})
+    assert res["created_remote"] is True
+    assert seen["point1"].startswith("38.24") and seen["estimate"]["cost_float"] == 201.5
+
+
+def test_quote_estimate_matches_pickup_time():
+    q = Quote.new("Πάτρα", "Αθήνα")
+    q.estimates["now"] = {"cost_float": 201.5}
+    q.estimates["18:30"] = {"cost_float": 240.0}
+    assert rb._quote_estimate(q, {"pickup_time": "αύριο 18:30"})["cost_float"] == 240.0
+    assert rb._quote_estimate(q, {"pickup_time": "ASAP"})["cost_float"] == 201.5
+    assert rb._quote_estimate(q, {})["cost_float"] == 201.5
+    # άλλη ώρα: όχι η τιμή του "τώρα" (π.χ. νυχτερινή) — το create_booking την ξαναϋπολογίζει
+    assert rb._quote_estimate(q, {"pickup_time": "23:45"}) is None
+    assert rb._quote_estimate(q, {"pickup_time": "αύριο το πρωί"}) is None
+
+
+def test_prequote_starts_when_both_addresses_known(monkeypatch):
+    calls = []
+
+    def fake_quote(message, when="now"):
+        calls.append(message)
+        return "💶 Εκτίμηση: 15€", quotes.BOOK.put(
+            Quote.new("Αγίου Νικολάου 10", "Σωκράτους 5", reply="💶 Εκτίμηση: 15€",
+                      origin_coords=(38.24, 21.73), dest_coords=(38.25, 21.74)))
+
+    monkeypatch.setattr(rb, "trip_quote", fake_quote)
+    st = _state(origin="Αγίου Νικολάου 10")
+    rb.booking_collect(st, "Σωκράτους 5")  # destination → ξεκινά το pre-quote
+    key = st.slots["prequote"]
+    assert quotes.SPECULATOR.wait(key, 5) is not None or quotes.BOOK.for_route("Αγίου Νικολάου 10", "Σωκράτους 5")
+
+    st.booking_slots.update(pickup_time="18:30", name="Νίκος", phone="6900000000")
+    out = rb.booking_confirm(st)
+    assert "15€" in out["reply"] and len(calls) == 1  # το confirm δεν ξαναϋπολογίζει
+    assert "prequote" not in st.slots
+
+
+def test_prequote_cancelled_on_address_change(monkeypatch):
+    cancelled = []
+    monkeypatch.setattr(quotes.SPECULATOR, "submit", lambda key, fn: None)
+    monkeypatch.setattr(quotes.SPECULATOR, "cancel", cancelled.append)
+    st = _state(origin="Αγίου Νικολάου 10", destination="Σωκράτους 5")
+    rb._speculate_quote(st)
+    old = st.slots["prequote"]
+    st.booking_slots["destination"] = "Κορίνθου 20"
+    rb._speculate_quote(st)
+    assert cancelled == [old] and st.slots["prequote"] != old
@@ -0,0 +1,51 @@
+# tests/test_rate_limit.py
+import asyncio
+import time
+
+import security
+from security import Bucket, MemoryRateLimiter
+
+
+def test_token_bucket_burst_then_refill():
+    rl = MemoryRateLimiter()
+    b = [Bucket("ip:1", rate=1.0, capacity=3)]
+    assert [rl.take(b, now=100.0).allowed for _ in range(4)] == [True, True, True, False]
+    denied = rl.take(b, now=100.0)
+    assert denied.retry_after == 1.0
+    # όχι 2× burst στο "όριο παραθύρου": μετά από 1s υπάρχει μόνο 1 token
+    assert [rl.take(b, now=101.0).allowed for _ in range(2)] == [True, False]
+
+
+def test_route_cost_and_all_buckets_or_nothing():
+    rl = MemoryRateLimiter()
+    key, ip = Bucket("key:a", 1.0, 10), Bucket("ip:1", 1.0, 2)
+    assert rl.take([key, ip], cost=2, now=0.0).allowed
+    assert not rl.take([key, ip], cost=2, now=0.0).allowed  # το IP bucket άδειασε
+    # η απόρριψη δεν κατανάλωσε από το key bucket
+    assert rl.take([key], cost=8, now=0.0).allowed
+    assert security.parse_route_costs("/chat/stream=2,bad") == {"/chat": 1.0, "/chat/stream": 2.0}
+
+
+def test_redis_unreachable_fails_open_locally():
+    rl = security.RedisRateLimiter("redis://127.0.0.1:1/0", timeout=0.2, retry_sec=60)
+    b = [Bucket("ip:1", 1.0, 1)]
+
+    async def go():
+        t0 = time.perf_counter()
+        first = await rl.acquire(b)
+        second = await rl.acquire(b)  # circuit ανοιχτό → κατευθείαν τοπικά
+        return first, second, time.perf_counter() - t0
+
+    first, second, elapsed = asyncio.run(go())
+    assert first.allowed and not second.allowed and elapsed < 1.0
+
+
+def test_memory_limiter_is_bounded_and_prunes():
+    rl = MemoryRateLimiter(shards=1, max_keys=100, prune_sec=10)
+    for i in range(1000):  # IP churn
+        rl.take([Bucket(f"ip:{i}", 1.0, 5)], now=0.0)
+    st = rl.stats()
+    assert st["keys"] <= 100 and st["evicted"] >= 900 and st["allowed"] == 1000
+    # μετά το refill όλα είναι γεμάτα → το επόμενο prune του shard τα αφαιρεί
+    rl.take([Bucket("ip:new", 1.0, 5)], now=60.0)
+    assert rl.stats()["keys"] == 1
@@ -0,0 +1,82 @@
+# tests/test_reply_pipeline.py
+import asyncio
+import random
+
+import main
+import reply_pipeline
+from reply_pipeline import Pipeline, Reply, Stage
+
+MAP = "https://www.google.com/maps/dir/?api=1&origin=A&destination=B"
+
+
+def test_cap_emojis_keeps_the_first_ones_across_lines():
+    text = "💊 Φαρμακείο 1 📍\n💊 Φαρμακείο 2 📍\n💊 Φαρμακείο 3 📍"
+    out = reply_pipeline.cap_emojis(text, 4)
+    assert out == "💊 Φαρμακείο 1 📍\n💊 Φαρμακείο 2 📍\n Φαρμακείο 3 "
+    assert reply_pipeline.cap_emojis("χωρίς", 4) == "χωρίς"
+
+
+def test_scan_finds_links_and_emojis_in_one_pass():
+    r = Reply.scan(f"🚕 Κόστος 20€ 📍\n[Χάρτης]({MAP})")
+    assert r.emojis == 2 and r.links == [MAP]
+    reply_pipeline.strip_map(r, {})
+    assert r.map_url == MAP and r.text == "🚕 Κόστος 20€ 📍" and r.emojis == 2
+
+
+def test_strip_map_link_keeps_text_when_only_a_link():
+    assert main.strip_map_link(MAP) == (MAP, MAP)
+    assert main.strip_map_link(f"Δες {MAP}") == ("Δες", MAP)
+    assert main.strip_map_link("τίποτα") == ("τίποτα", None)
+
+
+def test_stages_are_timed_and_switchable_per_channel():
+    seen = []
+
+    async def shout(reply, ctx):
+        seen.append(ctx["who"])
+        reply.set_text(reply.text.upper())
+
+    p = Pipeline([Stage("shout", shout), Stage("tail", lambda r, _c: r.append("!"))], off="ws:shout")
+    r = asyncio.run(p.run(Reply.scan("γεια"), channel="chat", who="x"))
+    assert r.text == "ΓΕΙΑ!" and set(r.timings) == {"shout", "tail"} and seen == ["x"]
+    r = asyncio.run(p.run(Reply.scan("γεια"), channel="ws", who="y"))
+    assert r.text == "γεια!" and "shout" not in r.timings
+    assert p.stats()["tail"]["calls"] == 2
+
+
+def test_finish_reply_matches_enrich_reply(monkeypatch):
+    monkeypatch.setattr(main, "_session_can_phrase", lambda st: False)
+    raw = f"Η απόσταση είναι 215 km, εκτίμηση 180€ 🚕🛣️🕒📍💶\n[Χάρτης]({MAP})"
+    random.seed(3)
+    resp = asyncio.run(main._finish_reply(raw, sid="rp-test", user_text="πόσο πάει;", request=None,
+                                          intent=main.INTENT_TRIP))
+    random.seed(3)
+    text, url = main.strip_map_link(raw)
+    assert resp == {"reply": main.enrich_reply(text, intent=main.INTENT_TRIP), "map_url": MAP}
+    assert reply_pipeline.count_emojis(resp["reply"]) == main.REPLY_MAX_EMOJIS
+
+
+def test_tour_replies_go_through_the_pipeline(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    seen = []
+    spy = Stage("spy", lambda reply, ctx: seen.append((ctx["trendy_intent"], ctx["trendy"])))
+    monkeypatch.setattr(main.REPLY_PIPELINE, "stages", [*main.REPLY_PIPELINE.stages, spy])
+    client = TestClient(main.app)
+    for msg in ("εκδρομές", "τι περιλαμβάνει"):
+        assert client.post("/chat", json={"message": msg, "session_id": "rp-tours"}).status_code == 200
+    assert seen and all(intent == main.INTENT_SERVICES for intent, _ in seen)
+
+
+def test_router_cancel_and_contact_replies_go_through_the_pipeline(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    seen = []
+    spy = Stage("spy", lambda reply, ctx: seen.append((reply.text, ctx["trendy"])))
+    monkeypatch.setattr(main.REPLY_PIPELINE, "stages", [*main.REPLY_PIPELINE.stages, spy])
+    client = TestClient(main.app)
+    assert "αφήνουμε" in client.post("/chat", json={"message": "άκυρο", "session_id": "rp-cancel"}).json()["reply"]
+    client.post("/chat", json={"message": "ραδιοταξι τηλεφωνο", "session_id": "rp-contact"})
+    monkeypatch.setattr(main, "maybe_handle_followup_or_booking", lambda st, text: {"reply": "📝 Κωδικός: BK-1"})
+    assert "BK-1" in client.post("/chat", json={"message": "ναι", "session_id": "rp-router"}).json()["reply"]
+    assert len(seen) == 3 and not any(trendy for _, trendy in seen)
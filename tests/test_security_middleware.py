@@ -0,0 +1,75 @@
+# tests/test_security_middleware.py
+from fastapi import Body, FastAPI, Request
+from fastapi.testclient import TestClient
+
+from config import Settings
+from security import APIKeys, SecurityMiddleware
+
+
+def _client(**kw):
+    app = FastAPI()
+
+    @app.post("/chat")
+    def chat(payload: dict = Body(None)):
+        return {"reply": "ok"}
+
+    @app.post("/raw")
+    async def raw(request: Request):
+        return {"size": len(await request.body())}
+
+    settings = Settings(RATE_LIMIT_MAX_REQ=2, RATE_LIMIT_WINDOW_SEC=60)
+    cors = lambda o: {"Access-Control-Allow-Origin": o, "Vary": "Origin"} if o == "https://ok.gr" else {}
+    app.add_middleware(SecurityMiddleware, settings=settings, cors_headers=cors, max_body_bytes=50, **kw)
+    return TestClient(app)
+
+
+def test_same_status_and_bodies_as_separate_middlewares():
+    c = _client(keys=["secret"])
+    # preflight πριν από auth
+    r = c.options("/chat", headers={"Origin": "https://ok.gr", "Access-Control-Request-Method": "POST"})
+    assert r.status_code == 204 and r.headers["access-control-allow-origin"] == "https://ok.gr"
+    r = c.post("/chat", json={}, headers={"Origin": "https://x.gr"})
+    assert (r.status_code, r.json()) == (401, {"detail": "Unauthorized"})
+    assert r.headers["access-control-allow-origin"] == "https://x.gr"
+    r = c.post("/chat", content=b"x" * 100, headers={"Authorization": "Bearer secret"})
+    assert (r.status_code, r.json()) == (413, {"detail": "Request body too large"})
+
+
+def test_rate_limit_before_auth():
+    c = _client(keys=["secret"])
+    codes = [c.post("/chat", json={}, headers={"X-API-Key": "secret"}).status_code for _ in range(3)]
+    assert codes == [200, 200, 429]
+
+
+def test_api_keys_hashed_check():
+    keys = APIKeys(["a", " b "])
+    assert keys.check("b") and not keys.check("c") and not keys.check(None)
+    assert not APIKeys([])
+
+
+def test_chunked_body_is_cut_at_limit():
+    c = _client()
+
+    def chunks():
+        for _ in range(100):  # χωρίς Content-Length (chunked)
+            yield b"x" * 20
+
+    r = c.post("/chat", content=chunks(), headers={"Origin": "https://x.gr", "Content-Type": "application/json"})
+    assert (r.status_code, r.json()) == (413, {"detail": "Request body too large"})
+    assert r.headers["access-control-allow-origin"] == "https://x.gr"
+    assert c.post("/raw", content=chunks()).status_code == 413  # body εκτός FastAPI parsing
+    assert c.post("/raw", content=iter([b"x" * 20])).json() == {"size": 20}
+
+
+def test_ready_probe_is_public_and_free():
+    app = FastAPI()
+
+    @app.get("/ready")
+    def ready():
+        return {"ready": True}
+
+    # ακόμη κι αν κάποιος του δώσει κόστος, το probe δεν ξοδεύει tokens
+    settings = Settings(RATE_LIMIT_MAX_REQ=1, RATE_LIMIT_WINDOW_SEC=60, RATE_LIMIT_COSTS="/ready=1")
+    app.add_middleware(SecurityMiddleware, settings=settings, keys=["secret"], paths=("/ready",))
+    c = TestClient(app)
+    assert [c.get("/ready").status_code for _ in range(3)] == [200, 200, 200]
@@ -0,0 +1,41 @@
+# tests/test_startup.py
+import sys
+
+from fastapi.testclient import TestClient
+
+import main
+import startup
+from benchmarks import importtime
+
+
+def test_lazy_module_imports_on_first_attribute():
+    sys.modules.pop("colorsys", None)
+    mod = startup.LazyModule("colorsys")
+    assert not mod.loaded and "colorsys" not in sys.modules
+    assert mod.rgb_to_hsv(0, 0, 0) == (0.0, 0.0, 0.0)
+    assert mod.loaded
+
+
+def test_warmup_reports_failures_and_still_becomes_ready():
+    w = startup.Warmup()
+    w.add("ok", lambda: None)
+    w.add("boom", lambda: 1 / 0)
+    assert not w.ready
+    w.run()
+    st = w.status()
+    assert st["ready"] and st["tasks"]["ok"]["state"] == "ok" and st["tasks"]["boom"]["state"] == "failed"
+
+
+def test_ready_endpoint_flips_after_warmup(monkeypatch):
+    w = startup.Warmup()
+    w.add("noop", lambda: None)
+    monkeypatch.setattr(startup, "WARMUP", w)
+    c = TestClient(main.app)
+    assert c.get("/ready").status_code == 503
+    w.run()
+    assert c.get("/ready").json()["ready"] is True
+
+
+def test_import_main_does_not_load_heavy_dependencies():
+    s = importtime.summary(importtime.profile("main"), "main")
+    assert s["lazy_loaded"] == []  # agents/openai/redis/spacy μόνο στην πρώτη χρήση
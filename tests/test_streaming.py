@@ -0,0 +1,49 @@
+# tests/test_streaming.py
+import asyncio
+import json
+
+from fastapi.responses import JSONResponse
+
+import streaming
+
+
+def _collect(work):
+    async def go():
+        return [ev async for ev in streaming.run(work)]
+    return asyncio.run(go())
+
+
+def test_run_yields_emitted_events_then_done():
+    async def work():
+        streaming.emit("partial", {"text": "💶 270€", "source": "trip_quote_nlp"})
+        await asyncio.sleep(0)
+        streaming.emit("token", {"delta": "Hi", "source": "agent"})
+        return {"reply": "Hi!"}
+
+    evs = _collect(work())
+    assert [e["event"] for e in evs] == ["partial", "token", "done"]
+    assert json.loads(evs[-1]["data"]) == {"reply": "Hi!"}
+    # εκτός stream το emit είναι no-op
+    assert not streaming.active()
+    streaming.emit("token", {"delta": "x"})
+
+
+def test_error_response_becomes_error_event():
+    async def work():
+        return JSONResponse(status_code=504, content={"error": "Upstream timeout"})
+
+    (ev,) = _collect(work())
+    assert ev["event"] == "error"
+    assert json.loads(ev["data"]) == {"status": 504, "error": "Upstream timeout"}
+
+
+def test_chat_stream_endpoint_done_event(client, clear_state):
+    sid = "t_stream"; clear_state(sid)
+    # ντετερμινιστικό path (χωρίς LLM): ακύρωση χωρίς ενεργό intent
+    payload = {"message": "άκυρο", "user_id": sid, "session_id": sid}
+    r = client.post("/chat/stream", json=payload)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+    assert "event: done" in r.text
+    data = r.text.split("event: done", 1)[1].split("data: ", 1)[1].split("\r\n", 1)[0]
+    assert "αφήνουμε" in json.loads(data)["reply"]
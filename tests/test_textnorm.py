@@ -0,0 +1,50 @@
+# tests/test_textnorm.py
+import copy
+import pickle
+
+import textnorm
+from textnorm import NormText
+
+
+def test_views_match_plain_helpers():
+    s = "  Θέλω   ταξί για ΠΆΤΡΑ  "
+    t = NormText(s)
+    assert t.folded == textnorm.folded(s) == "θελω ταξι για πατρα"
+    assert t.lowered == s.lower()
+    assert t.deaccented == textnorm.deaccented(s)
+    assert t.tokens == textnorm.tokens(s)
+
+
+def test_views_are_computed_once():
+    t = NormText("Πάτρα - Αθήνα")
+    assert t.folded is t.folded
+    assert textnorm.folded(t) is t.folded
+    assert t.lowered is textnorm.lowered(t)
+
+
+def test_strip_keeps_cache_when_nothing_changes():
+    t = NormText("Αίγιο")
+    _ = t.folded
+    assert t.strip() is t
+    assert isinstance(NormText(" Αίγιο ").strip(), NormText)
+
+
+def test_greeklish_is_deterministic():
+    assert textnorm.greeklish("Πάτρα") == "patra"
+    assert textnorm.greeklish("Ναύπακτος") == "naypaktos"
+    assert NormText("Μπαρμπάρα").greeklish == "mparmpara"
+
+
+def test_is_still_a_str_and_pickles_without_cache():
+    t = NormText("Ρίο")
+    _ = t.folded
+    assert t == "Ρίο" and t.raw == "Ρίο"
+    for c in (copy.deepcopy(t), pickle.loads(pickle.dumps(t))):
+        assert c == t and "folded" not in c.__dict__
+
+
+def test_main_nrm_keeps_greek_letters():
+    import main
+
+    # παλιό bug: το φίλτρο ord<0x300 έσβηνε όλα τα ελληνικά
+    assert main._nrm("Δελφοί") == "δελφοι"
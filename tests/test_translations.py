@@ -0,0 +1,73 @@
+# tests/test_translations.py
+import asyncio
+import threading
+
+import translations
+from translations import TemplateCatalog, TranslationCache
+
+
+def test_trip_reply_localized_without_llm():
+    reply = (
+        "Πάμε! 🚕 💶 Εκτίμηση: 270€\n🛣️ Απόσταση: ~211.4 km\n⏱️ Χρόνος: ~2 ώρες και 33 λεπτά\n"
+        "⚠️ Η τιμή δεν περιλαμβάνει διόδια."
+    )
+    out = translations.get_catalog().translate(reply, "en")
+    assert out == (
+        "Let's go! 🚕 💶 Estimate: 270€\n🛣️ Distance: ~211.4 km\n⏱️ Time: ~2 hours and 33 minutes\n"
+        "⚠️ The price does not include tolls."
+    )
+
+
+def test_dynamic_greek_line_needs_llm():
+    # ελεύθερο κείμενο δεν πρέπει να "καταπιεί" κάποιο template
+    assert translations.get_catalog().translate("🏥 ΠΓΝΠ Ρίο εφημερεύει σήμερα.", "en") is None
+    # ούτε να μπει ελληνικό κείμενο σε placeholder που περιμένει αριθμό/URL
+    assert translations.get_catalog().translate("💶 Τιμή: περίπου είκοσι€", "en") is None
+
+
+def test_cache_lru_and_ttl():
+    c = TranslationCache(maxsize=2, ttl=60)
+    c.set("α", "en", "a")
+    c.set("β", "en", "b")
+    assert c.get("α  ", "en") == "a"  # normalized key· το "α" γίνεται και most-recent
+    c.set("γ", "en", "c")
+    assert c.get("β", "en") is None and c.get("α", "en") == "a"
+    c.ttl = -1
+    c.set("δ", "de", "d")
+    assert c.get("δ", "de") is None
+
+
+def test_stats_count_catalog_cache_and_llm(monkeypatch):
+    monkeypatch.setattr(translations, "CACHE", TranslationCache(maxsize=10, ttl=60))
+    translations.reset_stats()
+    assert translations.localize("Πώς σε λένε;", "de") == "Wie heißt du?"
+    assert translations.localize("Η Πάτρα έχει ωραία καφέ.", "de") is None
+    translations.record_llm()
+    translations.remember("Η Πάτρα έχει ωραία καφέ.", "de", "Patras hat schöne Cafés.")
+    assert translations.localize("Η Πάτρα έχει ωραία καφέ.", "de") == "Patras hat schöne Cafés."
+    s = translations.stats()
+    assert (s["catalog"], s["cache"], s["llm"]) == (1, 1, 1)
+    assert s["served_without_llm_pct"] == 66.7
+
+
+def test_catalog_ignores_unknown_language():
+    cat = TemplateCatalog({"langs": ["en"], "templates": [{"el": "Πώς σε λένε;", "en": "What's your name?"}]})
+    assert cat.translate("Πώς σε λένε;", "ja") is None
+
+
+def test_sqlite_l2_runs_off_the_event_loop(tmp_path, monkeypatch):
+    path = str(tmp_path / "l2.sqlite3")
+    a, b = TranslationCache(db_path=path), TranslationCache(db_path=path)  # δύο workers, κοινό L2
+    threads = []
+    for name in ("_get_l2", "_set_l2"):
+        real = getattr(TranslationCache, name)
+        monkeypatch.setattr(TranslationCache, name,
+                            lambda self, *args, _real=real: threads.append(threading.current_thread()) or _real(self, *args))
+
+    async def go():
+        await a.aset("Καλημέρα Πάτρα", "en", "Good morning Patras")
+        return await b.aget("Καλημέρα Πάτρα", "en"), threading.current_thread()
+
+    out, loop_thread = asyncio.run(go())
+    assert out == "Good morning Patras"
+    assert len(threads) == 2 and loop_thread not in threads
@@ -0,0 +1,68 @@
+# tests/test_websocket.py
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+import main as main_mod
+import security
+from security import APIKeys
+
+
+def test_ws_turn_and_flush(client, clear_state):
+    sid = "t_ws"; clear_state(sid)
+    with client.websocket_connect(f"/chat/ws?session_id={sid}") as ws:
+        assert ws.receive_json() == {"type": "ready", "session_id": sid}
+        ws.send_json({"message": "άκυρο", "id": 1})
+        ev = ws.receive_json()
+        while ev["type"] != "done":
+            ev = ws.receive_json()
+        assert ev["id"] == 1 and "αφήνουμε" in ev["reply"]
+        # flush μετά τον γύρο → το STORE έχει το context
+        assert main_mod.STORE.get(sid).context_turns[0] == "U: άκυρο"
+        ws.send_text("not json")
+        assert ws.receive_json()["status"] == 400
+
+
+def test_ws_requires_api_key(client, monkeypatch):
+    monkeypatch.setattr(main_mod, "_KEYS", APIKeys(["secret"]))
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect("/chat/ws") as ws:
+            ws.receive_json()
+    with client.websocket_connect("/chat/ws?api_key=secret&session_id=t_ws_key") as ws:
+        assert ws.receive_json()["type"] == "ready"
+
+
+def test_overlay_defers_store_writes(clear_state):
+    sid = "t_overlay"; clear_state(sid)
+    ov = main_mod._SessionOverlay(sid)
+    token = main_mod._OVERLAY.set(ov)
+    try:
+        st = main_mod._get_state(sid)
+        st.intent = "TripCostIntent"
+        main_mod._save_state(sid, st)
+        assert main_mod._get_state(sid).intent == "TripCostIntent"
+        assert main_mod.STORE.get(sid) is None  # ακόμη στη μνήμη της σύνδεσης
+        ov.flush()
+    finally:
+        main_mod._OVERLAY.reset(token)
+    assert main_mod.STORE.get(sid).intent == "TripCostIntent"
+
+
+def test_ws_sockets_share_the_http_rate_limit(client, monkeypatch):
+    policy = security.RateLimitPolicy(main_mod.settings)
+    policy.max_req, policy.burst, policy.backend = 2, 0, security.MemoryRateLimiter()
+    monkeypatch.setattr(main_mod, "RATE_POLICY", policy)
+
+    def send(ws, n):
+        ws.send_json({"message": "άκυρο", "id": n})
+        ev = ws.receive_json()
+        while ev["type"] not in ("done", "error"):
+            ev = ws.receive_json()
+        return ev
+
+    with client.websocket_connect("/chat/ws?session_id=t_ws_rl1") as a, \
+            client.websocket_connect("/chat/ws?session_id=t_ws_rl2") as b:
+        a.receive_json(), b.receive_json()
+        assert send(a, 1)["type"] == "done" and send(a, 2)["type"] == "done"
+        # δεύτερο socket, ίδια IP: ίδιο bucket, όχι νέο budget
+        ev = send(b, 3)
+        assert (ev["type"], ev["status"], ev["id"]) == ("error", 429, 3) and ev["retry_after"] >= 1
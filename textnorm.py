@@ -0,0 +1,144 @@
+# textnorm.py
+"""
+NormText: το μήνυμα του χρήστη με τις κανονικοποιήσεις του υπολογισμένες το πολύ μία φορά.
+
+Είναι str (περνά αυτούσιο σε re/format/session), με lazy + memoized views:
+
+    raw         το αρχικό κείμενο
+    lowered     .lower()
+    folded      NFKC + lower + χωρίς τόνους + ένα κενό (≡ tools._norm_txt)
+    deaccented  χωρίς τόνους, ίδια κεφαλαία (≡ tools._deaccent)
+    greeklish   folded σε λατινικούς χαρακτήρες (ντετερμινιστικά: "πάτρα" → "patra")
+    tokens      λέξεις ≥3 χαρακτήρων, χωρίς σημεία στίξης (≡ main._tok)
+    skeleton    greeklish.skeleton: κοινή μορφή για ελληνικά/greeklish γραφές
+    greek       greeklish.to_greek: greeklish → ελληνικά
+
+Οι matchers καλούν τις module-level συναρτήσεις (lowered(s), folded(s), …): με NormText
+παίρνουν το cached view, με απλό str υπολογίζουν όπως πριν.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from functools import cached_property
+from typing import List
+
+_WS_RE = re.compile(r"\s+")
+
+_GREEKLISH = {
+    "α": "a", "β": "v", "γ": "g", "δ": "d", "ε": "e", "ζ": "z", "η": "i", "θ": "th", "ι": "i",
+    "κ": "k", "λ": "l", "μ": "m", "ν": "n", "ξ": "ks", "ο": "o", "π": "p", "ρ": "r", "σ": "s",
+    "ς": "s", "τ": "t", "υ": "y", "φ": "f", "χ": "x", "ψ": "ps", "ω": "o",
+}
+_GREEKLISH_DIGRAPHS = (("ου", "ou"), ("αι", "ai"), ("ει", "ei"), ("οι", "oi"), ("μπ", "mp"), ("ντ", "nt"), ("γκ", "gk"))
+_GREEKLISH_TABLE = str.maketrans(_GREEKLISH)
+
+
+class _MarkTable(dict):
+    """str.translate table που σβήνει τα combining marks (Mn)· γεμίζει lazily ανά χαρακτήρα."""
+
+    def __missing__(self, cp: int):
+        v = None if unicodedata.category(chr(cp)) == "Mn" else cp
+        self[cp] = v
+        return v
+
+
+_MARKS = _MarkTable()
+
+
+def _deaccent(s: str) -> str:
+    if s.isascii():
+        return s
+    return unicodedata.normalize("NFD", s).translate(_MARKS)
+
+
+def _fold(s: str) -> str:
+    return _WS_RE.sub(" ", _deaccent(unicodedata.normalize("NFKC", s).lower())).strip()
+
+
+def _greeklish(folded_text: str) -> str:
+    s = folded_text
+    for gr, lat in _GREEKLISH_DIGRAPHS:
+        if gr in s:
+            s = s.replace(gr, lat)
+    return s.translate(_GREEKLISH_TABLE)
+
+
+def _tokens(s: str) -> List[str]:
+    s = unicodedata.normalize("NFKD", s)
+    s = "".join(ch for ch in s if ch.isalnum() or ch.isspace()).lower()
+    return [w for w in _WS_RE.sub(" ", s).strip().split(" ") if len(w) >= 3]
+
+
+class NormText(str):
+    """Immutable κείμενο μηνύματος + cached κανονικοποιήσεις (βλ. module docstring)."""
+
+    @classmethod
+    def of(cls, s) -> "NormText":
+        return s if isinstance(s, NormText) else cls(s or "")
+
+    def __reduce__(self):
+        # copies/pickles (π.χ. asdict του session) χωρίς τα cached views
+        return (NormText, (str(self),))
+
+    def strip(self, chars=None) -> "NormText":  # type: ignore[override]
+        # `(text or "").strip()` στους matchers δεν πρέπει να χάνει το cache
+        s = str.strip(self, chars)
+        return self if len(s) == len(self) else NormText(s)
+
+    @property
+    def raw(self) -> str:
+        return str(self)
+
+    @cached_property
+    def lowered(self) -> str:
+        return str.lower(self)
+
+    @cached_property
+    def folded(self) -> str:
+        return _fold(self)
+
+    @cached_property
+    def deaccented(self) -> str:
+        return _deaccent(self)
+
+    @cached_property
+    def greeklish(self) -> str:
+        return _greeklish(self.folded)
+
+    @cached_property
+    def tokens(self) -> List[str]:
+        return _tokens(self)
+
+    @cached_property
+    def skeleton(self) -> str:
+        import greeklish  # lazy: το greeklish κάνει import το textnorm
+        return greeklish._skeleton(self.folded)
+
+    @cached_property
+    def greek(self) -> str:
+        import greeklish
+        return greeklish._to_greek(self.lowered)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Views για str ή NormText
+
+def lowered(s) -> str:
+    return s.lowered if isinstance(s, NormText) else (s or "").lower()
+
+
+def folded(s) -> str:
+    return s.folded if isinstance(s, NormText) else _fold(s or "")
+
+
+def deaccented(s) -> str:
+    return s.deaccented if isinstance(s, NormText) else _deaccent(s or "")
+
+
+def greeklish(s) -> str:
+    return s.greeklish if isinstance(s, NormText) else _greeklish(_fold(s or ""))
+
+
+def tokens(s) -> List[str]:
+    return list(s.tokens) if isinstance(s, NormText) else _tokens(s or "")
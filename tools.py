@@ -31,111 +31,91 @@ import logging
 import re
 from typing import Any, Dict, List, Optional, Tuple
 
-import unicodedata
 from urllib.parse import quote_plus
 
+import greeklish
+import quotes
+import startup
+import textnorm
+from quotes import Quote
+
 # ──────────────────────────────────────────────────────────────────────────────
-# Agents SDK (with compatibility shim)
-try:
-    # Import agent helper types from the Agents SDK if available.
-    from agents import function_tool as _sdk_function_tool, RunContextWrapper  # type: ignore
-
-    def function_tool(fn=None, **kwargs):
-        """Compatibility decorator that survives older/newer SDKs.
-        - Filters unknown kwargs for the SDK call.
-        - Tries `strict=False` first to avoid SDK-level strict schema crashes.
-        - If SDK decoration fails, falls back to returning the original function.
-        - Always attaches metadata attributes: name/description/parameters/strict.
-        """
-        allowed = {"name_override", "description_override"}
-        safe = {k: v for k, v in kwargs.items() if k in allowed}
-
-        def _decorate_with_sdk(f):
-            # Attempt with strict=False (newer SDKs may accept), then without.
-            try:
-                return _sdk_function_tool(**safe, strict=False)(f)  # type: ignore[call-arg]
-            except TypeError:
-                # Older SDKs: no `strict` kw
-                return _sdk_function_tool(**safe)(f)
-
-        def _attach_meta(obj, f):
-            # Ensure friendly name/description even if SDK wraps the function
-            if "name_override" in kwargs:
-                try:
-                    setattr(obj, "name", kwargs["name_override"])  # for discovery UIs
-                except Exception:
-                    pass
-            if "description_override" in kwargs:
-                try:
-                    setattr(obj, "description", kwargs["description_override"])  # for discovery UIs
-                except Exception:
-                    pass
-            # Preserve strict + parameters metadata for our runtime
-            if "strict" in kwargs:
-                try:
-                    setattr(obj, "__strict__", bool(kwargs["strict"]))
-                except Exception:
-                    pass
-            if "parameters" in kwargs and kwargs["parameters"]:
-                try:
-                    setattr(obj, "__parameters__", kwargs["parameters"])  # JSON Schema dict
-                except Exception:
-                    pass
-            return obj
+# Agents SDK (lazy, with compatibility shim)
+# Το `import agents` (μαζί με openai/mcp) κοστίζει ~0.7s στο cold start. Τα tools μένουν απλές
+# συναρτήσεις με metadata και γίνονται SDK FunctionTool στην πρώτη χρήση του agent (sdk_tool).
+HAS_AGENTS_SDK = startup.available("agents")
+_agents = startup.LazyModule("agents")
 
-        if fn is None:
-            def _wrap(f):
-                try:
-                    obj = _decorate_with_sdk(f)
-                except Exception:
-                    # Fall back to the raw function if the SDK chokes on schema inference
-                    obj = f
-                return _attach_meta(obj, f)
-            return _wrap
-        else:
+
+class RunContextWrapper:  # placeholder ώσπου να φορτωθεί το SDK (βλ. sdk_tool)
+    def __init__(self, context=None, **kwargs):
+        self.context = context or {}
+
+
+def function_tool(fn=None, **kwargs):
+    """Attaches tool metadata (name/description/parameters/strict) to the plain
+    function, which stays directly callable. The SDK wrapping is deferred to
+    ``sdk_tool`` so importing this module does not import the Agents SDK.
+    """
+    def _decorator(f):
+        # User-provided name/description fallbacks
+        setattr(f, "name", kwargs.get("name_override", getattr(f, "__name__", "tool")))
+        setattr(f, "description", kwargs.get("description_override", getattr(f, "__doc__", "")))
+        # Preserve strict + parameters metadata
+        if "strict" in kwargs:
+            setattr(f, "__strict__", bool(kwargs["strict"]))
+        if "parameters" in kwargs and kwargs["parameters"]:
+            setattr(f, "__parameters__", kwargs["parameters"])  # JSON Schema dict
+        setattr(f, "__tool_kwargs__", dict(kwargs))
+        return f
+
+    if fn is None:
+        return _decorator
+    return _decorator(fn)
+
+
+def sdk_tool(f):
+    """SDK FunctionTool για ένα @function_tool (cached στη συνάρτηση· φορτώνει το SDK).
+    - Filters unknown kwargs for the SDK call.
+    - Tries `strict=False` first to avoid SDK-level strict schema crashes.
+    - If SDK decoration fails, falls back to returning the original function.
+    """
+    cached = getattr(f, "__sdk_tool__", None)
+    if cached is not None:
+        return cached
+    # οι type hints (ctx: RunContextWrapper[Any]) λύνονται στα globals του module: εδώ πρέπει
+    # να είναι η κλάση του SDK για να περάσει το context στο tool
+    global RunContextWrapper
+    RunContextWrapper = _agents.RunContextWrapper
+    kwargs = getattr(f, "__tool_kwargs__", {})
+    safe = {k: v for k, v in kwargs.items() if k in {"name_override", "description_override"}}
+    try:
+        try:
+            obj = _agents.function_tool(**safe, strict=False)(f)  # type: ignore[call-arg]
+        except TypeError:
+            # Older SDKs: no `strict` kw
+            obj = _agents.function_tool(**safe)(f)
+    except Exception:
+        # Fall back to the raw function if the SDK chokes on schema inference
+        return f
+    for attr in ("name", "description", "__strict__", "__parameters__"):
+        if hasattr(f, attr):
             try:
-                obj = _decorate_with_sdk(fn)
+                setattr(obj, attr, getattr(f, attr))  # for discovery UIs / our runtime
             except Exception:
-                obj = fn
-            return _attach_meta(obj, fn)
-except Exception:  # graceful fallback if Agents SDK missing
-    def function_tool(fn=None, **kwargs):
-        """A minimal decorator to attach metadata for tools when the
-        Agents SDK is not available. Keeps name/description/parameters/strict
-        as attributes on the underlying function so runtime can still inspect
-        and validate calls.
-        """
-        def _decorator(f):
-            # User-provided name/description fallbacks
-            setattr(f, "name", kwargs.get("name_override", getattr(f, "__name__", "tool")))
-            setattr(f, "description", kwargs.get("description_override", getattr(f, "__doc__", "")))
-            # Preserve strict + parameters metadata
-            if "strict" in kwargs:
-                setattr(f, "__strict__", bool(kwargs["strict"]))
-            if "parameters" in kwargs and kwargs["parameters"]:
-                setattr(f, "__parameters__", kwargs["parameters"])  # JSON Schema dict
-            return f
-
-        if fn is None:
-            return _decorator
-        return _decorator(fn)
-
-    class RunContextWrapper:  # minimal placeholder to satisfy type hints
-        def __init__(self, context=None, **kwargs):
-            self.context = context or {}
+                pass
+    f.__sdk_tool__ = obj
+    return obj
 
 # Unicode normalization helpers
 from unicodedata import normalize as _u_norm
 
-# Optional OpenAI client (for ask_llm)
-try:
-    from openai import OpenAI  # type: ignore
-except Exception:  # optional dependency
-    OpenAI = None  # type: ignore
+# Optional OpenAI client (for ask_llm)· lazy, φορτώνει στην πρώτη κλήση του LLM
+_openai = startup.LazyModule("openai") if startup.available("openai") else None
 
 from phrases import pick_trendy_phrase  # trendy phrase picker, optional
-from constants import TAXI_TARIFF  # tariff configuration
 import constants
+import livedata  # τιμοκατάλογος, περιοχές, UI strings (data/constants.json, hot reload)
 
 logger = logging.getLogger(__name__)
 
@@ -144,12 +124,19 @@ logger = logging.getLogger(__name__)
 
 BRAND_INFO: Dict[str, Any] = getattr(constants, "BRAND_INFO", {})
 DEFAULTS: Dict[str, Any] = getattr(constants, "DEFAULTS", {})
-UI_TEXT: Dict[str, str] = getattr(constants, "UI_TEXT", {})
-AREA_ALIASES: Dict[str, List[str]] = getattr(constants, "AREA_ALIASES", {})
 
-# Q tails που κολλάνε στο destination (GR & greeklish)
-_Q_TAIL_GR = r"(?:\bπόσο(?:\s+κοστίζει)?\b|\bκοστίζει\b|\bκάνει\b|\bτιμή\b|\?)\s*$"
-_Q_TAIL_GL = r"(?:\bposo(?:\s+kostizei)?\b|\bkostizei\b|\bkanei\b|\btimi\b|\?)\s*$"
+# Q tails που κολλάνε στο destination· σε skeleton μορφή, άρα πιάνουν και κάθε greeklish γραφή
+_Q_TAIL = greeklish.AliasIndex({"q": ["πόσο", "κοστίζει", "κάνει", "τιμή"]})
+
+# Greeklish/αγγλικά connectives → ελληνικά (μόνο σε λατινικές λέξεις: το ελληνικό "το" μένει)
+_CONNECTIVES = greeklish.AliasIndex({
+    "από": ["apo", "from"],
+    "μέχρι": ["mexri"],
+    "προς": ["pros", "to"],
+    "για": ["gia"],
+    "έως": ["eos"],
+})
+_LATIN_WORD_RE = re.compile(r"[A-Za-z\u00C0-\u024F]+")
 
 # Stopwords που ΔΕΝ πρέπει να θεωρηθούν origin/destination
 _ROUTE_STOPWORDS = {"πόσο", "απο", "μεχρι","εως","εωσ", "κοστίζει", "κάνει", "τιμή", "poso","from", "kostizei", "kanei", "timi"}
@@ -197,59 +184,33 @@ def _validate_with_schema(payload: dict, schema: dict, *, where: str = "") -> No
 
 def _deaccent(s: str) -> str:
     """Remove diacritics from a string."""
-    if not s:
-        return ""
-    return "".join(ch for ch in unicodedata.normalize("NFD", s) if unicodedata.category(ch) != "Mn")
+    return textnorm.deaccented(s)
 
 
 def _norm_txt(s: str) -> str:
-    """Normalize, lowercase, and strip diacritics and excess whitespace."""
-    s = unicodedata.normalize("NFKC", s or "").lower()
-    s = _deaccent(s)
-    s = re.sub(r"\s+", " ", s).strip()
+    """Normalize, lowercase, and strip diacritics and excess whitespace (cached για NormText)."""
+    return textnorm.folded(s)
+
+
+def _strip_q_tail(s: str) -> str:
+    s = s.rstrip()
+    while s:
+        if s.endswith("?"):
+            s = s[:-1].rstrip()
+            continue
+        head, _, last = s.rpartition(" ")
+        if last not in _Q_TAIL:
+            break
+        s = head.rstrip()
     return s
 
 
 def _preclean_route_text(s: str) -> str:
     """Καθαρίζει καταλήξεις ερώτησης και greeklish connectives για parsing."""
-    s = (s or "").strip()
-    s = re.sub(_Q_TAIL_GR, "", s, flags=re.IGNORECASE)
-    s = re.sub(_Q_TAIL_GL, "", s, flags=re.IGNORECASE)
-    repl = {
-        r"\bapo\b": "από",
-        r"\bapó\b": "από",
-        r"\bmexri\b": "μέχρι",
-        r"\bmehri\b": "μέχρι",
-        r"\bpros\b": "προς",
-        r"\bgia\b": "για",
-        r"\beos\b": "έως",
-        r"\bews\b": "έως",
-        r"\bfrom\b": "από",
-        r"\bto\b": "προς",
-    }
-    for pat, rep in repl.items():
-        s = re.sub(pat, rep, s, flags=re.IGNORECASE)
-    s = _u_norm("NFKC", s)
+    s = _strip_q_tail(_u_norm("NFKC", (s or "").strip()))
+    s = _LATIN_WORD_RE.sub(lambda m: _CONNECTIVES.lookup(m.group()) or m.group(), s)
     return s.strip()
 
-# ──────────────────────────────────────────────────────────────────────────────
-# Tariff helpers (συγχρονισμένα με constants.py)
-
-def _tariff(keys: List[str], default: float) -> float:
-    for k in keys:
-        try:
-            v = TAXI_TARIFF.get(k)
-            if v is not None:
-                return float(v)
-        except Exception:
-            pass
-    return float(default)
-
-
-DAY_KM = _tariff(["km_rate_city_or_day", "km_rate_zone1"], 0.90)
-NIGHT_KM = _tariff(["km_rate_zone2_or_night"], max(DAY_KM, 1.25))
-START_FEE = _tariff(["minimum_fare"], 4.0)
-
 # ──────────────────────────────────────────────────────────────────────────────
 # Brand info (fallback: env)
 
@@ -282,11 +243,11 @@ def _ask_llm_with_system_prompt(
     context_text: str = "",
     history: Optional[List[Dict[str, str]]] = None,
 ) -> str:
-    if OpenAI is None:
-        return UI_TEXT.get("generic_error", "❌ LLM client δεν είναι διαθέσιμος.")
+    if _openai is None:
+        return livedata.current().ui_text.get("generic_error", "❌ LLM client δεν είναι διαθέσιμος.")
     model = os.getenv("LLM_MODEL", os.getenv("OPENAI_MODEL", "gpt-4.1-mini"))
 
-    client = OpenAI()
+    client = _openai.OpenAI()
 
     history_msgs: List[Dict[str, str]] = []
     if history:
@@ -313,7 +274,7 @@ def _ask_llm_with_system_prompt(
         return resp.choices[0].message.content or ""
     except Exception:
         logger.exception("ask_llm OpenAI call failed")
-        return UI_TEXT.get("generic_error", "❌ Παρουσιάστηκε σφάλμα κατά την κλήση του LLM.")
+        return livedata.current().ui_text.get("generic_error", "❌ Παρουσιάστηκε σφάλμα κατά την κλήση του LLM.")
 
 
 @function_tool(
@@ -341,7 +302,7 @@ def ask_llm(ctx: RunContextWrapper[Any], user_message: str) -> str:
         )
     except Exception:
         logger.exception("ask_llm failed")
-        return UI_TEXT.get("generic_error", "❌ Παρουσιάστηκε σφάλμα κατά την κλήση του LLM.")
+        return livedata.current().ui_text.get("generic_error", "❌ Παρουσιάστηκε σφάλμα κατά την κλήση του LLM.")
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -408,19 +369,18 @@ _GAZETTEER: Dict[str, Dict[str, Any]] = {
     },
 }
 
-_alias_to_pid: Dict[str, str] = {}
-for _pid, _rec in _GAZETTEER.items():
-    for _a in _rec.get("aliases", []) or []:
-        _alias_to_pid[_norm_txt(_a)] = _pid
+_GAZETTEER_INDEX = greeklish.bundled_index(
+    "tools.gazetteer", lambda: {pid: rec.get("aliases") or [] for pid, rec in _GAZETTEER.items()}, __file__
+)
 
 
 def _lookup_gazetteer(q: str) -> Optional[Dict[str, Any]]:
     key = _norm_txt(q)
-    pid = _alias_to_pid.get(key)
+    pid = _GAZETTEER_INDEX.lookup(key)
     if not pid:
         # try removing Greek articles
         key2 = re.sub(r"^(το|η|ο|τα|οι)\s+", "", key)
-        pid = _alias_to_pid.get(key2)
+        pid = _GAZETTEER_INDEX.lookup(key2)
     if pid:
         r = _GAZETTEER[pid]
         return {
@@ -435,10 +395,14 @@ def _lookup_gazetteer(q: str) -> Optional[Dict[str, Any]]:
 # ──────────────────────────────────────────────────────────────────────────────
 # Geocoding (OSM/Nominatim)
 
+# Override για load tests με τοπικό stub (βλ. loadtest/stubs.py)
+NOMINATIM_URL = os.getenv("NOMINATIM_URL", "https://nominatim.openstreetmap.org/search")
+
+
 def geocode_osm(q: str) -> Tuple[float, float]:
     """Geocode an address using OpenStreetMap's Nominatim API."""
     r = requests.get(
-        "https://nominatim.openstreetmap.org/search",
+        NOMINATIM_URL,
         params={"q": q, "format": "jsonv2", "limit": 1},
         headers={"User-Agent": "MrBooky/1.0 (+taxi)"},
         timeout=8,
@@ -503,7 +467,7 @@ def estimate_fare(
     round_trip: bool = False,
 ) -> Dict[str, Any]:
     """
-    Υπολογίζει κομίστρα με βάση START_FEE/DAY_KM/NIGHT_KM.
+    Υπολογίζει κομίστρα με βάση τον τρέχοντα τιμοκατάλογο (livedata: start_fee/day_km/night_km).
     Επιστρέφει {distance_km, duration_min, price_eur, night, round_trip, map_url}.
     """
     payload = {
@@ -522,8 +486,9 @@ def estimate_fare(
     km_one_way = _haversine_km(origin["lat"], origin["lng"], destination["lat"], destination["lng"])
     total_km = km_one_way * (2.0 if round_trip else 1.0)
 
-    per_km = NIGHT_KM if night else DAY_KM
-    price = START_FEE + per_km * total_km
+    snap = livedata.current()
+    per_km = snap.night_km if night else snap.day_km
+    price = snap.start_fee + per_km * total_km
 
     # Urban-ish average speeds for more realistic durations
     avg_kmh = 26.0 if total_km < 8 else 35.0
@@ -577,9 +542,10 @@ def _estimate_price_and_time_km(
     distance_km: float, *, night: bool = False, round_trip: bool = False
 ) -> Dict[str, Any]:
     """Χονδρική εκτίμηση (χωρίς διόδια)."""
-    per_km = NIGHT_KM if night else DAY_KM
+    snap = livedata.current()
+    per_km = snap.night_km if night else snap.day_km
     total_km = max(distance_km, 0.0) * (2.0 if round_trip else 1.0)
-    cost = START_FEE + per_km * total_km
+    cost = snap.start_fee + per_km * total_km
     avg_kmh = 83.0  # Assumed highway average speed (km/h) for long trips
     duration_h = total_km / max(avg_kmh, 1.0)
     duration_min = int(round(duration_h * 60))
@@ -711,22 +677,31 @@ def _fmt_minutes(mins: Optional[int]) -> Optional[str]:
 # ──────────────────────────────────────────────────────────────────────────────
 # Trip quote tools
 
-@function_tool
-def trip_quote_nlp(message: str, when: str = "now") -> str:
+def _keep_quote(text: str, origin_txt: str, dest_txt: str, **kw: Any) -> Tuple[str, Optional[Quote]]:
+    try:
+        q = quotes.BOOK.put(Quote.new(origin_txt, dest_txt, reply=text, **kw))
+    except Exception:
+        logger.exception("quote record failed")
+        q = None
+    return text, q
+
+
+def trip_quote(message: str, when: str = "now") -> Tuple[str, Optional[Quote]]:
     """
     Extract origin/destination from free text and estimate trip cost, distance,
     and duration. First attempts strict tools (resolve_place → estimate_fare).
     If that fails, uses the external Timologio API if available; otherwise
     provides a fallback estimate. Always includes a Google Maps link to the
-    calculated route. The output is a human-friendly string.
+    calculated route. Returns the human-friendly string and the Quote record
+    (None when the route could not be parsed).
     """
     logger.info("[tool] trip_quote_nlp parse")
     origin_txt, dest_txt = _extract_route_free_text(message)
     if not origin_txt or not dest_txt:
-        return UI_TEXT.get(
+        return livedata.current().ui_text.get(
             "ask_trip_route",
             "❓ Πες μου από πού ξεκινάς και πού πας (π.χ. «Από Πάτρα μέχρι Διακοπτό»).",
-        )
+        ), None
 
     night_flag = _detect_night_or_double_tariff(message, when)
     round_trip_flag = _is_round_trip(message)
@@ -756,8 +731,14 @@ def trip_quote_nlp(message: str, when: str = "now") -> str:
             parts.append(f"⏱️ Χρόνος: ~{dur_text}")
         if res.get("map_url"):
             parts.append(f"[📌 Δες τη διαδρομή στον χάρτη]({res['map_url']})")
-        parts.append(UI_TEXT.get("fare_disclaimer", "⚠️ Η τιμή δεν περιλαμβάνει διόδια."))
-        return "\n".join(parts)
+        parts.append(livedata.current().ui_text.get("fare_disclaimer", "⚠️ Η τιμή δεν περιλαμβάνει διόδια."))
+        return _keep_quote(
+            "\n".join(parts), origin_txt, dest_txt,
+            price_eur=_round5(res["price_eur"]), distance_km=res.get("distance_km"),
+            duration_min=res.get("duration_min"), night=night_flag, round_trip=round_trip_flag,
+            origin_coords=(o["lat"], o["lng"]), dest_coords=(d["lat"], d["lng"]),
+            map_url=res.get("map_url"), source="strict",
+        )
     except Exception:
         logger.exception("strict tools pipeline failed; falling back")
 
@@ -795,10 +776,12 @@ def trip_quote_nlp(message: str, when: str = "now") -> str:
             km_val = None
 
         parts: List[str] = []
+        q_price: Optional[float] = None
 
         if round_trip_flag and km_val is not None:
             est = _estimate_price_and_time_km(km_val, night=night_flag, round_trip=True)
             rounded = _round5(est["price_eur"])
+            q_price, mins = rounded, est["duration_min"]
             parts.append(f"💶 Εκτίμηση: {rounded}€ (πήγαινε–έλα)")
             parts.append(f"🛣️ Συνολική απόσταση: ~{est['distance_km']} km (2×{round(km_val, 1)} km)")
             parts.append(f"⏱️ Χρόνος: ~{_fmt_minutes(est['duration_min'])}")
@@ -813,6 +796,7 @@ def trip_quote_nlp(message: str, when: str = "now") -> str:
                 try:
                     price_val = float(str(price).replace(",", "."))
                     rounded = _round5(price_val)
+                    q_price = rounded
                     parts.append(f"💶 Τιμή: {rounded}€")
                 except Exception:
                     parts.append(f"💶 Τιμή: {price}€")
@@ -827,8 +811,12 @@ def trip_quote_nlp(message: str, when: str = "now") -> str:
                 f"&destination={quote_plus(dest_txt)}&travelmode=driving"
             )
         parts.append(f"[📌 Δες τη διαδρομή στον χάρτη]({map_url})")
-        parts.append(UI_TEXT.get("fare_disclaimer", "⚠️ Η τιμή δεν περιλαμβάνει διόδια."))
-        return "\n".join(parts)
+        parts.append(livedata.current().ui_text.get("fare_disclaimer", "⚠️ Η τιμή δεν περιλαμβάνει διόδια."))
+        return _keep_quote(
+            "\n".join(parts), origin_txt, dest_txt,
+            price_eur=q_price, distance_km=km_val, duration_min=mins,
+            night=night_flag, round_trip=round_trip_flag, map_url=map_url, source="timologio",
+        )
 
     # 3) FALLBACK when Timologio is unavailable
     logger.warning("[tool] timologio unavailable, using fallback")
@@ -848,9 +836,25 @@ def trip_quote_nlp(message: str, when: str = "now") -> str:
         + (f" (2×{round(one_way_km, 1)} km)" if round_trip_flag else ""),
         f"⏱️ Χρόνος: ~{dur_text}",
         f"[📌 Δες τη διαδρομή στον χάρτη]({map_url})",
-        UI_TEXT.get("fare_disclaimer", "⚠️ Η τιμή δεν περιλαμβάνει διόδια."),
+        livedata.current().ui_text.get("fare_disclaimer", "⚠️ Η τιμή δεν περιλαμβάνει διόδια."),
     ]
-    return "\n".join(body)
+    return _keep_quote(
+        "\n".join(body), origin_txt, dest_txt,
+        price_eur=_round5(est["price_eur"]), distance_km=est["distance_km"], duration_min=est["duration_min"],
+        night=night_flag, round_trip=round_trip_flag, map_url=map_url, source="fallback",
+    )
+
+
+@function_tool
+def trip_quote_nlp(message: str, when: str = "now") -> str:
+    """
+    Extract origin/destination from free text and estimate trip cost, distance,
+    and duration. First attempts strict tools (resolve_place → estimate_fare).
+    If that fails, uses the external Timologio API if available; otherwise
+    provides a fallback estimate. Always includes a Google Maps link to the
+    calculated route. The output is a human-friendly string.
+    """
+    return trip_quote(message, when)[0]
 
 
 @function_tool
@@ -904,41 +908,12 @@ def taxi_contact(city: str = "Πάτρα") -> str:
 # ──────────────────────────────────────────────────────────────────────────────
 # Φαρμακεία
 
-def _build_area_rules() -> List[Tuple[str, str]]:
-    """Construct regex patterns for mapping area aliases to canonical names."""
-    rules: List[Tuple[str, str]] = []
-    aliases_map = AREA_ALIASES or {}
-    for canon, aliases in aliases_map.items():
-        norm_aliases = [re.escape(_norm_txt(a)) for a in aliases if a]
-        if not norm_aliases:
-            continue
-        pattern = r"\b(?:" + "|".join(norm_aliases) + r")\b"
-        rules.append((pattern, canon))
-    return rules
-
-
-AREA_RULES: List[Tuple[str, str]] = _build_area_rules()
 DEFAULT_AREA = DEFAULTS.get("default_area", "Πάτρα")
 
 
 def _area_from_text(text: str) -> Optional[str]:
-    """Extract a canonical area from user text based on defined aliases."""
-    if not text:
-        return None
-    t = _norm_txt(text)
-
-    for pat, canon in AREA_RULES:
-        if re.search(pat, t):
-            return canon
-
-    m = re.search(r"\bστ[οην]\s+([a-z0-9 .'\-]+)", t)
-    if m:
-        chunk = m.group(1).strip()
-        for pat, canon in AREA_RULES:
-            if re.search(pat, chunk):
-                return canon
-
-    return None
+    """Extract a canonical area from user text (κοινό area index, βλ. livedata.Snapshot.area)."""
+    return livedata.current().area(text)
 
 
 @function_tool(
@@ -961,11 +936,11 @@ def pharmacy_lookup(area: str = DEFAULT_AREA, method: str = "get") -> str:
         data = client.get_on_duty(area=area, method=method)
     except Exception:
         logger.exception("pharmacy_lookup failed")
-        return UI_TEXT.get("generic_error", "❌ Δεν κατάφερα να φέρω εφημερεύοντα φαρμακεία.")
+        return livedata.current().ui_text.get("generic_error", "❌ Δεν κατάφερα να φέρω εφημερεύοντα φαρμακεία.")
 
     items = data if isinstance(data, list) else data.get("pharmacies", [])
     if not items:
-        return UI_TEXT.get("pharmacy_none_for_area", "❌ Δεν βρέθηκαν εφημερεύοντα.").format(area=area)
+        return livedata.current().ui_text.get("pharmacy_none_for_area", "❌ Δεν βρέθηκαν εφημερεύοντα.").format(area=area)
 
     groups: Dict[str, List[Dict[str, Any]]] = {}
     for p in items:
@@ -1003,18 +978,18 @@ def pharmacy_lookup_nlp(message: str, method: str = "get") -> str:
 
     area = _area_from_text(message)
     if not area:
-        return UI_TEXT.get("ask_pharmacy_area", "Για ποια περιοχή να ψάξω εφημερεύον φαρμακείο; 😊")
+        return livedata.current().ui_text.get("ask_pharmacy_area", "Για ποια περιοχή να ψάξω εφημερεύον φαρμακείο; 😊")
 
     client = PharmacyClient()
     try:
         data = client.get_on_duty(area=area, method=method)
     except Exception:
         logger.exception("pharmacy_lookup_nlp failed")
-        return UI_TEXT.get("generic_error", "❌ Δεν κατάφερα να φέρω εφημερεύοντα φαρμακεία.")
+        return livedata.current().ui_text.get("generic_error", "❌ Δεν κατάφερα να φέρω εφημερεύοντα φαρμακεία.")
 
     items = data if isinstance(data, list) else data.get("pharmacies", [])
     if not items:
-        return UI_TEXT.get("pharmacy_none_for_area", "❌ Δεν βρέθηκαν εφημερεύοντα για {area}.").format(area=area)
+        return livedata.current().ui_text.get("pharmacy_none_for_area", "❌ Δεν βρέθηκαν εφημερεύοντα για {area}.").format(area=area)
 
     groups: Dict[str, List[Dict[str, Any]]] = {}
     for p in items:
@@ -1068,7 +1043,7 @@ def hospital_duty(which_day: str = "σήμερα") -> str:
         return result
     except Exception:
         logger.exception("hospital_duty failed")
-        return UI_TEXT.get("generic_error", "❌ Δεν κατάφερα να φέρω τα εφημερεύοντα νοσοκομεία.")
+        return livedata.current().ui_text.get("generic_error", "❌ Δεν κατάφερα να φέρω τα εφημερεύοντα νοσοκομεία.")
 
 
 @function_tool
@@ -1081,7 +1056,7 @@ def patras_info(query: str) -> str:
         return client.ask(query)
     except Exception:
         logger.exception("patras_info failed")
-        return UI_TEXT.get("generic_error", "❌ Δεν κατάφερα να βρω πληροφορίες.")
+        return livedata.current().ui_text.get("generic_error", "❌ Δεν κατάφερα να βρω πληροφορίες.")
 
 
 def detect_area_for_pharmacy(message: str):
@@ -1114,26 +1089,3 @@ def notify_booking_slack(payload: dict) -> bool:
         return r.status_code < 300
     except Exception:
         return False
-
-# ──────────────────────────────────────────────────────────────────────────────
-# Make decorated tools callable when imported directly
-# When the Agents SDK is available, @function_tool may wrap functions into
-# objects that aren't directly callable. Keep old behavior by exposing __call__.
-try:
-    for _name in (
-        "pharmacy_lookup",
-        "pharmacy_lookup_nlp",
-        "hospital_duty",
-        "resolve_place",
-        "estimate_fare",
-    ):
-        _obj = globals().get(_name)
-        if _obj is not None and not callable(_obj):
-            # Try common attribute names that hold the original function
-            underlying = getattr(_obj, "func", None) or getattr(_obj, "_func", None) or getattr(_obj, "fn", None)
-            if underlying and callable(underlying):
-                def _make_call(u):
-                    return lambda *a, **kw: u(*a, **kw)
-                setattr(_obj, "__call__", _make_call(underlying))  # type: ignore
-except Exception:
-    pass
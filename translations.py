@@ -0,0 +1,421 @@
+# translations.py
+"""
+Τοπικοποίηση απαντήσεων χωρίς LLM.
+
+1) Template catalog (data/translations.json): οι σταθερές γραμμές του bot
+   (contact, UI_TEXT, PROMPTS, tour cards, φαρμακεία, booking) είναι ήδη
+   μεταφρασμένες για τις βασικές γλώσσες → 0 LLM calls.
+2) Translation cache για τα δυναμικά replies: key = (normalized text, lang),
+   LRU + TTL στη μνήμη και προαιρετικά κοινό Redis ή SQLite (L2) για πολλούς workers.
+3) Μετρητές: πόσες προσαρμογές σερβιρίστηκαν χωρίς LLM.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import localdb
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FILE = os.getenv("TRANSLATIONS_FILE", "data/translations.json")
+CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "2000"))
+CACHE_TTL_SEC = int(os.getenv("TRANSLATION_CACHE_TTL_SEC", str(7 * 24 * 3600)))
+CACHE_BACKEND = os.getenv("TRANSLATION_CACHE_BACKEND", os.getenv("PERSIST_BACKEND", "memory"))
+
+GREEK_RE = re.compile(r"[\u0370-\u03FF\u1F00-\u1FFF]")
+_PH_RE = re.compile(r"\{(\w+)(?::(\w+))?\}")
+_WS_RE = re.compile(r"[ \t\u00a0]+")
+# Εισαγωγικό token χωρίς γράμματα (emoji / σύμβολα) που ακολουθείται από κενό — π.χ. "🚕 " από το enrich_reply
+_LEAD_SYM_RE = re.compile(r"([^\w\s]+)\s+(.*)$", re.S)
+
+# Τιμή placeholder ανά τύπο: default = χωρίς ελληνικά (αριθμοί, URLs, τηλέφωνα)
+_PH_PATTERNS = {
+    None: r"[^\u0370-\u03FF\u1F00-\u1FFF]+?",
+    "name": r".+?",
+    "words": r".+?",
+}
+
+_DROP = object()
+
+
+def looks_greek(s: str) -> bool:
+    return bool(GREEK_RE.search(s or ""))
+
+
+def normalize_text(text: str) -> str:
+    """Σταθερή μορφή για keys: συμπτυγμένα κενά ανά γραμμή, χωρίς trailing κενές γραμμές."""
+    lines = [_WS_RE.sub(" ", ln).strip() for ln in (text or "").strip().splitlines()]
+    return "\n".join(lines)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Template catalog
+
+class _Template:
+    __slots__ = ("regex", "kinds", "targets", "literal")
+
+    def __init__(self, el: str, targets: Dict[str, str]):
+        el = _WS_RE.sub(" ", el).strip()
+        parts: List[str] = []
+        pos = 0
+        self.kinds: Dict[str, Optional[str]] = {}
+        for m in _PH_RE.finditer(el):
+            parts.append(re.escape(el[pos:m.start()]))
+            name, kind = m.group(1), m.group(2)
+            self.kinds[name] = kind
+            parts.append(f"(?P<{name}>{_PH_PATTERNS.get(kind, _PH_PATTERNS[None])})")
+            pos = m.end()
+        parts.append(re.escape(el[pos:]))
+        self.regex = re.compile("".join(parts))
+        self.literal = el[: el.find("{")] if "{" in el else el
+        self.targets = {k: _WS_RE.sub(" ", v).strip() for k, v in targets.items()}
+
+
+class TemplateCatalog:
+    """Line-level μεταφραστής: κάθε ελληνική γραμμή πρέπει να ταιριάζει σε template."""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.version = data.get("version", 0)
+        self.langs = tuple(data.get("langs") or ())
+        self.prefixes: Dict[str, Dict[str, str]] = data.get("prefixes") or {}
+        self.words: Dict[str, Dict[str, str]] = {k.lower(): v for k, v in (data.get("words") or {}).items()}
+        # index ανά πρώτο χαρακτήρα· τα πιο "μακριά" literals πρώτα (πιο συγκεκριμένα)
+        self._by_first: Dict[str, List[_Template]] = {}
+        self._wild: List[_Template] = []
+        for row in data.get("templates") or []:
+            el = row.get("el")
+            if not el:
+                continue
+            targets = {k: v for k, v in row.items() if k != "el"}
+            self._add(_Template(el, targets))
+            # Το enrich_reply κόβει emojis όταν είναι >4 → δήλωσε και την "γυμνή" εκδοχή
+            m = _LEAD_SYM_RE.match(el)
+            if m and not looks_greek(m.group(1)):
+                bare = {k: (_LEAD_SYM_RE.match(v).group(2) if _LEAD_SYM_RE.match(v) else v) for k, v in targets.items()}
+                tpl = _Template(m.group(2), bare)
+                if looks_greek(tpl.literal):  # όχι σκέτο "{title}" — θα έπιανε οτιδήποτε
+                    self._add(tpl)
+        for bucket in self._by_first.values():
+            bucket.sort(key=lambda t: len(t.literal), reverse=True)
+
+    def _add(self, tpl: _Template) -> None:
+        if tpl.literal:
+            self._by_first.setdefault(tpl.literal[0], []).append(tpl)
+        else:
+            self._wild.append(tpl)
+
+    @classmethod
+    def load(cls, path: str = CATALOG_FILE) -> "TemplateCatalog":
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls(json.load(f))
+        except Exception:
+            logger.warning("translations: δεν φορτώθηκε το %s — κενός catalog", path, exc_info=True)
+            return cls({})
+
+    def supports(self, lang: Optional[str]) -> bool:
+        return bool(lang) and lang in self.langs
+
+    def _words(self, value: str, lang: str) -> str:
+        out = []
+        for tok in value.split(" "):
+            tr = (self.words.get(tok.lower()) or {}).get(lang)
+            out.append(tr if tr else tok)
+        return " ".join(out)
+
+    def _match(self, s: str, lang: str) -> Optional[str]:
+        for tpl in self._by_first.get(s[0], []) + self._wild:
+            if tpl.literal and not s.startswith(tpl.literal):
+                continue
+            m = tpl.regex.fullmatch(s)
+            if not m:
+                continue
+            target = tpl.targets.get(lang)
+            if target is None:
+                return None
+            vals = m.groupdict()
+            for name, kind in tpl.kinds.items():
+                if kind == "words":
+                    vals[name] = self._words(vals[name], lang)
+            return _PH_RE.sub(lambda mm: vals.get(mm.group(1), ""), target)
+        return None
+
+    def _line(self, s: str, lang: str, trendy: Callable[[], frozenset]) -> Any:
+        lead = ""
+        while s:
+            hit = self._match(s, lang)
+            if hit is not None:
+                return lead + hit
+            if s in trendy():
+                return _DROP  # trendy φράσεις είναι ελληνικό "χρώμα" — δεν μεταφράζονται
+            for p, tr in self.prefixes.items():
+                if s == p or s.startswith(p + " "):
+                    if lang not in tr:
+                        return None
+                    lead += tr[lang] + " "
+                    s = s[len(p):].lstrip()
+                    break
+            else:
+                m = _LEAD_SYM_RE.match(s)
+                if not m or looks_greek(m.group(1)):
+                    return None
+                lead += m.group(1) + " "
+                s = m.group(2)
+        return lead.rstrip()
+
+    def translate(self, text: str, lang: str, *, trendy: Callable[[], frozenset] = frozenset) -> Optional[str]:
+        """Ολόκληρο reply → lang, ή None αν έστω μία ελληνική γραμμή δεν καλύπτεται."""
+        if not self.supports(lang):
+            return None
+        out: List[str] = []
+        for raw in (text or "").split("\n"):
+            s = _WS_RE.sub(" ", raw).strip()
+            if not s or not looks_greek(s):
+                out.append(raw)
+                continue
+            tr = self._line(s, lang, trendy)
+            if tr is None:
+                return None
+            if tr is _DROP:
+                continue
+            out.append(tr)
+        return "\n".join(out).strip()
+
+
+_CATALOG: Optional[TemplateCatalog] = None
+_CATALOG_LOCK = threading.Lock()
+
+
+def get_catalog() -> TemplateCatalog:
+    global _CATALOG
+    if _CATALOG is None:
+        with _CATALOG_LOCK:
+            if _CATALOG is None:
+                _CATALOG = TemplateCatalog.load()
+    return _CATALOG
+
+
+def reload_catalog() -> TemplateCatalog:
+    global _CATALOG
+    with _CATALOG_LOCK:
+        _CATALOG = TemplateCatalog.load()
+    return _CATALOG
+
+
+_TRENDY_CACHE: Tuple[int, frozenset] = (0, frozenset())
+
+
+def _trendy_texts() -> frozenset:
+    # Το phrases.py αντικαθιστά τη λίστα σε κάθε reload → το id() αρκεί ως version
+    global _TRENDY_CACHE
+    try:
+        from phrases import _load_trendy
+        items = _load_trendy()
+    except Exception:
+        return frozenset()
+    if _TRENDY_CACHE[0] != id(items):
+        _TRENDY_CACHE = (id(items), frozenset(_WS_RE.sub(" ", x.get("text", "")).strip() for x in items))
+    return _TRENDY_CACHE[1]
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Translation cache (L1 μνήμη, L2 Redis/SQLite προαιρετικά)
+
+class TranslationCache:
+    def __init__(self, *, maxsize: int = CACHE_SIZE, ttl: int = CACHE_TTL_SEC, redis_url: Optional[str] = None,
+                 db_path: Optional[str] = None):
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl
+        self._mem: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.r = None
+        self.db_path = db_path  # L2 στο κοινό SQLite του host (localdb)
+        self.prefix = "mrbooky:tr:"
+        if redis_url:
+            try:
+                import redis
+
+                self.r = redis.Redis.from_url(redis_url, decode_responses=True)
+            except Exception:
+                logger.warning("translations: Redis μη διαθέσιμο — μόνο memory cache", exc_info=True)
+
+    @staticmethod
+    def key(text: str, lang: str) -> str:
+        h = hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+        return f"{lang}:{h}"
+
+    @property
+    def blocking(self) -> bool:
+        """L2 με I/O (Redis/SQLite): οι async εκδοχές το καλούν σε thread."""
+        return self.r is not None or bool(self.db_path)
+
+    def get(self, text: str, lang: str) -> Optional[str]:
+        k = self.key(text, lang)
+        now = time.time()
+        v = self._get_mem(k, now)
+        return v if v is not None else self._get_l2(k, now)
+
+    async def aget(self, text: str, lang: str) -> Optional[str]:
+        k = self.key(text, lang)
+        now = time.time()
+        v = self._get_mem(k, now)
+        if v is not None or not self.blocking:
+            return v
+        return await asyncio.to_thread(self._get_l2, k, now)
+
+    def set(self, text: str, lang: str, translated: str) -> None:
+        k = self.key(text, lang)
+        self._put_mem(k, translated, time.time())
+        self._set_l2(k, translated)
+
+    async def aset(self, text: str, lang: str, translated: str) -> None:
+        k = self.key(text, lang)
+        self._put_mem(k, translated, time.time())
+        if self.blocking:
+            await asyncio.to_thread(self._set_l2, k, translated)
+
+    def _get_mem(self, k: str, now: float) -> Optional[str]:
+        with self._lock:
+            item = self._mem.get(k)
+            if item is not None:
+                if item[0] > now:
+                    self._mem.move_to_end(k)
+                    return item[1]
+                self._mem.pop(k, None)
+        return None
+
+    def _get_l2(self, k: str, now: float) -> Optional[str]:
+        if self.r is not None:
+            try:
+                v = self.r.get(self.prefix + k)
+            except Exception:
+                logger.warning("translations: Redis get απέτυχε", exc_info=True)
+                v = None
+        elif self.db_path:
+            try:
+                v = localdb.get_db(self.db_path).get("tr", k, now)
+            except Exception:
+                logger.warning("translations: SQLite get απέτυχε", exc_info=True)
+                v = None
+        else:
+            return None
+        if v:
+            self._put_mem(k, v, now)
+            return v
+        return None
+
+    def _set_l2(self, k: str, translated: str) -> None:
+        if self.r is not None:
+            try:
+                self.r.set(self.prefix + k, translated, ex=self.ttl)
+            except Exception:
+                logger.warning("translations: Redis set απέτυχε", exc_info=True)
+        elif self.db_path:
+            try:
+                localdb.get_db(self.db_path).set("tr", k, translated, self.ttl)
+            except Exception:
+                logger.warning("translations: SQLite set απέτυχε", exc_info=True)
+
+    def _put_mem(self, k: str, v: str, now: float) -> None:
+        with self._lock:
+            self._mem[k] = (now + self.ttl, v)
+            self._mem.move_to_end(k)
+            while len(self._mem) > self.maxsize:
+                self._mem.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._mem)
+
+
+def _make_cache() -> TranslationCache:
+    if CACHE_BACKEND.lower() == "sqlite":
+        return TranslationCache(db_path=localdb.LOCAL_DB)
+    url = os.getenv("REDIS_URL", "") if CACHE_BACKEND.lower() == "redis" else ""
+    return TranslationCache(redis_url=url or None)
+
+
+CACHE = _make_cache()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Stats
+
+_STATS = {"catalog": 0, "cache": 0, "llm": 0}
+_STATS_LOCK = threading.Lock()
+
+
+def _count(kind: str) -> None:
+    with _STATS_LOCK:
+        _STATS[kind] += 1
+
+
+def record_llm() -> None:
+    _count("llm")
+
+
+def stats() -> Dict[str, Any]:
+    with _STATS_LOCK:
+        s = dict(_STATS)
+    total = s["catalog"] + s["cache"] + s["llm"]
+    s["total"] = total
+    s["served_without_llm_pct"] = round(100.0 * (s["catalog"] + s["cache"]) / total, 1) if total else 0.0
+    s["cache_entries"] = len(CACHE)
+    return s
+
+
+def reset_stats() -> None:
+    with _STATS_LOCK:
+        for k in _STATS:
+            _STATS[k] = 0
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Public API
+
+def localize(text: str, lang: Optional[str]) -> Optional[str]:
+    """Catalog → cache. Επιστρέφει None όταν χρειάζεται LLM."""
+    if not text or not lang:
+        return None
+    out = get_catalog().translate(text, lang, trendy=_trendy_texts)
+    if out is not None:
+        _count("catalog")
+        return out
+    out = CACHE.get(text, lang)
+    if out is not None:
+        _count("cache")
+        return out
+    return None
+
+
+async def alocalize(text: str, lang: Optional[str]) -> Optional[str]:
+    """Όπως το localize, για το request path: το L2 (Redis/SQLite) διαβάζεται σε thread."""
+    if not text or not lang:
+        return None
+    out = get_catalog().translate(text, lang, trendy=_trendy_texts)
+    if out is not None:
+        _count("catalog")
+        return out
+    out = await CACHE.aget(text, lang)
+    if out is not None:
+        _count("cache")
+        return out
+    return None
+
+
+def remember(text: str, lang: Optional[str], translated: str) -> None:
+    if text and lang and translated and translated != text:
+        CACHE.set(text, lang, translated)
+
+
+async def aremember(text: str, lang: Optional[str], translated: str) -> None:
+    if text and lang and translated and translated != text:
+        await CACHE.aset(text, lang, translated)